@@ -0,0 +1,378 @@
+# analitica.py
+# Este archivo calcula indicadores de cartera: mediana y percentiles 10/90 del cumplimiento de cada KPA,
+# histogramas de porcentajes, proporción de proyectos que cumplen el Nivel 2 y la evolución por periodo
+# Uso histogramas de intervalos fijos: ocupan siempre lo mismo (101 contadores por KPA), se llenan
+# en una sola pasada y dos resultados parciales (por ejemplo, de procesos distintos) se fusionan sumándolos
+
+import json  # Para guardar y leer resultados parciales
+from KPAS import KPAS  # Cargo las 5 KPAs con sus preguntas
+
+
+# Ancho de cada intervalo del histograma (en puntos de porcentaje)
+# Con 1 punto los porcentajes del cuestionario incluido (múltiplos de 10) caen cada uno en su intervalo
+ANCHO_INTERVALO = 1.0
+
+# Percentiles que muestro en el informe
+PERCENTILES = (10, 50, 90)
+
+
+class HistogramaFijo:
+    """
+    Histograma de porcentajes (0-100) con intervalos de ancho fijo.
+    Guardo también la suma exacta para la media. Los cuantiles se calculan con el criterio
+    del rango más cercano y se devuelven como el límite inferior de su intervalo,
+    así que su precisión es el ancho del intervalo.
+    """
+
+    def __init__(self, ancho=ANCHO_INTERVALO, minimo=0.0, maximo=100.0):
+        self.ancho = ancho
+        self.minimo = minimo
+        self.maximo = maximo
+        self.contadores = [0] * (int((maximo - minimo) / ancho) + 1)  # El último intervalo es el máximo
+        self.total = 0
+        self.suma = 0.0
+
+    def indice(self, valor):
+        # Los valores fuera de rango van al primer o al último intervalo
+        i = int((valor - self.minimo) / self.ancho)
+        return min(max(i, 0), len(self.contadores) - 1)
+
+    def agregar(self, valor, veces=1):
+        self.contadores[self.indice(valor)] += veces
+        self.total += veces
+        self.suma += valor * veces
+
+    def fusionar(self, otro):
+        """
+        Sumo otro histograma con los mismos intervalos a este.
+        """
+        if (otro.ancho, otro.minimo, otro.maximo) != (self.ancho, self.minimo, self.maximo):
+            raise ValueError("Solo puedo fusionar histogramas con los mismos intervalos.")
+        self.contadores = [a + b for a, b in zip(self.contadores, otro.contadores)]
+        self.total += otro.total
+        self.suma += otro.suma
+        return self
+
+    def limite_inferior(self, i):
+        return self.minimo + i * self.ancho
+
+    def cuantil(self, q):
+        """
+        Devuelvo el cuantil q (entre 0 y 1) o None si el histograma está vacío.
+        """
+        if not self.total:
+            return None
+        # Rango más cercano: el menor valor que deja al menos q·total observaciones por debajo o en él
+        rango = max(1, -(-q * self.total // 1))
+        acumulado = 0
+        for i, n in enumerate(self.contadores):
+            acumulado += n
+            if acumulado >= rango:
+                return self.limite_inferior(i)
+        return self.limite_inferior(len(self.contadores) - 1)
+
+    @property
+    def media(self):
+        return self.suma / self.total if self.total else None
+
+    def a_dict(self):
+        return {"ancho": self.ancho, "minimo": self.minimo, "maximo": self.maximo,
+                "contadores": self.contadores, "total": self.total, "suma": self.suma}
+
+    @classmethod
+    def desde_dict(cls, datos):
+        h = cls(datos["ancho"], datos["minimo"], datos["maximo"])
+        h.contadores = list(datos["contadores"])
+        h.total = datos["total"]
+        h.suma = datos["suma"]
+        return h
+
+
+def periodo_de(fecha):
+    """
+    Devuelvo el periodo (año-mes, "AAAA-MM") de una fecha "AAAA-MM-DD ..." o None si no hay fecha.
+    """
+    return fecha[:7] if fecha else None
+
+
+class AnaliticaCartera:
+    """
+    Indicadores de cartera calculados en una sola pasada y con memoria acotada:
+    un histograma y el reparto de estados por KPA, los proyectos que cumplen el Nivel 2
+    y, por cada periodo, los contadores necesarios para ver la evolución de la media de cada KPA.
+    """
+
+    def __init__(self, kpas=None, ancho=ANCHO_INTERVALO):
+        # KPAs de los resultados: las del cuestionario incluido o las de un cuestionario cargado
+        self.kpas = list(kpas or KPAS)
+        self.ancho = ancho
+        self.proyectos = 0
+        self.cumplen_nivel2 = 0
+        self.histogramas = {kpa: HistogramaFijo(ancho) for kpa in self.kpas}
+        self.estados = {kpa: {"Implementada": 0, "Parcialmente implementada": 0, "Deficiente": 0}
+                        for kpa in self.kpas}
+        # periodo -> {"proyectos", "cumplen_nivel2", "sumas": {kpa: suma de porcentajes}}
+        self.periodos = {}
+
+    def agregar(self, resultados, cumple_nivel2, fecha=None):
+        """
+        Sumo un proyecto: sus resultados por KPA (con "kpa", "porcentaje" y "estado"),
+        su veredicto de Nivel 2 y, opcionalmente, la fecha de la evaluación para la evolución por periodo.
+        """
+        self.proyectos += 1
+        self.cumplen_nivel2 += 1 if cumple_nivel2 else 0
+        periodo = periodo_de(fecha)
+        if periodo is not None:
+            p = self.periodos.get(periodo)
+            if p is None:
+                p = self.periodos[periodo] = {"proyectos": 0, "cumplen_nivel2": 0,
+                                              "sumas": {kpa: 0.0 for kpa in self.kpas}}
+            p["proyectos"] += 1
+            p["cumplen_nivel2"] += 1 if cumple_nivel2 else 0
+        for r in resultados:
+            kpa, porcentaje = r["kpa"], r["porcentaje"]
+            histograma = self.histogramas.get(kpa)
+            if histograma is None:
+                raise ValueError(f"KPA desconocida '{kpa}': indica con --cuestionario el cuestionario de esos resultados.")
+            histograma.agregar(porcentaje)
+            self.estados[kpa][r["estado"]] += 1
+            if periodo is not None:
+                p["sumas"][kpa] += porcentaje
+        return self
+
+    def agregar_puntuacion(self, puntuacion, nombres_kpa=None, estados=None):
+        """
+        Sumo de golpe una cartera puntuada por motor_vectorial o motor_ponderado
+        (el diccionario de arrays de puntuar_matriz), sin recorrer los proyectos en Python.
+        Las columnas son las KPAs de esta analítica salvo que indique otros nombres.
+        """
+        import numpy as np  # Solo hace falta para esta ruta vectorizada
+        from motor_vectorial import ESTADOS
+        nombres_kpa = nombres_kpa or self.kpas
+        estados = estados or ESTADOS
+        porcentajes = puntuacion["porcentajes"]
+        self.proyectos += porcentajes.shape[0]
+        self.cumplen_nivel2 += int(np.count_nonzero(puntuacion["cumple_nivel2"]))
+        for k, kpa in enumerate(nombres_kpa):
+            h = self.histogramas[kpa]
+            indices = np.clip(((porcentajes[:, k] - h.minimo) / h.ancho).astype(np.intp), 0, len(h.contadores) - 1)
+            for i, n in enumerate(np.bincount(indices, minlength=len(h.contadores)).tolist()):
+                h.contadores[i] += n
+            h.total += porcentajes.shape[0]
+            h.suma += float(porcentajes[:, k].sum())
+            for codigo, n in enumerate(np.bincount(puntuacion["estados"][:, k], minlength=len(estados)).tolist()):
+                self.estados[kpa][estados[codigo]] += n
+        return self
+
+    def fusionar(self, otra):
+        """
+        Sumo los indicadores parciales de otra cartera (por ejemplo, de otro proceso) a esta.
+        """
+        if otra.kpas != self.kpas:
+            raise ValueError("Solo puedo fusionar analíticas con las mismas KPAs.")
+        self.proyectos += otra.proyectos
+        self.cumplen_nivel2 += otra.cumplen_nivel2
+        for kpa in self.kpas:
+            self.histogramas[kpa].fusionar(otra.histogramas[kpa])
+            for estado, n in otra.estados[kpa].items():
+                self.estados[kpa][estado] += n
+        for periodo, q in otra.periodos.items():
+            p = self.periodos.setdefault(periodo, {"proyectos": 0, "cumplen_nivel2": 0,
+                                                   "sumas": {kpa: 0.0 for kpa in self.kpas}})
+            p["proyectos"] += q["proyectos"]
+            p["cumplen_nivel2"] += q["cumplen_nivel2"]
+            for kpa in self.kpas:
+                p["sumas"][kpa] += q["sumas"][kpa]
+        return self
+
+    # --- INDICADORES ---
+
+    @property
+    def proporcion_nivel2(self):
+        return self.cumplen_nivel2 / self.proyectos if self.proyectos else None
+
+    def percentiles(self, kpa, percentiles=PERCENTILES):
+        return {p: self.histogramas[kpa].cuantil(p / 100) for p in percentiles}
+
+    def tendencias(self):
+        """
+        Devuelvo por periodo (en orden) la proporción que cumple el Nivel 2 y la media de cada KPA.
+        """
+        return {
+            periodo: {
+                "proyectos": p["proyectos"],
+                "proporcion_nivel2": p["cumplen_nivel2"] / p["proyectos"],
+                "media_por_kpa": {kpa: p["sumas"][kpa] / p["proyectos"] for kpa in self.kpas},
+            }
+            for periodo, p in sorted(self.periodos.items())
+        }
+
+    def informe(self):
+        """
+        Devuelvo los indicadores de cartera como diccionario (listo para JSON).
+        Los percentiles son el límite inferior del intervalo del histograma en que caen:
+        el valor real está entre ese límite y el límite más ancho_intervalo.
+        """
+        return {
+            "proyectos": self.proyectos,
+            "ancho_intervalo": self.ancho,
+            "cumplen_nivel2": self.cumplen_nivel2,
+            "proporcion_nivel2": self.proporcion_nivel2,
+            "por_kpa": {
+                kpa: {
+                    "media": self.histogramas[kpa].media,
+                    "percentiles": {f"p{p}": v for p, v in self.percentiles(kpa).items()},
+                    "estados": self.estados[kpa],
+                }
+                for kpa in self.kpas
+            },
+            "tendencias": self.tendencias(),
+        }
+
+    # --- RESULTADOS PARCIALES ---
+
+    def a_dict(self):
+        return {
+            "kpas": self.kpas,
+            "ancho": self.ancho,
+            "proyectos": self.proyectos,
+            "cumplen_nivel2": self.cumplen_nivel2,
+            "histogramas": {kpa: h.a_dict() for kpa, h in self.histogramas.items()},
+            "estados": self.estados,
+            "periodos": self.periodos,
+        }
+
+    @classmethod
+    def desde_dict(cls, datos):
+        a = cls(datos["kpas"], datos["ancho"])
+        a.proyectos = datos["proyectos"]
+        a.cumplen_nivel2 = datos["cumplen_nivel2"]
+        a.histogramas = {kpa: HistogramaFijo.desde_dict(h) for kpa, h in datos["histogramas"].items()}
+        a.estados = datos["estados"]
+        a.periodos = datos["periodos"]
+        return a
+
+
+# --- FUENTES ---
+
+def analizar_resultados_jsonl(archivo, analitica=None, fecha=None):
+    """
+    Recorro en streaming un archivo de resultados del modo por lotes (un proyecto por línea).
+    Los registros del modo por lotes no llevan fecha: para verlos en la evolución por periodo
+    paso la fecha de la evaluación ("AAAA-MM-DD"), que uso en los registros que no tengan la suya.
+    """
+    analitica = analitica or AnaliticaCartera()
+    for linea in archivo:
+        if linea.strip():
+            registro = json.loads(linea)
+            analitica.agregar(registro["kpas"], registro["cumple_nivel2"], registro.get("fecha") or fecha)
+    return analitica
+
+
+def analizar_historial(historial, analitica=None):
+    """
+    Recorro en una sola pasada todas las evaluaciones completas del historial SQLite
+    (las que tienen veredicto de Nivel 2), con su fecha para la evolución por periodo.
+    """
+    analitica = analitica or AnaliticaCartera()
+    cursor = historial.conexion.execute("""
+        SELECT e.id, e.fecha, e.cumple_nivel2, k.nombre, s.porcentaje, s.estado
+        FROM evaluaciones e
+        JOIN puntuaciones s ON s.evaluacion_id = e.id
+        JOIN kpas k ON k.id = s.kpa_id
+        WHERE e.cumple_nivel2 IS NOT NULL
+        ORDER BY e.id
+    """)
+    actual, fecha, cumple, resultados = None, None, None, []
+    for id_eval, fecha_eval, cumple_eval, kpa, porcentaje, estado in cursor:
+        if id_eval != actual:
+            if actual is not None:
+                analitica.agregar(resultados, cumple, fecha)
+            actual, fecha, cumple, resultados = id_eval, fecha_eval, bool(cumple_eval), []
+        resultados.append({"kpa": kpa, "porcentaje": porcentaje, "estado": estado})
+    if actual is not None:
+        analitica.agregar(resultados, cumple, fecha)
+    return analitica
+
+
+def mostrar_informe(informe):
+    """
+    Muestro por pantalla los indicadores de cartera.
+    """
+    print(f"Proyectos analizados: {informe['proyectos']}")
+    if informe["proporcion_nivel2"] is not None:
+        print(f"  Cumplen Nivel 2: {informe['cumplen_nivel2']} ({informe['proporcion_nivel2']:.1%})")
+        ancho = informe["ancho_intervalo"]
+        print(f"  Percentiles: límite inferior del intervalo de {ancho:g} punto{'' if ancho == 1 else 's'} en que caen")
+    for kpa, datos in informe["por_kpa"].items():
+        if datos["media"] is None:
+            continue
+        p = datos["percentiles"]
+        print(f"\nKPA: {kpa}")
+        print(f"  - Media: {datos['media']:.2f}%   p10: {p['p10']}%   mediana: {p['p50']}%   p90: {p['p90']}%")
+        print(f"  - Estados: {datos['estados']}")
+    if informe["tendencias"]:
+        print("\nEvolución por periodo (proporción que cumple el Nivel 2):")
+        for periodo, datos in informe["tendencias"].items():
+            print(f"  {periodo}: {datos['proporcion_nivel2']:.1%} de {datos['proyectos']} proyectos")
+
+
+def main(argv=None):
+    """
+    Calculo los indicadores de una o varias fuentes (resultados JSONL del modo por lotes,
+    el historial SQLite o resultados parciales guardados con --guardar) y los fusiono.
+    """
+    import argparse
+    import sqlite3
+    import sys
+    parser = argparse.ArgumentParser(description="Indicadores de cartera CMMI Nivel 2.")
+    parser.add_argument("resultados", nargs="*", help="Resultados JSONL del modo por lotes")
+    parser.add_argument("--fecha", metavar="AAAA-MM-DD",
+                        help="Fecha de los resultados JSONL que no la incluyen (para la evolución por periodo; "
+                             "con fechas distintas, guarda cada archivo con --guardar y fusiónalos con --parciales)")
+    parser.add_argument("--historial", help="Base de datos SQLite del historial")
+    parser.add_argument("--cuestionario", metavar="RUTA",
+                        help="Definición JSON o TOML del cuestionario de los resultados (por defecto el incluido)")
+    parser.add_argument("--parciales", nargs="*", default=[], help="Resultados parciales (JSON) que fusiono")
+    parser.add_argument("--guardar", help="Guardo aquí el resultado parcial fusionable (JSON)")
+    parser.add_argument("--json", help="Guardo aquí el informe de indicadores (JSON)")
+    args = parser.parse_args(argv)
+
+    try:
+        kpas = None
+        if args.cuestionario:
+            from cuestionario import cargar_cuestionario
+            kpas = cargar_cuestionario(args.cuestionario).nombres_kpa
+        analitica = AnaliticaCartera(kpas)
+        if args.fecha:
+            import datetime
+            datetime.date.fromisoformat(args.fecha)  # ValueError si no es AAAA-MM-DD
+        for ruta in args.resultados:
+            with open(ruta, encoding="utf-8") as f:
+                analizar_resultados_jsonl(f, analitica, args.fecha)
+        if args.historial:
+            from historial import HistorialEvaluaciones
+            with HistorialEvaluaciones(args.historial) as historial:
+                analizar_historial(historial, analitica)
+        for ruta in args.parciales:
+            with open(ruta, encoding="utf-8") as f:
+                analitica.fusionar(AnaliticaCartera.desde_dict(json.load(f)))
+        if args.guardar:
+            with open(args.guardar, "w", encoding="utf-8") as f:
+                json.dump(analitica.a_dict(), f, ensure_ascii=False)
+        informe = analitica.informe()
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(informe, f, ensure_ascii=False, indent=2)
+    except (OSError, ValueError, KeyError, sqlite3.Error) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+
+    mostrar_informe(informe)
+    return 0
+
+
+# Este bloque solo se ejecuta si ejecuto este archivo directamente (no si lo importo)
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
@@ -0,0 +1,478 @@
+# archivo_columnar.py
+# Este archivo implementa un formato binario por columnas para archivar millones de evaluaciones
+# Guardo cada dato en una columna de ancho fijo (identificador de proyecto, fecha, respuestas
+# empaquetadas en un uint64 y el porcentaje de cada KPA en centésimas) más una tabla con los
+# nombres de los proyectos. El lector abre el archivo con mmap y ve cada columna con
+# np.frombuffer sin copiarla, así un filtro como "proyectos por debajo del 50% en Aseguramiento
+# de calidad el último trimestre" solo lee las dos columnas que necesita
+#
+# Estructura del archivo (little-endian):
+#   MAGIA (8 bytes) | formato (uint32) | longitud de la cabecera (uint32) | cabecera JSON (UTF-8)
+#   y después cada columna alineada a 64 bytes; la cabecera dice dónde empieza cada una
+
+import calendar  # Para pasar fechas a segundos desde 1970
+import datetime  # Para leer fechas y calcular trimestres
+import json  # Para la cabecera del archivo
+import mmap  # Para leer el archivo sin cargarlo en memoria
+import struct  # Para el prefijo binario del archivo
+from array import array  # Columnas en memoria mientras escribo (sin NumPy)
+from KPAS import KPAS  # Cargo las 5 KPAs con sus preguntas
+from cuestionario import VERSION_CUESTIONARIO  # Versión del cuestionario incluido
+from codificacion import BITS_RESPUESTA, CODIGO_OPCION, desempaquetar_proyecto  # Respuestas a 2 bits
+
+
+MAGIA = b"CMMICOL\x00"
+FORMATO = 1
+PREFIJO = struct.Struct("<8sII")
+
+# Alineación de cada columna (una línea de caché)
+ALINEACION = 64
+
+# Tipo NumPy de cada columna fija
+TIPO_PROYECTO = "<u4"  # Identificador del proyecto (posición en la tabla de nombres)
+TIPO_FECHA = "<i8"  # Segundos desde 1970, tomando la fecha guardada como UTC
+TIPO_RESPUESTAS = "<u8"  # Respuestas empaquetadas a 2 bits (la primera en los bits bajos)
+TIPO_PORCENTAJE = "<u2"  # Porcentaje de la KPA en centésimas (0-10000), exacto con 2 decimales
+
+# Formato de fecha de las entradas (el mismo del historial)
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+
+
+def segundos_de(fecha):
+    """
+    Paso una fecha "AAAA-MM-DD[ HH:MM:SS]" (o un datetime) a segundos desde 1970, sin zona horaria.
+    """
+    if isinstance(fecha, str):
+        fecha = datetime.datetime.strptime(fecha, FORMATO_FECHA if " " in fecha else "%Y-%m-%d")
+    return calendar.timegm(fecha.timetuple())
+
+
+def fecha_de(segundos):
+    """
+    Paso segundos desde 1970 al texto de fecha del historial.
+    """
+    return datetime.datetime.fromtimestamp(int(segundos), datetime.timezone.utc).strftime(FORMATO_FECHA)
+
+
+def trimestre_anterior(hoy=None):
+    """
+    Devuelvo (desde, hasta) en segundos del trimestre natural anterior al de hoy; hasta no se incluye.
+    """
+    hoy = hoy or datetime.date.today()
+    inicio_actual = datetime.date(hoy.year, 3 * ((hoy.month - 1) // 3) + 1, 1)
+    mes_anterior = inicio_actual.month - 3
+    inicio_anterior = (datetime.date(inicio_actual.year, mes_anterior, 1) if mes_anterior >= 1
+                       else datetime.date(inicio_actual.year - 1, mes_anterior + 12, 1))
+    return segundos_de(datetime.datetime.combine(inicio_anterior, datetime.time())), \
+        segundos_de(datetime.datetime.combine(inicio_actual, datetime.time()))
+
+
+def alinear(posicion):
+    return -(-posicion // ALINEACION) * ALINEACION
+
+
+class EscritorColumnar:
+    """
+    Acumulo las columnas en arrays compactos (unos 30 bytes por evaluación) y las escribo al final.
+    Los nombres de proyecto se guardan una sola vez; cada evaluación guarda solo el identificador.
+    """
+
+    def __init__(self, kpas=None, version=VERSION_CUESTIONARIO):
+        kpas = kpas or KPAS
+        self.kpas = list(kpas)
+        self.preguntas_por_kpa = [len(kpas[k]) for k in self.kpas]
+        if sum(self.preguntas_por_kpa) * BITS_RESPUESTA > 64:
+            raise ValueError("Las respuestas empaquetadas no caben en 64 bits (máximo 32 preguntas).")
+        self.version = version
+        self.ids = {}  # nombre -> identificador
+        self.proyecto = array("I")
+        self.fecha = array("q")
+        self.respuestas = array("Q")
+        self.porcentajes = [array("H") for _ in self.kpas]
+
+    def __len__(self):
+        return len(self.proyecto)
+
+    def id_proyecto(self, nombre):
+        id_ = self.ids.get(nombre)
+        if id_ is None:
+            id_ = self.ids[nombre] = len(self.ids)
+        return id_
+
+    def agregar(self, nombre, fecha, respuestas_empaquetadas, porcentajes):
+        """
+        Añado una evaluación: fecha en segundos, respuestas ya empaquetadas y el porcentaje de cada KPA.
+        """
+        self.proyecto.append(self.id_proyecto(nombre))
+        self.fecha.append(int(fecha))
+        self.respuestas.append(respuestas_empaquetadas)
+        for columna, porcentaje in zip(self.porcentajes, porcentajes):
+            columna.append(round(porcentaje * 100))
+
+    def agregar_bloque(self, nombres, fechas, matriz, porcentajes):
+        """
+        Añado de golpe un bloque puntuado con motor_vectorial: la matriz uint8 de respuestas
+        (proyectos × preguntas) y sus porcentajes (proyectos × KPAs).
+        """
+        import numpy as np
+        desplazamientos = (np.arange(matriz.shape[1], dtype=np.uint64) * BITS_RESPUESTA)
+        empaquetadas = (matriz.astype(np.uint64) << desplazamientos).sum(axis=1, dtype=np.uint64)
+        centesimas = np.rint(np.asarray(porcentajes) * 100).astype(np.uint16)
+        self.proyecto.extend(self.id_proyecto(n) for n in nombres)
+        self.fecha.frombytes(np.broadcast_to(np.asarray(fechas, dtype=np.int64), (len(nombres),)).tobytes())
+        self.respuestas.frombytes(empaquetadas.tobytes())
+        for k, columna in enumerate(self.porcentajes):
+            columna.frombytes(np.ascontiguousarray(centesimas[:, k]).tobytes())
+
+    def guardar(self, ruta):
+        """
+        Escribo el archivo: prefijo, cabecera JSON y las columnas alineadas. Devuelvo las filas escritas.
+        """
+        nombres = [n.encode("utf-8") for n in self.ids]  # Los diccionarios conservan el orden de inserción
+        desplazamientos_nombres = array("Q", [0])
+        for n in nombres:
+            desplazamientos_nombres.append(desplazamientos_nombres[-1] + len(n))
+
+        bloques = [("proyecto", TIPO_PROYECTO, self.proyecto), ("fecha", TIPO_FECHA, self.fecha),
+                   ("respuestas", TIPO_RESPUESTAS, self.respuestas)]
+        bloques += [(f"porcentaje:{kpa}", TIPO_PORCENTAJE, c) for kpa, c in zip(self.kpas, self.porcentajes)]
+        bloques += [("nombres:desplazamientos", "<u8", desplazamientos_nombres), ("nombres:datos", "|u1", nombres)]
+
+        # Primero calculo la cabecera con posiciones relativas, luego sumo lo que ocupa ella misma
+        tamanos = [len(datos) * datos.itemsize if isinstance(datos, array) else sum(map(len, datos))
+                   for _, _, datos in bloques]
+        relativas, posicion = [], 0
+        for tamano in tamanos:
+            relativas.append(posicion)
+            posicion = alinear(posicion + tamano)
+
+        def cabecera(base):
+            return json.dumps({
+                "filas": len(self.proyecto),
+                "proyectos": len(nombres),
+                "kpas": self.kpas,
+                "preguntas_por_kpa": self.preguntas_por_kpa,
+                "version_cuestionario": self.version,
+                "columnas": {nombre: {"tipo": tipo, "desplazamiento": base + r, "bytes": t}
+                             for (nombre, tipo, _), r, t in zip(bloques, relativas, tamanos)},
+            }, ensure_ascii=False).encode("utf-8")
+
+        # La base depende de la longitud de la cabecera, que a su vez incluye la base: itero hasta que no cambia
+        base = alinear(PREFIJO.size + len(cabecera(0)))
+        while alinear(PREFIJO.size + len(cabecera(base))) != base:
+            base = alinear(PREFIJO.size + len(cabecera(base)))
+        texto = cabecera(base)
+
+        with open(ruta, "wb") as f:
+            f.write(PREFIJO.pack(MAGIA, FORMATO, len(texto)))
+            f.write(texto)
+            f.write(b"\0" * (base - PREFIJO.size - len(texto)))
+            for (_, _, datos), tamano in zip(bloques, tamanos):
+                if isinstance(datos, array):
+                    datos.tofile(f)
+                else:
+                    for n in datos:
+                        f.write(n)
+                f.write(b"\0" * (alinear(tamano) - tamano))
+        return len(self.proyecto)
+
+
+class ArchivoColumnar:
+    """
+    Lector de un archivo columnar. Cada columna es un array de NumPy sobre el mmap (sin copias):
+    solo se leen del disco las páginas de las columnas que se usan.
+    """
+
+    def __init__(self, ruta):
+        import numpy as np  # Solo lo necesita el lector
+        self.np = np
+        self.archivo = open(ruta, "rb")
+        try:
+            self.mapa = mmap.mmap(self.archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Archivo vacío
+            self.archivo.close()
+            raise ValueError(f"{ruta} no es un archivo columnar de evaluaciones.")
+        try:
+            magia, formato, longitud = PREFIJO.unpack_from(self.mapa, 0)
+        except struct.error:
+            magia, formato, longitud = b"", 0, 0
+        if magia != MAGIA or formato != FORMATO:
+            self.cerrar()
+            raise ValueError(f"{ruta} no es un archivo columnar de evaluaciones (formato {FORMATO}).")
+        self.cabecera = json.loads(self.mapa[PREFIJO.size:PREFIJO.size + longitud])
+        self.filas = self.cabecera["filas"]
+        self.kpas = self.cabecera["kpas"]
+        # {kpa: preguntas} con el orden y el número de preguntas con que se empaquetaron las respuestas
+        # (las del cuestionario usado al archivar); desempaquetar_proyecto solo necesita cuántas hay
+        self.preguntas = {kpa: range(n) for kpa, n in zip(self.kpas, self.cabecera["preguntas_por_kpa"])}
+        self.columnas = {}
+
+    def columna(self, nombre):
+        """
+        Devuelvo la columna como array de NumPy de solo lectura que apunta al mmap.
+        """
+        vista = self.columnas.get(nombre)
+        if vista is None:
+            info = self.cabecera["columnas"].get(nombre)
+            if info is None:
+                raise ValueError(f"El archivo no tiene la columna '{nombre}'.")
+            tipo = self.np.dtype(info["tipo"])
+            vista = self.columnas[nombre] = self.np.frombuffer(
+                self.mapa, dtype=tipo, count=info["bytes"] // tipo.itemsize, offset=info["desplazamiento"])
+        return vista
+
+    @property
+    def proyecto(self):
+        return self.columna("proyecto")
+
+    @property
+    def fecha(self):
+        return self.columna("fecha")
+
+    @property
+    def respuestas(self):
+        return self.columna("respuestas")
+
+    def centesimas(self, kpa):
+        """
+        Porcentajes de una KPA en centésimas (uint16, sin copia).
+        """
+        return self.columna(f"porcentaje:{kpa}")
+
+    def porcentajes(self, kpa):
+        """
+        Porcentajes de una KPA como float64 (esta sí es una copia), iguales a los de evaluar_kpa.
+        """
+        return self.centesimas(kpa) / 100
+
+    def nombre_proyecto(self, id_proyecto):
+        desplazamientos = self.columna("nombres:desplazamientos")
+        datos = self.cabecera["columnas"]["nombres:datos"]["desplazamiento"]
+        inicio, fin = int(desplazamientos[id_proyecto]), int(desplazamientos[id_proyecto + 1])
+        return self.mapa[datos + inicio:datos + fin].decode("utf-8")
+
+    def filtrar(self, kpa=None, menor_que=None, desde=None, hasta=None):
+        """
+        Devuelvo las posiciones de las evaluaciones cuya KPA está por debajo de menor_que (en %)
+        y cuya fecha está en [desde, hasta) (en segundos). Solo leo las columnas que intervienen.
+        """
+        np = self.np
+        mascara = None
+
+        def combinar(condicion):
+            nonlocal mascara
+            mascara = condicion if mascara is None else np.logical_and(mascara, condicion, out=mascara)
+
+        if desde is not None:
+            combinar(self.fecha >= desde)
+        if hasta is not None:
+            combinar(self.fecha < hasta)
+        if menor_que is not None:
+            if kpa is None:
+                raise ValueError("Para filtrar por porcentaje hay que indicar la KPA.")
+            # En centésimas enteras: p < x  equivale a  centésimas < ceil(x * 100)
+            combinar(self.centesimas(kpa) < int(-(-menor_que * 100 // 1)))
+        if mascara is None:
+            return np.arange(self.filas)
+        return np.flatnonzero(mascara)
+
+    def fila(self, i):
+        """
+        Reconstruyo una evaluación como diccionario (para mostrarla, no para recorrer el archivo).
+        """
+        return {
+            "proyecto": self.nombre_proyecto(int(self.proyecto[i])),
+            "fecha": fecha_de(self.fecha[i]),
+            "respuestas": desempaquetar_proyecto(int(self.respuestas[i]), self.preguntas),
+            "porcentajes": {kpa: int(self.centesimas(kpa)[i]) / 100 for kpa in self.kpas},
+        }
+
+    def cerrar(self):
+        # Suelto las vistas antes de cerrar el mmap (no se puede cerrar con vistas vivas)
+        self.columnas = {}
+        try:
+            self.mapa.close()
+        except BufferError:
+            pass  # Alguien conserva una columna: el mmap se cerrará cuando la suelte
+        self.archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+# --- CREACIÓN ---
+
+def escritor_para(cuestionario=None):
+    """
+    Escritor con las KPAs y la versión del cuestionario (None = el incluido).
+    """
+    if cuestionario is None:
+        return EscritorColumnar()
+    return EscritorColumnar(cuestionario.kpas, cuestionario.version_cache)
+
+
+def archivar_respuestas(ruta_entrada, ruta_archivo, fecha=None, formato=None, tam_bloque=65536, cuestionario=None):
+    """
+    Leo un archivo de respuestas (CSV o JSONL), lo puntúo por bloques con motor_vectorial
+    (o con motor_ponderado si hay un cuestionario cargado) y escribo el archivo columnar.
+    Todas las evaluaciones llevan la misma fecha (por defecto, ahora).
+    Devuelvo el número de evaluaciones archivadas.
+    """
+    import itertools
+    import numpy as np
+    from evaluacion_lotes import formato_por_extension, kpas_de, leer_respuestas
+    if cuestionario is None:
+        from motor_vectorial import matriz_respuestas, puntuar_matriz
+        recodificar = None
+    else:
+        from motor_ponderado import ModeloPonderado
+        modelo = ModeloPonderado(cuestionario)
+        matriz_respuestas, puntuar_matriz = modelo.matriz_respuestas, modelo.puntuar
+        # El modelo numera las opciones según el orden de cuestionario.valores; el archivo las guarda con CODIGO_OPCION
+        recodificar = np.array([0] + [CODIGO_OPCION[o] for o in cuestionario.valores], dtype=np.uint8)
+    segundos = segundos_de(fecha or datetime.datetime.now())
+    escritor = escritor_para(cuestionario)
+    formato = formato or formato_por_extension(ruta_entrada)
+    with open(ruta_entrada, encoding="utf-8", newline="") as entrada:
+        proyectos = leer_respuestas(entrada, formato, kpas=kpas_de(cuestionario))
+        while True:
+            bloque = list(itertools.islice(proyectos, tam_bloque))
+            if not bloque:
+                break
+            matriz = matriz_respuestas(r for _, r in bloque)
+            porcentajes = puntuar_matriz(matriz)["porcentajes"]
+            if recodificar is not None:
+                matriz = recodificar[matriz]
+            escritor.agregar_bloque([n for n, _ in bloque], segundos, matriz, porcentajes)
+    return escritor.guardar(ruta_archivo)
+
+
+def archivar_historial(historial, ruta_archivo, cuestionario=None):
+    """
+    Archivo todas las evaluaciones completas (con veredicto de Nivel 2) del historial SQLite,
+    con su fecha, sus respuestas y sus porcentajes, recorriéndolas en una sola consulta por tabla.
+    Las KPAs son las del cuestionario con que se evaluaron (None = el incluido).
+    Las evaluaciones con alguna KPA provisional (veredicto rápido: el historial no guarda su
+    porcentaje) no se archivan, porque el archivo no tiene forma de marcar un porcentaje que falta.
+    Devuelvo (evaluaciones archivadas, evaluaciones provisionales omitidas).
+    """
+    escritor = escritor_para(cuestionario)
+    posicion_kpa = {kpa: k for k, kpa in enumerate(escritor.kpas)}
+    inicio_kpa, total = [], 0
+    for n in escritor.preguntas_por_kpa:
+        inicio_kpa.append(total)
+        total += n
+    conexion = historial.conexion
+    evaluaciones = conexion.execute("""
+        SELECT e.id, p.nombre, e.fecha FROM evaluaciones e JOIN proyectos p ON p.id = e.proyecto_id
+        WHERE e.cumple_nivel2 IS NOT NULL ORDER BY e.id
+    """)
+    respuestas = conexion.execute("""
+        SELECT r.evaluacion_id, k.nombre, r.pregunta, r.opcion FROM respuestas r
+        JOIN kpas k ON k.id = r.kpa_id JOIN evaluaciones e ON e.id = r.evaluacion_id
+        WHERE e.cumple_nivel2 IS NOT NULL ORDER BY r.evaluacion_id
+    """)
+    puntuaciones = conexion.execute("""
+        SELECT s.evaluacion_id, k.nombre, s.porcentaje FROM puntuaciones s
+        JOIN kpas k ON k.id = s.kpa_id JOIN evaluaciones e ON e.id = s.evaluacion_id
+        WHERE e.cumple_nivel2 IS NOT NULL ORDER BY s.evaluacion_id
+    """)
+    # Recorro las tres consultas a la vez, como una mezcla ordenada por id de evaluación
+    provisionales = 0
+    siguiente_respuesta = next(respuestas, None)
+    siguiente_puntuacion = next(puntuaciones, None)
+    for id_eval, nombre, fecha in evaluaciones:
+        codigo = 0
+        while siguiente_respuesta is not None and siguiente_respuesta[0] == id_eval:
+            _, kpa, pregunta, opcion = siguiente_respuesta
+            if kpa in posicion_kpa:
+                posicion = inicio_kpa[posicion_kpa[kpa]] + pregunta - 1
+                codigo |= CODIGO_OPCION[opcion] << (BITS_RESPUESTA * posicion)
+            siguiente_respuesta = next(respuestas, None)
+        porcentajes = [None] * len(escritor.kpas)
+        while siguiente_puntuacion is not None and siguiente_puntuacion[0] == id_eval:
+            _, kpa, porcentaje = siguiente_puntuacion
+            if kpa in posicion_kpa:
+                porcentajes[posicion_kpa[kpa]] = porcentaje
+            siguiente_puntuacion = next(puntuaciones, None)
+        if None in porcentajes:
+            provisionales += 1
+            continue
+        escritor.agregar(nombre, segundos_de(fecha), codigo, porcentajes)
+    return escritor.guardar(ruta_archivo), provisionales
+
+
+def main(argv=None):
+    """
+    Creo un archivo columnar (desde respuestas o desde el historial) y/o filtro uno existente.
+    """
+    import argparse
+    import sqlite3
+    import sys
+    import time
+    parser = argparse.ArgumentParser(description="Archivo columnar de evaluaciones CMMI Nivel 2.")
+    parser.add_argument("archivo", help="Archivo columnar (.cmmicol) que creo o leo")
+    parser.add_argument("--desde-respuestas", metavar="RUTA", help="Creo el archivo puntuando respuestas (.csv o .jsonl)")
+    parser.add_argument("--fecha", help="Fecha de esas evaluaciones (AAAA-MM-DD[ HH:MM:SS]; por defecto, ahora)")
+    parser.add_argument("--desde-historial", metavar="RUTA", help="Creo el archivo desde el historial SQLite")
+    parser.add_argument("--cuestionario", metavar="RUTA",
+                        help="Definición JSON o TOML del cuestionario de esas evaluaciones (por defecto el incluido)")
+    parser.add_argument("--kpa", help="KPA por la que filtro")
+    parser.add_argument("--menor-que", type=float, help="Porcentaje por debajo del cual se selecciona la evaluación")
+    parser.add_argument("--desde", help="Solo evaluaciones desde esta fecha (incluida)")
+    parser.add_argument("--hasta", help="Solo evaluaciones anteriores a esta fecha")
+    parser.add_argument("--ultimo-trimestre", action="store_true", help="Solo evaluaciones del trimestre anterior")
+    parser.add_argument("--mostrar", type=int, default=10, help="Evaluaciones seleccionadas que muestro")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.desde_respuestas and args.desde_historial:
+            raise ValueError("Usa --desde-respuestas o --desde-historial, no los dos.")
+        cuestionario = None
+        if args.cuestionario:
+            from cuestionario import cargar_cuestionario
+            cuestionario = cargar_cuestionario(args.cuestionario)
+        if args.desde_respuestas:
+            total = archivar_respuestas(args.desde_respuestas, args.archivo, args.fecha, cuestionario=cuestionario)
+            print(f"Evaluaciones archivadas: {total}")
+        elif args.desde_historial:
+            from historial import HistorialEvaluaciones
+            with HistorialEvaluaciones(args.desde_historial) as historial:
+                total, provisionales = archivar_historial(historial, args.archivo, cuestionario)
+            print(f"Evaluaciones archivadas: {total}"
+                  + (f" (omitidas {provisionales} con resultados provisionales)" if provisionales else ""))
+
+        with ArchivoColumnar(args.archivo) as archivo:
+            if args.kpa is not None and args.kpa not in archivo.kpas:
+                raise ValueError(f"KPA desconocida: '{args.kpa}'.")
+            desde = segundos_de(args.desde) if args.desde else None
+            hasta = segundos_de(args.hasta) if args.hasta else None
+            if args.ultimo_trimestre:
+                desde, hasta = trimestre_anterior()
+            inicio = time.perf_counter()
+            seleccion = archivo.filtrar(args.kpa, args.menor_que, desde, hasta)
+            segundos = time.perf_counter() - inicio
+            # Bytes de las columnas que ha recorrido el filtro
+            leidos = archivo.filas * ((8 if desde is not None or hasta is not None else 0)
+                                      + (2 if args.menor_que is not None else 0))
+            print(f"Evaluaciones en el archivo: {archivo.filas} ({archivo.cabecera['proyectos']} proyectos)")
+            print(f"Seleccionadas: {len(seleccion)} en {segundos * 1000:.2f} ms"
+                  + (f" ({leidos / segundos / 1e9:.2f} GB/s de columnas)" if leidos and segundos else ""))
+            for i in seleccion[:max(args.mostrar, 0)]:
+                fila = archivo.fila(int(i))
+                detalle = f"{args.kpa}: {fila['porcentajes'][args.kpa]}%" if args.kpa else ""
+                print(f"  {fila['fecha']}  {fila['proyecto']}  {detalle}".rstrip())
+            del seleccion
+    except (OSError, ValueError, KeyError, sqlite3.Error) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+# Este bloque solo se ejecuta si ejecuto este archivo directamente (no si lo importo)
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
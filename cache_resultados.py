@@ -0,0 +1,139 @@
+# cache_resultados.py
+# Este archivo implementa una caché LRU acotada para los resultados de la puntuación
+# En la práctica casi todos los proyectos envían uno de unos pocos cientos de vectores de respuestas
+# (los equipos copian plantillas), así que guardo el resultado de cada vector ya calculado y
+# la siguiente vez que llega el mismo vector solo cuesta una búsqueda en un diccionario
+# La clave es el vector de respuestas empaquetado (codificacion.py) junto con la versión del cuestionario
+
+import os  # Para leer la capacidad desde una variable de entorno
+from KPAS import KPAS  # Orden de las KPAs del cuestionario incluido
+from codificacion import empaquetar, empaquetar_proyecto  # Vectores de respuestas empaquetados a 2 bits
+from cuestionario import VERSION_CUESTIONARIO  # Versión del cuestionario incluido
+
+# Marca de "no está en la caché" (None podría ser un valor guardado)
+AUSENTE = object()
+
+# Resultados que guarda cada caché como máximo (se puede cambiar con la variable de entorno CMMI_CACHE_RESULTADOS)
+CAPACIDAD_POR_DEFECTO = 4096
+
+
+def capacidad_configurada():
+    """
+    Devuelvo la capacidad de la variable de entorno CMMI_CACHE_RESULTADOS o la de por defecto.
+    """
+    valor = os.environ.get("CMMI_CACHE_RESULTADOS")
+    if not valor:
+        return CAPACIDAD_POR_DEFECTO
+    try:
+        capacidad = int(valor)
+    except ValueError:
+        raise ValueError(f"CMMI_CACHE_RESULTADOS debe ser un número entero, no '{valor}'.")
+    if capacidad < 0:
+        raise ValueError("CMMI_CACHE_RESULTADOS no puede ser negativa.")
+    return capacidad
+
+
+def clave_kpa(kpa, opciones, version=VERSION_CUESTIONARIO):
+    """
+    Clave de las respuestas de una KPA. Incluyo el número de respuestas porque
+    las omitidas al final empaquetan igual que una lista más corta.
+    """
+    return version, kpa, len(opciones), empaquetar(opciones)
+
+
+def clave_proyecto(respuestas, version=VERSION_CUESTIONARIO, kpas=KPAS):
+    """
+    Clave de un proyecto {kpa: [opciones]} con todas sus respuestas validadas
+    (kpas son las del cuestionario de la versión indicada).
+    """
+    return version, empaquetar_proyecto(respuestas, kpas)
+
+
+class CacheLRU:
+    """
+    Caché acotada que desaloja el resultado usado hace más tiempo.
+    Uso un diccionario normal, que conserva el orden de inserción: al acertar vuelvo a insertar
+    la clave al final y al desalojar quito la primera. No uso cerrojos (importar threading
+    retrasaría el arranque de evaluacion_cmmi): cada operación sobre el diccionario es atómica,
+    así que es segura desde varios hilos; solo los contadores pueden perder alguna unidad.
+    Los valores guardados se comparten entre todas las llamadas: no deben modificarse.
+    Con capacidad 0 no guardo nada (útil para medir sin caché).
+    """
+
+    def __init__(self, capacidad=None):
+        self.capacidad = capacidad_configurada() if capacidad is None else capacidad
+        self.datos = {}
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+
+    def __len__(self):
+        return len(self.datos)
+
+    def obtener(self, clave, defecto=None):
+        """
+        Devuelvo el valor guardado (y lo marco como el más reciente) o defecto si no está.
+        """
+        valor = self.datos.pop(clave, AUSENTE)
+        if valor is AUSENTE:
+            self.fallos += 1
+            return defecto
+        self.datos[clave] = valor
+        self.aciertos += 1
+        return valor
+
+    def guardar(self, clave, valor):
+        """
+        Guardo un valor como el más reciente, desalojando el más antiguo si no cabe.
+        """
+        if self.capacidad <= 0:
+            return valor
+        self.datos.pop(clave, None)
+        self.datos[clave] = valor
+        self.desalojar(self.capacidad)
+        return valor
+
+    def desalojar(self, capacidad):
+        while len(self.datos) > capacidad:
+            try:
+                self.datos.pop(next(iter(self.datos)), None)
+            except (StopIteration, RuntimeError):  # Otro hilo vació o cambió el diccionario a la vez
+                break
+            self.desalojos += 1
+
+    def obtener_o_calcular(self, clave, calcular, *args):
+        """
+        Devuelvo el valor guardado o lo calculo con calcular(*args) y lo guardo.
+        """
+        valor = self.obtener(clave, AUSENTE)
+        if valor is AUSENTE:
+            valor = self.guardar(clave, calcular(*args))
+        return valor
+
+    def redimensionar(self, capacidad):
+        """
+        Cambio la capacidad y desalojo lo que sobre.
+        """
+        self.capacidad = capacidad
+        self.desalojar(max(capacidad, 0))
+
+    def vaciar(self):
+        """
+        Borro todos los resultados y pongo los contadores a cero.
+        """
+        self.datos.clear()
+        self.aciertos = self.fallos = self.desalojos = 0
+
+    def estadisticas(self):
+        """
+        Devuelvo los contadores de la caché como diccionario.
+        """
+        consultas = self.aciertos + self.fallos
+        return {
+            "capacidad": self.capacidad,
+            "tamano": len(self.datos),
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "desalojos": self.desalojos,
+            "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else None,
+        }
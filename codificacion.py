@@ -0,0 +1,157 @@
+# codificacion.py
+# Este archivo define una representación compacta de las respuestas y de los resultados por KPA
+# Cada respuesta ocupa 2 bits dentro de un entero (25 respuestas caben en 50 bits)
+# y los resultados guardan una referencia a las preguntas en lugar de copiar sus textos
+
+from KPAS import KPAS  # Cargo las 5 KPAs con sus preguntas
+from VALOR_RESPUESTA import VALOR_RESPUESTA  # Valores numéricos de cada opción
+from tabla_recomendaciones import TEXTO_OPCION  # Texto legible de cada opción
+
+
+# Código de 2 bits de cada opción (el 0 lo reservo para "sin responder")
+CODIGO_OPCION = {"1": 1, "2": 2, "3": 3}
+OPCION_CODIGO = {c: o for o, c in CODIGO_OPCION.items()}
+
+# Bits que ocupa cada respuesta y máscara para extraerla
+BITS_RESPUESTA = 2
+MASCARA_RESPUESTA = (1 << BITS_RESPUESTA) - 1
+
+
+def empaquetar(opciones):
+    """
+    Empaqueto una secuencia de opciones ('1', '2', '3') en un entero.
+    La primera respuesta ocupa los 2 bits menos significativos; las omitidas ("") quedan a 0.
+    """
+    codigo = 0
+    desplazamiento = 0
+    for o in opciones:
+        if o:
+            codigo |= CODIGO_OPCION[o] << desplazamiento
+        desplazamiento += BITS_RESPUESTA
+    return codigo
+
+
+def desempaquetar(codigo, cantidad):
+    """
+    Recupero la lista de opciones de un entero empaquetado.
+    Las respuestas sin contestar (código 0) aparecen como cadena vacía.
+    """
+    opciones = []
+    for _ in range(cantidad):
+        opciones.append(OPCION_CODIGO.get(codigo & MASCARA_RESPUESTA, ""))
+        codigo >>= BITS_RESPUESTA
+    return opciones
+
+
+def empaquetar_proyecto(respuestas, kpas=KPAS):
+    """
+    Empaqueto todas las respuestas de un proyecto {kpa: [opciones]} en un único entero,
+    siguiendo el orden de kpas (con las 25 preguntas de KPAS ocupa 50 bits).
+    """
+    return empaquetar(o for kpa in kpas for o in respuestas[kpa])
+
+
+def desempaquetar_proyecto(codigo, kpas=KPAS):
+    """
+    Recupero el diccionario {kpa: [opciones]} de un proyecto empaquetado con empaquetar_proyecto
+    y las mismas kpas (de kpas solo uso el orden y cuántas preguntas tiene cada una).
+    """
+    respuestas = {}
+    for kpa, preguntas in kpas.items():
+        respuestas[kpa] = desempaquetar(codigo, len(preguntas))
+        codigo >>= BITS_RESPUESTA * len(preguntas)
+    return respuestas
+
+
+def texto_estado(resultado):
+    """
+    Estado de una KPA para los informes; si es provisional indico que es solo la cota inferior.
+    """
+    if resultado.get("provisional"):
+        return f"{resultado['estado']} (provisional: cota inferior, las preguntas omitidas podrían mejorarlo)"
+    return resultado["estado"]
+
+
+class ResultadoKPA:
+    """
+    Resultado compacto de la evaluación de una KPA.
+    Guardo las respuestas empaquetadas y una referencia a la lista de preguntas de KPAS;
+    los diccionarios de detalle que esperan los informes se construyen solo cuando se piden.
+    También se puede leer como un diccionario: resultado["porcentaje"], resultado["detalles"], etc.
+    """
+
+    __slots__ = ("kpa", "preguntas", "codigos", "porcentaje", "estado", "recomendaciones", "omitidas", "provisional",
+                 "valores")
+
+    # Claves que admite el acceso tipo diccionario
+    CLAVES = ("kpa", "porcentaje", "estado", "detalles", "recomendaciones", "respuestas_raw", "respuestas",
+              "omitidas", "provisional")
+
+    def __init__(self, kpa, preguntas, codigos, porcentaje, estado, recomendaciones, omitidas=(), provisional=False,
+                 valores=VALOR_RESPUESTA):
+        self.kpa = kpa  # Nombre de la KPA
+        self.preguntas = preguntas  # Referencia (no copia) a la lista de preguntas
+        self.codigos = codigos  # Respuestas empaquetadas a 2 bits
+        self.porcentaje = porcentaje  # Porcentaje redondeado a 2 decimales
+        self.estado = estado  # Implementada, Parcialmente implementada o Deficiente
+        self.recomendaciones = recomendaciones  # Tupla compartida de recomendaciones
+        self.omitidas = omitidas  # Índices de las preguntas omitidas en el modo de veredicto rápido
+        # Con preguntas omitidas el porcentaje es la cota inferior; si además las omitidas aún podían
+        # cambiar el estado (criterio "nivel2"), el estado también lo es y el resultado es provisional
+        self.provisional = provisional
+        self.valores = valores  # Referencia a la tabla opción -> valor del cuestionario usado
+
+    @property
+    def opciones(self):
+        """
+        Opciones elegidas para cada pregunta, en orden.
+        """
+        return desempaquetar(self.codigos, len(self.preguntas))
+
+    @property
+    def respuestas_raw(self):
+        """
+        Vista con la misma forma que la lista respuestas_raw de evaluar_kpa.
+        Las preguntas omitidas no aparecen.
+        """
+        return [
+            {"pregunta": p, "opcion": o, "valor": self.valores[o], "texto": TEXTO_OPCION[o]}
+            for p, o in zip(self.preguntas, self.opciones) if o
+        ]
+
+    @property
+    def detalles(self):
+        """
+        Vista con la misma forma que la lista detalles del informe de la CLI.
+        Las preguntas omitidas no aparecen.
+        """
+        return [
+            {"pregunta": p, "respuesta": {"opcion": o, "texto": TEXTO_OPCION[o], "valor": self.valores[o]}}
+            for p, o in zip(self.preguntas, self.opciones) if o
+        ]
+
+    # La GUI llama "respuestas" a la misma lista que la CLI llama "respuestas_raw"
+    respuestas = respuestas_raw
+
+    def __getitem__(self, clave):
+        if clave not in self.CLAVES:
+            raise KeyError(clave)
+        return getattr(self, clave)
+
+    def __contains__(self, clave):
+        return clave in self.CLAVES
+
+    def get(self, clave, defecto=None):
+        return getattr(self, clave) if clave in self.CLAVES else defecto
+
+    def keys(self):
+        return self.CLAVES
+
+    def a_dict(self):
+        """
+        Devuelvo el resultado como diccionario completo (la forma original de evaluar_kpa).
+        """
+        return {clave: self[clave] for clave in self.CLAVES}
+
+    def __repr__(self):
+        return f"ResultadoKPA({self.kpa!r}, {self.porcentaje}%, {self.estado!r})"
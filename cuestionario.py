@@ -0,0 +1,389 @@
+# cuestionario.py
+# Este archivo carga definiciones de cuestionarios desde archivos JSON o TOML
+# Cada KPA y cada pregunta tiene un identificador estable (por ejemplo "REQM-01"), así los bancos
+# de preguntas propios (o de otras áreas de proceso, como las de Nivel 3) se mantienen sin tocar el código
+# Un cuestionario cargado se pasa a la puntuación (construir_resultado_kpa, evaluar_proyecto, la GUI...)
+# para evaluar con sus KPAs, sus preguntas, sus valores y sus recomendaciones
+# La primera carga compila el archivo a una caché JSON con índices ya calculados; las siguientes
+# cargas leen solo la caché, que se invalida si cambia la fecha de modificación y el contenido del archivo
+# La caché es solo de datos: leerla nunca ejecuta código, aunque alguien la haya modificado
+
+import os  # Para las rutas y la fecha de modificación
+from KPAS import KPAS  # Cuestionario incluido en la herramienta
+from RECOMENDACIONES_BASE import RECOMENDACIONES_BASE  # Recomendaciones incluidas en la herramienta
+from VALOR_RESPUESTA import VALOR_RESPUESTA  # Valores incluidos en la herramienta
+
+
+# Versión del cuestionario incluido (KPAS.py); con ella entran sus resultados en las cachés de puntuación
+# Los cuestionarios cargados de un archivo usan su huella SHA-256, que nunca coincide con este texto
+VERSION_CUESTIONARIO = "cmmi-nivel2-1"
+
+# Versión del formato de la caché: si cambia la forma de los datos compilados, las cachés viejas se descartan
+FORMATO_CACHE = 4
+
+# Siglas CMMI que uso como identificador estable de cada KPA del cuestionario incluido
+SIGLAS_KPA = {
+    "Gestión de requisitos": "REQM",
+    "Planificación de proyectos": "PP",
+    "Seguimiento y control de proyectos": "PMC",
+    "Gestión de configuración": "CM",
+    "Aseguramiento de calidad": "PPQA",
+}
+
+
+class Cuestionario:
+    """
+    Cuestionario compilado: KPAs y preguntas en orden, con sus identificadores,
+    la posición global de cada pregunta, el inicio de cada KPA, los pesos y la tabla de valores.
+    Las preguntas de todas las KPAs van seguidas, igual que las columnas de motor_vectorial.
+    """
+
+    def __init__(self, datos):
+        # Los datos llegan ya compilados (de compilar_definicion o de la caché): solo los asigno y
+        # compruebo que encajan, sin recorrer las preguntas, así cargar la caché no repite el trabajo
+        self.version = datos["version"]  # Versión declarada en el archivo
+        self.huella = datos["huella"]  # SHA-256 del contenido (identifica el cuestionario exacto)
+        self.valores = datos["valores"]  # Opción -> valor (como VALOR_RESPUESTA)
+        self.ids_kpa = tuple(datos["ids_kpa"])  # Identificador de cada KPA, en orden
+        self.nombres_kpa = tuple(datos["nombres_kpa"])  # Nombre de cada KPA, en orden
+        self.inicio_kpa = tuple(datos["inicio_kpa"])  # Posición de la primera pregunta de cada KPA (y el total al final)
+        self.pesos = tuple(datos["pesos"])  # Peso de cada pregunta dentro de su KPA (1.0 si no se indica)
+        self.recomendaciones = datos["recomendaciones"]  # Nombre de KPA -> recomendaciones base
+        self.ids_pregunta = tuple(datos["ids_pregunta"])  # Identificador de cada pregunta, en orden global
+        # Identificador de pregunta -> posición global. Guardarlo en la caché haría más lenta su lectura
+        # que construirlo aquí con dict y zip, que no recorren las preguntas en Python
+        self.posicion = dict(zip(self.ids_pregunta, range(len(self.ids_pregunta))))
+        # {nombre de KPA: [preguntas]}, con la misma forma que KPAS. Cada lista es de este cuestionario:
+        # los resultados guardan una referencia a ella y las cachés de puntuación la reconocen
+        self.kpas = datos["kpas"]
+        # {nombre de KPA: pesos de sus preguntas}, o None si todas pesan 1 (así la puntuación es la media
+        # de siempre, idéntica a la del cuestionario incluido)
+        self.pesos_kpa = datos["pesos_kpa"]
+        total = self.inicio_kpa[-1] if self.inicio_kpa else -1
+        if (len(self.inicio_kpa) != len(self.nombres_kpa) + 1 or total != len(self.ids_pregunta)
+                or total != len(self.pesos) or total != len(self.posicion)
+                or list(self.kpas) != list(self.nombres_kpa) or list(self.pesos_kpa) != list(self.nombres_kpa)
+                or any(len(self.kpas[nombre]) != self.inicio_kpa[k + 1] - self.inicio_kpa[k]
+                       for k, nombre in enumerate(self.nombres_kpa))):
+            raise ValueError("Datos de cuestionario incoherentes.")
+        # Versión con la que entran los resultados de este cuestionario en las cachés de puntuación
+        self.version_cache = self.huella or f"sin-huella-{id(self)}"
+
+    @property
+    def total_preguntas(self):
+        return self.inicio_kpa[-1]
+
+    def preguntas_de(self, kpa):
+        """
+        Devuelvo la lista de textos de las preguntas de una KPA (por nombre o identificador).
+        """
+        return list(self.kpas[self.nombres_kpa[self.indice_kpa(kpa)]])
+
+    def indice_kpa(self, kpa):
+        if kpa in self.nombres_kpa:
+            return self.nombres_kpa.index(kpa)
+        if kpa in self.ids_kpa:
+            return self.ids_kpa.index(kpa)
+        raise KeyError(kpa)
+
+    def respuestas_por_kpa(self, respuestas_por_id):
+        """
+        Convierto respuestas {id de pregunta: opción} en {nombre de KPA: [opciones]},
+        la forma que usan evaluar_kpa y el modo por lotes. Las preguntas sin respuesta quedan como "".
+        """
+        opciones = [""] * self.total_preguntas
+        for id_pregunta, opcion in respuestas_por_id.items():
+            if id_pregunta not in self.posicion:
+                raise ValueError(f"Pregunta desconocida '{id_pregunta}'.")
+            if opcion not in self.valores:
+                raise ValueError(f"Opción no válida '{opcion}' en '{id_pregunta}'.")
+            opciones[self.posicion[id_pregunta]] = opcion
+        return {
+            nombre: opciones[self.inicio_kpa[k]:self.inicio_kpa[k + 1]]
+            for k, nombre in enumerate(self.nombres_kpa)
+        }
+
+    def __repr__(self):
+        return (f"Cuestionario({self.version!r}, {len(self.nombres_kpa)} KPAs, "
+                f"{self.total_preguntas} preguntas)")
+
+
+# --- LECTURA Y COMPILACIÓN ---
+
+def leer_definicion(ruta, contenido):
+    """
+    Interpreto el contenido (bytes) de un archivo de cuestionario según su extensión (.json o .toml).
+    """
+    import json  # Solo lo cargo al leer un archivo (no al importar la puntuación)
+    if ruta.lower().endswith(".toml"):
+        try:
+            import tomllib  # Solo está en la biblioteca estándar desde Python 3.11
+        except ImportError:
+            raise ValueError("Los cuestionarios TOML necesitan Python 3.11 o posterior (tomllib).") from None
+        return tomllib.loads(contenido.decode("utf-8"))
+    return json.loads(contenido.decode("utf-8"))
+
+
+def compilar_definicion(definicion, huella=""):
+    """
+    Valido una definición (el diccionario leído del archivo) y calculo todos sus índices,
+    incluidos los que usa la puntuación (preguntas y pesos por KPA): se guardan tal cual en la caché
+    y Cuestionario los usa sin recalcularlos. Solo contiene
+    tipos de JSON (listas, diccionarios, textos y números).
+    Lanzo ValueError con un mensaje claro si falta algo o hay identificadores repetidos.
+    """
+    valores = {str(o): float(v) for o, v in definicion.get("valores", VALOR_RESPUESTA).items()}
+    if set(valores) != set(VALOR_RESPUESTA):
+        # Las claves de las opciones son fijas: la CLI, la GUI, los archivos de respuestas, el empaquetado
+        # a 2 bits y las recomendaciones por pregunta ('2' Parcial, '3' No) las usan; lo que cambia es su valor
+        raise ValueError("Las opciones de respuesta deben ser '1' (Sí), '2' (Parcial) y '3' (No).")
+    kpas = definicion.get("kpas")
+    if not kpas:
+        raise ValueError("El cuestionario no define ninguna KPA.")
+
+    ids_kpa, nombres_kpa, inicio_kpa = [], [], [0]
+    ids_pregunta, textos, pesos = [], [], []
+    posicion, recomendaciones = {}, {}
+    for kpa in kpas:
+        id_kpa = kpa.get("id")
+        nombre = kpa.get("nombre", id_kpa)
+        if not id_kpa:
+            raise ValueError(f"La KPA '{nombre}' no tiene identificador.")
+        if id_kpa in ids_kpa or nombre in nombres_kpa:
+            raise ValueError(f"KPA repetida: '{id_kpa}'.")
+        ids_kpa.append(id_kpa)
+        nombres_kpa.append(nombre)
+        recomendaciones[nombre] = list(kpa.get("recomendaciones", []))
+        for pregunta in kpa.get("preguntas", []):
+            id_pregunta = pregunta.get("id")
+            if not id_pregunta or "texto" not in pregunta:
+                raise ValueError(f"Pregunta sin identificador o sin texto en la KPA '{id_kpa}'.")
+            if id_pregunta in posicion:
+                raise ValueError(f"Identificador de pregunta repetido: '{id_pregunta}'.")
+            try:
+                peso = float(pregunta.get("peso", 1.0))
+            except (TypeError, ValueError):
+                peso = -1.0
+            if not peso > 0:
+                raise ValueError(f"El peso de la pregunta '{id_pregunta}' debe ser un número positivo.")
+            posicion[id_pregunta] = len(ids_pregunta)
+            ids_pregunta.append(id_pregunta)
+            textos.append(pregunta["texto"])
+            pesos.append(peso)
+        inicio_kpa.append(len(ids_pregunta))
+
+    # Índices por KPA: sus preguntas y sus pesos (None si todas pesan 1)
+    kpas_compiladas, pesos_kpa = {}, {}
+    for k, nombre in enumerate(nombres_kpa):
+        kpas_compiladas[nombre] = textos[inicio_kpa[k]:inicio_kpa[k + 1]]
+        pesos_de_kpa = pesos[inicio_kpa[k]:inicio_kpa[k + 1]]
+        pesos_kpa[nombre] = None if all(p == 1.0 for p in pesos_de_kpa) else pesos_de_kpa
+
+    return {
+        "version": str(definicion.get("version", "")),
+        "huella": huella,
+        "valores": valores,
+        "ids_kpa": ids_kpa,
+        "nombres_kpa": nombres_kpa,
+        "inicio_kpa": inicio_kpa,
+        "pesos": pesos,
+        "recomendaciones": recomendaciones,
+        "ids_pregunta": ids_pregunta,
+        "kpas": kpas_compiladas,
+        "pesos_kpa": pesos_kpa,
+    }
+
+
+def ruta_cache(ruta):
+    """
+    Devuelvo la ruta de la caché compilada de un cuestionario: __pycache__/<nombre>.cuestionario
+    junto al archivo, igual que Python guarda el bytecode.
+    """
+    directorio, nombre = os.path.split(os.path.abspath(ruta))
+    return os.path.join(directorio, "__pycache__", nombre + ".cuestionario")
+
+
+def leer_cache(ruta_compilada):
+    """
+    Leo una caché compilada (JSON). Devuelvo None si no existe, está dañada o es de otro formato.
+    """
+    import json
+    try:
+        with open(ruta_compilada, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):  # JSONDecodeError y UnicodeDecodeError son ValueError
+        return None
+    if not isinstance(cache, dict) or cache.get("formato") != FORMATO_CACHE or not isinstance(cache.get("datos"), dict):
+        return None
+    return cache
+
+
+def cuestionario_de_cache(cache):
+    """
+    Construyo el cuestionario guardado en una caché, o devuelvo None si sus datos no son válidos.
+    """
+    try:
+        return Cuestionario(cache["datos"])
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+
+
+def escribir_cache(ruta_compilada, cache):
+    """
+    Escribo la caché compilada (primero en un archivo temporal, para no dejarla a medias).
+    Si no se puede escribir (por ejemplo, un directorio de solo lectura) sigo sin caché.
+    """
+    import json
+    temporal = f"{ruta_compilada}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(ruta_compilada), exist_ok=True)
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temporal, ruta_compilada)
+    except OSError:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+
+
+def cargar_cuestionario(ruta, usar_cache=True):
+    """
+    Cargo un cuestionario desde un archivo JSON o TOML.
+    Si la caché compilada tiene la misma fecha de modificación y tamaño que el archivo, la uso
+    sin leer el archivo. Si no, leo el archivo: cuando su contenido (SHA-256) coincide con el de
+    la caché solo actualizo la fecha guardada; si ha cambiado, lo vuelvo a compilar.
+    """
+    import hashlib  # Para la huella del contenido del archivo
+    estado = os.stat(ruta)
+    ruta_compilada = ruta_cache(ruta)
+    cache = leer_cache(ruta_compilada) if usar_cache else None
+    guardado = cuestionario_de_cache(cache) if cache is not None else None
+    if guardado is not None and cache.get("mtime_ns") == estado.st_mtime_ns and cache.get("tamano") == estado.st_size:
+        return guardado
+
+    with open(ruta, "rb") as f:
+        contenido = f.read()
+    huella = hashlib.sha256(contenido).hexdigest()
+    if guardado is not None and guardado.huella == huella:
+        datos = cache["datos"]  # Solo ha cambiado la fecha (por ejemplo, tras un checkout)
+    else:
+        datos = compilar_definicion(leer_definicion(ruta, contenido), huella)
+    if usar_cache:
+        escribir_cache(ruta_compilada, {
+            "formato": FORMATO_CACHE,
+            "mtime_ns": estado.st_mtime_ns,
+            "tamano": estado.st_size,
+            "datos": datos,
+        })
+    return Cuestionario(datos)
+
+
+def definicion_por_defecto():
+    """
+    Devuelvo como definición (la misma forma que un archivo JSON) el cuestionario incluido
+    en la herramienta (KPAS, RECOMENDACIONES_BASE y VALOR_RESPUESTA), con identificadores estables.
+    """
+    return {
+        "version": VERSION_CUESTIONARIO,
+        "valores": dict(VALOR_RESPUESTA),
+        "kpas": [
+            {
+                "id": SIGLAS_KPA.get(nombre, nombre),
+                "nombre": nombre,
+                "recomendaciones": list(RECOMENDACIONES_BASE.get(nombre, [])),
+                "preguntas": [
+                    {"id": f"{SIGLAS_KPA.get(nombre, nombre)}-{i + 1:02d}", "texto": texto}
+                    for i, texto in enumerate(preguntas)
+                ],
+            }
+            for nombre, preguntas in KPAS.items()
+        ],
+    }
+
+
+def texto_definicion(definicion):
+    """
+    Devuelvo el JSON con el que escribo una definición en un archivo.
+    """
+    import json
+    return json.dumps(definicion, ensure_ascii=False, indent=2) + "\n"
+
+
+def cuestionario_por_defecto():
+    """
+    Devuelvo el cuestionario incluido en la herramienta ya compilado (no necesita archivo ni caché).
+    Su huella es la misma que la del archivo que escribe --exportar.
+    """
+    import hashlib
+    definicion = definicion_por_defecto()
+    huella = hashlib.sha256(texto_definicion(definicion).encode("utf-8")).hexdigest()
+    return Cuestionario(compilar_definicion(definicion, huella))
+
+
+def definicion_sintetica(num_kpas, preguntas_por_kpa):
+    """
+    Genero un banco de preguntas sintético (para medir la carga de bancos grandes).
+    """
+    return {
+        "version": f"sintetico-{num_kpas}x{preguntas_por_kpa}",
+        "valores": dict(VALOR_RESPUESTA),
+        "kpas": [
+            {
+                "id": f"KPA{k + 1}",
+                "nombre": f"Área de proceso {k + 1}",
+                "recomendaciones": [f"Recomendación general del área {k + 1}."],
+                "preguntas": [
+                    {"id": f"KPA{k + 1}-{i + 1:04d}", "texto": f"¿Se cumple la práctica {i + 1} del área {k + 1}?"}
+                    for i in range(preguntas_por_kpa)
+                ],
+            }
+            for k in range(num_kpas)
+        ],
+    }
+
+
+def main(argv=None):
+    """
+    Utilidades de línea de comandos: exportar el cuestionario incluido, generar un banco sintético
+    o cargar un cuestionario mostrando cuánto tarda con y sin caché.
+    """
+    import argparse
+    import sys
+    import time
+    parser = argparse.ArgumentParser(description="Cuestionarios CMMI en JSON o TOML con caché compilada.")
+    parser.add_argument("ruta", help="Archivo del cuestionario (.json o .toml)")
+    parser.add_argument("--exportar", action="store_true", help="Escribo en la ruta el cuestionario incluido (JSON)")
+    parser.add_argument("--sintetico", nargs=2, type=int, metavar=("KPAS", "PREGUNTAS"),
+                        help="Escribo en la ruta un banco sintético de KPAS × PREGUNTAS (JSON)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.exportar or args.sintetico:
+            definicion = definicion_sintetica(*args.sintetico) if args.sintetico else definicion_por_defecto()
+            with open(args.ruta, "w", encoding="utf-8", newline="\n") as f:
+                f.write(texto_definicion(definicion))
+            print(f"Cuestionario escrito en {args.ruta}")
+            return 0
+
+        inicio = time.perf_counter()
+        cuestionario = cargar_cuestionario(args.ruta, usar_cache=False)
+        sin_cache = (time.perf_counter() - inicio) * 1000
+        cargar_cuestionario(args.ruta)  # Me aseguro de que la caché esté al día
+        inicio = time.perf_counter()
+        cargar_cuestionario(args.ruta)
+        con_cache = (time.perf_counter() - inicio) * 1000
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+
+    print(cuestionario)
+    print(f"  Carga compilando el archivo: {sin_cache:.2f} ms")
+    print(f"  Carga desde la caché: {con_cache:.2f} ms")
+    return 0
+
+
+# Este bloque solo se ejecuta si ejecuto este archivo directamente (no si lo importo)
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
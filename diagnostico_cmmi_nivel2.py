@@ -3,7 +3,13 @@ import datetime  # Lo necesito para registrar fecha y hora en la conclusión fin
 from KPAS import KPAS  # Cargo las 5 KPAs con sus preguntas
 from VALOR_RESPUESTA import VALOR_RESPUESTA  # Importo los valores numéricos de cada respuesta
 from RECOMENDACIONES_BASE import RECOMENDACIONES_BASE  # Traigo las recomendaciones generales
-from porcentaje import estado_porcentaje  # Función para clasificar según el porcentaje
+from porcentaje import estado_decidido  # Cotas del modo de veredicto rápido
+from tabla_recomendaciones import TablaRecomendaciones  # Recomendaciones precompiladas por patrón
+from codificacion import texto_estado  # Estado de una KPA para los informes
+from cache_resultados import CacheLRU, clave_kpa  # Resultados de las respuestas repetidas
+from cuestionario import VERSION_CUESTIONARIO  # Versión del cuestionario incluido (para la caché)
+from evaluacion_cmmi import calcular_resultado_kpa  # Puntuación de una KPA (compartida con la GUI)
+from perfilado import etapa  # Medición por etapa (sin coste si el perfilado está desactivado)
 
 
 def respuesta_usuario(pregunta):
@@ -27,73 +33,76 @@ def respuesta_usuario(pregunta):
         # Si la opción no es válida, muestro un mensaje de error y vuelvo a preguntar
         print("Opción no válida. Intenta de nuevo.")
 
-def evaluar_kpa(nombre_kpa, preguntas):
+def evaluar_kpa(nombre_kpa, preguntas, modo_rapido=False, criterio="estado", cuestionario=None):
     """
     Esta es mi función principal para evaluar una KPA completa.
     Recibo el nombre de la KPA y su lista de preguntas, hago todas las preguntas al usuario,
     calculo el porcentaje de cumplimiento y genero las recomendaciones necesarias.
+    En modo rápido dejo de preguntar en cuanto las preguntas restantes ya no pueden cambiar
+    el estado de la KPA (criterio "estado") o su aportación al Nivel 2 (criterio "nivel2").
+    Con un cuestionario cargado (cuestionario.py) puntúo con sus valores, sus pesos y sus recomendaciones.
     """
+    valores_opcion = VALOR_RESPUESTA if cuestionario is None else cuestionario.valores
+    extremos = (min(valores_opcion.values()), max(valores_opcion.values()))
+    pesos = None if cuestionario is None else cuestionario.pesos_kpa.get(nombre_kpa)
     # Muestro un encabezado visual para separar cada KPA
     print("\n" + "="*60)
     print(f"Evaluando KPA: {nombre_kpa}")
     print("="*60)
     
-    # Inicializo tres listas para almacenar diferentes aspectos de las respuestas
-    respuestas_val = []  # Aquí guardo solo los valores numéricos para calcular el porcentaje
-    respuestas_raw = []  # En esta lista guardo la información completa de cada respuesta
-    detalles = []  # Aquí almaceno un resumen legible para el informe final
-    
-    # Recorro todas las preguntas de esta KPA
+    # Pido al usuario la opción de cada pregunta de esta KPA
+    opciones = []
+    valores = []  # Valores de las preguntas ya respondidas, para calcular las cotas
     for p in preguntas:
-        # Pido al usuario que responda la pregunta y obtengo su valor y opción
-        val, opcion = respuesta_usuario(p)
-        
-        # Guardo el valor numérico para el cálculo del porcentaje
-        respuestas_val.append(val)
-        
-        # Almaceno toda la información de la respuesta en formato estructurado
-        respuestas_raw.append({
-            "pregunta": p,  # La pregunta original
-            "opcion": opcion,  # La opción elegida: '1', '2' o '3'
-            "valor": val,  # El valor numérico: 1.0, 0.5 o 0.0
-            "texto": {"1":"Sí","2":"Parcial","3":"No"}[opcion]  # Convierto la opción a texto legible
-        })
-        
-        # Guardo un resumen detallado para mostrarlo en el informe
-        detalles.append({
-            "pregunta": p, 
-            "respuesta": {
-                "opcion": opcion, 
-                "texto": {"1":"Sí","2":"Parcial","3":"No"}[opcion], 
-                "valor": val
-            }
-        })
-    
-    # Calculo el porcentaje de cumplimiento de esta KPA
-    # Sumo todos los valores y divido entre el número total de respuestas, luego multiplico por 100
-    porcentaje = (sum(respuestas_val) / len(respuestas_val)) * 100
+        # En modo rápido compruebo antes de cada pregunta si el resultado ya está decidido
+        if modo_rapido and valores and estado_decidido(
+                valores + [None] * (len(preguntas) - len(valores)), criterio, extremos, pesos):
+            omitidas = len(preguntas) - len(opciones)
+            print(f"\nEl resultado de esta KPA ya está decidido: omito {omitidas} pregunta(s).")
+            # Marco las preguntas restantes como omitidas (opción vacía)
+            opciones.extend([""] * omitidas)
+            break
+        # Pido la respuesta y me quedo con su opción y su valor
+        _, opcion = respuesta_usuario(p)
+        valores.append(valores_opcion[opcion])
+        opciones.append(opcion)
     
-    # Clasifico el estado según el porcentaje obtenido (Implementada, Parcial, Deficiente)
-    estado = estado_porcentaje(porcentaje)
-    
-    # Genero recomendaciones personalizadas basándome en las respuestas del usuario
-    recomendaciones = generar_recomendaciones_por_respuestas(nombre_kpa, respuestas_raw)
-    
-    # Devuelvo un diccionario con toda la información de la evaluación de esta KPA
-    return {
-        "kpa": nombre_kpa,  # Nombre de la KPA evaluada
-        "porcentaje": round(porcentaje, 2),  # Porcentaje redondeado a 2 decimales
-        "estado": estado,  # Clasificación: Implementada, Parcial o Deficiente
-        "detalles": detalles,  # Detalles de cada pregunta y respuesta
-        "recomendaciones": recomendaciones,  # Lista de recomendaciones personalizadas
-        "respuestas_raw": respuestas_raw  # Datos completos de las respuestas
-    }
+    # Con todas las opciones recogidas construyo el resultado de la KPA
+    return construir_resultado_kpa(nombre_kpa, preguntas, opciones, cuestionario)
 
-def generar_recomendaciones_por_respuestas(kpa, respuestas_raw):
+# Resultados de KPA ya calculados, por KPA y respuestas empaquetadas
+CACHE_RESULTADOS = CacheLRU()
+
+@etapa()
+def construir_resultado_kpa(nombre_kpa, preguntas, opciones, cuestionario=None):
+    """
+    Esta función calcula el resultado de una KPA a partir de opciones ya conocidas ('1', '2', '3').
+    La separo de evaluar_kpa para poder puntuar respuestas sin preguntar nada por pantalla,
+    por ejemplo cuando las leo de un archivo en el modo por lotes.
+    Las preguntas omitidas en el modo rápido llegan con opción vacía: cuentan con el valor
+    mínimo (como un "No"), así que el porcentaje es la cota inferior. Si las omitidas todavía
+    podían cambiar el estado (criterio "nivel2"), el resultado queda marcado como provisional.
+    Sin cuestionario uso el incluido (KPAS, VALOR_RESPUESTA y RECOMENDACIONES_BASE); con un cuestionario
+    cargado (cuestionario.py) uso sus valores, sus pesos y sus recomendaciones, y preguntas son las suyas
+    (cuestionario.kpas[nombre_kpa]).
+    Con las preguntas del cuestionario, las respuestas repetidas devuelven el mismo resultado compartido de la caché.
+    """
+    # La puntuación es la de evaluacion_cmmi; solo cambia la tabla de recomendaciones (las de la CLI)
+    kpas = KPAS if cuestionario is None else cuestionario.kpas
+    if preguntas is not kpas.get(nombre_kpa):
+        return calcular_resultado_kpa(nombre_kpa, opciones, cuestionario, preguntas, TABLA_RECOMENDACIONES)
+    version = VERSION_CUESTIONARIO if cuestionario is None else cuestionario.version_cache
+    return CACHE_RESULTADOS.obtener_o_calcular(
+        clave_kpa(nombre_kpa, opciones, version), calcular_resultado_kpa,
+        nombre_kpa, opciones, cuestionario, preguntas, TABLA_RECOMENDACIONES)
+
+@etapa()
+def generar_recomendaciones_por_respuestas(kpa, respuestas_raw, base=None):
     """
     Esta función genera recomendaciones inteligentes según las respuestas del usuario.
     Si hay problemas (respuestas "Parcial" o "No"), añado recomendaciones genéricas
-    de RECOMENDACIONES_BASE y también recomendaciones específicas para cada pregunta fallida.
+    de RECOMENDACIONES_BASE (o las de base, si vienen de un cuestionario cargado)
+    y también recomendaciones específicas para cada pregunta fallida.
     """
     lista = []  # Inicializo la lista donde guardaré todas las recomendaciones
     
@@ -102,7 +111,7 @@ def generar_recomendaciones_por_respuestas(kpa, respuestas_raw):
     
     if problemas:  # Si hay problemas detectados
         # Primero añado las recomendaciones genéricas de esta KPA desde RECOMENDACIONES_BASE
-        lista.extend(RECOMENDACIONES_BASE.get(kpa, []))
+        lista.extend(RECOMENDACIONES_BASE.get(kpa, []) if base is None else base)
         
         # Ahora genero recomendaciones específicas para cada pregunta fallida
         for r in problemas:
@@ -128,54 +137,80 @@ def generar_recomendaciones_por_respuestas(kpa, respuestas_raw):
     
     return salida
 
-def evaluar_todas_las_kpas():
+# Tabla con las recomendaciones de todos los patrones de respuesta de cada KPA
+# Se compila con la función anterior la primera vez que se usa cada KPA
+TABLA_RECOMENDACIONES = TablaRecomendaciones(generar_recomendaciones_por_respuestas)
+
+def iterar_evaluacion_kpas(modo_rapido=False, criterio="estado", cuestionario=None):
+    """
+    Esta función es la versión en streaming de evaluar_todas_las_kpas.
+    Voy devolviendo el resultado de cada KPA en cuanto termino de evaluarla,
+    sin guardar la lista completa.
+    """
+    # Recorro las áreas clave de proceso (las de KPAS o las del cuestionario cargado)
+    for kpa, preguntas in (KPAS if cuestionario is None else cuestionario.kpas).items():
+        # Evalúo cada KPA y entrego su resultado completo
+        yield evaluar_kpa(kpa, preguntas, modo_rapido, criterio, cuestionario)
+
+def evaluar_todas_las_kpas(modo_rapido=False, criterio="estado", cuestionario=None):
     """
     Esta función ejecuta la evaluación completa de todas las KPAs del proyecto.
     Recorro cada KPA, hago todas sus preguntas y almaceno los resultados.
+    En modo rápido cada KPA deja de preguntar cuando su resultado ya está decidido.
     """
-    resultados = []  # Lista donde guardaré los resultados de todas las KPAs
-    
-    # Recorro el diccionario KPAS que contiene todas las áreas clave de proceso
-    for kpa, preguntas in KPAS.items():
-        # Evalúo cada KPA y obtengo su resultado completo
-        respuestas = evaluar_kpa(kpa, preguntas)
-        # Añado el resultado a mi lista
-        resultados.append(respuestas)
-    
-    return resultados  # Devuelvo la lista con todas las evaluaciones
+    # Guardo en una lista los resultados de todas las KPAs
+    return list(iterar_evaluacion_kpas(modo_rapido, criterio, cuestionario))  # Devuelvo la lista con todas las evaluaciones
 
-def diagnostico_general(resultados):
+def resumen_vacio():
     """
-    Esta función calcula el diagnóstico general del proyecto basándose en todas las KPAs.
-    Cuento cuántas están implementadas, parciales o deficientes y determino si cumple Nivel 2.
+    Devuelvo un resumen con todos los contadores a cero.
     """
-    # Inicializo un diccionario con contadores para cada categoría
-    resumen = {
+    return {
         "implementadas": 0,  # Contador de KPAs bien implementadas (≥80%)
         "parciales": 0,  # Contador de KPAs parcialmente implementadas (50-79%)
         "deficientes": 0,  # Contador de KPAs deficientes (<50%)
         "por_kpa": {}  # Diccionario para guardar el porcentaje de cada KPA
     }
+
+def actualizar_resumen(resumen, r):
+    """
+    Añado un único resultado de KPA a un resumen ya existente.
+    Así puedo ir acumulando el diagnóstico a medida que llegan los resultados.
+    """
+    # Guardo el porcentaje de esta KPA en el resumen
+    resumen["por_kpa"][r["kpa"]] = r["porcentaje"]
+    
+    # Incremento el contador correspondiente según el estado de la KPA
+    if r["estado"] == "Implementada":
+        resumen["implementadas"] += 1  # Incremento si está bien implementada
+    elif r["estado"] == "Parcialmente implementada":
+        resumen["parciales"] += 1  # Incremento si está parcial
+    else:
+        resumen["deficientes"] += 1  # Incremento si está deficiente
     
-    # Analizo cada resultado individual
+    return resumen
+
+@etapa()
+def diagnostico_general(resultados, kpas=KPAS):
+    """
+    Esta función calcula el diagnóstico general del proyecto basándose en todas las KPAs.
+    Cuento cuántas están implementadas, parciales o deficientes y determino si cumple Nivel 2.
+    kpas son las del cuestionario evaluado (las de KPAS o las de un cuestionario cargado).
+    """
+    # Inicializo un diccionario con contadores para cada categoría
+    resumen = resumen_vacio()
+    
+    # Analizo cada resultado individual y lo voy acumulando
     for r in resultados:
-        # Guardo el porcentaje de esta KPA en el resumen
-        resumen["por_kpa"][r["kpa"]] = r["porcentaje"]
-        
-        # Incremento el contador correspondiente según el estado de la KPA
-        if r["estado"] == "Implementada":
-            resumen["implementadas"] += 1  # Incremento si está bien implementada
-        elif r["estado"] == "Parcialmente implementada":
-            resumen["parciales"] += 1  # Incremento si está parcial
-        else:
-            resumen["deficientes"] += 1  # Incremento si está deficiente
+        actualizar_resumen(resumen, r)
     
     # Determino si el proyecto cumple el Nivel 2 de CMMI
     # Solo cumple si TODAS las KPAs están en estado "Implementada"
-    cumple_nivel2 = (resumen["implementadas"] == len(KPAS))
+    cumple_nivel2 = (resumen["implementadas"] == len(kpas))
     
     return resumen, cumple_nivel2  # Devuelvo el resumen y el veredicto final
 
+@etapa()
 def recomendaciones_para_alcanzar_nivel2(resultados):
     """
     Esta función genera un listado de recomendaciones para alcanzar el Nivel 2.
@@ -235,7 +270,7 @@ def menu_principal():
     
     return opcion  # Devuelvo la opción elegida
 
-def elegir_kpa():
+def elegir_kpa(kpas=KPAS):
     """
     Esta función permite al usuario seleccionar una KPA específica del listado.
     Muestro todas las KPAs numeradas y valido la selección.
@@ -243,31 +278,138 @@ def elegir_kpa():
     print("\nSelecciona la KPA a evaluar:")
     
     # Obtengo la lista de todas las KPAs disponibles
-    kpas = list(KPAS.keys())
+    nombres = list(kpas.keys())
     
     # Muestro cada KPA con su número
     i = 1
-    for k in kpas:
+    for k in nombres:
         print(f"  {i}) {k}")
         i += 1
     
     # Pido al usuario que elija un número
-    opcion = input(f"Elige (1-{len(kpas)}): ").strip()
+    opcion = input(f"Elige (1-{len(nombres)}): ").strip()
     
     # Valido que la opción sea un número y esté en el rango correcto
-    if opcion.isdigit() and 1 <= int(opcion) <= len(kpas):
+    if opcion.isdigit() and 1 <= int(opcion) <= len(nombres):
         # Devuelvo la KPA seleccionada (resto 1 porque las listas empiezan en 0)
-        return kpas[int(opcion) - 1]
+        return nombres[int(opcion) - 1]
     else:
         # Si la opción no es válida, muestro error y vuelvo a preguntar recursivamente
         print("Opción no válida.")
-        return elegir_kpa()
+        return elegir_kpa(kpas)
     
-def main():
+@etapa()
+def imprimir_informe_completo(resultados, resumen, cumple_nivel2, kpas=KPAS):
+    """
+    Muestro en la consola el informe de todas las KPAs evaluadas, el resumen general y la conclusión.
+    """
+    # Muestro el encabezado del informe completo
+    print("\n" + "="*80)
+    print("INFORME RESUMIDO (todas las KPAs):")
+    print("="*80)
+
+    # Recorro y muestro los resultados de cada KPA evaluada
+    for r in resultados:
+        # Imprimo la información de cada KPA
+        print(f"\nKPA: {r['kpa']}")
+        print(f"  - Cumplimiento: {r['porcentaje']}%{' (mínimo)' if r['omitidas'] else ''}")
+        print(f"  - Estado: {texto_estado(r)}")
+
+        # Muestro las respuestas dadas a cada pregunta
+        print("  - Respuestas:")
+        for d in r["detalles"]:
+            print(f"     * {d['pregunta']} -> {d['respuesta']['texto']}")
+
+        # En modo rápido indico qué preguntas no hizo falta responder
+        if r["omitidas"]:
+            print("  - Preguntas omitidas (el veredicto ya estaba decidido; el porcentaje es el mínimo):")
+            for i in r["omitidas"]:
+                print(f"     * {kpas[r['kpa']][i]}")
+
+        # Listo las recomendaciones generadas para esta KPA
+        print("  - Recomendaciones:")
+        for rec in r["recomendaciones"]:
+            print(f"     - {rec}")
+
+    # Ahora muestro el resumen general consolidado
+    print("\n" + "="*80)
+    print("Resumen general:")
+    print(f"  KPAs implementadas: {resumen['implementadas']}")
+    print(f"  KPAs parcialmente implementadas: {resumen['parciales']}")
+    print(f"  KPAs deficientes: {resumen['deficientes']}")
+    provisionales = sum(1 for r in resultados if r.get("provisional"))
+    if provisionales:
+        print(f"  KPAs con estado provisional (cuentan por su cota inferior): {provisionales}")
+
+    # Muestro si cumple o no el Nivel 2 de CMMI
+    print(f"\nVerificación nivel 2: {'Cumple' if cumple_nivel2 else 'No cumple'}")
+    print(conclusion_final(cumple_nivel2, resumen))
+
+@etapa()
+def imprimir_informe_kpa(kpa, respuesta, kpas=KPAS):
+    """
+    Muestro en la consola el informe de una sola KPA: cumplimiento, respuestas y recomendaciones.
+    """
+    print("\n" + "="*60)
+    print(f"Informe KPA seleccionada: {kpa}")
+    print("="*60)
+    print(f"Cumplimiento: {respuesta['porcentaje']}%{' (mínimo)' if respuesta['omitidas'] else ''}")
+    print(f"Estado: {texto_estado(respuesta)}")
+
+    # Listo las respuestas
+    print("\nRespuestas:")
+    for d in respuesta["detalles"]:
+        print(f" - {d['pregunta']} -> {d['respuesta']['texto']}")
+
+    # En modo rápido indico qué preguntas no hizo falta responder
+    if respuesta["omitidas"]:
+        print("\nPreguntas omitidas (el veredicto ya estaba decidido; el porcentaje es el mínimo):")
+        for i in respuesta["omitidas"]:
+            print(f" - {kpas[kpa][i]}")
+
+    # Listo las recomendaciones
+    print("\nRecomendaciones:")
+    for rec in respuesta["recomendaciones"]:
+        print(f" - {rec}")
+
+@etapa()
+def exportar_evaluacion(ruta, nombre_proyecto, resultados, resumen, cumple_nivel2, kpas=KPAS):
+    """
+    Exporto una evaluación completa a CSV, JSON Lines o HTML según la extensión de la ruta.
+    """
+    # Los exportadores solo se cargan si se pide exportar
+    from exportadores import abrir_salida, crear_exportador, formato_salida_por_extension
+    formato = formato_salida_por_extension(ruta)
+    opciones = {"con_recomendaciones": True} if formato == "html" else {}
+    with abrir_salida(ruta) as salida, crear_exportador(salida, formato, kpas=kpas, **opciones) as exportador:
+        exportador.escribir_proyecto(nombre_proyecto, resultados, resumen, cumple_nivel2)
+
+
+def ruta_exportacion(ruta, numero):
+    """
+    Ruta del archivo de la evaluación número numero de la sesión: la primera va a ruta y las siguientes
+    a informe_2.html, informe_3.html... para que una evaluación no sobrescriba la anterior.
+    """
+    if numero == 1:
+        return ruta
+    import os
+    base, extension = os.path.splitext(ruta)
+    return f"{base}_{numero}{extension}"
+
+
+def main(modo_rapido=False, criterio="estado", ruta_exportar=None, cuestionario=None):
     """
     Esta es la función principal que ejecuta todo el programa.
     Controlo el flujo de la aplicación, manejo el menú y coordino las evaluaciones.
+    Con modo_rapido activo el modo de veredicto rápido en todas las evaluaciones.
+    Con ruta_exportar guardo además cada evaluación completa en un archivo (CSV, JSON Lines o HTML):
+    la primera en ruta_exportar y las siguientes numeradas (ver ruta_exportacion).
+    Con un cuestionario cargado (cuestionario.py) pregunto y puntúo sus KPAs en lugar de las de KPAS.
     """
+    kpas = KPAS if cuestionario is None else cuestionario.kpas
+    # El historial (y SQLite) solo lo cargo al usar la aplicación interactiva, no al importar este módulo
+    from historial import guardar_en_historial
+    
     # Mensaje de bienvenida
     print("Bienvenido a la herramienta de diagnóstico CMMI Nivel 2.")
     
@@ -278,6 +420,9 @@ def main():
     if nombre_proyecto == "":
         nombre_proyecto = "Proyecto_sin_nombre"
 
+    # Evaluaciones completas exportadas en esta sesión (cada una va a su propio archivo)
+    exportadas = 0
+
     # Bucle principal del programa - se ejecuta hasta que el usuario decida salir
     while True:
         # Muestro el menú y obtengo la opción seleccionada
@@ -286,43 +431,26 @@ def main():
         # Opción 1: Evaluar todas las KPAs (evaluación completa)
         if opcion == "1":
             # Ejecuto la evaluación completa de todas las KPAs
-            resultados = evaluar_todas_las_kpas()
+            resultados = evaluar_todas_las_kpas(modo_rapido, criterio, cuestionario)
             
             # Calculo el diagnóstico general y verifico si cumple Nivel 2
-            resumen, cumple_nivel2 = diagnostico_general(resultados)
-
-            # Muestro el encabezado del informe completo
-            print("\n" + "="*80)
-            print("INFORME RESUMIDO (todas las KPAs):")
-            print("="*80)
-
-            # Recorro y muestro los resultados de cada KPA evaluada
-            for r in resultados:
-                # Imprimo la información de cada KPA
-                print(f"\nKPA: {r['kpa']}")
-                print(f"  - Cumplimiento: {r['porcentaje']}%")
-                print(f"  - Estado: {r['estado']}")
-                
-                # Muestro las respuestas dadas a cada pregunta
-                print("  - Respuestas:")
-                for d in r["detalles"]:
-                    print(f"     * {d['pregunta']} -> {d['respuesta']['texto']}")
-                
-                # Listo las recomendaciones generadas para esta KPA
-                print("  - Recomendaciones:")
-                for rec in r["recomendaciones"]:
-                    print(f"     - {rec}")
-
-            # Ahora muestro el resumen general consolidado
-            print("\n" + "="*80)
-            print("Resumen general:")
-            print(f"  KPAs implementadas: {resumen['implementadas']}")
-            print(f"  KPAs parcialmente implementadas: {resumen['parciales']}")
-            print(f"  KPAs deficientes: {resumen['deficientes']}")
-
-            # Muestro si cumple o no el Nivel 2 de CMMI
-            print(f"\nVerificación nivel 2: {'Cumple' if cumple_nivel2 else 'No cumple'}")
-            print(conclusion_final(cumple_nivel2, resumen))
+            resumen, cumple_nivel2 = diagnostico_general(resultados, kpas)
+
+            # Muestro el informe completo en la consola
+            imprimir_informe_completo(resultados, resumen, cumple_nivel2, kpas)
+
+            # Guardo la evaluación completa en el historial
+            guardar_en_historial(nombre_proyecto, resultados, cumple_nivel2, origen="cli")
+
+            # Si lo pidió, exporto también el informe a un archivo
+            if ruta_exportar:
+                ruta = ruta_exportacion(ruta_exportar, exportadas + 1)
+                try:
+                    exportar_evaluacion(ruta, nombre_proyecto, resultados, resumen, cumple_nivel2, kpas)
+                    exportadas += 1
+                    print(f"Informe exportado a {ruta}")
+                except OSError as error:
+                    print(f"No se pudo exportar el informe: {error}")
 
             # Pregunto si quiere hacer otra evaluación
             repetir = input("\n¿Quieres realizar otra evaluación? (s/n): ").strip().lower()
@@ -333,27 +461,16 @@ def main():
         # Opción 2: Evaluar una KPA específica
         elif opcion == "2":
             # Permito al usuario seleccionar qué KPA quiere evaluar
-            kpa = elegir_kpa()
+            kpa = elegir_kpa(kpas)
             
             # Evalúo solo esa KPA seleccionada
-            respuesta = evaluar_kpa(kpa, KPAS[kpa])
+            respuesta = evaluar_kpa(kpa, kpas[kpa], modo_rapido, criterio, cuestionario)
 
             # Muestro el informe de esta KPA individual
-            print("\n" + "="*60)
-            print(f"Informe KPA seleccionada: {kpa}")
-            print("="*60)
-            print(f"Cumplimiento: {respuesta['porcentaje']}%")
-            print(f"Estado: {respuesta['estado']}")
-            
-            # Listo las respuestas
-            print("\nRespuestas:")
-            for d in respuesta["detalles"]:
-                print(f" - {d['pregunta']} -> {d['respuesta']['texto']}")
-            
-            # Listo las recomendaciones
-            print("\nRecomendaciones:")
-            for rec in respuesta["recomendaciones"]:
-                print(f" - {rec}")
+            imprimir_informe_kpa(kpa, respuesta, kpas)
+
+            # Guardo esta KPA en el historial (sin veredicto de Nivel 2, porque solo evalué una)
+            guardar_en_historial(nombre_proyecto, [respuesta], None, origen="cli")
 
             # Pregunto qué quiere hacer a continuación
             while True:
@@ -379,4 +496,28 @@ def main():
 
 # Este bloque solo se ejecuta si ejecuto este archivo directamente (no si lo importo)
 if __name__ == "__main__":
-    main()  # Inicio la ejecución del programa
+    # Leo las opciones de la línea de comandos (solo las del modo de veredicto rápido)
+    import argparse
+    parser = argparse.ArgumentParser(description="Herramienta de diagnóstico CMMI Nivel 2 (consola).")
+    parser.add_argument("--veredicto-rapido", action="store_true",
+                        help="Dejar de preguntar en cada KPA cuando su resultado ya está decidido")
+    parser.add_argument("--criterio", choices=("estado", "nivel2"), default="estado",
+                        help="Qué debe estar decidido para omitir preguntas: el estado de la KPA o solo el Nivel 2")
+    parser.add_argument("--exportar", metavar="RUTA",
+                        help="Exportar cada evaluación completa a un archivo .csv, .jsonl o .html (las siguientes, numeradas)")
+    parser.add_argument("--cuestionario", metavar="RUTA",
+                        help="Cuestionario JSON o TOML con el que evaluar (por defecto, el incluido)")
+    import perfilado  # Opciones --perfilar: al salir muestro el tiempo de cada etapa
+    perfilado.agregar_argumentos(parser)
+    args = parser.parse_args()
+    perfilado.activar_desde_argumentos(args)
+    cuestionario = None
+    if args.cuestionario:
+        import sys
+        from cuestionario import cargar_cuestionario
+        try:
+            cuestionario = cargar_cuestionario(args.cuestionario)
+        except (OSError, ValueError) as error:
+            print(f"Error: {error}", file=sys.stderr)
+            sys.exit(1)
+    main(args.veredicto_rapido, args.criterio, args.exportar, cuestionario)  # Inicio la ejecución del programa
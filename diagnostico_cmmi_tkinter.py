@@ -3,159 +3,261 @@
 # Utilizo Tkinter para crear una aplicación con ventanas, botones y formularios
 
 import tkinter as tk  # Importo Tkinter para crear la interfaz gráfica
-from tkinter import ttk, messagebox  # Importo widgets mejorados y cuadros de diálogo
+from tkinter import ttk, messagebox, filedialog  # Importo widgets mejorados y cuadros de diálogo
+from tkinter import font as tkfont  # Para medir el texto de las preguntas
 from KPAS import KPAS  # Cargo las 5 KPAs con sus preguntas
 from VALOR_RESPUESTA import VALOR_RESPUESTA  # Valores numéricos de las respuestas
-from RECOMENDACIONES_BASE import RECOMENDACIONES_BASE  # Recomendaciones base para cada KPA
-from porcentaje import estado_porcentaje  # Función para clasificar el estado según porcentaje
-import datetime  # Para registrar fecha y hora en la conclusión
+from porcentaje import estado_decidido  # Cotas del modo de veredicto rápido
+from evaluacion_cmmi import (  # La puntuación vive en un módulo sin dependencias gráficas
+    evaluar_kpa,
+    exportar_cartera,
+    exportar_lineas,
+    generar_resumen_general,
+    importar_y_evaluar,
+    lineas_informe_kpa,
+    lineas_resumen_general,
+    lineas_totales_cartera,
+)
+import os  # Para saber la extensión del archivo exportado
+import time  # Para medir la latencia de las transiciones entre pantallas
+import sqlite3  # Para capturar los errores al guardar en el historial
+from historial import HistorialEvaluaciones  # Historial persistente de evaluaciones (SQLite)
+from trabajos_fondo import TrabajadorFondo  # Trabajos pesados en segundo plano
+from marcador import MarcadorEnVivo  # Puntuación en vivo mientras se responde
+import perfilado  # Medición por etapa (sin coste si el perfilado está desactivado)
 
 
-# --- LÓGICA (adaptada de la versión CLI) ---
+# --- LISTA VIRTUAL DE PREGUNTAS ---
 
-def generar_recomendaciones_por_respuestas(kpa, respuestas_raw):
-    """
-    Esta función genera recomendaciones personalizadas según las respuestas del usuario.
-    Es la misma lógica que en la versión CLI, pero adaptada para la GUI.
-    """
-    lista = []  # Lista donde guardaré todas las recomendaciones
-    
-    # Filtro solo las respuestas problemáticas (Parcial o No)
-    problemas = [r for r in respuestas_raw if r['opcion'] in ('2', '3')]
-    
-    if problemas:  # Si hay problemas detectados
-        # Añado las recomendaciones genéricas de esta KPA
-        lista.extend(RECOMENDACIONES_BASE.get(kpa, []))
-        
-        # Genero recomendaciones específicas para cada pregunta con problemas
-        for r in problemas:
-            texto_preg = r['pregunta']
-            if r['opcion'] == '3':  # Si respondió "No"
-                lista.append(f"'{texto_preg}' → No implementado. Priorizar su corrección.")
-            elif r['opcion'] == '2':  # Si respondió "Parcial"
-                lista.append(f"'{texto_preg}' → Parcialmente implementado. Mejorar formalidad.")
-    else:
-        # Si todo está bien, felicito al usuario
-        lista.append("Todas las prácticas clave parecen estar satisfechas. Mantener procesos y evidencias.")
-    
-    # Elimino duplicados manteniendo el orden
-    visto = set()
-    salida = []
-    for contenido in lista:
-        if contenido not in visto:
-            salida.append(contenido)
-            visto.add(contenido)
-    
-    return salida
+# Alto fijo de cada fila (texto de la pregunta en hasta dos líneas más los radio buttons)
+ALTO_FILA = 64
 
+# Ancho en píxeles y número de líneas del texto de la pregunta que caben en una fila
+ANCHO_TEXTO = 760
+LINEAS_TEXTO = 2
 
-def evaluar_kpa(nombre_kpa, respuestas_usuario):
-    """
-    Evalúo una KPA completa recibiendo las respuestas del usuario desde la GUI.
-    La diferencia con la versión CLI es que aquí recibo las respuestas como parámetro
-    en lugar de pedirlas interactivamente.
-    """
-    # Obtengo las preguntas de esta KPA
-    preguntas = KPAS[nombre_kpa]
-    respuestas_raw = []  # Lista para almacenar información detallada de cada respuesta
-    valores = []  # Lista solo con los valores numéricos para calcular el porcentaje
-
-    # Proceso cada pregunta con su respuesta correspondiente
-    for p, opcion in zip(preguntas, respuestas_usuario):
-        # Obtengo el valor numérico de la respuesta desde VALOR_RESPUESTA
-        val = VALOR_RESPUESTA[opcion]
-        
-        # Guardo toda la información de esta respuesta
-        respuestas_raw.append({
-            "pregunta": p,  # Texto de la pregunta
-            "opcion": opcion,  # Opción seleccionada: '1', '2' o '3'
-            "valor": val,  # Valor numérico: 1.0, 0.5 o 0.0
-            "texto": {"1": "Sí", "2": "Parcial", "3": "No"}[opcion]  # Texto legible
-        })
-        
-        # Añado el valor a la lista para el cálculo del porcentaje
-        valores.append(val)
-
-    # Calculo el porcentaje de cumplimiento (o 0 si no hay valores)
-    porcentaje = (sum(valores) / len(valores)) * 100 if valores else 0
-    
-    # Clasifico el estado según el porcentaje obtenido
-    estado = estado_porcentaje(porcentaje)
-    
-    # Genero recomendaciones personalizadas
-    recomendaciones = generar_recomendaciones_por_respuestas(nombre_kpa, respuestas_raw)
-
-    # Devuelvo un diccionario con toda la información de la evaluación
-    return {
-        "kpa": nombre_kpa,
-        "porcentaje": round(porcentaje, 2),  # Redondeo a 2 decimales
-        "estado": estado,
-        "respuestas": respuestas_raw,
-        "recomendaciones": recomendaciones
-    }
+# Opciones de respuesta de cada pregunta
+OPCIONES_RESPUESTA = [("Sí", "1"), ("Parcial", "2"), ("No", "3")]
 
 
-def generar_resumen_general(resultados):
+def recortar_lineas(texto, medir, ancho=ANCHO_TEXTO, lineas=LINEAS_TEXTO):
     """
-    Genero un resumen consolidado de todas las KPAs evaluadas.
-    Cuento cuántas están implementadas, parciales o deficientes.
+    Reparto el texto por palabras en líneas de hasta `ancho` píxeles (medir(texto) da su ancho)
+    y me quedo con las `lineas` primeras; si no cabe entero termino la última en "…".
+    Devuelvo (texto a mostrar, True si lo recorté).
     """
-    resumen = {
-        "implementadas": 0,  # Contador de KPAs bien implementadas
-        "parciales": 0,  # Contador de KPAs parcialmente implementadas
-        "deficientes": 0,  # Contador de KPAs deficientes
-        "por_kpa": {}  # Diccionario con el porcentaje de cada KPA
-    }
-    
-    # Analizo cada resultado
-    for r in resultados:
-        # Guardo el porcentaje de esta KPA
-        resumen["por_kpa"][r["kpa"]] = r["porcentaje"]
-        
-        # Incremento el contador correspondiente según su estado
-        if r["estado"] == "Implementada":
-            resumen["implementadas"] += 1
-        elif r["estado"] == "Parcialmente implementada":
-            resumen["parciales"] += 1
+    partes = []
+    actual = ""
+    for palabra in texto.split():
+        propuesta = f"{actual} {palabra}" if actual else palabra
+        if actual and medir(propuesta) > ancho:
+            partes.append(actual)
+            actual = palabra
         else:
-            resumen["deficientes"] += 1
-    
-    # El proyecto cumple Nivel 2 solo si TODAS las KPAs están implementadas
-    cumple_nivel2 = (resumen["implementadas"] == len(KPAS))
-    
-    return resumen, cumple_nivel2
+            actual = propuesta
+    partes.append(actual)
+    if len(partes) <= lineas:
+        return "\n".join(partes), False
+    palabras = partes[lineas - 1].split()
+    while len(palabras) > 1 and medir(" ".join(palabras) + " …") > ancho:
+        palabras.pop()
+    return "\n".join(partes[:lineas - 1] + [" ".join(palabras) + " …"]), True
 
 
-def conclusion_final(cumple_nivel2):
+class ListaPreguntasVirtual:
     """
-    Genero la conclusión final con fecha y hora actual.
+    Lista de preguntas con scroll que solo crea widgets para las filas visibles.
+    Las respuestas viven en una lista normal (self.respuestas, una opción o "" por pregunta);
+    al desplazarme reutilizo las mismas filas y les cambio el texto y la respuesta mostrada.
+    Así abrir un formulario de miles de preguntas cuesta lo mismo que uno de cinco.
+    Las filas tienen alto fijo: el texto que no cabe en LINEAS_TEXTO líneas se recorta con "…"
+    y se ve completo en una ayuda emergente al pasar el ratón por encima.
     """
-    # Obtengo la fecha y hora en formato legible
-    ahora = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    if cumple_nivel2:  # Si cumple todos los requisitos
-        mensaje = f"Conclusión ({ahora}): El proyecto cumple el Nivel 2 de CMMI."
-    else:  # Si no cumple
-        mensaje = f"Conclusión ({ahora}): El proyecto NO cumple el Nivel 2 de CMMI. Recomendado trabajar las áreas deficientes y parciales."
-    
-    return mensaje
+
+    def __init__(self, padre, preguntas, al_cambiar=None, alto=420):
+        self.preguntas = preguntas
+        self.respuestas = [""] * len(preguntas)  # Estado de las respuestas, sin widgets
+        self.al_cambiar = al_cambiar  # al_cambiar(indice, anterior, nueva) cuando el usuario elige una opción
+        self.bloquear_pendientes = False  # En modo rápido desactivo las preguntas sin responder
+        self.filas = []  # Filas reutilizables: (id de ventana en el canvas, etiqueta, variable, radios)
+        self.indice_fila = []  # Pregunta que muestra cada fila (-1 si ninguna)
+        self.cargando = False  # Evito tratar como respuesta del usuario el valor que pongo al reciclar
+        self.recortada = []  # Si el texto que muestra cada fila está recortado
+        self.fuente = None  # Fuente de las etiquetas (la tomo al crear la primera fila)
+        self.ayuda = None  # Ventana emergente con el texto completo de una pregunta recortada
+
+        # Frame con el canvas (la ventana visible) y la scrollbar
+        marco = ttk.Frame(padre)
+        marco.pack(fill="both", expand=True, padx=10, pady=10)
+        self.canvas = tk.Canvas(marco, height=alto, highlightthickness=0,
+                                yscrollincrement=ALTO_FILA)  # Cada paso de scroll avanza una fila
+        scrollbar = ttk.Scrollbar(marco, orient="vertical", command=self.desplazar)
+        self.canvas.configure(yscrollcommand=scrollbar.set,
+                              scrollregion=(0, 0, 0, len(preguntas) * ALTO_FILA))
+        self.canvas.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        # Redibujo al cambiar el tamaño y al usar la rueda del ratón
+        self.canvas.bind("<Configure>", lambda e: self.redibujar())
+        self.enlazar_rueda(self.canvas)
+
+        self.redibujar(alto)
+
+    def enlazar_rueda(self, widget):
+        """
+        Enlazo la rueda del ratón (Windows/macOS y los botones 4/5 de X11) al desplazamiento de la lista.
+        Lo hago en el canvas y en cada widget de las filas, porque el evento llega al que está bajo el puntero.
+        """
+        widget.bind("<MouseWheel>", lambda e: self.desplazar("scroll", -1 if e.delta > 0 else 1, "units"))
+        widget.bind("<Button-4>", lambda e: self.desplazar("scroll", -1, "units"))
+        widget.bind("<Button-5>", lambda e: self.desplazar("scroll", 1, "units"))
+
+    def crear_fila(self):
+        """
+        Creo una fila reutilizable (etiqueta y tres radio buttons) dentro del canvas.
+        """
+        numero = len(self.filas)
+        frame = ttk.Frame(self.canvas)
+        lbl = tk.Label(frame, wraplength=ANCHO_TEXTO, justify="left")
+        lbl.pack(anchor="w")
+        if self.fuente is None:
+            self.fuente = tkfont.Font(root=lbl, font=lbl.cget("font"))
+        lbl.bind("<Enter>", lambda e: self.mostrar_ayuda(numero, e))
+        lbl.bind("<Leave>", lambda e: self.ocultar_ayuda())
+        var = tk.StringVar()
+        opt_frame = ttk.Frame(frame)
+        opt_frame.pack(anchor="w", pady=2)
+        radios = []
+        for txt, val in OPCIONES_RESPUESTA:
+            rb = ttk.Radiobutton(opt_frame, text=txt, variable=var, value=val)
+            rb.pack(side="left", padx=5)
+            radios.append(rb)
+        var.trace_add("write", lambda *args: self.al_elegir(numero))
+        for widget in [frame, lbl, opt_frame] + radios:
+            self.enlazar_rueda(widget)
+        id_ventana = self.canvas.create_window(0, 0, window=frame, anchor="nw", height=ALTO_FILA)
+        self.filas.append((id_ventana, lbl, var, radios))
+        self.indice_fila.append(-1)
+        self.recortada.append(False)
+
+    def mostrar_ayuda(self, numero, evento):
+        """
+        Muestro junto al puntero el texto completo de la pregunta de una fila si está recortado.
+        """
+        self.ocultar_ayuda()
+        i = self.indice_fila[numero]
+        if i < 0 or not self.recortada[numero]:
+            return
+        self.ayuda = tk.Toplevel(self.canvas)
+        self.ayuda.wm_overrideredirect(True)
+        self.ayuda.wm_geometry(f"+{evento.x_root + 12}+{evento.y_root + 12}")
+        tk.Label(self.ayuda, text=f"{i+1}. {self.preguntas[i]}", wraplength=ANCHO_TEXTO, justify="left",
+                 background="#ffffe0", relief="solid", borderwidth=1).pack()
+
+    def ocultar_ayuda(self):
+        if self.ayuda is not None:
+            self.ayuda.destroy()
+            self.ayuda = None
+
+    def desplazar(self, *args):
+        """
+        Desplazo el canvas (mismos argumentos que yview) y recoloco las filas.
+        """
+        self.ocultar_ayuda()
+        self.canvas.yview(*args)
+        self.redibujar()
+
+    def redibujar(self, alto=None):
+        """
+        Coloco las filas reutilizables sobre las preguntas que están a la vista.
+        """
+        alto = alto or self.canvas.winfo_height()
+        # Creo las filas que falten para cubrir la altura visible (más una por el desplazamiento parcial)
+        necesarias = min(len(self.preguntas), alto // ALTO_FILA + 2)
+        while len(self.filas) < necesarias:
+            self.crear_fila()
+
+        primera = int(self.canvas.canvasy(0)) // ALTO_FILA
+        for k, (id_ventana, lbl, var, radios) in enumerate(self.filas):
+            i = primera + k
+            if i >= len(self.preguntas):
+                self.canvas.itemconfigure(id_ventana, state="hidden")
+                self.indice_fila[k] = -1
+                continue
+            if self.indice_fila[k] != i:
+                # Reciclo la fila: la muevo a su posición y le pongo la pregunta y la respuesta guardada
+                self.indice_fila[k] = i
+                self.canvas.coords(id_ventana, 0, i * ALTO_FILA)
+                self.canvas.itemconfigure(id_ventana, state="normal")
+                texto, self.recortada[k] = recortar_lineas(f"{i+1}. {self.preguntas[i]}", self.fuente.measure)
+                lbl.config(text=texto)
+                self.cargando = True
+                var.set(self.respuestas[i])
+                self.cargando = False
+            bloqueada = self.bloquear_pendientes and not self.respuestas[i]
+            for rb in radios:
+                rb.state(["disabled"] if bloqueada else ["!disabled"])
+
+    def al_elegir(self, numero):
+        """
+        Guardo en self.respuestas la opción que el usuario eligió en una fila.
+        """
+        if self.cargando:
+            return
+        i = self.indice_fila[numero]
+        if i < 0:
+            return
+        anterior = self.respuestas[i]
+        nueva = self.respuestas[i] = self.filas[numero][2].get()
+        if self.al_cambiar is not None and nueva != anterior:
+            self.al_cambiar(i, anterior, nueva)
+
+    def bloquear(self, bloquear_pendientes):
+        """
+        Activo o desactivo las preguntas sin responder (modo de veredicto rápido).
+        """
+        if bloquear_pendientes != self.bloquear_pendientes:
+            self.bloquear_pendientes = bloquear_pendientes
+            self.redibujar()
+
+    def vaciar(self):
+        """
+        Borro todas las respuestas y vuelvo a cargar las filas visibles.
+        """
+        self.respuestas = [""] * len(self.preguntas)
+        self.indice_fila = [-1] * len(self.filas)
+        self.redibujar()
 
 
 # --- INTERFAZ TKINTER ---
 
+# Número de líneas del informe que inserto en cada lote (entre lote y lote Tk atiende eventos)
+LINEAS_POR_LOTE = 300
+
+# Formato de exportación de una cartera según la extensión (.txt u otras: el informe en texto)
+FORMATOS_EXPORTACION = {".csv": "csv", ".jsonl": "jsonl", ".html": "html", ".htm": "html"}
+
 class CMMIApp:
     """
     Esta es mi clase principal que gestiona toda la interfaz gráfica.
     Controlo las diferentes pantallas, formularios y la navegación entre ellas.
+    Cada pantalla se construye una sola vez y se guarda en una caché: al navegar
+    solo oculto la pantalla actual y muestro la siguiente, sin destruir widgets.
     """
     
-    def __init__(self, root):
+    def __init__(self, root, cuestionario=None):
         """
         Constructor de la aplicación. Aquí inicializo la ventana principal
         y todas las variables que necesitaré durante la ejecución.
+        cuestionario es un cuestionario cargado con cuestionario.py (None = el incluido).
         """
         # Guardo la referencia a la ventana principal
         self.root = root
+
+        # Cuestionario con el que evalúo: sus KPAs con sus preguntas y su tabla opción -> valor
+        self.cuestionario = cuestionario
+        self.kpas = KPAS if cuestionario is None else cuestionario.kpas
+        self.valores = VALOR_RESPUESTA if cuestionario is None else cuestionario.valores
         
         # Configuro el título de la ventana
         self.root.title("Diagnóstico CMMI Nivel 2")
@@ -174,61 +276,155 @@ class CMMIApp:
         self.batch_index = 0  # Índice de la KPA actual en el proceso batch
         self.batch_results = []  # Resultados acumulados de las evaluaciones
 
+        # Modo de veredicto rápido: en la evaluación por lotes permito dejar sin responder
+        # las preguntas que ya no pueden cambiar el estado de la KPA
+        self.modo_rapido = tk.BooleanVar(value=False)
+        self.lista = None  # Lista de preguntas del formulario actual
+        self.lbl_rapido = None  # Etiqueta que indica cuántas preguntas se pueden omitir
+
+        # Caché de pantallas: clave -> frame ya construido ("inicio", ("kpa", nombre), ("lote", nombre)...)
+        self.pantallas = {}
+        self.pantalla_actual = None
+        
+        # Estado de cada formulario: (modo, kpa) -> lista de preguntas y etiqueta de modo rápido.
+        # Así las respuestas se conservan al ir y volver entre pantallas
+        self.listas = {}
+        self.etiquetas_rapido = {}
+        
+        # Marcador en vivo de cada modo: se actualiza con cada respuesta sin volver a evaluar
+        pesos = None if cuestionario is None else cuestionario.pesos_kpa
+        self.marcadores = {modo: MarcadorEnVivo(self.kpas, self.valores, pesos) for modo in ("kpa", "lote")}
+        self.etiquetas_marcador = {}
+        
+        # Widgets de las pantallas de informe, que reutilizo cambiando solo su contenido
+        self.widgets_informe = {}
+        self.widgets_resumen = {}
+
+        # Trabajador en segundo plano para importar, puntuar carteras y exportar sin bloquear la ventana
+        self.trabajador = TrabajadorFondo(root)
+        self.trabajo_actual = None  # Importación en marcha (para poder cancelarla)
+        self.cartera = None  # Última cartera importada (para exportarla a CSV, JSON Lines o HTML)
+        self.widgets_cartera = {}
+        self.root.protocol("WM_DELETE_WINDOW", self.salir)
+
+        # Latencia de cada transición (clave de pantalla, milisegundos) cuando la mido
+        self.medir = False
+        self.latencias = []
+
         # Muestro la pantalla inicial
         self.frame_inicio()
 
     def limpiar_frame(self):
         """
-        Esta función elimina todos los widgets de la ventana.
-        La uso antes de mostrar una nueva pantalla para limpiar la anterior.
+        Oculto la pantalla actual antes de mostrar otra.
+        Ya no destruyo los widgets: la pantalla queda en la caché para la próxima vez.
         """
-        # Recorro todos los widgets hijos de la ventana principal y los destruyo
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        if self.pantalla_actual is not None:
+            self.pantalla_actual.pack_forget()
+            self.pantalla_actual = None
+
+    def mostrar_pantalla(self, clave, construir):
+        """
+        Muestro la pantalla guardada con esta clave, construyéndola con construir(frame)
+        solo la primera vez que se pide. Devuelvo el frame de la pantalla.
+        """
+        inicio = time.perf_counter()
+        frame = self.pantallas.get(clave)
+        if frame is None:
+            # Mido la construcción de los widgets de cada tipo de pantalla ("kpa", "lote", "informe"...)
+            with perfilado.tramo(f"CMMIApp.construir:{clave[0] if isinstance(clave, tuple) else clave}"):
+                frame = ttk.Frame(self.root)
+                construir(frame)
+            self.pantallas[clave] = frame
+        if frame is not self.pantalla_actual:
+            self.limpiar_frame()
+            frame.pack(fill="both", expand=True)
+            self.pantalla_actual = frame
+        if self.medir:
+            # Espero a que Tk termine de dibujar para medir la transición completa
+            self.root.update_idletasks()
+            self.latencias.append((clave, (time.perf_counter() - inicio) * 1000))
+        return frame
+
+    def salir(self):
+        """
+        Cancelo los trabajos en segundo plano y cierro la aplicación.
+        """
+        self.trabajador.cerrar()
+        self.root.quit()
+
+    def guardar_historial(self, resultados, cumple_nivel2):
+        """
+        Guardo una evaluación en el historial con el nombre de proyecto escrito en la pantalla inicial.
+        Si la base de datos falla, aviso al usuario pero sigo mostrando los resultados.
+        """
+        nombre = self.nombre_proyecto.get().strip() or "Proyecto_sin_nombre"
+        try:
+            with HistorialEvaluaciones() as historial:
+                historial.guardar_evaluacion(nombre, resultados, cumple_nivel2, origen="gui")
+        except sqlite3.Error as error:
+            messagebox.showwarning("Historial", f"No se pudo guardar la evaluación en el historial:\n{error}")
 
     def frame_inicio(self):
         """
         Muestro la pantalla de inicio con el menú principal.
         Aquí el usuario puede elegir entre evaluar todas las KPAs, una específica, o salir.
         """
-        # Limpio cualquier contenido previo de la ventana
-        self.limpiar_frame()
-        
+        self.mostrar_pantalla("inicio", self.construir_inicio)
+
+    def construir_inicio(self, frame):
+        """
+        Construyo la pantalla de inicio (solo la primera vez que se muestra).
+        """
         # Creo y muestro el título principal
-        tk.Label(self.root, text="Herramienta Diagnóstico CMMI Nivel 2",
+        tk.Label(frame, text="Herramienta Diagnóstico CMMI Nivel 2",
                  font=("Helvetica", 18, "bold")).pack(pady=20)
         
         # Etiqueta para el campo de nombre del proyecto
-        tk.Label(self.root, text="Nombre del proyecto:").pack()
+        tk.Label(frame, text="Nombre del proyecto:").pack()
         
         # Campo de entrada para que el usuario escriba el nombre del proyecto
-        tk.Entry(self.root, textvariable=self.nombre_proyecto, width=60).pack(pady=5)
+        tk.Entry(frame, textvariable=self.nombre_proyecto, width=60).pack(pady=5)
         
         # Botón para evaluar todas las KPAs
-        ttk.Button(self.root, text="Evaluar todas las KPAs", command=self.evaluar_todas).pack(pady=10)
+        ttk.Button(frame, text="Evaluar todas las KPAs", command=self.evaluar_todas).pack(pady=10)
         
         # Botón para evaluar una KPA específica
-        ttk.Button(self.root, text="Evaluar una KPA específica", command=self.menu_kpa).pack(pady=10)
+        ttk.Button(frame, text="Evaluar una KPA específica", command=self.menu_kpa).pack(pady=10)
+        
+        # Botón para importar un archivo de respuestas de muchos proyectos y evaluarlos en segundo plano
+        ttk.Button(frame, text="Importar y evaluar archivo de respuestas...",
+                   command=self.importar_archivo).pack(pady=10)
+        
+        # Casilla para activar el modo de veredicto rápido en la evaluación de todas las KPAs
+        ttk.Checkbutton(frame, text="Veredicto rápido: omitir preguntas que ya no cambian el estado de la KPA",
+                        variable=self.modo_rapido).pack(pady=5)
         
         # Botón para salir de la aplicación
-        ttk.Button(self.root, text="Salir", command=self.root.quit).pack(pady=10)
+        ttk.Button(frame, text="Salir", command=self.salir).pack(pady=10)
 
     def menu_kpa(self):
         """
         Muestro un menú con todas las KPAs disponibles para que el usuario elija una.
+        """
+        self.mostrar_pantalla("menu_kpa", self.construir_menu_kpa)
+
+    def construir_menu_kpa(self, frame):
+        """
+        Construyo el menú de KPAs.
         Utilizo un canvas con scrollbar para que pueda desplazarse si hay muchas KPAs.
         """
-        # Limpio la ventana
-        self.limpiar_frame()
-        
         # Título de la pantalla
-        tk.Label(self.root, text="Selecciona una KPA:", font=("Helvetica", 14, "bold")).pack(pady=20)
+        tk.Label(frame, text="Selecciona una KPA:", font=("Helvetica", 14, "bold")).pack(pady=20)
+        
+        # Botón para volver al menú principal (lo empaqueto antes para que el canvas no lo tape)
+        ttk.Button(frame, text="Volver", command=self.frame_inicio).pack(side="bottom", pady=10)
         
         # Creo un canvas (lienzo) que me permite añadir scrollbar
-        canvas = tk.Canvas(self.root)
+        canvas = tk.Canvas(frame)
         
         # Creo una barra de desplazamiento vertical
-        scrollbar = ttk.Scrollbar(self.root, orient="vertical", command=canvas.yview)
+        scrollbar = ttk.Scrollbar(frame, orient="vertical", command=canvas.yview)
         
         # Frame que contendrá todos los botones de las KPAs
         scroll_frame = ttk.Frame(canvas)
@@ -248,7 +444,7 @@ class CMMIApp:
         canvas.configure(yscrollcommand=scrollbar.set, height=420)
 
         # Creo un botón para cada KPA disponible
-        for kpa in KPAS.keys():
+        for kpa in self.kpas.keys():
             # Cada botón llama a formulario_kpa con la KPA correspondiente
             # Uso lambda con parámetro por defecto para capturar el valor correcto de kpa
             ttk.Button(scroll_frame, text=kpa, width=80,
@@ -257,82 +453,72 @@ class CMMIApp:
         # Posiciono el canvas y la scrollbar en la ventana
         canvas.pack(side="left", fill="both", expand=True, padx=(10, 0))
         scrollbar.pack(side="right", fill="y")
-        
-        # Botón para volver al menú principal
-        ttk.Button(self.root, text="Volver", command=self.frame_inicio).pack(pady=10)
+
+    def construir_preguntas(self, padre, modo, kpa):
+        """
+        Creo la lista virtual de preguntas de una KPA con sus radio buttons Sí/Parcial/No
+        y la etiqueta del marcador en vivo. La lista queda guardada por (modo, kpa)
+        para conservar las respuestas.
+        """
+        self.etiquetas_marcador[(modo, kpa)] = tk.Label(padre, text="", fg="navy")
+        self.etiquetas_marcador[(modo, kpa)].pack()
+        self.listas[(modo, kpa)] = ListaPreguntasVirtual(
+            padre, self.kpas[kpa], lambda i, anterior, nueva: self.respuesta_cambiada(modo, kpa, anterior, nueva, i))
+
+    def usar_formulario(self, modo, kpa):
+        """
+        Apunto self.lista al estado guardado del formulario que acabo de mostrar.
+        """
+        self.lista = self.listas[(modo, kpa)]
+        self.lbl_rapido = self.etiquetas_rapido.get((modo, kpa))
+        self.actualizar_marcador(modo, kpa)
+
+    def respuesta_cambiada(self, modo, kpa, anterior, nueva, indice=None):
+        """
+        Aplico al marcador en vivo el cambio de la respuesta a la pregunta indice (solo la diferencia)
+        y actualizo lo que depende de ella en pantalla.
+        """
+        self.marcadores[modo].cambiar(kpa, anterior, nueva, indice)
+        self.actualizar_marcador(modo, kpa)
+        if modo == "lote":
+            self.actualizar_veredicto_rapido()
+
+    def actualizar_marcador(self, modo, kpa):
+        """
+        Muestro el porcentaje y el estado actuales de la KPA y, en la evaluación de todas las KPAs,
+        los contadores del resumen general y el veredicto de Nivel 2 provisional.
+        """
+        marcador = self.marcadores[modo]
+        texto = f"Ahora: {round(marcador.porcentaje(kpa), 2)}% ({marcador.estados[kpa]})"
+        if modo == "lote":
+            c = marcador.contadores
+            veredicto = "cumple" if marcador.cumple_nivel2 else "no cumple"
+            texto += (f"   |   Implementadas: {c['implementadas']}, parciales: {c['parciales']}, "
+                      f"deficientes: {c['deficientes']}   |   Nivel 2: {veredicto}")
+        self.etiquetas_marcador[(modo, kpa)].config(text=texto)
 
     # --- Evaluar una sola KPA ---
     
     def formulario_kpa(self, kpa):
         """
         Muestro el formulario con todas las preguntas de una KPA específica.
-        Para cada pregunta, creo botones de opción (radio buttons) con las opciones Sí/Parcial/No.
+        Si el usuario ya lo había abierto, conserva las respuestas que dio.
         """
-        # Limpio la ventana
-        self.limpiar_frame()
-        
         # Guardo qué KPA estoy evaluando
         self.kpa_actual = kpa
-        
-        # Muestro el nombre de la KPA como título
-        tk.Label(self.root, text=f"KPA: {kpa}", font=("Helvetica", 16, "bold")).pack(pady=10)
-        
-        # Obtengo las preguntas de esta KPA
-        preguntas = KPAS[kpa]
+        self.mostrar_pantalla(("kpa", kpa), lambda frame: self.construir_formulario_kpa(frame, kpa))
+        self.usar_formulario("kpa", kpa)
 
-        # Lista para almacenar las variables de cada pregunta
-        self.vars = []
-        
-        # Creo un frame para contener las preguntas con scroll
-        frame_preguntas = ttk.Frame(self.root)
-        frame_preguntas.pack(fill="both", expand=True, padx=10, pady=10)
-
-        # Canvas para permitir scroll
-        canvas = tk.Canvas(frame_preguntas)
-        scrollbar = ttk.Scrollbar(frame_preguntas, orient="vertical", command=canvas.yview)
-        preguntas_frame = ttk.Frame(canvas)
-
-        # Configuro el scroll region
-        preguntas_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-
-        canvas.create_window((0, 0), window=preguntas_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set, height=420)
-
-        # Creo los elementos para cada pregunta
-        for i, p in enumerate(preguntas):
-            # Frame individual para cada pregunta
-            frame_p = ttk.Frame(preguntas_frame)
-            frame_p.pack(anchor="w", pady=6, fill="x")
-            
-            # Etiqueta con el texto de la pregunta
-            lbl = tk.Label(frame_p, text=f"{i+1}. {p}", wraplength=760, justify="left")
-            lbl.pack(anchor="w")
-            
-            # Variable para almacenar la respuesta de esta pregunta
-            var = tk.StringVar()
-            self.vars.append(var)
-            
-            # Defino las tres opciones de respuesta
-            opciones = [("Sí", "1"), ("Parcial", "2"), ("No", "3")]
-            
-            # Frame para los radio buttons
-            opt_frame = ttk.Frame(frame_p)
-            opt_frame.pack(anchor="w", pady=2)
-            
-            # Creo un radio button para cada opción
-            for txt, val in opciones:
-                ttk.Radiobutton(opt_frame, text=txt, variable=var, value=val).pack(side="left", padx=5)
-
-        # Posiciono el canvas y scrollbar
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+    def construir_formulario_kpa(self, frame, kpa):
+        """
+        Construyo el formulario de una KPA: título, preguntas y botones de acción.
+        """
+        # Muestro el nombre de la KPA como título
+        tk.Label(frame, text=f"KPA: {kpa}", font=("Helvetica", 16, "bold")).pack(pady=10)
 
-        # Frame para los botones de acción
-        btn_frame = ttk.Frame(self.root)
-        btn_frame.pack(pady=10)
+        # Frame para los botones de acción (abajo, para que la lista de preguntas no lo tape)
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(side="bottom", pady=10)
         
         # Botón para evaluar (procesar las respuestas)
         ttk.Button(btn_frame, text="Evaluar", command=self.mostrar_resultado_kpa).pack(side="left", padx=5)
@@ -340,13 +526,16 @@ class CMMIApp:
         # Botón para volver al menú de KPAs
         ttk.Button(btn_frame, text="Volver", command=self.menu_kpa).pack(side="left")
 
+        # Creo la lista de preguntas
+        self.construir_preguntas(frame, "kpa", kpa)
+
     def mostrar_resultado_kpa(self):
         """
         Proceso las respuestas del formulario, evalúo la KPA y muestro los resultados.
         Primero valido que todas las preguntas estén respondidas.
         """
         # Recopilo todas las respuestas seleccionadas por el usuario
-        respuestas_usuario = [v.get() for v in self.vars]
+        respuestas_usuario = list(self.lista.respuestas)
         
         # Verifico que no haya preguntas sin responder (valores vacíos)
         if "" in respuestas_usuario:
@@ -355,64 +544,139 @@ class CMMIApp:
             return
         
         # Evalúo la KPA con las respuestas del usuario
-        resultado = evaluar_kpa(self.kpa_actual, respuestas_usuario)
+        resultado = evaluar_kpa(self.kpa_actual, respuestas_usuario, self.cuestionario)
+        
+        # Guardo esta KPA en el historial (sin veredicto de Nivel 2, porque solo evalué una)
+        self.guardar_historial([resultado], None)
         
         # Muestro el informe de resultados
         self.mostrar_informe(resultado, volver_menu=True)
 
-    def mostrar_informe(self, resultado, volver_menu=False):
+    def construir_area_texto(self, frame):
         """
-        Muestro el informe detallado de una KPA evaluada.
-        Incluyo porcentaje, estado, respuestas y recomendaciones.
+        Creo un área de texto de solo lectura con scrollbar y un indicador de progreso de carga.
+        Devuelvo un diccionario con los widgets (texto, barra de progreso y etiqueta).
         """
-        # Limpio la ventana
-        self.limpiar_frame()
-        
-        # Título con el nombre de la KPA
-        tk.Label(self.root, text=f"Informe de {resultado['kpa']}",
-                 font=("Helvetica", 16, "bold")).pack(pady=10)
-        
-        # Muestro el porcentaje de cumplimiento
-        tk.Label(self.root, text=f"Cumplimiento: {resultado['porcentaje']}%").pack()
-        
-        # Muestro el estado (Implementada, Parcial, Deficiente)
-        tk.Label(self.root, text=f"Estado: {resultado['estado']}").pack(pady=5)
+        # Indicador de progreso mientras se inserta un informe largo
+        frame_progreso = ttk.Frame(frame)
+        frame_progreso.pack(side="bottom", fill="x", padx=20)
+        etiqueta = tk.Label(frame_progreso, text="")
+        etiqueta.pack(side="left")
+        barra = ttk.Progressbar(frame_progreso, mode="determinate")
+        barra.pack(side="left", fill="x", expand=True, padx=5)
 
         # Creo un frame con un área de texto scrollable para mostrar detalles
-        frame_texto = ttk.Frame(self.root)
+        frame_texto = ttk.Frame(frame)
         frame_texto.pack(fill="both", expand=True, padx=20, pady=10)
         
-        # Widget de texto para mostrar la información detallada
-        text = tk.Text(frame_texto, wrap="word")
+        # Widget de texto para mostrar la información detallada (de solo lectura)
+        text = tk.Text(frame_texto, wrap="word", state="disabled")
         text.pack(fill="both", expand=True, side="left")
         
         # Scrollbar para el área de texto
         scroll = ttk.Scrollbar(frame_texto, command=text.yview, orient="vertical")
         scroll.pack(side="right", fill="y")
         text.configure(yscrollcommand=scroll.set)
+        return {"texto": text, "barra": barra, "etiqueta": etiqueta, "tarea": None, "lineas": []}
 
-        # Inserto el contenido en el área de texto
-        text.insert("end", "Respuestas:\n\n")
+    def insertar_por_lotes(self, area, lineas):
+        """
+        Sustituyo el contenido del área de texto por las líneas dadas, insertándolas en lotes
+        de LINEAS_POR_LOTE programados con root.after. Entre lote y lote la ventana sigue
+        respondiendo (scroll, cerrar...) y la barra muestra el avance.
+        """
+        text, barra, etiqueta = area["texto"], area["barra"], area["etiqueta"]
+        area["lineas"] = lineas  # Las guardo para poder exportar el informe
         
-        # Muestro cada pregunta con su respuesta
-        for r in resultado["respuestas"]:
-            text.insert("end", f" - {r['pregunta']}\n     → {r['texto']}\n")
+        # Si todavía se estaba cargando otro informe en esta área, lo cancelo
+        if area["tarea"] is not None:
+            self.root.after_cancel(area["tarea"])
+            area["tarea"] = None
+
+        text.configure(state="normal")
+        text.delete("1.0", "end")
+        text.configure(state="disabled")
+        total = len(lineas)
+        barra.configure(maximum=max(total, 1), value=0)
+
+        def insertar_lote(inicio):
+            fin = min(inicio + LINEAS_POR_LOTE, total)
+            # Habilito el texto solo mientras inserto: para el usuario sigue siendo de solo lectura
+            text.configure(state="normal")
+            text.insert("end", "".join(lineas[inicio:fin]))
+            text.configure(state="disabled")
+            barra.configure(value=fin)
+            if fin < total:
+                etiqueta.config(text=f"Cargando informe... {fin * 100 // total}%")
+                area["tarea"] = self.root.after(1, insertar_lote, fin)
+            else:
+                etiqueta.config(text="Informe completo")
+                area["tarea"] = None
+
+        # El primer lote lo inserto ya, para que el usuario vea el principio del informe al instante
+        insertar_lote(0)
+
+    def anadir_lineas(self, area, lineas, al_principio=False):
+        """
+        Añado líneas a un área de texto cuyo informe llega por partes (al final, o al principio).
+        """
+        text = area["texto"]
+        text.configure(state="normal")
+        if al_principio:
+            area["lineas"][:0] = lineas
+            text.insert("1.0", "".join(lineas))
+        else:
+            area["lineas"].extend(lineas)
+            text.insert("end", "".join(lineas))
+        text.configure(state="disabled")
+
+    def construir_informe(self, frame):
+        """
+        Construyo la pantalla de informe de una KPA. Los textos los relleno mostrar_informe.
+        """
+        w = self.widgets_informe
         
-        text.insert("end", "\nRecomendaciones:\n\n")
+        # Título con el nombre de la KPA
+        w["titulo"] = tk.Label(frame, font=("Helvetica", 16, "bold"))
+        w["titulo"].pack(pady=10)
         
-        # Muestro todas las recomendaciones
-        for rec in resultado["recomendaciones"]:
-            text.insert("end", f" - {rec}\n")
+        # Porcentaje de cumplimiento
+        w["porcentaje"] = tk.Label(frame)
+        w["porcentaje"].pack()
+        
+        # Estado (Implementada, Parcial, Deficiente)
+        w["estado"] = tk.Label(frame)
+        w["estado"].pack(pady=5)
 
-        # Frame para el botón de volver
-        btn_frame = ttk.Frame(self.root)
-        btn_frame.pack(pady=10)
+        # Frame para el botón de volver (abajo, para que el área de texto no lo tape)
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(side="bottom", pady=10)
         
         # Botón para regresar al menú principal
-        if volver_menu:
-            ttk.Button(btn_frame, text="Volver al menú", command=self.frame_inicio).pack()
-        else:
-            ttk.Button(btn_frame, text="Volver al menú", command=self.frame_inicio).pack()
+        ttk.Button(btn_frame, text="Volver al menú", command=self.frame_inicio).pack(side="left", padx=5)
+        
+        # Botón para exportar el informe a un archivo de texto
+        ttk.Button(btn_frame, text="Exportar...",
+                   command=lambda: self.exportar_informe(w["area"])).pack(side="left", padx=5)
+
+        # Área de texto para respuestas y recomendaciones
+        w["area"] = self.construir_area_texto(frame)
+
+    def mostrar_informe(self, resultado, volver_menu=False):
+        """
+        Muestro el informe detallado de una KPA evaluada.
+        Incluyo porcentaje, estado, respuestas y recomendaciones.
+        """
+        self.mostrar_pantalla("informe", self.construir_informe)
+        w = self.widgets_informe
+        
+        # Actualizo los textos de la pantalla con este resultado
+        w["titulo"].config(text=f"Informe de {resultado['kpa']}")
+        w["porcentaje"].config(text=f"Cumplimiento: {resultado['porcentaje']}%")
+        w["estado"].config(text=f"Estado: {resultado['estado']}")
+
+        # Inserto el contenido en el área de texto
+        self.insertar_por_lotes(w["area"], lineas_informe_kpa(resultado))
 
     # --- Evaluar todas las KPAs (batch/lote) ---
     
@@ -422,7 +686,7 @@ class CMMIApp:
         El usuario responderá las preguntas de cada KPA una por una.
         """
         # Obtengo la lista de todas las KPAs a evaluar
-        self.batch_kpas = list(KPAS.keys())
+        self.batch_kpas = list(self.kpas.keys())
         
         # Reseteo el índice a 0 (empiezo por la primera KPA)
         self.batch_index = 0
@@ -437,9 +701,20 @@ class CMMIApp:
         
         # Pido confirmación al usuario antes de comenzar
         if messagebox.askyesno("Confirmar", "Se van a evaluar todas las KPAs de forma secuencial. ¿Continuar?"):
+            # Una evaluación nueva empieza con los formularios en blanco
+            self.vaciar_formularios_batch()
             # Si confirma, muestro el formulario de la primera KPA
             self.formulario_kpa_batch(self.batch_index)
 
+    def vaciar_formularios_batch(self):
+        """
+        Borro las respuestas guardadas en los formularios de la evaluación por lotes.
+        """
+        for (modo, _), lista in self.listas.items():
+            if modo == "lote":
+                lista.vaciar()
+        self.marcadores["lote"].vaciar()
+
     def formulario_kpa_batch(self, index):
         """
         Muestro el formulario de una KPA dentro del proceso de evaluación por lotes.
@@ -447,62 +722,39 @@ class CMMIApp:
         """
         # Si ya evalué todas las KPAs, muestro el resumen final
         if index >= len(self.batch_kpas):
+            # Guardo la evaluación completa en el historial antes de mostrar el informe
+            _, cumple_nivel2 = generar_resumen_general(self.batch_results, self.kpas)
+            self.guardar_historial(self.batch_results, cumple_nivel2)
             self.mostrar_resumen_general(self.batch_results)
             return
 
-        # Limpio la ventana
-        self.limpiar_frame()
-        
         # Obtengo la KPA actual
         kpa = self.batch_kpas[index]
         self.kpa_actual = kpa
+        self.mostrar_pantalla(("lote", kpa),
+                              lambda frame: self.construir_formulario_batch(frame, index, kpa))
+        self.usar_formulario("lote", kpa)
         
+        # Sincronizo el modo rápido por si la casilla cambió desde la última vez
+        self.actualizar_veredicto_rapido()
+
+    def construir_formulario_batch(self, frame, index, kpa):
+        """
+        Construyo el formulario de una KPA de la evaluación por lotes.
+        """
         # Título con indicador de progreso (ej: "KPA [2/5]: Planificación de proyectos")
-        tk.Label(self.root, text=f"KPA [{index+1}/{len(self.batch_kpas)}]: {kpa}", 
+        tk.Label(frame, text=f"KPA [{index+1}/{len(self.batch_kpas)}]: {kpa}", 
                  font=("Helvetica", 16, "bold")).pack(pady=10)
-        
-        # Obtengo las preguntas de esta KPA
-        preguntas = KPAS[kpa]
 
-        # Lista para almacenar las variables de respuesta
-        self.vars = []
+        # Frame para los botones (abajo, para que la lista de preguntas no lo tape)
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(side="bottom", pady=10)
         
-        # Creo el frame con scroll para las preguntas
-        frame_preg = ttk.Frame(self.root)
-        frame_preg.pack(fill="both", expand=True, padx=10, pady=10)
-
-        canvas = tk.Canvas(frame_preg)
-        scrollbar = ttk.Scrollbar(frame_preg, orient="vertical", command=canvas.yview)
-        preguntas_frame = ttk.Frame(canvas)
-
-        preguntas_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-
-        canvas.create_window((0, 0), window=preguntas_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set, height=420)
-
-        # Creo los elementos para cada pregunta (igual que en formulario_kpa)
-        for i, p in enumerate(preguntas):
-            frame_p = ttk.Frame(preguntas_frame)
-            frame_p.pack(anchor="w", pady=6, fill="x")
-            lbl = tk.Label(frame_p, text=f"{i+1}. {p}", wraplength=760, justify="left")
-            lbl.pack(anchor="w")
-            var = tk.StringVar()
-            self.vars.append(var)
-            opciones = [("Sí", "1"), ("Parcial", "2"), ("No", "3")]
-            opt_frame = ttk.Frame(frame_p)
-            opt_frame.pack(anchor="w", pady=2)
-            for txt, val in opciones:
-                ttk.Radiobutton(opt_frame, text=txt, variable=var, value=val).pack(side="left", padx=5)
-
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
-
-        # Frame para los botones
-        btn_frame = ttk.Frame(self.root)
-        btn_frame.pack(pady=10)
+        # Botón para volver a la KPA anterior (sus respuestas siguen en su formulario)
+        anterior = ttk.Button(btn_frame, text="Anterior", command=self.anterior_batch)
+        anterior.pack(side="left", padx=5)
+        if index == 0:
+            anterior.state(["disabled"])
         
         # Botón para guardar las respuestas y continuar con la siguiente KPA
         ttk.Button(btn_frame, text="Guardar y Siguiente", 
@@ -512,21 +764,54 @@ class CMMIApp:
         ttk.Button(btn_frame, text="Cancelar (volver al menú)", 
                    command=self.cancelar_batch).pack(side="left", padx=5)
 
+        # En modo rápido muestro cuándo el estado de la KPA ya está decidido
+        lbl_rapido = self.etiquetas_rapido[("lote", kpa)] = tk.Label(frame, text="", fg="dark green")
+        lbl_rapido.pack(side="bottom")
+
+        # Creo la lista de preguntas (igual que en formulario_kpa); en modo rápido
+        # recalculo las cotas cada vez que cambia una respuesta
+        self.construir_preguntas(frame, "lote", kpa)
+
+    def estado_ya_decidido(self):
+        """
+        Compruebo si con las respuestas dadas hasta ahora el estado de la KPA actual ya está decidido.
+        """
+        respuestas = self.lista.respuestas
+        valores = [self.valores[o] if o else None for o in respuestas]
+        extremos = (min(self.valores.values()), max(self.valores.values()))
+        pesos = None if self.cuestionario is None else self.cuestionario.pesos_kpa.get(self.kpa_actual)
+        return any(respuestas) and estado_decidido(valores, extremos=extremos, pesos=pesos)
+
+    def actualizar_veredicto_rapido(self):
+        """
+        En modo rápido desactivo las preguntas sin responder cuando ya no pueden cambiar
+        el estado de la KPA, y las vuelvo a activar si una respuesta cambia y deja de estar decidido.
+        """
+        decidido = self.modo_rapido.get() and self.estado_ya_decidido()
+        pendientes = self.lista.respuestas.count("")
+        self.lista.bloquear(decidido)
+        if self.lbl_rapido is not None:
+            if decidido and pendientes:
+                self.lbl_rapido.config(text=f"Estado decidido: se pueden omitir {pendientes} pregunta(s).")
+            else:
+                self.lbl_rapido.config(text="")
+
     def guardar_siguiente_batch(self):
         """
         Guardo las respuestas de la KPA actual y avanzo a la siguiente.
-        Valido que todas las preguntas estén respondidas antes de continuar.
+        Valido que todas las preguntas estén respondidas antes de continuar
+        (en modo rápido basta con que el estado de la KPA ya esté decidido).
         """
         # Recopilo las respuestas del formulario actual
-        respuestas_usuario = [v.get() for v in self.vars]
+        respuestas_usuario = list(self.lista.respuestas)
         
         # Verifico que todas las preguntas estén respondidas
-        if "" in respuestas_usuario:
+        if "" in respuestas_usuario and not (self.modo_rapido.get() and self.estado_ya_decidido()):
             messagebox.showerror("Error", "Responde todas las preguntas antes de continuar.")
             return
         
         # Evalúo esta KPA con las respuestas del usuario
-        resultado = evaluar_kpa(self.kpa_actual, respuestas_usuario)
+        resultado = evaluar_kpa(self.kpa_actual, respuestas_usuario, self.cuestionario)
         
         # Añado el resultado a mi lista acumulada
         self.batch_results.append(resultado)
@@ -537,6 +822,17 @@ class CMMIApp:
         # Continúo con la siguiente KPA (o muestro el resumen si terminé)
         self.formulario_kpa_batch(self.batch_index)
 
+    def anterior_batch(self):
+        """
+        Vuelvo a la KPA anterior del proceso por lotes para corregir sus respuestas.
+        Descarto su resultado: se vuelve a evaluar al pulsar "Guardar y Siguiente".
+        """
+        if self.batch_index == 0:
+            return
+        self.batch_index -= 1
+        del self.batch_results[self.batch_index:]
+        self.formulario_kpa_batch(self.batch_index)
+
     def cancelar_batch(self):
         """
         Cancelo el proceso de evaluación por lotes y vuelvo al menú principal.
@@ -548,91 +844,259 @@ class CMMIApp:
             self.batch_kpas = []
             self.batch_index = 0
             self.batch_results = []
+            self.vaciar_formularios_batch()
             
             # Vuelvo al menú principal
             self.frame_inicio()
 
-    def mostrar_resumen_general(self, resultados):
+    def construir_resumen(self, frame):
         """
-        Muestro el informe completo con los resultados de todas las KPAs evaluadas.
-        Incluyo detalles de cada KPA, resumen general y conclusión sobre el Nivel 2.
+        Construyo la pantalla del informe general. El contenido lo rellena mostrar_resumen_general.
         """
-        # Limpio la ventana
-        self.limpiar_frame()
-        
         # Título del informe general
-        tk.Label(self.root, text="INFORME RESUMIDO (todas las KPAs)", 
+        tk.Label(frame, text="INFORME RESUMIDO (todas las KPAs)", 
                  font=("Helvetica", 16, "bold")).pack(pady=10)
 
-        # Genero el resumen consolidado y verifico si cumple Nivel 2
-        resumen, cumple_nivel2 = generar_resumen_general(resultados)
-
-        # Creo un frame con área de texto scrollable para el informe completo
-        frame_texto = ttk.Frame(self.root)
-        frame_texto.pack(fill="both", expand=True, padx=20, pady=10)
-        
-        # Widget de texto para mostrar todo el contenido
-        text = tk.Text(frame_texto, wrap="word")
-        text.pack(fill="both", expand=True)
-        
-        # Scrollbar para navegar por el informe
-        scroll = ttk.Scrollbar(frame_texto, command=text.yview, orient="vertical")
-        scroll.pack(side="right", fill="y")
-        text.configure(yscrollcommand=scroll.set)
-
-        # Inserto la información de cada KPA evaluada
-        for r in resultados:
-            # Nombre de la KPA
-            text.insert("end", f"KPA: {r['kpa']}\n")
-            
-            # Porcentaje de cumplimiento
-            text.insert("end", f" - Cumplimiento: {r['porcentaje']}%\n")
-            
-            # Estado (Implementada, Parcial, Deficiente)
-            text.insert("end", f" - Estado: {r['estado']}\n")
-            
-            # Lista de respuestas dadas
-            text.insert("end", " - Respuestas:\n")
-            for resp in r['respuestas']:
-                text.insert("end", f"    * {resp['pregunta']} → {resp['texto']}\n")
-            
-            # Recomendaciones para esta KPA
-            text.insert("end", " - Recomendaciones:\n")
-            for rec in r['recomendaciones']:
-                text.insert("end", f"    - {rec}\n")
-            
-            # Separador visual entre KPAs
-            text.insert("end", "\n" + "-"*80 + "\n\n")
-
-        # Añado el resumen general al final
-        text.insert("end", "\nResumen general:\n")
-        text.insert("end", f"  KPAs implementadas: {resumen['implementadas']}\n")
-        text.insert("end", f"  KPAs parcialmente implementadas: {resumen['parciales']}\n")
-        text.insert("end", f"  KPAs deficientes: {resumen['deficientes']}\n\n")
-        
-        # Inserto la conclusión final sobre el cumplimiento del Nivel 2
-        text.insert("end", conclusion_final(cumple_nivel2) + "\n")
-
-        # Frame para los botones de acción
-        btn_frame = ttk.Frame(self.root)
-        btn_frame.pack(pady=10)
+        # Frame para los botones de acción (abajo, para que el área de texto no lo tape)
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(side="bottom", pady=10)
         
         # Botón para volver al menú principal
         ttk.Button(btn_frame, text="Volver al menú", command=self.frame_inicio).pack(side="left", padx=5)
         
+        # Botón para exportar el informe a un archivo de texto
+        ttk.Button(btn_frame, text="Exportar...",
+                   command=lambda: self.exportar_informe(self.widgets_resumen["area"])).pack(side="left", padx=5)
+        
         # Botón para cerrar la aplicación
-        ttk.Button(btn_frame, text="Cerrar", command=self.root.quit).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Cerrar", command=self.salir).pack(side="left", padx=5)
+
+        # Área de texto para el informe completo
+        self.widgets_resumen["area"] = self.construir_area_texto(frame)
+
+    def mostrar_resumen_general(self, resultados):
+        """
+        Muestro el informe completo con los resultados de todas las KPAs evaluadas.
+        Incluyo detalles de cada KPA, resumen general y conclusión sobre el Nivel 2.
+        """
+        self.mostrar_pantalla("resumen", self.construir_resumen)
+
+        # Preparo todo el texto en una pasada y lo inserto por lotes
+        self.insertar_por_lotes(self.widgets_resumen["area"], lineas_resumen_general(resultados, self.kpas))
+
+    # --- Importación y exportación en segundo plano ---
+
+    def importar_archivo(self):
+        """
+        Pido un archivo de respuestas (CSV o JSONL) y lo importo y evalúo en segundo plano.
+        El informe de cartera se va rellenando con cada bloque de proyectos evaluados;
+        el usuario puede cancelar en cualquier momento con "Volver al menú".
+        """
+        ruta = filedialog.askopenfilename(
+            title="Archivo de respuestas",
+            filetypes=[("Respuestas", "*.csv *.jsonl"), ("Todos los archivos", "*.*")])
+        if not ruta:
+            return
+        self.cartera = []
+        self.mostrar_pantalla("cartera", self.construir_cartera)
+        w = self.widgets_cartera
+        w["titulo"].config(text="Importando y evaluando proyectos...")
+        self.insertar_por_lotes(w["area"], [])  # Vacío el informe anterior
+        w["area"]["barra"].configure(mode="indeterminate")
+        w["area"]["etiqueta"].config(text="")
+        self.trabajo_actual = self.trabajador.lanzar(
+            importar_y_evaluar, ruta, self.cuestionario,
+            al_progresar=self.progreso_importacion,
+            al_recibir=self.bloque_importado,
+            al_terminar=self.fin_importacion,
+            al_fallar=self.error_importacion,
+            al_cancelar=self.frame_inicio,
+        )
+
+    def importando(self):
+        """
+        Indico si hay una importación en marcha.
+        """
+        return self.trabajo_actual is not None and not self.trabajo_actual.terminado
+
+    def progreso_importacion(self, hechos, total, mensaje):
+        """
+        Actualizo la barra del informe de cartera (se llama en el hilo de Tkinter).
+        No sé el total hasta terminar, así que muevo la barra sin escala.
+        """
+        area = self.widgets_cartera["area"]
+        area["barra"].step()
+        area["etiqueta"].config(text=f"{mensaje}: {hechos}")
+
+    def bloque_importado(self, bloque):
+        """
+        Añado a la cartera y al informe un bloque de proyectos evaluados.
+        """
+        proyectos, lineas = bloque
+        self.cartera.extend(proyectos)
+        self.anadir_lineas(self.widgets_cartera["area"], lineas)
+        self.widgets_cartera["titulo"].config(
+            text=f"INFORME DE CARTERA ({len(self.cartera)} proyectos, importando...)")
+
+    def cancelar_trabajo(self):
+        """
+        Pido a la importación en marcha que se detenga; al confirmarlo vuelvo al menú principal.
+        """
+        if self.importando():
+            self.trabajo_actual.cancelar()
+            self.widgets_cartera["area"]["etiqueta"].config(text="Cancelando...")
+        else:
+            self.frame_inicio()
+
+    def error_importacion(self, error):
+        """
+        Muestro el error de una importación fallida y vuelvo al menú principal.
+        """
+        messagebox.showerror("Error", f"No se pudo importar el archivo:\n{error}")
+        self.frame_inicio()
+
+    def fin_importacion(self, evaluados):
+        """
+        Completo el informe de la cartera importada con sus totales, que van al principio.
+        """
+        self.trabajo_actual = None
+        w = self.widgets_cartera
+        self.anadir_lineas(w["area"], lineas_totales_cartera(self.cartera), al_principio=True)
+        w["titulo"].config(text=f"INFORME DE CARTERA ({evaluados} proyectos)")
+        w["area"]["barra"].configure(mode="determinate", maximum=1, value=1)
+        w["area"]["etiqueta"].config(text="Informe completo")
+
+    def construir_cartera(self, frame):
+        """
+        Construyo la pantalla del informe de cartera.
+        """
+        w = self.widgets_cartera
+        w["titulo"] = tk.Label(frame, font=("Helvetica", 16, "bold"))
+        w["titulo"].pack(pady=10)
+        btn_frame = ttk.Frame(frame)
+        btn_frame.pack(side="bottom", pady=10)
+        # Mientras se importa, volver al menú cancela la importación
+        ttk.Button(btn_frame, text="Volver al menú", command=self.cancelar_trabajo).pack(side="left", padx=5)
+        ttk.Button(btn_frame, text="Exportar...",
+                   command=lambda: self.exportar_informe(w["area"], self.cartera)).pack(side="left", padx=5)
+        w["area"] = self.construir_area_texto(frame)
+
+    def exportar_informe(self, area, cartera=None):
+        """
+        Exporto en segundo plano el informe mostrado en un área a un archivo de texto.
+        Si recibo la cartera importada también puedo exportarla a CSV, JSON Lines o HTML
+        (según la extensión elegida). El progreso se ve en la etiqueta del área.
+        """
+        if not area["lineas"] or (cartera is not None and self.importando()):
+            return  # Nada que exportar, o la cartera todavía se está importando
+        tipos = [("Texto", "*.txt")]
+        if cartera is not None:
+            tipos += [("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("Informe HTML", "*.html")]
+        ruta = filedialog.asksaveasfilename(
+            title="Exportar informe", defaultextension=".txt",
+            filetypes=tipos + [("Todos los archivos", "*.*")])
+        if not ruta:
+            return
+        formato = FORMATOS_EXPORTACION.get(os.path.splitext(ruta)[1].lower()) if cartera is not None else None
+        if formato is None:
+            funcion, argumentos = exportar_lineas, (ruta, area["lineas"])
+        else:
+            funcion, argumentos = exportar_cartera, (ruta, cartera, formato, self.kpas)
+        etiqueta = area["etiqueta"]
+        self.trabajador.lanzar(
+            funcion, *argumentos,
+            al_progresar=lambda hechos, total, mensaje: etiqueta.config(
+                text=f"{mensaje}... {hechos * 100 // max(total, 1)}%"),
+            al_terminar=lambda ruta: etiqueta.config(text=f"Informe exportado a {ruta}"),
+            al_fallar=lambda error: messagebox.showerror("Error", f"No se pudo exportar el informe:\n{error}"),
+        )
+
+
+# --- MEDICIÓN DE LATENCIA ---
+
+def medir_transiciones(app, vueltas=5):
+    """
+    Recorro varias veces las pantallas de navegación (inicio → menú → cada KPA → menú → inicio)
+    y devuelvo {pantalla: (ms primera visita, ms media de las visitas siguientes)}.
+    La primera visita construye la pantalla (lo que antes costaba cada transición);
+    las siguientes solo la muestran desde la caché.
+    """
+    app.medir = True
+    app.latencias = []
+    for _ in range(vueltas):
+        app.frame_inicio()
+        app.menu_kpa()
+        for kpa in app.kpas:
+            app.formulario_kpa(kpa)
+            app.menu_kpa()
+    app.medir = False
+
+    tiempos = {}
+    for clave, ms in app.latencias:
+        tiempos.setdefault(clave, []).append(ms)
+    return {
+        clave: (ms[0], sum(ms[1:]) / len(ms[1:]) if len(ms) > 1 else ms[0])
+        for clave, ms in tiempos.items()
+    }
+
+
+def medir_formulario(root, num_preguntas=1000):
+    """
+    Mido en milisegundos cuánto tarda en abrirse (construirse y dibujarse) un formulario
+    con num_preguntas preguntas sintéticas, y lo destruyo después.
+    """
+    preguntas = [f"Pregunta de prueba número {i+1}" for i in range(num_preguntas)]
+    inicio = time.perf_counter()
+    frame = ttk.Frame(root)
+    frame.pack(fill="both", expand=True)
+    ListaPreguntasVirtual(frame, preguntas)
+    root.update_idletasks()
+    ms = (time.perf_counter() - inicio) * 1000
+    frame.destroy()
+    return ms
 
 
 # --- PUNTO DE ENTRADA PRINCIPAL ---
 
 # Este bloque solo se ejecuta si ejecuto este archivo directamente
 if __name__ == "__main__":
+    import argparse  # Para leer las opciones de la línea de comandos
+    parser = argparse.ArgumentParser(description="Diagnóstico CMMI Nivel 2 (interfaz gráfica).")
+    parser.add_argument("--medir-transiciones", type=int, metavar="VUELTAS",
+                        help="Recorro las pantallas VUELTAS veces, muestro la latencia de cada transición y salgo")
+    parser.add_argument("--medir-formulario", type=int, metavar="PREGUNTAS",
+                        help="Muestro cuánto tarda en abrirse un formulario de PREGUNTAS preguntas y salgo")
+    parser.add_argument("--cuestionario", metavar="RUTA",
+                        help="Definición JSON del cuestionario (por defecto el incluido, ver cuestionario.py)")
+    perfilado.agregar_argumentos(parser)
+    args = parser.parse_args()
+    perfilado.activar_desde_argumentos(args)
+
+    cuestionario = None
+    if args.cuestionario:
+        import sys
+        from cuestionario import cargar_cuestionario
+        try:
+            cuestionario = cargar_cuestionario(args.cuestionario)
+        except (OSError, ValueError) as error:
+            print(f"Error: {error}", file=sys.stderr)
+            sys.exit(1)
+
     # Creo la ventana principal de Tkinter
     root = tk.Tk()
     
-    # Instancio mi aplicación CMMI pasándole la ventana principal
-    app = CMMIApp(root)
+    # Instancio mi aplicación CMMI pasándole la ventana principal y el cuestionario
+    app = CMMIApp(root, cuestionario)
     
-    # Inicio el loop de eventos de Tkinter (mantiene la ventana abierta y responde a acciones)
-    root.mainloop()
+    if args.medir_formulario:
+        # Modo de medición del formulario grande
+        print(f"Formulario de {args.medir_formulario} preguntas: {medir_formulario(root, args.medir_formulario):.2f} ms")
+        root.destroy()
+    elif args.medir_transiciones:
+        # Modo de medición: muestro la latencia y cierro la ventana
+        for clave, (primera, siguientes) in medir_transiciones(app, args.medir_transiciones).items():
+            print(f"{str(clave):60} primera: {primera:8.2f} ms   siguientes: {siguientes:8.2f} ms")
+        root.destroy()
+    else:
+        # Inicio el loop de eventos de Tkinter (mantiene la ventana abierta y responde a acciones)
+        root.mainloop()
@@ -0,0 +1,478 @@
+# evaluacion_cmmi.py
+# Este archivo reúne la puntuación de la herramienta sin ninguna dependencia gráfica
+# Antes estas funciones solo existían dentro de diagnostico_cmmi_tkinter.py, así que para puntuar
+# desde un cron o un hook de pre-commit había que cargar Tkinter; ahora la GUI las importa de aquí
+# Solo importo lo imprescindible al arrancar: el resto (lectura de archivos, motor NumPy, historial)
+# se carga la primera vez que se usa
+
+from KPAS import KPAS  # Cargo las 5 KPAs con sus preguntas
+from VALOR_RESPUESTA import VALOR_RESPUESTA  # Valores numéricos de las respuestas
+from RECOMENDACIONES_BASE import RECOMENDACIONES_BASE  # Recomendaciones base para cada KPA
+from porcentaje import estado_porcentaje, estado_decidido, porcentaje_ponderado, VALOR_MINIMO  # Clasificación y cotas por porcentaje
+from tabla_recomendaciones import TablaRecomendaciones, recomendaciones_omitidas  # Recomendaciones precompiladas por patrón
+from codificacion import ResultadoKPA, empaquetar, texto_estado  # Resultado compacto con respuestas empaquetadas
+from cache_resultados import CacheLRU, clave_kpa  # Resultados de las respuestas repetidas
+from cuestionario import VERSION_CUESTIONARIO  # Versión del cuestionario incluido (para la caché)
+from perfilado import etapa  # Medición por etapa (sin coste si el perfilado está desactivado)
+
+
+# --- LÓGICA (la misma de la GUI, adaptada de la versión CLI) ---
+
+@etapa()
+def generar_recomendaciones_por_respuestas(kpa, respuestas_raw, base=None):
+    """
+    Esta función genera recomendaciones personalizadas según las respuestas del usuario.
+    Es la misma lógica que en la versión CLI, pero adaptada para la GUI.
+    base son las recomendaciones genéricas de un cuestionario cargado (None = RECOMENDACIONES_BASE).
+    """
+    lista = []  # Lista donde guardaré todas las recomendaciones
+    
+    # Filtro solo las respuestas problemáticas (Parcial o No)
+    problemas = [r for r in respuestas_raw if r['opcion'] in ('2', '3')]
+    
+    if problemas:  # Si hay problemas detectados
+        # Añado las recomendaciones genéricas de esta KPA
+        lista.extend(RECOMENDACIONES_BASE.get(kpa, []) if base is None else base)
+        
+        # Genero recomendaciones específicas para cada pregunta con problemas
+        for r in problemas:
+            texto_preg = r['pregunta']
+            if r['opcion'] == '3':  # Si respondió "No"
+                lista.append(f"'{texto_preg}' → No implementado. Priorizar su corrección.")
+            elif r['opcion'] == '2':  # Si respondió "Parcial"
+                lista.append(f"'{texto_preg}' → Parcialmente implementado. Mejorar formalidad.")
+    else:
+        # Si todo está bien, felicito al usuario
+        lista.append("Todas las prácticas clave parecen estar satisfechas. Mantener procesos y evidencias.")
+    
+    # Elimino duplicados manteniendo el orden
+    visto = set()
+    salida = []
+    for contenido in lista:
+        if contenido not in visto:
+            salida.append(contenido)
+            visto.add(contenido)
+    
+    return salida
+
+
+# Tabla con las recomendaciones de todos los patrones de respuesta de cada KPA (versión GUI)
+TABLA_RECOMENDACIONES = TablaRecomendaciones(generar_recomendaciones_por_respuestas)
+
+
+# Resultados de KPA ya calculados, por KPA y respuestas empaquetadas
+CACHE_RESULTADOS = CacheLRU()
+
+
+@etapa()
+def evaluar_kpa(nombre_kpa, respuestas_usuario, cuestionario=None):
+    """
+    Evalúo una KPA completa recibiendo las respuestas del usuario desde la GUI.
+    La diferencia con la versión CLI es que aquí recibo las respuestas como parámetro
+    en lugar de pedirlas interactivamente.
+    Las respuestas vacías son preguntas omitidas en el modo de veredicto rápido:
+    cuentan con el valor mínimo, igual que en la versión CLI.
+    Con un cuestionario cargado (cuestionario.py) uso sus preguntas, sus valores y sus recomendaciones.
+    Si las mismas respuestas ya se evaluaron, devuelvo el resultado compartido de la caché.
+    """
+    version = VERSION_CUESTIONARIO if cuestionario is None else cuestionario.version_cache
+    return CACHE_RESULTADOS.obtener_o_calcular(
+        clave_kpa(nombre_kpa, respuestas_usuario, version), calcular_resultado_kpa,
+        nombre_kpa, respuestas_usuario, cuestionario)
+
+
+@etapa()
+def calcular_resultado_kpa(nombre_kpa, respuestas_usuario, cuestionario=None, preguntas=None, tabla=None):
+    """
+    Calculo de verdad el resultado de una KPA (sin pasar por la caché).
+    Es la única puntuación de una KPA: la CLI y el modo por lotes también la usan, pasando sus
+    preguntas (si no son las del cuestionario) y su tabla de recomendaciones (None = la de la GUI).
+    """
+    # Obtengo las preguntas de esta KPA y la tabla de valores (las del cuestionario cargado, si lo hay)
+    if preguntas is None:
+        preguntas = (KPAS if cuestionario is None else cuestionario.kpas)[nombre_kpa]
+    if tabla is None:
+        tabla = TABLA_RECOMENDACIONES
+    valores_opcion = VALOR_RESPUESTA if cuestionario is None else cuestionario.valores
+    minimo = VALOR_MINIMO if cuestionario is None else min(valores_opcion.values())
+    pesos = None if cuestionario is None else cuestionario.pesos_kpa.get(nombre_kpa)
+    # Obtengo el valor numérico de cada respuesta (las omitidas valen el mínimo)
+    valores = [valores_opcion[opcion] if opcion else minimo
+               for _, opcion in zip(preguntas, respuestas_usuario)]
+    omitidas = tuple(i for i, opcion in enumerate(respuestas_usuario) if not opcion)
+    provisional = bool(omitidas) and not estado_decidido(
+        [valores_opcion[opcion] if opcion else None for _, opcion in zip(preguntas, respuestas_usuario)],
+        extremos=(minimo, max(valores_opcion.values())), pesos=pesos)
+
+    # Calculo el porcentaje de cumplimiento con los pesos de las preguntas (o 0 si no hay valores)
+    porcentaje = porcentaje_ponderado(valores, pesos)
+    
+    # Clasifico el estado según el porcentaje obtenido
+    estado = estado_porcentaje(porcentaje)
+    
+    # Busco las recomendaciones personalizadas en la tabla precompilada
+    base = None if cuestionario is None else cuestionario.recomendaciones.get(nombre_kpa, [])
+    recomendaciones = tabla.buscar(nombre_kpa, preguntas, respuestas_usuario, base)
+    if omitidas:
+        recomendaciones += recomendaciones_omitidas(preguntas, respuestas_usuario)
+
+    # Devuelvo un resultado compacto que se lee como el diccionario de siempre
+    # (kpa, porcentaje, estado, respuestas, recomendaciones); la lista de respuestas
+    # se construye solo cuando el informe la pide
+    return ResultadoKPA(
+        nombre_kpa,
+        preguntas,
+        empaquetar(respuestas_usuario),
+        round(porcentaje, 2),  # Redondeo a 2 decimales
+        estado,
+        recomendaciones,
+        omitidas,
+        provisional,
+        valores_opcion,
+    )
+
+
+@etapa()
+def generar_resumen_general(resultados, kpas=KPAS):
+    """
+    Genero un resumen consolidado de todas las KPAs evaluadas.
+    Cuento cuántas están implementadas, parciales o deficientes.
+    kpas son las del cuestionario evaluado (las de KPAS o las de un cuestionario cargado).
+    """
+    resumen = {
+        "implementadas": 0,  # Contador de KPAs bien implementadas
+        "parciales": 0,  # Contador de KPAs parcialmente implementadas
+        "deficientes": 0,  # Contador de KPAs deficientes
+        "por_kpa": {}  # Diccionario con el porcentaje de cada KPA
+    }
+    
+    # Analizo cada resultado
+    for r in resultados:
+        # Guardo el porcentaje de esta KPA
+        resumen["por_kpa"][r["kpa"]] = r["porcentaje"]
+        
+        # Incremento el contador correspondiente según su estado
+        if r["estado"] == "Implementada":
+            resumen["implementadas"] += 1
+        elif r["estado"] == "Parcialmente implementada":
+            resumen["parciales"] += 1
+        else:
+            resumen["deficientes"] += 1
+    
+    # El proyecto cumple Nivel 2 solo si TODAS las KPAs están implementadas
+    cumple_nivel2 = (resumen["implementadas"] == len(kpas))
+    
+    return resumen, cumple_nivel2
+
+
+def conclusion_final(cumple_nivel2):
+    """
+    Genero la conclusión final con fecha y hora actual.
+    """
+    import datetime  # Solo lo cargo cuando hace falta una conclusión (ahorra tiempo de arranque)
+    
+    # Obtengo la fecha y hora en formato legible
+    ahora = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    if cumple_nivel2:  # Si cumple todos los requisitos
+        mensaje = f"Conclusión ({ahora}): El proyecto cumple el Nivel 2 de CMMI."
+    else:  # Si no cumple
+        mensaje = f"Conclusión ({ahora}): El proyecto NO cumple el Nivel 2 de CMMI. Recomendado trabajar las áreas deficientes y parciales."
+    
+    return mensaje
+
+
+@etapa()
+def lineas_informe_kpa(resultado):
+    """
+    Preparo en una sola pasada el texto del informe de una KPA (respuestas y recomendaciones),
+    como una lista de líneas lista para insertar en el área de texto.
+    """
+    lineas = ["Respuestas:\n\n"]
+    
+    # Cada pregunta con su respuesta
+    for r in resultado["respuestas"]:
+        lineas.append(f" - {r['pregunta']}\n     → {r['texto']}\n")
+    
+    lineas.append("\nRecomendaciones:\n\n")
+    
+    # Todas las recomendaciones
+    for rec in resultado["recomendaciones"]:
+        lineas.append(f" - {rec}\n")
+    return lineas
+
+
+@etapa()
+def lineas_resumen_general(resultados, kpas=KPAS):
+    """
+    Preparo en una sola pasada el texto del informe general de todas las KPAs evaluadas:
+    detalles de cada KPA, resumen general y conclusión sobre el Nivel 2.
+    """
+    # Genero el resumen consolidado y verifico si cumple Nivel 2
+    resumen, cumple_nivel2 = generar_resumen_general(resultados, kpas)
+    lineas = []
+
+    for r in resultados:
+        # Nombre, porcentaje de cumplimiento y estado de la KPA
+        lineas.append(f"KPA: {r['kpa']}\n")
+        lineas.append(f" - Cumplimiento: {r['porcentaje']}%\n")
+        lineas.append(f" - Estado: {texto_estado(r)}\n")
+        
+        # Lista de respuestas dadas
+        lineas.append(" - Respuestas:\n")
+        for resp in r['respuestas']:
+            lineas.append(f"    * {resp['pregunta']} → {resp['texto']}\n")
+        
+        # Preguntas omitidas en el modo de veredicto rápido
+        if r['omitidas']:
+            lineas.append(" - Preguntas omitidas (el porcentaje es el mínimo):\n")
+            for i in r['omitidas']:
+                lineas.append(f"    * {kpas[r['kpa']][i]}\n")
+        
+        # Recomendaciones para esta KPA
+        lineas.append(" - Recomendaciones:\n")
+        for rec in r['recomendaciones']:
+            lineas.append(f"    - {rec}\n")
+        
+        # Separador visual entre KPAs
+        lineas.append("\n" + "-"*80 + "\n\n")
+
+    # Resumen general y conclusión final al final
+    lineas.append("\nResumen general:\n")
+    lineas.append(f"  KPAs implementadas: {resumen['implementadas']}\n")
+    lineas.append(f"  KPAs parcialmente implementadas: {resumen['parciales']}\n")
+    lineas.append(f"  KPAs deficientes: {resumen['deficientes']}\n\n")
+    lineas.append(conclusion_final(cumple_nivel2) + "\n")
+    return lineas
+
+
+@etapa()
+def lineas_cartera(cartera):
+    """
+    Preparo el texto del informe de una cartera de proyectos importada:
+    totales y, para cada proyecto, su veredicto y el estado de cada KPA.
+    cartera es una lista de (nombre, resultados, resumen, cumple_nivel2).
+    """
+    return lineas_totales_cartera(cartera) + lineas_proyectos_cartera(cartera)
+
+
+def lineas_totales_cartera(cartera):
+    """
+    Líneas con los totales de una cartera (van al principio del informe).
+    """
+    cumplen = sum(1 for *_, cumple in cartera if cumple)
+    return [f"Proyectos evaluados: {len(cartera)}\n",
+            f"Cumplen el Nivel 2: {cumplen}\n\n"]
+
+
+def lineas_proyectos_cartera(cartera):
+    """
+    Líneas con el veredicto y el estado de cada KPA de cada proyecto de una cartera (o de un bloque).
+    """
+    lineas = []
+    for nombre, resultados, resumen, cumple in cartera:
+        veredicto = "Cumple" if cumple else "No cumple"
+        lineas.append(f"Proyecto: {nombre} → {veredicto} el Nivel 2 "
+                      f"(implementadas {resumen['implementadas']}, parciales {resumen['parciales']}, "
+                      f"deficientes {resumen['deficientes']})\n")
+        for r in resultados:
+            lineas.append(f"   - {r['kpa']}: {r['porcentaje']}% ({r['estado']})\n")
+    return lineas
+
+
+# --- TRABAJOS EN SEGUNDO PLANO ---
+# La GUI ejecuta estas funciones en el hilo del trabajador (trabajos_fondo): no tocan ningún widget
+
+# Proyectos que evalúo y entrego juntos a la GUI durante una importación
+PROYECTOS_POR_BLOQUE = 200
+
+
+@etapa()
+def importar_y_evaluar(trabajo, ruta, cuestionario=None, por_bloque=PROYECTOS_POR_BLOQUE):
+    """
+    Leo en streaming un archivo de respuestas (CSV o JSONL, como el modo por lotes) y evalúo cada
+    proyecto con evaluar_kpa (con el cuestionario cargado, si lo hay). No acumulo la cartera:
+    cada por_bloque proyectos entrego a la GUI (trabajo.entregar) el bloque
+    [(nombre, resultados, resumen, cumple_nivel2)] y sus líneas del informe.
+    Devuelvo el número de proyectos evaluados.
+    """
+    # Cargo el lector del modo por lotes solo cuando se importa un archivo
+    from evaluacion_lotes import formato_por_extension, leer_respuestas
+
+    kpas = KPAS if cuestionario is None else cuestionario.kpas
+    bloque = []
+    evaluados = 0
+    with open(ruta, encoding="utf-8", newline="") as archivo:
+        for nombre, respuestas in leer_respuestas(archivo, formato_por_extension(ruta), kpas=kpas):
+            # Los patrones de respuesta repetidos salen de la caché de evaluar_kpa
+            resultados = [evaluar_kpa(kpa, respuestas[kpa], cuestionario) for kpa in kpas]
+            resumen, cumple_nivel2 = generar_resumen_general(resultados, kpas)
+            bloque.append((nombre, resultados, resumen, cumple_nivel2))
+            evaluados += 1
+            if len(bloque) >= por_bloque:
+                trabajo.entregar((bloque, lineas_proyectos_cartera(bloque)))
+                bloque = []
+            # No conozco el total sin leer antes todo el archivo: aviso solo de los evaluados
+            trabajo.avanzar(evaluados, None, "Evaluando proyectos")
+    if bloque:
+        trabajo.entregar((bloque, lineas_proyectos_cartera(bloque)))
+    return evaluados
+
+
+def exportar_lineas(trabajo, ruta, lineas, lineas_por_bloque=5000):
+    """
+    Escribo las líneas de un informe en un archivo de texto, por bloques, avisando del progreso.
+    """
+    total = len(lineas)
+    with open(ruta, "w", encoding="utf-8") as f:
+        for inicio in range(0, total, lineas_por_bloque):
+            f.write("".join(lineas[inicio:inicio + lineas_por_bloque]))
+            trabajo.avanzar(min(inicio + lineas_por_bloque, total), total, "Exportando")
+    return ruta
+
+
+@etapa()
+def exportar_cartera(trabajo, ruta, cartera, formato, kpas=KPAS):
+    """
+    Exporto una cartera importada a CSV, JSON Lines o HTML ("csv", "jsonl" o "html"),
+    proyecto a proyecto a través del exportador, avisando del progreso.
+    """
+    # Los exportadores solo se cargan al exportar
+    from exportadores import abrir_salida, crear_exportador
+    opciones = {"con_recomendaciones": True} if formato == "html" else {}
+    total = len(cartera)
+    with abrir_salida(ruta) as salida, crear_exportador(salida, formato, kpas=kpas, **opciones) as exportador:
+        for n, (nombre, resultados, resumen, cumple_nivel2) in enumerate(cartera, 1):
+            exportador.escribir_proyecto(nombre, resultados, resumen, cumple_nivel2)
+            trabajo.avanzar(n, total, "Exportando")
+    return ruta
+
+
+# --- IMPORTACIONES PEREZOSAS ---
+
+# Funciones de otros módulos que también se pueden usar desde aquí (evaluacion_cmmi.evaluar_archivo, etc.)
+# El módulo que las define se importa la primera vez que se piden, no al importar este archivo
+PEREZOSOS = {
+    "evaluar_proyecto": "evaluacion_lotes",
+    "evaluar_archivo": "evaluacion_lotes",
+    "evaluar_archivo_paralelo": "evaluacion_lotes",
+    "leer_respuestas": "evaluacion_lotes",
+    "ejecutar_flujo": "flujo_evaluacion",
+    "HistorialEvaluaciones": "historial",
+    "guardar_en_historial": "historial",
+    "matriz_respuestas": "motor_vectorial",
+    "puntuar_matriz": "motor_vectorial",
+    "ModeloPonderado": "motor_ponderado",
+    "OptimizadorNivel2": "optimizador_nivel2",
+    "SimuladorSensibilidad": "sensibilidad",
+    "MarcadorEnVivo": "marcador",
+    "cargar_cuestionario": "cuestionario",
+    "cuestionario_por_defecto": "cuestionario",
+}
+
+
+def __getattr__(nombre):
+    # Python llama a esta función (PEP 562) solo cuando el nombre no está definido en el módulo
+    modulo = PEREZOSOS.get(nombre)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    import importlib
+    valor = getattr(importlib.import_module(modulo), nombre)
+    globals()[nombre] = valor  # La próxima vez ya no paso por aquí
+    return valor
+
+
+def __dir__():
+    return sorted(list(globals()) + list(PEREZOSOS))
+
+
+# --- PRESUPUESTO DE ARRANQUE ---
+
+# Límites que comprueba --medir-arranque (en milisegundos)
+PRESUPUESTO_IMPORTACION_MS = 10  # Importar este módulo (-X importtime, tiempo acumulado)
+PRESUPUESTO_ARRANQUE_MS = 40  # Importar y puntuar una evaluación completa, desde cero
+
+# Programa que ejecuto en un intérprete nuevo para medir el arranque en frío
+PROGRAMA_ARRANQUE = """
+import sys, time
+inicio = time.perf_counter()
+import evaluacion_cmmi
+resultados = [evaluacion_cmmi.evaluar_kpa(kpa, ["1", "2", "3", "1", "2"][:len(preguntas)])
+              for kpa, preguntas in evaluacion_cmmi.KPAS.items()]
+evaluacion_cmmi.generar_resumen_general(resultados)
+print((time.perf_counter() - inicio) * 1000)
+print(int("tkinter" in sys.modules))
+"""
+
+
+def tiempo_importacion_ms(directorio):
+    """
+    Importo este módulo en un intérprete nuevo con -X importtime y devuelvo su tiempo acumulado en ms.
+    """
+    import subprocess
+    import sys
+    salida = subprocess.run([sys.executable, "-X", "importtime", "-c", "import evaluacion_cmmi"],
+                            cwd=directorio, capture_output=True, text=True, check=True).stderr
+    # Cada línea es "import time: propio | acumulado | módulo" (en microsegundos)
+    for linea in salida.splitlines():
+        partes = linea.split("|")
+        if len(partes) == 3 and partes[2].strip() == "evaluacion_cmmi":
+            return int(partes[1]) / 1000
+    raise RuntimeError("No encontré evaluacion_cmmi en la salida de -X importtime.")
+
+
+def medir_arranque(repeticiones=5):
+    """
+    Mido en intérpretes nuevos el tiempo de importación y el de arranque hasta la primera evaluación
+    puntuada (me quedo con el mejor de varias repeticiones para no medir ruido del sistema).
+    Devuelvo (importación ms, arranque ms, si se cargó tkinter).
+    """
+    import os
+    import subprocess
+    import sys
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    importacion = min(tiempo_importacion_ms(directorio) for _ in range(repeticiones))
+    arranques = []
+    tkinter_cargado = False
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, "-c", PROGRAMA_ARRANQUE], cwd=directorio,
+                                capture_output=True, text=True, check=True).stdout.split()
+        arranques.append(float(salida[0]))
+        tkinter_cargado = tkinter_cargado or salida[1] == "1"
+    return importacion, min(arranques), tkinter_cargado
+
+
+def main(argv=None):
+    """
+    Con --medir-arranque compruebo el presupuesto de arranque y devuelvo 1 si se supera
+    (pensado para ejecutarlo en un hook de pre-commit o en la integración continua).
+    """
+    import argparse
+    parser = argparse.ArgumentParser(description="Puntuación CMMI Nivel 2 sin interfaz gráfica.")
+    parser.add_argument("--medir-arranque", action="store_true",
+                        help="Mido el tiempo de importación y de arranque y compruebo el presupuesto")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Intérpretes nuevos que lanzo por medida")
+    args = parser.parse_args(argv)
+    if not args.medir_arranque:
+        parser.print_help()
+        return 0
+
+    importacion, arranque, tkinter_cargado = medir_arranque(args.repeticiones)
+    print(f"Importación de evaluacion_cmmi: {importacion:.2f} ms (presupuesto {PRESUPUESTO_IMPORTACION_MS} ms)")
+    print(f"Arranque hasta la primera evaluación: {arranque:.2f} ms (presupuesto {PRESUPUESTO_ARRANQUE_MS} ms)")
+    errores = []
+    if importacion > PRESUPUESTO_IMPORTACION_MS:
+        errores.append("la importación supera su presupuesto")
+    if arranque > PRESUPUESTO_ARRANQUE_MS:
+        errores.append("el arranque supera su presupuesto")
+    if tkinter_cargado:
+        errores.append("se ha cargado tkinter")
+    for error in errores:
+        print(f"Error: {error}")
+    return 1 if errores else 0
+
+
+# Este bloque solo se ejecuta si ejecuto este archivo directamente (no si lo importo)
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
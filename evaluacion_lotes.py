@@ -0,0 +1,443 @@
+# evaluacion_lotes.py
+# Este archivo implementa el modo por lotes (sin preguntas por pantalla) de mi herramienta CMMI
+# Leo muchos conjuntos de respuestas desde CSV o JSONL, un proyecto por fila,
+# los puntúo con la misma lógica que la versión CLI y escribo un resultado por proyecto
+
+import argparse  # Para leer los argumentos de la línea de comandos
+import collections  # Para la ventana de bloques pendientes en el modo paralelo
+import csv  # Para leer las respuestas en formato CSV
+import itertools  # Para cortar la entrada en bloques de líneas
+import functools  # Para cargar una sola vez el cuestionario y para json.dumps sin ASCII
+import json  # Para leer y escribir JSON Lines
+import os  # Para saber cuántos núcleos hay
+import sys  # Para devolver un código de salida y escribir errores
+from KPAS import KPAS  # Cargo las 5 KPAs con sus preguntas
+from VALOR_RESPUESTA import VALOR_RESPUESTA  # Para validar las opciones leídas
+from diagnostico_cmmi_nivel2 import (  # Reutilizo exactamente la lógica de la versión CLI
+    construir_resultado_kpa,
+    diagnostico_general,
+    recomendaciones_para_alcanzar_nivel2,
+)
+from cache_resultados import CacheLRU, clave_proyecto  # Resultados de los vectores de respuestas repetidos
+from cuestionario import VERSION_CUESTIONARIO  # Clave de caché del cuestionario incluido
+import perfilado  # Medición por etapa (sin coste si el perfilado está desactivado)
+
+
+# Separador entre el nombre de la KPA y el número de pregunta en las columnas CSV
+# Por ejemplo: "Gestión de requisitos|1" es la primera pregunta de Gestión de requisitos
+SEPARADOR_COLUMNA = "|"
+
+
+def clave_columna(kpa, numero):
+    """
+    Devuelvo el nombre de columna CSV de una pregunta (numero empieza en 1).
+    """
+    return f"{kpa}{SEPARADOR_COLUMNA}{numero}"
+
+
+def columnas_csv(kpas=KPAS):
+    """
+    Devuelvo la cabecera completa que espero en un CSV de respuestas:
+    primero la columna del proyecto y luego una columna por pregunta de cada KPA.
+    """
+    columnas = ["proyecto"]
+    for kpa, preguntas in kpas.items():
+        for i in range(len(preguntas)):
+            columnas.append(clave_columna(kpa, i + 1))
+    return columnas
+
+
+@perfilado.etapa()
+def texto_proyecto(nombre, linea=None):
+    """
+    Cómo nombro un proyecto en los mensajes de error (con su línea del archivo, si la sé).
+    """
+    return f"Proyecto '{nombre}'" + (f" (línea {linea})" if linea is not None else "")
+
+
+def validar_respuestas(nombre, respuestas, kpas=KPAS, linea=None):
+    """
+    Compruebo que un proyecto tenga una opción válida para cada pregunta de cada KPA de kpas.
+    Si falta algo o hay una opción desconocida, lanzo ValueError indicando dónde.
+    """
+    for kpa, preguntas in kpas.items():
+        opciones = respuestas.get(kpa)
+        # Cada KPA debe tener exactamente una opción por pregunta
+        if opciones is None or len(opciones) != len(preguntas):
+            raise ValueError(f"{texto_proyecto(nombre, linea)}: se esperaban {len(preguntas)} respuestas para '{kpa}'.")
+        for i, opcion in enumerate(opciones):
+            if opcion not in VALOR_RESPUESTA:
+                raise ValueError(f"{texto_proyecto(nombre, linea)}: opción no válida '{opcion}' "
+                                 f"en '{clave_columna(kpa, i + 1)}'.")
+    return respuestas
+
+
+def leer_csv(archivo, cabecera=None, kpas=KPAS, primera_linea=1):
+    """
+    Leo un CSV de respuestas y voy devolviendo (nombre_proyecto, respuestas) fila a fila.
+    respuestas es un diccionario {kpa: [opción de cada pregunta]}.
+    Si recibo la cabecera, las líneas no la incluyen (es el caso de los bloques en paralelo).
+    primera_linea es el número en el archivo de la primera línea recibida (para los mensajes de error).
+    """
+    # Calculo una sola vez los nombres de columna de cada KPA
+    columnas_por_kpa = {kpa: [clave_columna(kpa, i + 1) for i in range(len(preguntas))] for kpa, preguntas in kpas.items()}
+    lector = csv.DictReader(archivo, fieldnames=cabecera)
+    for fila in lector:
+        nombre = (fila.get("proyecto") or "").strip() or "Proyecto_sin_nombre"
+        respuestas = {}
+        for kpa, columnas in columnas_por_kpa.items():
+            # Recojo las opciones de las columnas de esta KPA en orden
+            respuestas[kpa] = [(fila.get(c) or "").strip() for c in columnas]
+        yield nombre, validar_respuestas(nombre, respuestas, kpas, primera_linea - 1 + lector.line_num)
+
+
+@perfilado.etapa()
+def proyecto_desde_json(datos, kpas=KPAS, linea=None):
+    """
+    Convierto un proyecto ya decodificado de JSON, con la forma
+    {"proyecto": "...", "respuestas": {"Gestión de requisitos": ["1", "2", ...], ...}},
+    en (nombre_proyecto, respuestas) validadas.
+    Las respuestas de cada KPA deben ser una lista de textos: una cadena como "11111" no son cinco respuestas.
+    linea es la línea del archivo de la que viene el proyecto, para los mensajes de error.
+    """
+    if not isinstance(datos, dict) or not isinstance(datos.get("respuestas", {}), dict):
+        donde = f" (línea {linea})" if linea is not None else ""
+        raise ValueError(f"Cada proyecto debe ser un objeto JSON con 'proyecto' y 'respuestas'{donde}.")
+    nombre = str(datos.get("proyecto") or "").strip() or "Proyecto_sin_nombre"
+    respuestas = dict(datos.get("respuestas", {}))
+    for kpa, opciones in respuestas.items():
+        if not isinstance(opciones, list) or not all(isinstance(o, str) for o in opciones):
+            raise ValueError(f"{texto_proyecto(nombre, linea)}: las respuestas de '{kpa}' deben ser "
+                             f"una lista de textos ('1', '2' o '3').")
+    return nombre, validar_respuestas(nombre, respuestas, kpas, linea)
+
+
+def leer_jsonl(archivo, kpas=KPAS, primera_linea=1):
+    """
+    Leo un archivo JSON Lines con un proyecto por línea (la forma de proyecto_desde_json).
+    primera_linea es el número en el archivo de la primera línea recibida (para los mensajes de error).
+    """
+    for numero, linea in enumerate(archivo, primera_linea):
+        linea = linea.strip()
+        if not linea:  # Ignoro las líneas vacías
+            continue
+        try:
+            datos = json.loads(linea)
+        except ValueError as error:
+            raise ValueError(f"Línea {numero}: JSON no válido ({error}).") from None
+        yield proyecto_desde_json(datos, kpas, numero)
+
+
+def leer_respuestas(archivo, formato, cabecera=None, kpas=KPAS, primera_linea=1):
+    """
+    Elijo el lector según el formato ('csv' o 'jsonl').
+    kpas son las del cuestionario con el que se evaluará (por defecto las de KPAS).
+    """
+    if formato == "csv":
+        return leer_csv(archivo, cabecera, kpas, primera_linea)
+    return leer_jsonl(archivo, kpas, primera_linea)
+
+
+def formato_por_extension(ruta):
+    """
+    Deduzco el formato de entrada a partir de la extensión del archivo.
+    """
+    return "csv" if ruta.lower().endswith(".csv") else "jsonl"
+
+
+def kpas_de(cuestionario):
+    """
+    Devuelvo las KPAs con sus preguntas del cuestionario cargado, o las de KPAS si no hay ninguno.
+    """
+    return KPAS if cuestionario is None else cuestionario.kpas
+
+
+@functools.cache
+def cuestionario_de(ruta):
+    """
+    Cargo una sola vez por proceso el cuestionario de ruta (None = el incluido).
+    Lo usan los procesos trabajadores del modo paralelo, que reciben la ruta y no el objeto.
+    """
+    if ruta is None:
+        return None
+    from cuestionario import cargar_cuestionario
+    return cargar_cuestionario(ruta)
+
+
+def resultado_kpa_por_patron(kpa, opciones, cuestionario=None):
+    """
+    Calculo el resultado de una KPA para una tupla de opciones.
+    Con 5 preguntas y 3 opciones solo hay 243 patrones posibles por KPA, así que en una
+    cartera grande casi todos los proyectos repiten patrones ya calculados: los guarda
+    la caché de construir_resultado_kpa (diagnostico_cmmi_nivel2.CACHE_RESULTADOS).
+    El diccionario devuelto se comparte entre proyectos: no debe modificarse.
+    """
+    return construir_resultado_kpa(kpa, kpas_de(cuestionario)[kpa], opciones, cuestionario)
+
+
+@perfilado.etapa()
+def cuerpo_proyecto(respuestas, cuestionario=None):
+    """
+    Puntúo todas las KPAs de un proyecto y devuelvo su registro sin el nombre.
+    Uso las mismas funciones que la versión CLI: construir_resultado_kpa, diagnostico_general
+    y recomendaciones_para_alcanzar_nivel2.
+    """
+    kpas = kpas_de(cuestionario)
+    # Evalúo cada KPA con las opciones leídas del archivo
+    resultados = [resultado_kpa_por_patron(kpa, tuple(respuestas[kpa]), cuestionario) for kpa in kpas]
+
+    # Calculo el diagnóstico general y el veredicto de Nivel 2
+    resumen, cumple_nivel2 = diagnostico_general(resultados, kpas)
+
+    # Devuelvo solo lo necesario para el informe (sin repetir las respuestas de entrada)
+    return {
+        "kpas": [
+            {
+                "kpa": r["kpa"],
+                "porcentaje": r["porcentaje"],
+                "estado": r["estado"],
+                "recomendaciones": r["recomendaciones"],
+            }
+            for r in resultados
+        ],
+        "resumen": resumen,
+        "cumple_nivel2": cumple_nivel2,
+        "recomendaciones_nivel2": recomendaciones_para_alcanzar_nivel2(resultados),
+    }
+
+
+# Registros (sin nombre) y líneas JSON (sin nombre) de los vectores de respuestas ya puntuados
+CACHE_REGISTROS = CacheLRU()
+CACHE_JSON = CacheLRU()
+# Fragmentos JSON ya codificados de cada patrón de respuestas de una KPA
+CACHE_FRAGMENTOS = CacheLRU()
+
+
+def clave_cuestionario(respuestas, cuestionario):
+    """
+    Clave de caché de un vector de respuestas, separada por cuestionario.
+    """
+    if cuestionario is None:
+        return clave_proyecto(respuestas)
+    return clave_proyecto(respuestas, cuestionario.version_cache, cuestionario.kpas)
+
+
+@perfilado.etapa()
+def evaluar_proyecto(nombre, respuestas, cuestionario=None):
+    """
+    Puntúo todas las KPAs de un proyecto sin hacer preguntas y devuelvo su registro de resultado.
+    Con un cuestionario cargado (cuestionario.py) uso sus preguntas, valores y recomendaciones.
+    Si el mismo vector de respuestas ya se puntuó, reutilizo su registro de la caché:
+    las listas y diccionarios internos se comparten entre proyectos y no deben modificarse.
+    """
+    cuerpo = CACHE_REGISTROS.obtener_o_calcular(
+        clave_cuestionario(respuestas, cuestionario), cuerpo_proyecto, respuestas, cuestionario)
+    return {"proyecto": nombre, **cuerpo}
+
+
+def fragmentos_json_por_patron(kpa, opciones, cuestionario=None):
+    """
+    Codifico una sola vez en JSON las partes del registro que dependen solo del patrón de una KPA:
+    su entrada en "kpas" y, si no está implementada, su entrada en "recomendaciones_nivel2".
+    Así escribir un proyecto consiste casi solo en unir textos ya codificados.
+    """
+    # La tupla de opciones ya sirve de clave: no hace falta empaquetarla
+    version = VERSION_CUESTIONARIO if cuestionario is None else cuestionario.version_cache
+    return CACHE_FRAGMENTOS.obtener_o_calcular(
+        (version, kpa, opciones), codificar_fragmentos, kpa, opciones, cuestionario)
+
+
+def codificar_fragmentos(kpa, opciones, cuestionario=None):
+    """
+    Codifico los fragmentos JSON de un patrón de KPA (sin pasar por la caché).
+    """
+    r = resultado_kpa_por_patron(kpa, opciones, cuestionario)
+    dumps = functools.partial(json.dumps, ensure_ascii=False)
+    entrada_kpa = dumps({
+        "kpa": r["kpa"],
+        "porcentaje": r["porcentaje"],
+        "estado": r["estado"],
+        "recomendaciones": r["recomendaciones"],
+    })
+    entrada_nivel2 = None
+    if r["estado"] != "Implementada":
+        entrada_nivel2 = dumps({"kpa": r["kpa"], "estado": r["estado"], "recomendaciones": r["recomendaciones"]})
+    return r, entrada_kpa, entrada_nivel2
+
+
+def nivel2_json(patrones, resultados):
+    """
+    Codifico la parte "recomendaciones_nivel2" de un proyecto.
+    Las KPAs pendientes ya tienen su fragmento; si no hay ninguna uso el mensaje de la CLI.
+    """
+    pendientes = [p[2] for p in patrones if p[2] is not None]
+    if pendientes:
+        return "[" + ", ".join(pendientes) + "]"
+    return json.dumps(recomendaciones_para_alcanzar_nivel2(resultados), ensure_ascii=False)
+
+
+def cola_json(patrones, resumen, cumple_nivel2, nivel2):
+    """
+    Uno los fragmentos ya codificados en el final de la línea JSON de un proyecto (todo salvo el nombre).
+    """
+    return (
+        ', "kpas": [' + ", ".join(p[1] for p in patrones)
+        + '], "resumen": ' + json.dumps(resumen, ensure_ascii=False)
+        + ', "cumple_nivel2": ' + ("true" if cumple_nivel2 else "false")
+        + ', "recomendaciones_nivel2": ' + nivel2 + "}"
+    )
+
+
+def linea_json(nombre, patrones, resumen, cumple_nivel2, nivel2):
+    """
+    Uno los fragmentos ya codificados en la línea JSON del registro de un proyecto.
+    """
+    return '{"proyecto": ' + json.dumps(nombre, ensure_ascii=False) + cola_json(patrones, resumen, cumple_nivel2, nivel2)
+
+
+def cola_json_proyecto(respuestas, cuestionario=None):
+    """
+    Codifico el registro de un proyecto sin su nombre, reutilizando los fragmentos de cada patrón de KPA.
+    """
+    kpas = kpas_de(cuestionario)
+    patrones = [fragmentos_json_por_patron(kpa, tuple(respuestas[kpa]), cuestionario) for kpa in kpas]
+    resultados = [p[0] for p in patrones]
+    resumen, cumple_nivel2 = diagnostico_general(resultados, kpas)
+    return cola_json(patrones, resumen, cumple_nivel2, nivel2_json(patrones, resultados))
+
+
+@perfilado.etapa()
+def evaluar_proyecto_json(nombre, respuestas, cuestionario=None):
+    """
+    Devuelvo directamente la línea JSON del registro de un proyecto.
+    El texto es idéntico a json.dumps(evaluar_proyecto(...), ensure_ascii=False), pero solo
+    codifico el nombre: el resto sale de la caché si el vector de respuestas ya se puntuó.
+    """
+    cola = CACHE_JSON.obtener_o_calcular(
+        clave_cuestionario(respuestas, cuestionario), cola_json_proyecto, respuestas, cuestionario)
+    return '{"proyecto": ' + json.dumps(nombre, ensure_ascii=False) + cola
+
+
+@perfilado.etapa()
+def evaluar_archivo(ruta_entrada, ruta_salida, formato=None, formato_salida=None, cuestionario=None):
+    """
+    Puntúo todos los proyectos de un archivo y escribo un resultado JSON por línea
+    (o una fila CSV o HTML si la salida tiene esa extensión o lo indica formato_salida).
+    Uso la tubería en streaming de flujo_evaluacion, así que la memoria no crece con el archivo.
+    Devuelvo el número de proyectos evaluados.
+    """
+    # Importo aquí la tubería porque ella a su vez reutiliza las funciones de este módulo
+    from flujo_evaluacion import ejecutar_flujo
+    total, _ = ejecutar_flujo(ruta_entrada, ruta_salida, formato, formato_salida=formato_salida,
+                              cuestionario=cuestionario)
+    return total
+
+
+@perfilado.etapa()
+def evaluar_bloque(lineas, formato, cabecera=None, ruta_cuestionario=None, primera_linea=1):
+    """
+    Puntúo un bloque de líneas de entrada dentro de un proceso trabajador.
+    primera_linea es el número de la primera línea del bloque en el archivo (para los mensajes de error).
+    Devuelvo el bloque ya serializado como texto JSON Lines, que viaja entre procesos
+    mucho más ligero que una lista de diccionarios anidados.
+    """
+    cuestionario = cuestionario_de(ruta_cuestionario)
+    return "".join(
+        evaluar_proyecto_json(nombre, respuestas, cuestionario) + "\n"
+        for nombre, respuestas in leer_respuestas(lineas, formato, cabecera, kpas_de(cuestionario), primera_linea)
+    )
+
+
+@perfilado.etapa()
+def evaluar_archivo_paralelo(ruta_entrada, ruta_salida, formato=None, procesos=None, tam_bloque=2000,
+                             ruta_cuestionario=None):
+    """
+    Puntúo un archivo grande repartiendo bloques de tam_bloque líneas entre varios procesos.
+    Cada proyecto debe ocupar una sola línea del archivo de entrada.
+    Cada trabajador carga una vez el cuestionario de ruta_cuestionario (None = el incluido).
+    Escribo los resultados en el mismo orden que la entrada y mantengo como mucho
+    dos bloques pendientes por proceso, así la memoria no crece con el tamaño del archivo.
+    Devuelvo el número de proyectos evaluados.
+    """
+    import concurrent.futures  # Para repartir los bloques entre varios procesos (solo lo cargo en este modo)
+
+    if tam_bloque < 1:
+        raise ValueError("El tamaño de bloque debe ser al menos 1.")
+    formato = formato or formato_por_extension(ruta_entrada)
+    procesos = procesos or os.cpu_count() or 1
+    cuestionario_de(ruta_cuestionario)  # Compruebo el cuestionario antes de lanzar los procesos
+    total = 0
+    with open(ruta_entrada, encoding="utf-8", newline="") as entrada, \
+            open(ruta_salida, "w", encoding="utf-8") as salida, \
+            concurrent.futures.ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        # En CSV leo la cabecera aquí y se la paso a cada bloque
+        cabecera = None
+        siguiente_linea = 1  # Número en el archivo de la primera línea del próximo bloque
+        if formato == "csv":
+            cabecera = next(csv.reader([entrada.readline()]), None)
+            siguiente_linea = 2
+
+        # Voy enviando bloques y escribiendo el más antiguo cuando la ventana está llena
+        max_pendientes = 2 * procesos
+        pendientes = collections.deque()
+        while True:
+            lineas = list(itertools.islice(entrada, tam_bloque))
+            if lineas:
+                pendientes.append(ejecutor.submit(evaluar_bloque, lineas, formato, cabecera, ruta_cuestionario,
+                                                  siguiente_linea))
+                siguiente_linea += len(lineas)
+            while pendientes and (len(pendientes) >= max_pendientes or not lineas):
+                texto = pendientes.popleft().result()
+                salida.write(texto)
+                total += texto.count("\n")
+            if not lineas:
+                break
+    return total
+
+
+def main(argv=None):
+    """
+    Punto de entrada del modo por lotes. Nunca pregunta nada por pantalla.
+    """
+    parser = argparse.ArgumentParser(description="Evaluación CMMI Nivel 2 por lotes (sin preguntas).")
+    parser.add_argument("entrada", help="Archivo de respuestas (.csv o .jsonl)")
+    parser.add_argument("salida", help="Archivo de resultados: JSON Lines, CSV o informe HTML (según la extensión)")
+    parser.add_argument("--formato", choices=("csv", "jsonl"), help="Formato de entrada (por defecto según la extensión)")
+    parser.add_argument("--formato-salida", choices=("jsonl", "csv", "html"),
+                        help="Formato de salida (por defecto según la extensión)")
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="Número de procesos trabajadores (0 = uno por núcleo; 1 = sin paralelismo)")
+    parser.add_argument("--tam-bloque", type=int, default=2000, help="Líneas de entrada por bloque en modo paralelo")
+    parser.add_argument("--cuestionario", metavar="RUTA",
+                        help="Definición JSON del cuestionario (por defecto el incluido, ver cuestionario.py)")
+    perfilado.agregar_argumentos(parser)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.procesos < 0:
+            raise ValueError("--procesos no puede ser negativo (0 = uno por núcleo).")
+        if args.tam_bloque < 1:
+            raise ValueError("--tam-bloque debe ser al menos 1.")
+        # En modo paralelo solo se mide el proceso principal (los trabajadores no escriben resumen)
+        perfilado.activar_desde_argumentos(args)
+        if args.procesos == 1:
+            total = evaluar_archivo(args.entrada, args.salida, args.formato, args.formato_salida,
+                                    cuestionario_de(args.cuestionario))
+        else:
+            from exportadores import formato_salida_por_extension
+            if (args.formato_salida or formato_salida_por_extension(args.salida)) != "jsonl":
+                raise ValueError("El modo paralelo solo escribe JSON Lines; usa --procesos 1 para CSV o HTML.")
+            total = evaluar_archivo_paralelo(args.entrada, args.salida, args.formato,
+                                             args.procesos or None, args.tam_bloque, args.cuestionario)
+    except (OSError, ValueError) as error:
+        # Informo del problema sin traza y devuelvo un código de error
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+
+    print(f"Proyectos evaluados: {total}")
+    return 0
+
+
+# Este bloque solo se ejecuta si ejecuto este archivo directamente (no si lo importo)
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+# exportadores.py
+# Este archivo implementa los exportadores de informes: CSV, JSON Lines y un informe HTML autocontenido
+# Cada exportador recibe los resultados de un proyecto cada vez y los escribe enseguida en un archivo
+# con un búfer grande, así la memoria no crece con el número de proyectos y nunca construyo
+# el documento completo como un único texto
+# Las partes que solo dependen del resultado de una KPA (su JSON, sus celdas HTML) las codifico
+# una sola vez y las reutilizo en todos los proyectos que repiten ese resultado
+
+import csv  # Para escribir las filas CSV con el escapado correcto
+import html  # Para escapar los textos del informe HTML
+import json  # Para codificar los registros JSON Lines
+from KPAS import KPAS  # Cargo las 5 KPAs con sus preguntas
+from evaluacion_lotes import linea_json, nivel2_json  # Misma codificación JSON que el modo por lotes
+from perfilado import etapa  # Medición por etapa (sin coste si el perfilado está desactivado)
+
+
+# Tamaño del búfer de escritura (1 MiB): el sistema operativo recibe pocas escrituras grandes
+TAM_BUFFER = 1 << 20
+
+# Fragmentos codificados que guardo como máximo en la caché de cada exportador (luego la vacío)
+MAX_FRAGMENTOS = 4096
+
+# Separador entre el nombre de la KPA y el dato en las columnas CSV (el mismo que la entrada por lotes)
+SEPARADOR_COLUMNA = "|"
+
+# Formato de exportación según la extensión del archivo de salida
+FORMATOS_POR_EXTENSION = {".csv": "csv", ".jsonl": "jsonl", ".json": "jsonl", ".html": "html", ".htm": "html"}
+
+# Clase CSS de cada estado en el informe HTML
+CLASE_ESTADO = {
+    "Implementada": "implementada",
+    "Parcialmente implementada": "parcial",
+    "Deficiente": "deficiente",
+}
+
+ESTILO_HTML = """
+body { font-family: Helvetica, Arial, sans-serif; margin: 2em; color: #222; }
+table { border-collapse: collapse; }
+th, td { border: 1px solid #ccc; padding: 4px 8px; text-align: left; }
+th { background: #f0f0f0; }
+.implementada { background: #d8f5d0; }
+.parcial { background: #fff3c4; }
+.deficiente { background: #f9d0d0; }
+.cumple { font-weight: bold; color: #1a7f37; }
+.no-cumple { color: #b42318; }
+details ul { margin: 0.3em 0; }
+"""
+
+
+def formato_salida_por_extension(ruta):
+    """
+    Deduzco el formato de exportación a partir de la extensión del archivo (JSON Lines por defecto).
+    """
+    ruta = str(ruta).lower()
+    for extension, formato in FORMATOS_POR_EXTENSION.items():
+        if ruta.endswith(extension):
+            return formato
+    return "jsonl"
+
+
+def abrir_salida(ruta):
+    """
+    Abro el archivo de salida en modo texto UTF-8 con el búfer grande de los exportadores.
+    """
+    return open(ruta, "w", encoding="utf-8", newline="", buffering=TAM_BUFFER)
+
+
+class Exportador:
+    """
+    Base de los exportadores. escribir_proyecto recibe el nombre, los resultados de cada KPA
+    (con "kpa", "porcentaje", "estado" y "recomendaciones"), el resumen de diagnostico_general
+    y el veredicto de Nivel 2; escribir recibe directamente el registro de evaluacion_lotes.evaluar_proyecto.
+    Las KPAs de la cabecera son las del primer proyecto, salvo que las indique al crear el exportador.
+    """
+
+    def __init__(self, salida, kpas=None):
+        self.salida = salida
+        self.kpas = list(kpas) if kpas is not None else None
+        self.iniciado = False
+        self.proyectos = 0
+        self.cumplen_nivel2 = 0
+        self.fragmentos = {}
+
+    def fragmento(self, r):
+        """
+        Devuelvo los textos ya codificados del resultado de una KPA.
+        """
+        clave = (r["kpa"], r["porcentaje"], r["estado"], tuple(r["recomendaciones"]))
+        fragmento = self.fragmentos.get(clave)
+        if fragmento is None:
+            if len(self.fragmentos) >= MAX_FRAGMENTOS:
+                self.fragmentos.clear()
+            fragmento = self.fragmentos[clave] = self.codificar(r)
+        return fragmento
+
+    def codificar(self, r):
+        """
+        Codifico el resultado de una KPA (cada exportador decide cómo).
+        """
+        raise NotImplementedError
+
+    def iniciar(self, kpas):
+        self.kpas = list(kpas) if self.kpas is None else self.kpas
+        self.iniciado = True
+        self.escribir_cabecera()
+
+    def escribir_cabecera(self):
+        pass
+
+    def por_kpa(self, resultados):
+        """
+        Ordeno los resultados como las KPAs de la cabecera (None en las que falten),
+        así las columnas cuadran aunque lleguen en otro orden o solo unas cuantas.
+        """
+        indice = {r["kpa"]: r for r in resultados}
+        return [indice.get(kpa) for kpa in self.kpas]
+
+    def escribir_pie(self):
+        pass
+
+    @etapa()
+    def escribir_proyecto(self, nombre, resultados, resumen, cumple_nivel2):
+        if not self.iniciado:
+            self.iniciar(r["kpa"] for r in resultados)
+        self.proyectos += 1
+        self.cumplen_nivel2 += 1 if cumple_nivel2 else 0
+        self.escribir_fila(nombre, resultados, resumen, cumple_nivel2)
+
+    def escribir(self, registro):
+        self.escribir_proyecto(registro["proyecto"], registro["kpas"], registro["resumen"], registro["cumple_nivel2"])
+
+    def cerrar(self):
+        """
+        Termino el documento (cabecera si no hubo proyectos y pie) y vacío el búfer.
+        No cierro el archivo: es de quien lo abrió.
+        """
+        if not self.iniciado:
+            self.iniciar(KPAS)
+        self.escribir_pie()
+        self.salida.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, *exc):
+        # Si hubo un error no escribo el pie: el archivo queda incompleto igualmente
+        if tipo is None:
+            self.cerrar()
+
+
+class ExportadorJSONL(Exportador):
+    """
+    Un registro JSON por línea, con el mismo texto que json.dumps(evaluar_proyecto(...), ensure_ascii=False).
+    """
+
+    def codificar(self, r):
+        entrada_kpa = json.dumps({
+            "kpa": r["kpa"],
+            "porcentaje": r["porcentaje"],
+            "estado": r["estado"],
+            "recomendaciones": r["recomendaciones"],
+        }, ensure_ascii=False)
+        entrada_nivel2 = None
+        if r["estado"] != "Implementada":
+            entrada_nivel2 = json.dumps({"kpa": r["kpa"], "estado": r["estado"],
+                                         "recomendaciones": r["recomendaciones"]}, ensure_ascii=False)
+        return r, entrada_kpa, entrada_nivel2
+
+    def escribir_fila(self, nombre, resultados, resumen, cumple_nivel2):
+        # Uno los fragmentos con las mismas funciones que el modo por lotes
+        patrones = [self.fragmento(r) for r in resultados]
+        self.salida.write(linea_json(nombre, patrones, resumen, cumple_nivel2, nivel2_json(patrones, resultados)))
+        self.salida.write("\n")
+
+
+class ExportadorCSV(Exportador):
+    """
+    Una fila por proyecto: nombre, veredicto, contadores del resumen y porcentaje y estado de cada KPA.
+    """
+
+    def __init__(self, salida, kpas=None):
+        super().__init__(salida, kpas)
+        self.escritor = csv.writer(salida)
+
+    def escribir_cabecera(self):
+        columnas = ["proyecto", "cumple_nivel2", "implementadas", "parciales", "deficientes"]
+        for kpa in self.kpas:
+            columnas += [f"{kpa}{SEPARADOR_COLUMNA}porcentaje", f"{kpa}{SEPARADOR_COLUMNA}estado"]
+        self.escritor.writerow(columnas)
+
+    def escribir_fila(self, nombre, resultados, resumen, cumple_nivel2):
+        # Aquí no uso la caché de fragmentos: cada celda ya es un valor suelto
+        fila = [nombre, "true" if cumple_nivel2 else "false",
+                resumen["implementadas"], resumen["parciales"], resumen["deficientes"]]
+        for r in self.por_kpa(resultados):
+            fila += (r["porcentaje"], r["estado"]) if r is not None else ("", "")
+        self.escritor.writerow(fila)
+
+
+class ExportadorHTML(Exportador):
+    """
+    Informe HTML autocontenido (estilos incluidos, sin recursos externos): una fila por proyecto
+    con el porcentaje de cada KPA coloreado según su estado y, al final, los totales de la cartera.
+    Con con_recomendaciones añado bajo cada proyecto sus recomendaciones para alcanzar el Nivel 2.
+    """
+
+    def __init__(self, salida, kpas=None, titulo="Informe de diagnóstico CMMI Nivel 2", con_recomendaciones=False):
+        super().__init__(salida, kpas)
+        self.titulo = titulo
+        self.con_recomendaciones = con_recomendaciones
+        self.estados = {}  # kpa -> {estado: proyectos}, para los totales del pie
+
+    def escribir_cabecera(self):
+        titulo = html.escape(self.titulo)
+        w = self.salida.write
+        w('<!DOCTYPE html>\n<html lang="es">\n<head>\n<meta charset="utf-8">\n')
+        w(f"<title>{titulo}</title>\n<style>{ESTILO_HTML}</style>\n</head>\n<body>\n<h1>{titulo}</h1>\n")
+        w("<table>\n<thead><tr><th>Proyecto</th><th>Nivel 2</th>")
+        for kpa in self.kpas:
+            w(f"<th>{html.escape(kpa)}</th>")
+        w("</tr></thead>\n<tbody>\n")
+        self.estados = {kpa: dict.fromkeys(CLASE_ESTADO, 0) for kpa in self.kpas}
+
+    def codificar(self, r):
+        celda = f'<td class="{CLASE_ESTADO[r["estado"]]}" title="{html.escape(r["estado"])}">{r["porcentaje"]}%</td>'
+        pendiente = ""
+        if r["estado"] != "Implementada":
+            elementos = "".join(f"<li>{html.escape(rec)}</li>" for rec in r["recomendaciones"])
+            pendiente = f"<li><b>{html.escape(r['kpa'])}</b> ({html.escape(r['estado'])})<ul>{elementos}</ul></li>"
+        return celda, pendiente
+
+    def escribir_fila(self, nombre, resultados, resumen, cumple_nivel2):
+        w = self.salida.write
+        veredicto = '<td class="cumple">Cumple</td>' if cumple_nivel2 else '<td class="no-cumple">No cumple</td>'
+        fragmentos = [self.fragmento(r) if r is not None else ("<td></td>", "") for r in self.por_kpa(resultados)]
+        w(f"<tr><td>{html.escape(str(nombre))}</td>{veredicto}{''.join(f[0] for f in fragmentos)}</tr>\n")
+        for r in resultados:
+            if r["kpa"] in self.estados:
+                self.estados[r["kpa"]][r["estado"]] += 1
+        if self.con_recomendaciones:
+            pendientes = "".join(f[1] for f in fragmentos)
+            if pendientes:
+                w(f'<tr><td colspan="{len(self.kpas) + 2}"><details><summary>Recomendaciones para alcanzar el Nivel 2'
+                  f"</summary><ul>{pendientes}</ul></details></td></tr>\n")
+
+    def escribir_pie(self):
+        w = self.salida.write
+        w("</tbody>\n</table>\n<h2>Resumen de la cartera</h2>\n")
+        w(f"<p>Proyectos evaluados: {self.proyectos}. Cumplen el Nivel 2: {self.cumplen_nivel2}.</p>\n")
+        w("<table>\n<thead><tr><th>KPA</th>")
+        for estado, clase in CLASE_ESTADO.items():
+            w(f'<th class="{clase}">{html.escape(estado)}</th>')
+        w("</tr></thead>\n<tbody>\n")
+        for kpa in self.kpas:
+            w(f"<tr><td>{html.escape(kpa)}</td>")
+            for estado in CLASE_ESTADO:
+                w(f"<td>{self.estados[kpa][estado]}</td>")
+            w("</tr>\n")
+        w("</tbody>\n</table>\n</body>\n</html>\n")
+
+
+EXPORTADORES = {"jsonl": ExportadorJSONL, "csv": ExportadorCSV, "html": ExportadorHTML}
+
+
+def crear_exportador(salida, formato, **opciones):
+    """
+    Creo el exportador de un formato ("jsonl", "csv" o "html") sobre un archivo ya abierto.
+    """
+    clase = EXPORTADORES.get(formato)
+    if clase is None:
+        raise ValueError(f"Formato de exportación desconocido: {formato}")
+    return clase(salida, **opciones)
+
+
+def exportar_registros(registros, ruta, formato=None, **opciones):
+    """
+    Exporto en streaming un iterable de registros de evaluar_proyecto y devuelvo cuántos escribí.
+    """
+    formato = formato or formato_salida_por_extension(ruta)
+    with abrir_salida(ruta) as salida:
+        with crear_exportador(salida, formato, **opciones) as exportador:
+            for registro in registros:
+                exportador.escribir(registro)
+    return exportador.proyectos
+
+
+def leer_registros(archivo):
+    """
+    Leo uno a uno los registros de un archivo de resultados JSON Lines del modo por lotes.
+    """
+    for linea in archivo:
+        if linea.strip():
+            yield json.loads(linea)
+
+
+def main(argv=None):
+    """
+    Convierto en streaming un archivo de resultados del modo por lotes a CSV, JSON Lines o HTML.
+    """
+    import argparse
+    import sys
+    parser = argparse.ArgumentParser(description="Exporta resultados CMMI Nivel 2 a CSV, JSON Lines o HTML.")
+    parser.add_argument("resultados", help="Resultados JSON Lines del modo por lotes")
+    parser.add_argument("salida", help="Archivo de salida (.csv, .jsonl o .html)")
+    parser.add_argument("--formato", choices=tuple(EXPORTADORES), help="Formato de salida (por defecto según la extensión)")
+    parser.add_argument("--recomendaciones", action="store_true",
+                        help="Incluir en el HTML las recomendaciones de cada proyecto")
+    args = parser.parse_args(argv)
+
+    formato = args.formato or formato_salida_por_extension(args.salida)
+    opciones = {"con_recomendaciones": True} if args.recomendaciones and formato == "html" else {}
+    try:
+        with open(args.resultados, encoding="utf-8") as entrada:
+            total = exportar_registros(leer_registros(entrada), args.salida, formato, **opciones)
+    except (OSError, ValueError, KeyError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+
+    print(f"Proyectos exportados: {total}")
+    return 0
+
+
+# Este bloque solo se ejecuta si ejecuto este archivo directamente (no si lo importo)
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
@@ -0,0 +1,209 @@
+# flujo_evaluacion.py
+# Este archivo implementa la evaluación por lotes como una tubería de generadores:
+# parsear → puntuar → clasificar → recomendar → emitir
+# Cada etapa procesa un proyecto cada vez, así que la memoria es constante aunque
+# la entrada tenga millones de evaluaciones archivadas
+
+import argparse  # Para leer los argumentos de la línea de comandos
+import json  # Para escribir los agregados finales
+import sqlite3  # Para capturar los errores del historial
+import sys  # Para devolver un código de salida y escribir errores
+from KPAS import KPAS  # Cargo las 5 KPAs con sus preguntas
+from diagnostico_cmmi_nivel2 import diagnostico_general  # Diagnóstico de cada proyecto
+from evaluacion_lotes import (  # Reutilizo el lector y la codificación del modo por lotes
+    formato_por_extension,
+    cuestionario_de,
+    fragmentos_json_por_patron,
+    kpas_de,
+    leer_respuestas,
+    linea_json,
+    nivel2_json,
+)
+from exportadores import abrir_salida, crear_exportador, formato_salida_por_extension  # CSV y HTML
+from historial import TAM_LOTE, HistorialEvaluaciones  # Historial persistente (opcional)
+import perfilado  # Medición por etapa (sin coste si el perfilado está desactivado)
+
+
+def agregados_vacios(kpas=KPAS):
+    """
+    Devuelvo los agregados de cartera con todos los contadores a cero.
+    Son los mismos contadores que diagnostico_general, sumados para todos los proyectos,
+    más el reparto de estados de cada KPA.
+    """
+    return {
+        "proyectos": 0,  # Proyectos procesados
+        "cumplen_nivel2": 0,  # Proyectos que cumplen el Nivel 2
+        "implementadas": 0,  # KPAs implementadas (sumando todos los proyectos)
+        "parciales": 0,  # KPAs parcialmente implementadas
+        "deficientes": 0,  # KPAs deficientes
+        "por_kpa": {kpa: {"Implementada": 0, "Parcialmente implementada": 0, "Deficiente": 0} for kpa in kpas},
+    }
+
+
+@perfilado.etapa()
+def actualizar_agregados(agregados, resultados, resumen, cumple_nivel2):
+    """
+    Sumo un proyecto a los agregados de cartera sin guardar el proyecto.
+    """
+    agregados["proyectos"] += 1
+    agregados["cumplen_nivel2"] += 1 if cumple_nivel2 else 0
+    agregados["implementadas"] += resumen["implementadas"]
+    agregados["parciales"] += resumen["parciales"]
+    agregados["deficientes"] += resumen["deficientes"]
+    for r in resultados:
+        agregados["por_kpa"][r["kpa"]][r["estado"]] += 1
+    return agregados
+
+
+# --- ETAPAS DE LA TUBERÍA ---
+
+def parsear(archivo, formato, cabecera=None, kpas=KPAS):
+    """
+    Etapa 1: leo el archivo y entrego (nombre, respuestas) de un proyecto cada vez.
+    """
+    yield from leer_respuestas(archivo, formato, cabecera, kpas)
+
+
+def puntuar(proyectos, cuestionario=None):
+    """
+    Etapa 2: calculo el resultado de cada KPA (porcentaje, estado y recomendaciones de la KPA).
+    Los resultados salen de la caché por patrón del modo por lotes junto con su JSON ya codificado.
+    """
+    kpas = kpas_de(cuestionario)
+    for nombre, respuestas in proyectos:
+        patrones = [fragmentos_json_por_patron(kpa, tuple(respuestas[kpa]), cuestionario) for kpa in kpas]
+        yield {"proyecto": nombre, "patrones": patrones, "resultados": [p[0] for p in patrones]}
+
+
+def clasificar(registros, agregados, kpas=KPAS):
+    """
+    Etapa 3: calculo el diagnóstico general de cada proyecto y lo sumo a los agregados de cartera.
+    """
+    for registro in registros:
+        resumen, cumple_nivel2 = diagnostico_general(registro["resultados"], kpas)
+        registro["resumen"] = resumen
+        registro["cumple_nivel2"] = cumple_nivel2
+        actualizar_agregados(agregados, registro["resultados"], resumen, cumple_nivel2)
+        yield registro
+
+
+def recomendar(registros):
+    """
+    Etapa 4: preparo las recomendaciones para alcanzar el Nivel 2 de cada proyecto.
+    """
+    for registro in registros:
+        registro["nivel2"] = nivel2_json(registro["patrones"], registro["resultados"])
+        yield registro
+
+
+def emitir(registros, salida):
+    """
+    Etapa 5: escribo una línea JSON por proyecto y la entrego para que el consumidor siga la cuenta.
+    """
+    for registro in registros:
+        salida.write(linea_json(registro["proyecto"], registro["patrones"], registro["resumen"],
+                                registro["cumple_nivel2"], registro["nivel2"]) + "\n")
+        yield registro
+
+
+def exportar(registros, exportador):
+    """
+    Etapa 5 para CSV y HTML: paso cada proyecto al exportador, que lo escribe enseguida.
+    """
+    for registro in registros:
+        exportador.escribir_proyecto(registro["proyecto"], registro["resultados"],
+                                     registro["resumen"], registro["cumple_nivel2"])
+        yield registro
+
+
+def registrar(registros, historial, tam_lote=TAM_LOTE):
+    """
+    Etapa opcional: guardo cada proyecto en el historial SQLite en lotes de tam_lote.
+    Solo retengo un lote como máximo, así que la memoria sigue siendo constante.
+    """
+    lote = []
+    for registro in registros:
+        lote.append((registro["proyecto"], registro["resultados"], registro["cumple_nivel2"]))
+        if len(lote) >= tam_lote:
+            historial.guardar_lote(lote)
+            lote = []
+        yield registro
+    historial.guardar_lote(lote)
+
+
+@perfilado.etapa()
+def ejecutar_flujo(ruta_entrada, ruta_salida, formato=None, historial=None, formato_salida=None,
+                   cuestionario=None):
+    """
+    Encadeno todas las etapas sobre un archivo completo.
+    El formato de salida ("jsonl", "csv" o "html") se deduce de la extensión si no lo indico.
+    Si recibo un HistorialEvaluaciones, también guardo cada proyecto en él.
+    Con un cuestionario cargado (cuestionario.py) puntúo con sus preguntas, valores y recomendaciones.
+    Devuelvo el número de proyectos procesados y los agregados de cartera.
+    """
+    formato = formato or formato_por_extension(ruta_entrada)
+    formato_salida = formato_salida or formato_salida_por_extension(ruta_salida)
+    kpas = kpas_de(cuestionario)
+    agregados = agregados_vacios(kpas)
+    total = 0
+    with open(ruta_entrada, encoding="utf-8", newline="") as entrada, abrir_salida(ruta_salida) as salida:
+        etapas = clasificar(puntuar(parsear(entrada, formato, kpas=kpas), cuestionario), agregados, kpas)
+        if historial is not None:
+            etapas = registrar(etapas, historial)
+        if formato_salida == "jsonl":
+            # JSON Lines: uno directamente los fragmentos ya codificados de cada patrón
+            for _ in emitir(recomendar(etapas), salida):
+                total += 1
+        else:
+            with crear_exportador(salida, formato_salida, kpas=kpas) as exportador:
+                for _ in exportar(etapas, exportador):
+                    total += 1
+    return total, agregados
+
+
+def main(argv=None):
+    """
+    Punto de entrada para las ejecuciones nocturnas: proceso el archivo en streaming
+    y al final muestro los agregados de cartera.
+    """
+    parser = argparse.ArgumentParser(description="Evaluación CMMI Nivel 2 en streaming con agregados de cartera.")
+    parser.add_argument("entrada", help="Archivo de respuestas (.csv o .jsonl)")
+    parser.add_argument("salida", help="Archivo de resultados: JSON Lines, CSV o informe HTML (según la extensión)")
+    parser.add_argument("--formato", choices=("csv", "jsonl"), help="Formato de entrada (por defecto según la extensión)")
+    parser.add_argument("--formato-salida", choices=("jsonl", "csv", "html"),
+                        help="Formato de salida (por defecto según la extensión)")
+    parser.add_argument("--agregados", help="Archivo JSON donde guardo los agregados de cartera")
+    parser.add_argument("--historial", help="Base de datos SQLite donde guardo cada evaluación")
+    parser.add_argument("--cuestionario", metavar="RUTA",
+                        help="Definición JSON del cuestionario (por defecto el incluido, ver cuestionario.py)")
+    perfilado.agregar_argumentos(parser)
+    args = parser.parse_args(argv)
+
+    try:
+        perfilado.activar_desde_argumentos(args)
+        cuestionario = cuestionario_de(args.cuestionario)
+        if args.historial:
+            with HistorialEvaluaciones(args.historial) as historial:
+                total, agregados = ejecutar_flujo(args.entrada, args.salida, args.formato, historial,
+                                                  args.formato_salida, cuestionario)
+        else:
+            total, agregados = ejecutar_flujo(args.entrada, args.salida, args.formato,
+                                              formato_salida=args.formato_salida, cuestionario=cuestionario)
+        if args.agregados:
+            with open(args.agregados, "w", encoding="utf-8") as f:
+                json.dump(agregados, f, ensure_ascii=False, indent=2)
+    except (OSError, ValueError, sqlite3.Error) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+
+    print(f"Proyectos evaluados: {total}")
+    print(f"  Cumplen Nivel 2: {agregados['cumplen_nivel2']}")
+    print(f"  KPAs implementadas: {agregados['implementadas']}")
+    print(f"  KPAs parcialmente implementadas: {agregados['parciales']}")
+    print(f"  KPAs deficientes: {agregados['deficientes']}")
+    return 0
+
+
+# Este bloque solo se ejecuta si ejecuto este archivo directamente (no si lo importo)
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+# historial.py
+# Este archivo guarda el historial de evaluaciones en una base de datos SQLite
+# Almaceno proyectos, evaluaciones, la respuesta a cada pregunta y el resultado de cada KPA,
+# con índices para responder rápido a consultas sobre carteras de millones de filas
+
+import datetime  # Para registrar la fecha de cada evaluación
+import os  # Para leer la ruta de la base de datos desde una variable de entorno
+import sqlite3  # Base de datos incluida en la biblioteca estándar
+
+
+# Ruta por defecto de la base de datos (se puede cambiar con la variable CMMI_HISTORIAL)
+RUTA_POR_DEFECTO = "historial_cmmi.db"
+
+# Número de evaluaciones que agrupo en cada inserción masiva
+TAM_LOTE = 5000
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS proyectos (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS kpas (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS evaluaciones (
+    id INTEGER PRIMARY KEY,
+    proyecto_id INTEGER NOT NULL REFERENCES proyectos(id),
+    fecha TEXT NOT NULL,
+    origen TEXT NOT NULL,
+    cumple_nivel2 INTEGER
+);
+CREATE TABLE IF NOT EXISTS respuestas (
+    evaluacion_id INTEGER NOT NULL REFERENCES evaluaciones(id),
+    kpa_id INTEGER NOT NULL REFERENCES kpas(id),
+    pregunta INTEGER NOT NULL,
+    opcion TEXT NOT NULL,
+    PRIMARY KEY (evaluacion_id, kpa_id, pregunta)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS puntuaciones (
+    evaluacion_id INTEGER NOT NULL REFERENCES evaluaciones(id),
+    kpa_id INTEGER NOT NULL REFERENCES kpas(id),
+    porcentaje REAL NOT NULL,
+    estado TEXT NOT NULL,
+    PRIMARY KEY (evaluacion_id, kpa_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_evaluaciones_proyecto_fecha ON evaluaciones (proyecto_id, fecha);
+CREATE INDEX IF NOT EXISTS idx_evaluaciones_fecha ON evaluaciones (fecha);
+CREATE INDEX IF NOT EXISTS idx_puntuaciones_kpa_estado ON puntuaciones (kpa_id, estado, evaluacion_id);
+"""
+
+
+def ruta_historial():
+    """
+    Devuelvo la ruta de la base de datos: la de CMMI_HISTORIAL si está definida o la de por defecto.
+    """
+    return os.environ.get("CMMI_HISTORIAL") or RUTA_POR_DEFECTO
+
+
+def fecha_actual():
+    """
+    Devuelvo la fecha y hora actual con el mismo formato que la conclusión final.
+    """
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def opciones_de(resultado):
+    """
+    Obtengo las opciones elegidas de un resultado de KPA (compacto o diccionario).
+    """
+    opciones = getattr(resultado, "opciones", None)
+    if opciones is None:
+        # Resultado en forma de diccionario: la CLI usa "respuestas_raw" y la GUI "respuestas"
+        raw = resultado.get("respuestas_raw") or resultado.get("respuestas") or []
+        opciones = [r["opcion"] for r in raw]
+    return opciones
+
+
+class HistorialEvaluaciones:
+    """
+    Almacén persistente de evaluaciones.
+    Uso el modo WAL para que las lecturas no bloqueen a las escrituras e inserto
+    en lotes con executemany dentro de una sola transacción.
+    """
+
+    def __init__(self, ruta=None):
+        self.ruta = ruta or ruta_historial()
+        self.conexion = sqlite3.connect(self.ruta)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self.conexion.executescript(ESQUEMA)
+        # Cachés nombre -> id para no consultar el mismo proyecto o KPA una y otra vez
+        self.ids_proyecto = {}
+        self.ids_kpa = {}
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def _ids_de(self, tabla, cache, nombres):
+        """
+        Devuelvo el id de cada nombre de la tabla (proyectos o kpas), creando los que no existan.
+        """
+        nuevos = [n for n in set(nombres) if n not in cache]
+        if nuevos:
+            self.conexion.executemany(f"INSERT OR IGNORE INTO {tabla} (nombre) VALUES (?)", [(n,) for n in nuevos])
+            # Consulto los ids en trozos para no superar el límite de parámetros de SQLite
+            for i in range(0, len(nuevos), 500):
+                trozo = nuevos[i:i + 500]
+                marcas = ",".join("?" * len(trozo))
+                for id_, nombre in self.conexion.execute(
+                        f"SELECT id, nombre FROM {tabla} WHERE nombre IN ({marcas})", trozo):
+                    cache[nombre] = id_
+        return cache
+
+    def _filas_resultado(self, r):
+        """
+        Preparo las filas (kpa_id, porcentaje, estado) y (kpa_id, pregunta, opcion) de un resultado de KPA.
+        Si el resultado es provisional (veredicto rápido con criterio "nivel2": el estado es solo la
+        cota inferior) guardo las respuestas dadas pero no la puntuación (None), para que las consultas
+        por estado no lo tomen como real.
+        """
+        kpa_id = self._ids_de("kpas", self.ids_kpa, [r["kpa"]])[r["kpa"]]
+        respuestas = [(kpa_id, n + 1, o) for n, o in enumerate(opciones_de(r)) if o]  # Sin las no respondidas
+        if r.get("provisional"):
+            return None, respuestas
+        return (kpa_id, r["porcentaje"], r["estado"]), respuestas
+
+    def guardar_lote(self, evaluaciones, origen="lotes"):
+        """
+        Guardo muchas evaluaciones de una vez.
+        evaluaciones es un iterable de (nombre_proyecto, resultados, cumple_nivel2[, fecha]);
+        cumple_nivel2 puede ser None cuando solo se evaluó una KPA.
+        Devuelvo la lista de ids asignados.
+        """
+        evaluaciones = list(evaluaciones)
+        if not evaluaciones:
+            return []
+        ahora = fecha_actual()
+        try:
+            with self.conexion:  # Una sola transacción para todo el lote
+                # Tomo el cerrojo de escritura antes de reservar los ids: con la transacción diferida por defecto,
+                # si todos los proyectos ya están en la caché nada escribe antes del MAX(id) y otro proceso
+                # (CLI, GUI, lotes o servicio HTTP) podría reservar los mismos ids a la vez
+                if not self.conexion.in_transaction:
+                    self.conexion.execute("BEGIN IMMEDIATE")
+                ids = self._ids_de("proyectos", self.ids_proyecto, [e[0] for e in evaluaciones])
+                # En los lotes grandes muchos proyectos comparten el mismo objeto resultado (un patrón
+                # de respuestas), así que preparo sus filas una sola vez por objeto
+                filas_por_resultado = {}
+                # Reservo los ids de las evaluaciones para poder insertar las tablas hijas con executemany
+                (ultimo,) = self.conexion.execute("SELECT COALESCE(MAX(id), 0) FROM evaluaciones").fetchone()
+                filas_eval, filas_resp, filas_punt = [], [], []
+                for i, evaluacion in enumerate(evaluaciones):
+                    nombre, resultados, cumple = evaluacion[:3]
+                    fecha = evaluacion[3] if len(evaluacion) > 3 else ahora
+                    id_eval = ultimo + 1 + i
+                    filas_eval.append((id_eval, ids[nombre], fecha, origen, None if cumple is None else int(cumple)))
+                    for r in resultados:
+                        filas = filas_por_resultado.get(id(r))
+                        if filas is None:
+                            filas = filas_por_resultado[id(r)] = self._filas_resultado(r)
+                        if filas[0] is not None:
+                            filas_punt.append((id_eval,) + filas[0])
+                        filas_resp.extend((id_eval,) + f for f in filas[1])
+                self.conexion.executemany("INSERT INTO evaluaciones VALUES (?, ?, ?, ?, ?)", filas_eval)
+                self.conexion.executemany("INSERT INTO puntuaciones VALUES (?, ?, ?, ?)", filas_punt)
+                self.conexion.executemany("INSERT INTO respuestas VALUES (?, ?, ?, ?)", filas_resp)
+        except BaseException:
+            # La transacción se ha deshecho: los ids que _ids_de guardó en las cachés durante ella
+            # ya no existen en la base de datos (otro proceso podría reutilizarlos), así que las vacío
+            self.ids_proyecto.clear()
+            self.ids_kpa.clear()
+            raise
+        return [f[0] for f in filas_eval]
+
+    def guardar_evaluacion(self, nombre_proyecto, resultados, cumple_nivel2=None, origen="cli"):
+        """
+        Guardo una sola evaluación (la que acaba de hacer un usuario en la CLI o la GUI).
+        """
+        return self.guardar_lote([(nombre_proyecto, resultados, cumple_nivel2)], origen)[0]
+
+    def guardar_flujo(self, evaluaciones, origen="lotes", tam_lote=TAM_LOTE):
+        """
+        Guardo un iterable de evaluaciones de cualquier tamaño en lotes de tam_lote.
+        Devuelvo el número de evaluaciones guardadas.
+        """
+        total = 0
+        lote = []
+        for evaluacion in evaluaciones:
+            lote.append(evaluacion)
+            if len(lote) >= tam_lote:
+                total += len(self.guardar_lote(lote, origen))
+                lote = []
+        total += len(self.guardar_lote(lote, origen))
+        return total
+
+    # --- CONSULTAS ---
+
+    def ultima_evaluacion_por_proyecto(self):
+        """
+        Devuelvo (proyecto, id_evaluacion, fecha, cumple_nivel2) de la última evaluación de cada proyecto.
+        """
+        return self.conexion.execute("""
+            SELECT p.nombre, e.id, e.fecha, e.cumple_nivel2
+            FROM proyectos p
+            JOIN evaluaciones e ON e.id = (
+                SELECT id FROM evaluaciones
+                WHERE proyecto_id = p.id
+                ORDER BY fecha DESC, id DESC
+                LIMIT 1
+            )
+            ORDER BY p.nombre
+        """).fetchall()
+
+    def proyectos_por_estado(self, kpa, estado="Deficiente", solo_ultima=True):
+        """
+        Devuelvo (proyecto, id_evaluacion, fecha, porcentaje) de las evaluaciones en las que
+        la KPA tiene el estado indicado. Con solo_ultima miro solo la última evaluación de cada proyecto.
+        """
+        consulta = """
+            SELECT p.nombre, e.id, e.fecha, s.porcentaje
+            FROM puntuaciones s
+            JOIN evaluaciones e ON e.id = s.evaluacion_id
+            JOIN proyectos p ON p.id = e.proyecto_id
+            JOIN kpas k ON k.id = s.kpa_id
+            WHERE k.nombre = ? AND s.estado = ?
+        """
+        if solo_ultima:
+            consulta += """
+              AND e.id = (
+                  SELECT id FROM evaluaciones
+                  WHERE proyecto_id = e.proyecto_id
+                  ORDER BY fecha DESC, id DESC
+                  LIMIT 1
+              )
+            """
+        return self.conexion.execute(consulta + " ORDER BY p.nombre", (kpa, estado)).fetchall()
+
+    def respuestas_de(self, id_evaluacion):
+        """
+        Devuelvo {kpa: [opciones]} de una evaluación guardada.
+        """
+        respuestas = {}
+        for kpa, opcion in self.conexion.execute(
+                "SELECT k.nombre, r.opcion FROM respuestas r JOIN kpas k ON k.id = r.kpa_id "
+                "WHERE r.evaluacion_id = ? ORDER BY r.kpa_id, r.pregunta",
+                (id_evaluacion,)):
+            respuestas.setdefault(kpa, []).append(opcion)
+        return respuestas
+
+
+def guardar_en_historial(nombre_proyecto, resultados, cumple_nivel2=None, origen="cli"):
+    """
+    Guardo una evaluación en el historial por defecto sin interrumpir al usuario si falla.
+    Devuelvo el id de la evaluación o None si no se pudo guardar.
+    """
+    try:
+        with HistorialEvaluaciones() as historial:
+            return historial.guardar_evaluacion(nombre_proyecto, resultados, cumple_nivel2, origen)
+    except sqlite3.Error as error:
+        print(f"Aviso: no se pudo guardar la evaluación en el historial ({error}).")
+        return None
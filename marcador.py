@@ -0,0 +1,90 @@
+# marcador.py
+# Este archivo implementa un marcador en vivo de la evaluación
+# Cada vez que cambia una respuesta aplico solo la diferencia (valor nuevo - valor anterior)
+# a la suma de su KPA y, si cambia el estado de la KPA, a los contadores del resumen general,
+# así el veredicto de Nivel 2 se actualiza al instante sin volver a evaluar nada
+
+from KPAS import KPAS  # Cargo las 5 KPAs con sus preguntas
+from VALOR_RESPUESTA import VALOR_RESPUESTA  # Valores numéricos de cada opción
+from porcentaje import estado_porcentaje  # Clasificación por porcentaje
+
+# Contador del resumen general que corresponde a cada estado (las mismas claves que generar_resumen_general)
+CONTADOR_ESTADO = {
+    "Implementada": "implementadas",
+    "Parcialmente implementada": "parciales",
+    "Deficiente": "deficientes",
+}
+
+
+def valor_opcion(opcion, valores=VALOR_RESPUESTA):
+    """
+    Devuelvo el valor numérico de una opción; las preguntas sin responder ("") valen el mínimo,
+    igual que las omitidas en el modo de veredicto rápido.
+    """
+    return valores[opcion] if opcion else min(valores.values())
+
+
+class MarcadorEnVivo:
+    """
+    Marcador incremental de una evaluación: suma de valores (por el peso de cada pregunta) y estado
+    de cada KPA, y los contadores implementadas / parciales / deficientes del resumen general.
+    Cada cambio de respuesta cuesta lo mismo sin importar cuántas preguntas o KPAs haya.
+    Mientras falten respuestas, el porcentaje es el mínimo que ya está asegurado.
+    """
+
+    def __init__(self, kpas=None, valores=None, pesos=None):
+        # Número de preguntas de cada KPA (lo único que necesito de las definiciones)
+        self.num_preguntas = {kpa: len(preguntas) for kpa, preguntas in (kpas or KPAS).items()}
+        # Pesos de las preguntas de cada KPA ({kpa: pesos}, como Cuestionario.pesos_kpa; None = todas pesan 1)
+        self.pesos = {kpa: (pesos or {}).get(kpa) for kpa in self.num_preguntas}
+        self.total_pesos = {kpa: sum(p) if p is not None else self.num_preguntas[kpa] for kpa, p in self.pesos.items()}
+        # Tabla opción -> valor (la de un cuestionario cargado o VALOR_RESPUESTA) y el valor mínimo
+        self.valores = valores or VALOR_RESPUESTA
+        self.minimo = min(self.valores.values())
+        self.vaciar()
+
+    def vaciar(self):
+        """
+        Vuelvo al estado inicial: ninguna pregunta respondida.
+        """
+        self.sumas = {kpa: total * self.minimo for kpa, total in self.total_pesos.items()}
+        self.estados = {kpa: estado_porcentaje(self.porcentaje(kpa)) for kpa in self.num_preguntas}
+        self.contadores = {"implementadas": 0, "parciales": 0, "deficientes": 0}
+        for estado in self.estados.values():
+            self.contadores[CONTADOR_ESTADO[estado]] += 1
+
+    def porcentaje(self, kpa):
+        """
+        Porcentaje actual de una KPA, con la misma fórmula que evaluar_kpa (sin redondear).
+        """
+        total = self.total_pesos[kpa]
+        return (self.sumas[kpa] / total) * 100 if total else 0
+
+    def cambiar(self, kpa, anterior, nueva, indice=None):
+        """
+        Aplico el cambio de una respuesta de la KPA (de la opción anterior a la nueva; "" = sin responder).
+        indice es la posición de la pregunta, que solo necesito si las preguntas de la KPA tienen pesos.
+        Devuelvo el estado actual de la KPA.
+        """
+        peso = 1 if self.pesos[kpa] is None else self.pesos[kpa][indice]
+        self.sumas[kpa] += peso * (valor_opcion(nueva, self.valores) - valor_opcion(anterior, self.valores))
+        estado = estado_porcentaje(self.porcentaje(kpa))
+        if estado != self.estados[kpa]:
+            # La KPA cambia de estado: muevo una unidad entre los contadores del resumen
+            self.contadores[CONTADOR_ESTADO[self.estados[kpa]]] -= 1
+            self.contadores[CONTADOR_ESTADO[estado]] += 1
+            self.estados[kpa] = estado
+        return estado
+
+    @property
+    def cumple_nivel2(self):
+        # El proyecto cumple Nivel 2 solo si TODAS las KPAs están implementadas
+        return self.contadores["implementadas"] == len(self.num_preguntas)
+
+    def resumen(self):
+        """
+        Devuelvo (resumen, cumple_nivel2) con la misma forma que generar_resumen_general.
+        """
+        resumen = dict(self.contadores)
+        resumen["por_kpa"] = {kpa: round(self.porcentaje(kpa), 2) for kpa in self.num_preguntas}
+        return resumen, self.cumple_nivel2
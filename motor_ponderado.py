@@ -0,0 +1,96 @@
+# motor_ponderado.py
+# Este archivo implementa la puntuación ponderada de carteras: cada pregunta tiene un peso
+# dentro de su KPA (definido en el cuestionario) y el porcentaje de una KPA es
+# suma(peso × valor) / suma(pesos) × 100
+# Toda la cartera se puntúa con un solo producto de matrices:
+# (proyectos × preguntas) · (preguntas × KPAs), disperso cuando el banco de preguntas es grande
+# El resultado es el de porcentaje.porcentaje_ponderado, la cuenta que hace evaluar_kpa para cada KPA;
+# con todos los pesos a 1 es idéntico al de motor_vectorial
+
+import numpy as np  # Dependencia opcional: solo la necesito para los motores vectorizados
+from cuestionario import cuestionario_por_defecto  # Cuestionario incluido (todos los pesos a 1)
+from motor_vectorial import clasificar_porcentajes  # Redondeo y estados idénticos a la ruta original
+
+
+# A partir de este número de preguntas uso el producto disperso en lugar de la matriz de pesos densa
+# (la matriz densa tiene preguntas × KPAs casillas, pero solo una por fila es distinta de cero)
+UMBRAL_DISPERSO = 2000
+
+
+class ModeloPonderado:
+    """
+    Matrices de un cuestionario preparadas para puntuar carteras:
+    la tabla de valores por código de opción y los pesos de cada pregunta en forma densa
+    (preguntas × KPAs) o dispersa (peso de cada fila e inicio de cada KPA, como una matriz CSR
+    con un único elemento por fila).
+    """
+
+    def __init__(self, cuestionario=None):
+        self.cuestionario = cuestionario or cuestionario_por_defecto()
+        c = self.cuestionario
+        # Código de cada opción en la matriz de respuestas: su posición en c.valores empezando en 1
+        # (0 queda para "sin responder"); con las opciones '1', '2', '3' coincide con int(opción)
+        self.codigo_opcion = {o: i + 1 for i, o in enumerate(c.valores)}
+        self.tabla_valores = np.array([np.nan] + list(c.valores.values()), dtype=np.float64)
+        self.inicio_kpa = np.array(c.inicio_kpa[:-1], dtype=np.intp)
+        self.pesos = np.array(c.pesos, dtype=np.float64)
+        self.disperso = c.total_preguntas > UMBRAL_DISPERSO
+
+        # Suma de pesos de cada KPA (el denominador del porcentaje); 0 si la KPA no tiene preguntas
+        self.suma_pesos = np.array(
+            [sum(c.pesos[c.inicio_kpa[k]:c.inicio_kpa[k + 1]]) for k in range(len(c.nombres_kpa))],
+            dtype=np.float64)
+        if not self.disperso:
+            # Matriz densa de pesos: la fila de cada pregunta solo tiene su peso en la columna de su KPA
+            self.matriz_pesos = np.zeros((c.total_preguntas, len(c.nombres_kpa)), dtype=np.float64)
+            for k in range(len(c.nombres_kpa)):
+                inicio, fin = c.inicio_kpa[k], c.inicio_kpa[k + 1]
+                self.matriz_pesos[inicio:fin, k] = self.pesos[inicio:fin]
+
+    def matriz_respuestas(self, proyectos):
+        """
+        Construyo la matriz uint8 (proyectos × preguntas) a partir de diccionarios {kpa: [opciones]}.
+        """
+        c = self.cuestionario
+        proyectos = list(proyectos)
+        matriz = np.zeros((len(proyectos), c.total_preguntas), dtype=np.uint8)
+        for fila, respuestas in enumerate(proyectos):
+            matriz[fila] = [self.codigo_opcion[o] for kpa in c.nombres_kpa for o in respuestas[kpa]]
+        return matriz
+
+    def sumas_ponderadas(self, valores):
+        """
+        Producto (proyectos × preguntas) · (preguntas × KPAs) de los valores por la matriz de pesos.
+        En forma dispersa multiplico cada columna por su peso y sumo los tramos de cada KPA,
+        que es exactamente el producto por una matriz con un solo peso por fila.
+        """
+        if self.disperso:
+            if valores.shape[1] == 0:
+                return np.zeros((valores.shape[0], len(self.suma_pesos)))
+            sumas = np.add.reduceat(valores * self.pesos, self.inicio_kpa, axis=1)
+            # reduceat devuelve un elemento en lugar de 0 para las KPAs vacías
+            sumas[:, self.suma_pesos == 0] = 0
+            return sumas
+        return valores @ self.matriz_pesos
+
+    def puntuar(self, matriz):
+        """
+        Puntúo una cartera completa y devuelvo el mismo diccionario de arrays que
+        motor_vectorial.puntuar_matriz (porcentajes, estados, contadores y cumple_nivel2).
+        """
+        matriz = np.asarray(matriz, dtype=np.uint8)
+        if matriz.ndim != 2 or matriz.shape[1] != self.cuestionario.total_preguntas:
+            raise ValueError(f"La matriz debe tener {self.cuestionario.total_preguntas} columnas (una por pregunta).")
+        if matriz.size and matriz.max() >= len(self.tabla_valores):
+            raise ValueError("La matriz contiene opciones no válidas.")
+        valores = self.tabla_valores[matriz]
+        if np.isnan(valores).any():
+            raise ValueError("La matriz contiene opciones vacías o no válidas.")
+
+        sumas = self.sumas_ponderadas(valores)
+        # Misma forma de calcular que evaluar_kpa: (suma / total) * 100, o 0 si la KPA no tiene preguntas
+        porcentajes = np.zeros_like(sumas)
+        con_preguntas = self.suma_pesos > 0
+        porcentajes[:, con_preguntas] = (sumas[:, con_preguntas] / self.suma_pesos[con_preguntas]) * 100
+        return clasificar_porcentajes(porcentajes)
+
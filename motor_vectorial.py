@@ -0,0 +1,122 @@
+# motor_vectorial.py
+# Este archivo implementa un motor de puntuación vectorizado con NumPy para carteras grandes
+# Trabajo sobre una matriz uint8 de respuestas (una fila por proyecto, una columna por pregunta)
+# y calculo porcentajes, estados y el veredicto de Nivel 2 con operaciones de arrays
+# Los resultados son idénticos bit a bit a los de la ruta por diccionarios (evaluar_kpa)
+
+import numpy as np  # Dependencia opcional: solo la necesito para este motor
+from KPAS import KPAS  # Cargo las 5 KPAs con sus preguntas
+from VALOR_RESPUESTA import VALOR_RESPUESTA  # Valores numéricos de cada opción
+from porcentaje import estado_porcentaje  # Clasificación por porcentaje (única fuente de los umbrales)
+
+
+# Orden fijo de los estados: el código de cada KPA es la posición en esta tupla
+ESTADOS = ("Implementada", "Parcialmente implementada", "Deficiente")
+
+# Nombres de las KPAs en el mismo orden que las columnas de la matriz
+NOMBRES_KPA = tuple(KPAS.keys())
+
+# Número de preguntas de cada KPA y posición de su primera columna en la matriz
+PREGUNTAS_POR_KPA = np.array([len(p) for p in KPAS.values()], dtype=np.intp)
+INICIO_KPA = np.concatenate(([0], np.cumsum(PREGUNTAS_POR_KPA)[:-1])).astype(np.intp)
+TOTAL_PREGUNTAS = int(PREGUNTAS_POR_KPA.sum())
+
+
+def tabla_valores():
+    """
+    Convierto VALOR_RESPUESTA en un array de búsqueda indexado por el código de opción.
+    La posición 0 queda como NaN para detectar respuestas vacías.
+    """
+    tabla = np.full(max(int(o) for o in VALOR_RESPUESTA) + 1, np.nan)
+    for opcion, valor in VALOR_RESPUESTA.items():
+        tabla[int(opcion)] = valor
+    return tabla
+
+
+# Tabla de búsqueda calculada una sola vez al importar el módulo
+TABLA_VALORES = tabla_valores()
+
+
+def matriz_respuestas(proyectos):
+    """
+    Construyo la matriz uint8 (proyectos × preguntas) a partir de diccionarios
+    {kpa: [opción de cada pregunta]}, como los que devuelve evaluacion_lotes.
+    """
+    proyectos = list(proyectos)
+    matriz = np.zeros((len(proyectos), TOTAL_PREGUNTAS), dtype=np.uint8)
+    for fila, respuestas in enumerate(proyectos):
+        # Concateno las opciones de todas las KPAs en el orden de KPAS
+        matriz[fila] = [int(o) for kpa in NOMBRES_KPA for o in respuestas[kpa]]
+    return matriz
+
+
+def puntuar_matriz(matriz):
+    """
+    Puntúo una cartera completa de una sola vez.
+    Devuelvo un diccionario de arrays:
+      - "porcentajes": (proyectos × KPAs) redondeados a 2 decimales como en evaluar_kpa
+      - "estados": códigos (proyectos × KPAs) con la posición en ESTADOS
+      - "implementadas", "parciales", "deficientes": contadores por proyecto
+      - "cumple_nivel2": booleano por proyecto
+    """
+    matriz = np.asarray(matriz, dtype=np.uint8)
+    if matriz.ndim != 2 or matriz.shape[1] != TOTAL_PREGUNTAS:
+        raise ValueError(f"La matriz debe tener {TOTAL_PREGUNTAS} columnas (una por pregunta).")
+
+    # Paso cada opción a su valor numérico con la tabla de búsqueda
+    if matriz.size and matriz.max() >= len(TABLA_VALORES):
+        raise ValueError("La matriz contiene opciones no válidas.")
+    valores = TABLA_VALORES[matriz]
+    if np.isnan(valores).any():
+        raise ValueError("La matriz contiene opciones vacías o no válidas.")
+
+    # Sumo los valores de cada bloque de preguntas (una KPA) y calculo el porcentaje
+    # con las mismas operaciones que la versión CLI: (suma / número de preguntas) * 100
+    sumas = np.add.reduceat(valores, INICIO_KPA, axis=1)
+    porcentajes = (sumas / PREGUNTAS_POR_KPA) * 100
+
+    return clasificar_porcentajes(porcentajes)
+
+
+def clasificar_porcentajes(porcentajes):
+    """
+    A partir de la matriz (proyectos × KPAs) de porcentajes sin redondear calculo el diccionario
+    de resultados de puntuar_matriz: porcentajes redondeados, estados, contadores y veredicto.
+    """
+    # Redondeo y clasifico cada porcentaje distinto con las funciones originales (round() de Python
+    # y estado_porcentaje). Como los porcentajes posibles son muy pocos, esto es casi gratis y
+    # garantiza exactamente el mismo resultado que la ruta por diccionarios
+    unicos, inversa = np.unique(porcentajes, return_inverse=True)
+    inversa = inversa.reshape(porcentajes.shape)
+    redondeados = np.array([round(float(v), 2) for v in unicos], dtype=np.float64)
+    estados = np.array([ESTADOS.index(estado_porcentaje(float(v))) for v in unicos], dtype=np.uint8)
+    porcentajes_redondeados = redondeados[inversa]
+    codigos_estado = estados[inversa]
+
+    # Cuento los estados de cada proyecto y decido el veredicto de Nivel 2
+    implementadas = np.count_nonzero(codigos_estado == 0, axis=1)
+    parciales = np.count_nonzero(codigos_estado == 1, axis=1)
+    deficientes = np.count_nonzero(codigos_estado == 2, axis=1)
+
+    return {
+        "porcentajes": porcentajes_redondeados,
+        "estados": codigos_estado,
+        "implementadas": implementadas,
+        "parciales": parciales,
+        "deficientes": deficientes,
+        "cumple_nivel2": implementadas == porcentajes.shape[1],
+    }
+
+
+def resumen_proyecto(puntuacion, fila):
+    """
+    Devuelvo para un proyecto el mismo (resumen, cumple_nivel2) que diagnostico_general.
+    """
+    resumen = {
+        "implementadas": int(puntuacion["implementadas"][fila]),
+        "parciales": int(puntuacion["parciales"][fila]),
+        "deficientes": int(puntuacion["deficientes"][fila]),
+        "por_kpa": {kpa: float(p) for kpa, p in zip(NOMBRES_KPA, puntuacion["porcentajes"][fila])},
+    }
+    return resumen, bool(puntuacion["cumple_nivel2"][fila])
+
@@ -0,0 +1,259 @@
+# optimizador_nivel2.py
+# Este archivo calcula el plan de mejora más barato para que un proyecto cumpla el Nivel 2
+# recomendaciones_para_alcanzar_nivel2 solo lista todas las recomendaciones de las KPAs que fallan;
+# aquí busco el conjunto mínimo de prácticas que hay que mejorar (Parcial → Sí, No → Parcial o Sí)
+# para que todas las KPAs lleguen a "Implementada" (≥ 80%)
+# Cada KPA se puede optimizar por separado (su porcentaje solo depende de sus preguntas), así que el plan
+# del proyecto es la suma de los planes óptimos de cada KPA. Con 5 preguntas solo hay 3^5 = 243 patrones
+# por KPA: precalculo el plan óptimo de cada uno y después planificar un proyecto son 5 búsquedas
+
+import json  # Para leer los esfuerzos y escribir los planes
+import sys  # Para devolver un código de salida y escribir errores
+from KPAS import KPAS  # Cargo las 5 KPAs con sus preguntas
+from VALOR_RESPUESTA import VALOR_RESPUESTA  # Valores numéricos de las respuestas
+from porcentaje import estado_porcentaje  # Clasificación por porcentaje
+from tabla_recomendaciones import MAX_PREGUNTAS_TABLA, TEXTO_OPCION  # Límite de las tablas y texto de cada opción
+
+
+# Opciones en el mismo orden que los dígitos de los patrones de TablaRecomendaciones ('1', '2', '3')
+OPCIONES = tuple(VALOR_RESPUESTA.keys())
+
+# Escalón de cada opción, de menos a más valor: No 0, Parcial 1, Sí 2
+# Mejorar una pregunta cuesta su esfuerzo por cada escalón que sube (No → Sí son dos escalones)
+ESCALON = {o: i for i, o in enumerate(sorted(VALOR_RESPUESTA, key=VALOR_RESPUESTA.get))}
+
+# Opción con la que planifico una pregunta sin responder (cuenta con el valor mínimo, como al puntuar)
+OPCION_OMITIDA = min(VALOR_RESPUESTA, key=VALOR_RESPUESTA.get)
+
+
+def patrones(num_preguntas):
+    """
+    Genero todas las combinaciones de opciones de una KPA en el orden de su índice
+    (número en base 3 con la primera pregunta como dígito menos significativo).
+    """
+    base = len(OPCIONES)
+    for indice in range(base ** num_preguntas):
+        opciones = []
+        for _ in range(num_preguntas):
+            indice, digito = divmod(indice, base)
+            opciones.append(OPCIONES[digito])
+        yield tuple(opciones)
+
+
+def implementada(opciones):
+    """
+    Compruebo si unas opciones dejan la KPA como "Implementada", con la misma cuenta que evaluar_kpa.
+    """
+    return estado_porcentaje((sum(VALOR_RESPUESTA[o] for o in opciones) / len(opciones)) * 100) == "Implementada"
+
+
+def cargar_esfuerzos(ruta):
+    """
+    Leo un JSON {kpa: [esfuerzo de cada pregunta]}; las KPAs que falten cuentan 1 por pregunta.
+    """
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class OptimizadorNivel2:
+    """
+    Plan de mejora de coste mínimo por KPA y por proyecto.
+    El coste de mejorar una pregunta es su esfuerzo (1 por defecto) por cada escalón que sube;
+    entre planes del mismo coste prefiero el que cambia menos preguntas.
+    Las tablas de cada KPA se compilan la primera vez que se usan y después se comparten.
+    """
+
+    def __init__(self, esfuerzos=None, kpas=None):
+        self.kpas = kpas or KPAS
+        esfuerzos = esfuerzos or {}
+        if not isinstance(esfuerzos, dict):
+            raise ValueError("Los esfuerzos deben ser un diccionario {kpa: [esfuerzo de cada pregunta]}.")
+        desconocidas = set(esfuerzos) - set(self.kpas)
+        if desconocidas:
+            raise ValueError(f"Esfuerzos de KPAs desconocidas: {', '.join(sorted(desconocidas))}.")
+        self.esfuerzos = {}
+        for kpa, preguntas in self.kpas.items():
+            lista = esfuerzos.get(kpa, [1.0] * len(preguntas))
+            if not isinstance(lista, list) or len(lista) != len(preguntas):
+                raise ValueError(f"'{kpa}' necesita una lista con el esfuerzo de sus {len(preguntas)} preguntas.")
+            if any(isinstance(e, bool) or not isinstance(e, (int, float)) or e < 0 for e in lista):
+                raise ValueError(f"Los esfuerzos de '{kpa}' deben ser números no negativos.")
+            self.esfuerzos[kpa] = tuple(float(e) for e in lista)
+        self.digito = {o: i for i, o in enumerate(OPCIONES)}
+        self.tablas = {}  # kpa -> lista (coste, cambios) por índice de patrón
+
+    def mejor_plan(self, kpa, opciones, objetivos):
+        """
+        Recorro los patrones objetivo (los que dejan la KPA implementada) alcanzables desde las opciones
+        actuales sin empeorar ninguna pregunta y me quedo con el más barato.
+        Devuelvo (coste, cambios) con cambios = ((pregunta, desde, hasta, coste), ...).
+        """
+        esfuerzos = self.esfuerzos[kpa]
+        mejor = None
+        for objetivo in objetivos:
+            coste, cambios = 0.0, []
+            for i, (actual, nueva) in enumerate(zip(opciones, objetivo)):
+                subida = ESCALON[nueva] - ESCALON[actual]
+                if subida < 0:
+                    break  # Este objetivo empeoraría una pregunta
+                if subida:
+                    coste_cambio = esfuerzos[i] * subida
+                    coste += coste_cambio
+                    cambios.append((i, actual, nueva, coste_cambio))
+            else:
+                clave = (round(coste, 9), len(cambios))
+                if mejor is None or clave < mejor[0]:
+                    mejor = (clave, coste, tuple(cambios))
+        return mejor[1], mejor[2]
+
+    def compilar(self, kpa):
+        """
+        Calculo el plan óptimo de los 3^n patrones de una KPA.
+        """
+        n = len(self.kpas[kpa])
+        objetivos = [p for p in patrones(n) if implementada(p)]
+        if not objetivos:
+            raise ValueError(f"La KPA '{kpa}' no puede llegar a 'Implementada'.")
+        tabla = self.tablas[kpa] = [self.mejor_plan(kpa, p, objetivos) for p in patrones(n)]
+        return tabla
+
+    def indice_patron(self, opciones):
+        indice, peso = 0, 1
+        for o in opciones:
+            indice += self.digito[o or OPCION_OMITIDA] * peso
+            peso *= len(OPCIONES)
+        return indice
+
+    def plan_kpa(self, kpa, opciones):
+        """
+        Devuelvo (coste, cambios) del plan óptimo de una KPA; (0, ()) si ya está implementada.
+        """
+        n = len(self.kpas[kpa])
+        if len(opciones) != n:
+            raise ValueError(f"'{kpa}' necesita {n} respuestas.")
+        if n > MAX_PREGUNTAS_TABLA:
+            # Demasiados patrones para una tabla: busco directamente sobre este proyecto
+            opciones = tuple(o or OPCION_OMITIDA for o in opciones)
+            return self.mejor_plan(kpa, opciones, [p for p in patrones(n) if implementada(p)])
+        tabla = self.tablas.get(kpa)
+        if tabla is None:
+            tabla = self.compilar(kpa)
+        return tabla[self.indice_patron(opciones)]
+
+    def plan(self, respuestas):
+        """
+        Plan de mejora de un proyecto {kpa: [opciones]}: coste total, coste por KPA y la lista
+        de cambios ordenada de más barato a más caro (primero las mejoras rápidas).
+        """
+        por_kpa, cambios = {}, []
+        for posicion, (kpa, preguntas) in enumerate(self.kpas.items()):
+            coste, cambios_kpa = self.plan_kpa(kpa, respuestas[kpa])
+            por_kpa[kpa] = coste
+            for i, desde, hasta, coste_cambio in cambios_kpa:
+                cambios.append((coste_cambio, posicion, i, {
+                    "kpa": kpa,
+                    "pregunta": i + 1,
+                    "texto": preguntas[i],
+                    "desde": TEXTO_OPCION[desde],
+                    "hasta": TEXTO_OPCION[hasta],
+                    "coste": coste_cambio,
+                }))
+        cambios.sort(key=lambda c: c[:3])
+        return {
+            "cumple_nivel2": not cambios,
+            "coste": sum(por_kpa.values()),
+            "coste_por_kpa": por_kpa,
+            "cambios": [c[3] for c in cambios],
+        }
+
+    def costes_matriz(self, matriz):
+        """
+        Coste mínimo de cada KPA para toda una cartera de golpe (matriz uint8 proyectos × preguntas
+        con los códigos 1, 2, 3 de motor_vectorial). Devuelvo (costes proyectos × KPAs, cambios por proyecto).
+        """
+        import numpy as np
+        matriz = np.asarray(matriz, dtype=np.intp)
+        costes = np.zeros((matriz.shape[0], len(self.kpas)), dtype=np.float64)
+        num_cambios = np.zeros(matriz.shape[0], dtype=np.intp)
+        inicio = 0
+        for k, (kpa, preguntas) in enumerate(self.kpas.items()):
+            n = len(preguntas)
+            tabla = self.tablas.get(kpa) or self.compilar(kpa)
+            # Índice del patrón: los códigos 1, 2, 3 son los dígitos 0, 1, 2 (las omitidas, 0, cuentan como "No")
+            codigos = matriz[:, inicio:inicio + n]
+            digitos = np.where(codigos == 0, self.digito[OPCION_OMITIDA], codigos - 1)
+            indices = digitos @ (len(OPCIONES) ** np.arange(n, dtype=np.intp))
+            costes[:, k] = np.array([c for c, _ in tabla])[indices]
+            num_cambios += np.array([len(cambios) for _, cambios in tabla], dtype=np.intp)[indices]
+            inicio += n
+        return costes, num_cambios
+
+
+def planificar_archivo(ruta_entrada, ruta_salida=None, optimizador=None, formato=None):
+    """
+    Calculo el plan de cada proyecto de un archivo de respuestas (CSV o JSONL) y, si hay salida,
+    escribo una línea JSON por proyecto. Devuelvo los totales de la cartera:
+    proyectos, cuántos ya cumplen, coste total y cuántas veces aparece cada mejora.
+    """
+    from evaluacion_lotes import formato_por_extension, leer_respuestas
+    optimizador = optimizador or OptimizadorNivel2()
+    totales = {"proyectos": 0, "cumplen_nivel2": 0, "coste": 0.0, "mejoras": {}}
+    salida = open(ruta_salida, "w", encoding="utf-8", newline="\n") if ruta_salida else None
+    try:
+        with open(ruta_entrada, encoding="utf-8", newline="") as entrada:
+            for nombre, respuestas in leer_respuestas(entrada, formato or formato_por_extension(ruta_entrada)):
+                plan = optimizador.plan(respuestas)
+                totales["proyectos"] += 1
+                totales["cumplen_nivel2"] += plan["cumple_nivel2"]
+                totales["coste"] += plan["coste"]
+                for c in plan["cambios"]:
+                    clave = (c["kpa"], c["pregunta"], c["desde"], c["hasta"])
+                    totales["mejoras"][clave] = totales["mejoras"].get(clave, 0) + 1
+                if salida:
+                    salida.write(json.dumps({"proyecto": nombre, **plan}, ensure_ascii=False) + "\n")
+    finally:
+        if salida:
+            salida.close()
+    return totales
+
+
+def main(argv=None):
+    """
+    Calculo los planes de mejora de una cartera y muestro el resumen y las mejoras más frecuentes.
+    """
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Plan de mejora mínimo para cumplir el Nivel 2 de CMMI.")
+    parser.add_argument("entrada", help="Archivo de respuestas (.csv o .jsonl)")
+    parser.add_argument("--salida", help="Archivo JSON Lines con el plan de cada proyecto")
+    parser.add_argument("--esfuerzos", help="JSON {kpa: [esfuerzo de cada pregunta]} (por defecto 1 por pregunta)")
+    parser.add_argument("--formato", choices=("csv", "jsonl"), help="Formato de entrada (por defecto según la extensión)")
+    parser.add_argument("--mejoras", type=int, default=10, help="Mejoras más frecuentes que muestro")
+    args = parser.parse_args(argv)
+
+    try:
+        optimizador = OptimizadorNivel2(cargar_esfuerzos(args.esfuerzos) if args.esfuerzos else None)
+        inicio = time.perf_counter()
+        totales = planificar_archivo(args.entrada, args.salida, optimizador, args.formato)
+        segundos = time.perf_counter() - inicio
+    except (OSError, ValueError, KeyError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+
+    proyectos = totales["proyectos"]
+    print(f"Proyectos planificados: {proyectos}"
+          + (f" ({segundos / proyectos * 1e6:.1f} µs por proyecto, con lectura)" if proyectos else ""))
+    print(f"  Ya cumplen el Nivel 2: {totales['cumplen_nivel2']}")
+    if proyectos:
+        print(f"  Coste medio del plan: {totales['coste'] / proyectos:.2f}")
+    frecuentes = sorted(totales["mejoras"].items(), key=lambda m: -m[1])[:max(args.mejoras, 0)]
+    if frecuentes:
+        print("Mejoras más frecuentes:")
+        for (kpa, pregunta, desde, hasta), veces in frecuentes:
+            print(f"  {veces:>8}  [{kpa}] {KPAS[kpa][pregunta - 1]} ({desde} → {hasta})")
+    return 0
+
+
+# Este bloque solo se ejecuta si ejecuto este archivo directamente (no si lo importo)
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+# perfilado.py
+# Este archivo mide dónde se va el tiempo en la evaluación: lectura de respuestas, puntuación de cada KPA,
+# recomendaciones, diagnóstico, formato de informes y construcción de pantallas de Tk
+# Marco las funciones de cada etapa con @etapa() y los bloques con "with tramo(nombre):"
+# Desactivado no cuesta nada: @etapa() devuelve la función original sin envolver
+# Se activa con la variable de entorno CMMI_PERFILADO (texto o json) o con la opción --perfilar de
+# las herramientas de línea de comandos; al salir escribo un resumen por etapa (llamadas, tiempo total,
+# medio y máximo con perf_counter_ns y, opcionalmente, memoria reservada con tracemalloc)
+
+import os  # Para leer la configuración de las variables de entorno
+import sys  # Para sustituir las funciones ya importadas y escribir el resumen
+import time  # perf_counter_ns para medir cada llamada
+
+
+# Estado del perfilado (solo lo cambia activar)
+ACTIVO = False
+MEMORIA = False  # Si mido también la memoria reservada (tracemalloc)
+FORMATO = "texto"  # Formato del resumen: texto o json
+SALIDA = None  # Archivo del resumen (None = salida de errores)
+INICIO = 0  # Momento de la activación (ns)
+
+FORMATOS = ("texto", "json")
+
+# Valores de las variables de entorno que cuentan como desactivado o como activado (en formato texto)
+VALORES_FALSOS = ("", "0", "no", "false", "off")
+VALORES_VERDADEROS = ("1", "si", "sí", "yes", "true", "on")
+
+# Estadísticas por etapa: nombre -> [llamadas, ns totales, ns máximo, bytes netos reservados]
+ETAPAS = {}
+
+# Funciones marcadas con @etapa: (función original, nombre de la etapa)
+REGISTRO = []
+
+
+def estadisticas(nombre):
+    datos = ETAPAS.get(nombre)
+    if datos is None:
+        datos = ETAPAS[nombre] = [0, 0, 0, 0]
+    return datos
+
+
+def anotar(datos, ns, memoria=0):
+    datos[0] += 1
+    datos[1] += ns
+    if ns > datos[2]:
+        datos[2] = ns
+    datos[3] += memoria
+
+
+def envolver(funcion, nombre):
+    """
+    Devuelvo la función envuelta con la medición de la etapa.
+    Los contadores no llevan cerrojo: desde varios hilos a la vez puede perderse alguna llamada.
+    """
+    import functools
+    datos = estadisticas(nombre)
+    reloj = time.perf_counter_ns
+
+    if MEMORIA:
+        import tracemalloc
+        memoria_actual = tracemalloc.get_traced_memory
+
+        @functools.wraps(funcion)
+        def medida(*args, **kwargs):
+            antes = memoria_actual()[0]
+            inicio = reloj()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                anotar(datos, reloj() - inicio, memoria_actual()[0] - antes)
+    else:
+        @functools.wraps(funcion)
+        def medida(*args, **kwargs):
+            inicio = reloj()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                ns = reloj() - inicio
+                datos[0] += 1
+                datos[1] += ns
+                if ns > datos[2]:
+                    datos[2] = ns
+    medida.etapa_perfilado = nombre
+    return medida
+
+
+def nombre_modulo(modulo):
+    """
+    Nombre del módulo para las etapas; el programa principal se llama por su archivo, no "__main__".
+    """
+    if modulo == "__main__":
+        archivo = getattr(sys.modules.get(modulo), "__file__", None)
+        if archivo:
+            return os.path.splitext(os.path.basename(archivo))[0]
+    return modulo
+
+
+def etapa(nombre=None):
+    """
+    Decorador que marca una función como etapa (por defecto con el nombre modulo.funcion).
+    Si el perfilado no está activo devuelvo la función tal cual.
+    """
+    def marcar(funcion):
+        nombre_etapa = nombre or f"{nombre_modulo(funcion.__module__)}.{funcion.__qualname__}"
+        REGISTRO.append((funcion, nombre_etapa))
+        return envolver(funcion, nombre_etapa) if ACTIVO else funcion
+    return marcar
+
+
+class Tramo:
+    """
+    Bloque medido con "with tramo(nombre):".
+    """
+    __slots__ = ("datos", "inicio", "antes")
+
+    def __init__(self, nombre):
+        self.datos = estadisticas(nombre)
+
+    def __enter__(self):
+        if MEMORIA:
+            import tracemalloc
+            self.antes = tracemalloc.get_traced_memory()[0]
+        self.inicio = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        ns = time.perf_counter_ns() - self.inicio
+        memoria = 0
+        if MEMORIA:
+            import tracemalloc
+            memoria = tracemalloc.get_traced_memory()[0] - self.antes
+        anotar(self.datos, ns, memoria)
+        return False
+
+
+class TramoNulo:
+    """
+    Bloque sin medición (perfilado desactivado). Hay una sola instancia compartida.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+TRAMO_NULO = TramoNulo()
+
+
+def tramo(nombre):
+    """
+    Devuelvo el contexto que mide un bloque de código, o uno vacío si el perfilado no está activo.
+    """
+    return Tramo(nombre) if ACTIVO else TRAMO_NULO
+
+
+# Carpeta del proyecto: solo sustituyo funciones en los módulos que están en ella
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def modulos_del_proyecto():
+    """
+    Devuelvo los módulos cargados que son del proyecto (los de su carpeta, también el programa principal).
+    """
+    for modulo in list(sys.modules.values()):
+        archivo = getattr(modulo, "__file__", None)
+        if archivo and os.path.dirname(os.path.abspath(archivo)) == DIRECTORIO:
+            yield modulo
+
+
+def sustituir_en(espacio, envueltas, asignar):
+    """
+    Sustituyo en un espacio de nombres (el __dict__ de un módulo, clase u objeto) las funciones marcadas.
+    """
+    for atributo, valor in list(espacio.items()):
+        if id(valor) in envueltas:
+            asignar(atributo, envueltas[id(valor)])
+
+
+def sustituir_funciones():
+    """
+    Envuelvo las funciones marcadas que se importaron antes de activar el perfilado.
+    Las busco en los módulos del proyecto (también las copiadas con "from x import f"), en sus clases
+    (los métodos) y en los objetos de esos módulos que guardan una función en un atributo
+    (por ejemplo, el generador de una TablaRecomendaciones).
+    """
+    envueltas = {id(f): envolver(f, nombre) for f, nombre in REGISTRO}
+    modulos = list(modulos_del_proyecto())
+    nombres = {modulo.__name__ for modulo in modulos}
+    for modulo in modulos:
+        espacio = modulo.__dict__
+        sustituir_en(espacio, envueltas, espacio.__setitem__)
+        for valor in list(espacio.values()):
+            if isinstance(valor, type):
+                if valor.__module__ == modulo.__name__:
+                    sustituir_en(dict(vars(valor)), envueltas, lambda a, f, c=valor: setattr(c, a, f))
+            elif type(valor).__module__ in nombres and isinstance(getattr(valor, "__dict__", None), dict):
+                # Objeto de una clase del proyecto: sus atributos pueden guardar una etapa
+                sustituir_en(valor.__dict__, envueltas, valor.__dict__.__setitem__)
+
+
+def activar(formato="texto", salida=None, memoria=False):
+    """
+    Activo el perfilado: envuelvo las etapas ya importadas y escribo el resumen al salir del programa.
+    """
+    global ACTIVO, MEMORIA, FORMATO, SALIDA, INICIO
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de perfilado desconocido: '{formato}' (usa texto o json).")
+    FORMATO, SALIDA = formato, salida
+    if ACTIVO:
+        return
+    if memoria:
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+    MEMORIA = memoria
+    ACTIVO = True
+    INICIO = time.perf_counter_ns()
+    sustituir_funciones()
+    import atexit
+    atexit.register(volcar)
+
+
+def activar_desde_entorno():
+    """
+    Activo el perfilado si lo piden las variables de entorno:
+    CMMI_PERFILADO (1, texto o json), CMMI_PERFILADO_SALIDA (archivo) y CMMI_PERFILADO_MEMORIA (1).
+    Un valor que no entiendo no puede romper la importación: aviso por la salida de errores y sigo sin perfilar.
+    """
+    valor = os.environ.get("CMMI_PERFILADO", "").strip().lower()
+    if valor in VALORES_FALSOS:
+        return
+    if valor in VALORES_VERDADEROS:
+        valor = "texto"
+    if valor not in FORMATOS:
+        sys.stderr.write(f"Aviso: CMMI_PERFILADO='{valor}' no es válido (usa 1, texto o json); perfilado desactivado.\n")
+        return
+    activar(valor, os.environ.get("CMMI_PERFILADO_SALIDA") or None,
+            os.environ.get("CMMI_PERFILADO_MEMORIA", "").strip().lower() not in VALORES_FALSOS)
+
+
+def agregar_argumentos(parser):
+    """
+    Añado a un ArgumentParser las opciones --perfilar, --perfilar-salida y --perfilar-memoria.
+    """
+    parser.add_argument("--perfilar", nargs="?", const="texto", choices=FORMATOS,
+                        help="Al salir, muestro el tiempo de cada etapa (texto o json)")
+    parser.add_argument("--perfilar-salida", metavar="RUTA", help="Escribo el resumen del perfilado en este archivo")
+    parser.add_argument("--perfilar-memoria", action="store_true",
+                        help="Mido también la memoria reservada por etapa (tracemalloc, más lento)")
+
+
+def activar_desde_argumentos(args):
+    """
+    Activo el perfilado si se pidió con las opciones de agregar_argumentos.
+    """
+    if args.perfilar or args.perfilar_salida or args.perfilar_memoria:
+        activar(args.perfilar or FORMATO, args.perfilar_salida, args.perfilar_memoria)
+
+
+def resumen():
+    """
+    Devuelvo el resumen del perfilado como diccionario, con las etapas de más a menos tiempo.
+    """
+    duracion = (time.perf_counter_ns() - INICIO) if ACTIVO else 0
+    etapas = {}
+    for nombre, (llamadas, total, maximo, memoria) in sorted(ETAPAS.items(), key=lambda e: -e[1][1]):
+        if not llamadas:
+            continue
+        etapas[nombre] = {
+            "llamadas": llamadas,
+            "total_ms": round(total / 1e6, 3),
+            "media_us": round(total / llamadas / 1e3, 3),
+            "maximo_us": round(maximo / 1e3, 3),
+            "porcentaje": round(100 * total / duracion, 2) if duracion else None,
+        }
+        if MEMORIA:
+            etapas[nombre]["memoria_bytes"] = memoria
+    return {"duracion_ms": round(duracion / 1e6, 3), "memoria": MEMORIA, "etapas": etapas}
+
+
+def texto_resumen(datos):
+    """
+    Formateo el resumen como tabla de texto.
+    Las etapas anidadas se solapan, así que los porcentajes pueden sumar más de 100.
+    """
+    lineas = [f"Perfilado por etapa ({datos['duracion_ms']:.1f} ms desde la activación)"]
+    ancho = max([len("Etapa")] + [len(nombre) for nombre in datos["etapas"]])
+    cabecera = f"{'Etapa':{ancho}} {'Llamadas':>10} {'Total ms':>12} {'Media µs':>12} {'Máx µs':>12} {'%':>7}"
+    if datos["memoria"]:
+        cabecera += f" {'Memoria KiB':>12}"
+    lineas.append(cabecera)
+    for nombre, e in datos["etapas"].items():
+        linea = (f"{nombre:{ancho}} {e['llamadas']:>10} {e['total_ms']:>12.3f} {e['media_us']:>12.3f} "
+                 f"{e['maximo_us']:>12.3f} {e['porcentaje'] if e['porcentaje'] is not None else 0:>7.2f}")
+        if datos["memoria"]:
+            linea += f" {e['memoria_bytes'] / 1024:>12.1f}"
+        lineas.append(linea)
+    if not datos["etapas"]:
+        lineas.append("(ninguna etapa medida)")
+    return "\n".join(lineas) + "\n"
+
+
+def volcar():
+    """
+    Escribo el resumen (se llama al salir del programa).
+    """
+    datos = resumen()
+    if FORMATO == "json":
+        import json
+        texto = json.dumps(datos, ensure_ascii=False, indent=2) + "\n"
+    else:
+        texto = texto_resumen(datos)
+    if SALIDA:
+        with open(SALIDA, "w", encoding="utf-8") as f:
+            f.write(texto)
+    else:
+        sys.stderr.write(texto)
+
+
+def reiniciar():
+    """
+    Pongo a cero las estadísticas (por ejemplo, para medir solo una parte del programa).
+    """
+    global INICIO
+    for datos in ETAPAS.values():
+        datos[:] = [0, 0, 0, 0]
+    INICIO = time.perf_counter_ns()
+
+
+# Con CMMI_PERFILADO activo el perfilado al importar: las etapas se envuelven al definirse
+activar_desde_entorno()
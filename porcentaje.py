@@ -1,6 +1,8 @@
 # Esta función clasifica el nivel de implementación según el porcentaje obtenido
 # La utilizo para asignar etiquetas descriptivas a los resultados numéricos
 
+from VALOR_RESPUESTA import VALOR_RESPUESTA  # Lo necesito para las cotas del modo de veredicto rápido
+
 def estado_porcentaje(pct):
     # Si el porcentaje es 80% o más, considero que la KPA está bien implementada
     if pct >= 80:
@@ -10,4 +12,40 @@ def estado_porcentaje(pct):
         return "Parcialmente implementada"
     # Si es menos del 50%, la KPA está deficiente y requiere atención urgente
     else:
-        return "Deficiente"
\ No newline at end of file
+        return "Deficiente"
+
+
+def porcentaje_ponderado(valores, pesos=None):
+    # Porcentaje de cumplimiento de una KPA: suma(peso × valor) / suma(pesos) × 100
+    # Sin pesos (el cuestionario incluido o uno con todos los pesos a 1) es la media de siempre
+    if pesos is None:
+        return (sum(valores) / len(valores)) * 100 if valores else 0
+    total = sum(pesos)
+    return (sum(p * v for p, v in zip(pesos, valores)) / total) * 100 if total else 0
+
+# --- Cotas para el modo de veredicto rápido ---
+
+# Valor más bajo y más alto que puede aportar una pregunta sin responder
+VALOR_MINIMO = min(VALOR_RESPUESTA.values())
+VALOR_MAXIMO = max(VALOR_RESPUESTA.values())
+
+
+def cotas_porcentaje(valores, extremos=(VALOR_MINIMO, VALOR_MAXIMO), pesos=None):
+    # valores tiene una entrada por pregunta: su valor si ya está respondida o None si falta
+    # Calculo el porcentaje mínimo y máximo que todavía puede alcanzar la KPA cuando se respondan
+    # las demás (de "No" a "Sí"); con pesos, cada pregunta que falta cuenta según su peso
+    # extremos son el valor más bajo y más alto de una respuesta (los de un cuestionario cargado, si se usa)
+    minimo = porcentaje_ponderado([extremos[0] if v is None else v for v in valores], pesos)
+    maximo = porcentaje_ponderado([extremos[1] if v is None else v for v in valores], pesos)
+    return minimo, maximo
+
+
+def estado_decidido(valores, criterio="estado", extremos=(VALOR_MINIMO, VALOR_MAXIMO), pesos=None):
+    # Compruebo si las preguntas que faltan (None en valores) ya no pueden cambiar el resultado de la KPA
+    # Con el criterio "estado" miro el estado completo (Implementada, Parcial o Deficiente)
+    # Con el criterio "nivel2" solo miro si puede llegar o no a "Implementada", que es lo que
+    # decide el veredicto de Nivel 2 (por ejemplo, con dos "No" de cinco ya no llega al 80%)
+    minimo, maximo = cotas_porcentaje(valores, extremos, pesos)
+    if criterio == "nivel2":
+        return (estado_porcentaje(minimo) == "Implementada") == (estado_porcentaje(maximo) == "Implementada")
+    return estado_porcentaje(minimo) == estado_porcentaje(maximo)
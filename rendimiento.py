@@ -0,0 +1,506 @@
+# rendimiento.py
+# Este archivo mide el rendimiento de la herramienta de forma reproducible
+# Genero carteras sintéticas deterministas (1, 1k, 100k y 1M proyectos) y mido la ruta original por
+# diccionarios (evaluar_kpa, generar_recomendaciones_por_respuestas, diagnostico_general,
+# recomendaciones_para_alcanzar_nivel2), el modo por lotes, los motores NumPy, el informe de la
+# consola y la construcción de las pantallas de CMMIApp (con una pantalla virtual si no hay ninguna)
+# Guardo los resultados en JSON junto con los datos del entorno, y --comparar marca las regresiones
+# respecto a una ejecución anterior que superen un umbral
+
+import argparse  # Para leer los argumentos de la línea de comandos
+import io  # Para capturar el informe de la consola
+import itertools  # Para generar los patrones de respuesta
+import json  # Para guardar y leer los resultados
+import os  # Para los datos del entorno y la pantalla virtual
+import platform  # Para los datos del entorno
+import random  # Generador determinista de respuestas
+import statistics  # Mediana de las repeticiones
+import sys  # Para devolver un código de salida y escribir errores
+import time  # Para medir
+from KPAS import KPAS  # Cargo las 5 KPAs con sus preguntas
+
+
+# Versión del formato de resultados
+FORMATO_RESULTADOS = 1
+
+# Tamaños de cartera: etiqueta -> número de proyectos
+TAMANOS = {"1": 1, "1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+
+SEMILLA = 20240601
+GENERADORES = ("uniforme", "plantillas")
+
+# Plantillas distintas del generador "plantillas" (los equipos copian unas pocas respuestas)
+NUM_PLANTILLAS = 256
+
+# Proyectos que convierto a diccionarios de cada vez (fuera de la medición)
+TAM_BLOQUE = 10_000
+
+# Umbral por defecto de --comparar (en %)
+UMBRAL = 10.0
+
+# Preguntas del formulario grande que mido en la GUI
+PREGUNTAS_FORMULARIO = 1000
+
+INICIOS = list(itertools.accumulate([0] + [len(p) for p in KPAS.values()]))
+TOTAL_PREGUNTAS = INICIOS[-1]
+
+
+# --- DATOS SINTÉTICOS ---
+
+class CarteraSintetica:
+    """
+    Cartera de n proyectos guardada como un único bloque de bytes ('1', '2', '3'), una fila de
+    TOTAL_PREGUNTAS opciones por proyecto: 1M proyectos ocupan 25 MB y no millones de diccionarios.
+    Con la misma semilla y el mismo generador siempre sale la misma cartera.
+    """
+
+    def __init__(self, n, generador="plantillas", semilla=SEMILLA):
+        if generador not in GENERADORES:
+            raise ValueError(f"Generador desconocido: '{generador}' (usa {', '.join(GENERADORES)}).")
+        self.n = n
+        rng = random.Random(f"{semilla}:{generador}")
+        if generador == "uniforme":
+            # Cada KPA elige uno de sus 3^k patrones con la misma probabilidad (respuestas independientes)
+            patrones = [["".join(p) for p in itertools.product("123", repeat=len(preguntas))]
+                        for preguntas in KPAS.values()]
+            filas = ("".join(rng.choice(p) for p in patrones) for _ in range(n))
+        else:
+            # Unas pocas plantillas muy repetidas y muchas raras (frecuencia 1/rango, como en la práctica)
+            plantillas = ["".join(rng.choice("123") for _ in range(TOTAL_PREGUNTAS)) for _ in range(NUM_PLANTILLAS)]
+            pesos = list(itertools.accumulate(1 / (i + 1) for i in range(NUM_PLANTILLAS)))
+            filas = (plantillas[i] for i in rng.choices(range(NUM_PLANTILLAS), cum_weights=pesos, k=n))
+        self.texto = "".join(filas).encode("ascii")
+
+    def proyectos(self, inicio=0, fin=None):
+        """
+        Devuelvo los proyectos [inicio, fin) como (nombre, {kpa: [opciones]}), como los lee evaluacion_lotes.
+        """
+        fin = self.n if fin is None else fin
+        texto, proyectos = self.texto, []
+        for i in range(inicio, fin):
+            fila = texto[i * TOTAL_PREGUNTAS:(i + 1) * TOTAL_PREGUNTAS].decode("ascii")
+            proyectos.append((f"P{i}", {kpa: list(fila[a:b]) for kpa, a, b in zip(KPAS, INICIOS, INICIOS[1:])}))
+        return proyectos
+
+    def bloques(self, tam_bloque=TAM_BLOQUE):
+        for inicio in range(0, self.n, tam_bloque):
+            yield self.proyectos(inicio, min(inicio + tam_bloque, self.n))
+
+    def matriz(self):
+        """
+        Matriz uint8 (proyectos × preguntas) para los motores NumPy, sin copiar los bytes.
+        """
+        import numpy as np
+        return (np.frombuffer(self.texto, dtype=np.uint8) - ord("0")).reshape(self.n, TOTAL_PREGUNTAS)
+
+
+# --- CASOS ---
+# Cada caso por diccionarios recibe un bloque de proyectos ya convertido; los casos vectorizados
+# reciben la matriz completa. Solo se mide la llamada al caso
+
+def caso_evaluacion_cmmi(bloque):
+    from evaluacion_cmmi import evaluar_kpa, generar_resumen_general
+    for _, respuestas in bloque:
+        generar_resumen_general([evaluar_kpa(kpa, respuestas[kpa]) for kpa in KPAS])
+
+
+def caso_cli(bloque):
+    from diagnostico_cmmi_nivel2 import construir_resultado_kpa, diagnostico_general, \
+        recomendaciones_para_alcanzar_nivel2
+    for _, respuestas in bloque:
+        resultados = [construir_resultado_kpa(kpa, preguntas, respuestas[kpa]) for kpa, preguntas in KPAS.items()]
+        diagnostico_general(resultados)
+        recomendaciones_para_alcanzar_nivel2(resultados)
+
+
+def caso_recomendaciones(bloque):
+    from diagnostico_cmmi_nivel2 import generar_recomendaciones_por_respuestas
+    for respuestas_kpas in bloque:
+        for kpa, respuestas_raw in respuestas_kpas:
+            generar_recomendaciones_por_respuestas(kpa, respuestas_raw)
+
+
+def preparar_recomendaciones(bloque):
+    # Las respuestas_raw ({pregunta, opcion, valor}) se construyen fuera de la medición
+    from tabla_recomendaciones import respuestas_raw_de
+    return [[(kpa, respuestas_raw_de(preguntas, respuestas[kpa])) for kpa, preguntas in KPAS.items()]
+            for _, respuestas in bloque]
+
+
+def caso_lotes_json(bloque):
+    from evaluacion_lotes import evaluar_proyecto_json
+    for nombre, respuestas in bloque:
+        evaluar_proyecto_json(nombre, respuestas)
+
+
+def caso_informe_cli(bloque):
+    from diagnostico_cmmi_nivel2 import diagnostico_general, imprimir_informe_completo
+    salida, anterior = io.StringIO(), sys.stdout
+    sys.stdout = salida
+    try:
+        for resultados in bloque:
+            resumen, cumple_nivel2 = diagnostico_general(resultados)
+            imprimir_informe_completo(resultados, resumen, cumple_nivel2)
+    finally:
+        sys.stdout = anterior
+
+
+def preparar_informe_cli(bloque):
+    from diagnostico_cmmi_nivel2 import construir_resultado_kpa
+    return [[construir_resultado_kpa(kpa, preguntas, respuestas[kpa]) for kpa, preguntas in KPAS.items()]
+            for _, respuestas in bloque]
+
+
+def caso_motor_vectorial(matriz):
+    from motor_vectorial import puntuar_matriz
+    puntuar_matriz(matriz)
+
+
+def caso_motor_ponderado(datos):
+    modelo, matriz = datos
+    modelo.puntuar(matriz)
+
+
+def preparar_motor_ponderado(matriz):
+    # El modelo (matrices de pesos del cuestionario) se construye fuera de la medición
+    from motor_ponderado import ModeloPonderado
+    return ModeloPonderado(), matriz
+
+
+def vaciar_caches():
+    # Cada repetición empieza con las cachés de resultados vacías
+    import diagnostico_cmmi_nivel2
+    import evaluacion_cmmi
+    import evaluacion_lotes
+    for cache in (evaluacion_cmmi.CACHE_RESULTADOS, diagnostico_cmmi_nivel2.CACHE_RESULTADOS,
+                  evaluacion_lotes.CACHE_REGISTROS, evaluacion_lotes.CACHE_JSON,
+                  evaluacion_lotes.CACHE_FRAGMENTOS):
+        cache.vaciar()
+
+
+class SinCache:
+    """
+    Contexto que desactiva la caché de evaluacion_cmmi.evaluar_kpa (capacidad 0) mientras dura.
+    """
+
+    def __enter__(self):
+        import evaluacion_cmmi
+        self.cache = evaluacion_cmmi.CACHE_RESULTADOS
+        self.capacidad = self.cache.capacidad
+        self.cache.redimensionar(0)
+
+    def __exit__(self, *exc):
+        self.cache.redimensionar(self.capacidad)
+
+
+class NoContexto:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+# Casos: nombre -> (función, tipo "dict" o "matriz", preparación sin medir, tamaño máximo por defecto, contexto)
+CASOS = {
+    "evaluacion_cmmi.evaluar_kpa": (caso_evaluacion_cmmi, "dict", None, "1M", None),
+    "evaluacion_cmmi.evaluar_kpa[sin_cache]": (caso_evaluacion_cmmi, "dict", None, "100k", SinCache),
+    "diagnostico_cmmi_nivel2.cli": (caso_cli, "dict", None, "1M", None),
+    "diagnostico_cmmi_nivel2.generar_recomendaciones_por_respuestas":
+        (caso_recomendaciones, "dict", preparar_recomendaciones, "100k", None),
+    "evaluacion_lotes.evaluar_proyecto_json": (caso_lotes_json, "dict", None, "1M", None),
+    "diagnostico_cmmi_nivel2.imprimir_informe_completo": (caso_informe_cli, "dict", preparar_informe_cli, "100k", None),
+    "motor_vectorial.puntuar_matriz": (caso_motor_vectorial, "matriz", None, "1M", None),
+    "motor_ponderado.puntuar": (caso_motor_ponderado, "matriz", preparar_motor_ponderado, "1M", None),
+}
+
+
+def medir_caso(nombre, cartera, repeticiones):
+    """
+    Ejecuto un caso sobre la cartera y devuelvo los segundos de cada repetición.
+    """
+    funcion, tipo, preparar, _, contexto = CASOS[nombre]
+    tiempos = []
+    if tipo == "matriz":
+        matriz = cartera.matriz()
+        if preparar:
+            matriz = preparar(matriz)
+    for _ in range(repeticiones):
+        vaciar_caches()
+        total = 0.0
+        with contexto() if contexto else NoContexto():
+            if tipo == "matriz":
+                inicio = time.perf_counter()
+                funcion(matriz)
+                total = time.perf_counter() - inicio
+            else:
+                for bloque in cartera.bloques():
+                    if preparar:
+                        bloque = preparar(bloque)
+                    inicio = time.perf_counter()
+                    funcion(bloque)
+                    total += time.perf_counter() - inicio
+        tiempos.append(total)
+    return tiempos
+
+
+def resultado(caso, tamano, n, tiempos):
+    mejor = min(tiempos)
+    return {
+        "caso": caso,
+        "tamano": tamano,
+        "n": n,
+        "repeticiones": len(tiempos),
+        "mejor_s": round(mejor, 6),
+        "mediana_s": round(statistics.median(tiempos), 6),
+        "por_elemento_us": round(mejor / n * 1e6, 4),
+        "elementos_s": round(n / mejor, 1) if mejor else None,
+    }
+
+
+# --- PANTALLAS DE LA GUI ---
+
+class PantallaVirtual:
+    """
+    Si no hay pantalla (DISPLAY) arranco un servidor X virtual (Xvfb) mientras dura el contexto.
+    Si hay pantalla, o no es Linux, no hago nada. Sin Xvfb lanzo RuntimeError.
+    """
+
+    def __enter__(self):
+        import shutil
+        import subprocess
+        self.proceso = None
+        if os.environ.get("DISPLAY") or not sys.platform.startswith("linux"):
+            return self
+        xvfb = shutil.which("Xvfb")
+        if xvfb is None:
+            raise RuntimeError("no hay pantalla (DISPLAY) ni Xvfb para crear una virtual")
+        for numero in range(99, 120):
+            if os.path.exists(f"/tmp/.X11-unix/X{numero}") or os.path.exists(f"/tmp/.X{numero}-lock"):
+                continue
+            self.proceso = subprocess.Popen([xvfb, f":{numero}", "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            limite = time.monotonic() + 5
+            while time.monotonic() < limite and self.proceso.poll() is None:
+                if os.path.exists(f"/tmp/.X11-unix/X{numero}"):
+                    os.environ["DISPLAY"] = f":{numero}"
+                    return self
+                time.sleep(0.05)
+            self.__exit__()
+        raise RuntimeError("no se pudo arrancar Xvfb")
+
+    def __exit__(self, *exc):
+        if self.proceso is not None:
+            os.environ.pop("DISPLAY", None)
+            self.proceso.terminate()
+            self.proceso.wait()
+            self.proceso = None
+        return False
+
+
+def medir_pantallas(repeticiones=3):
+    """
+    Mido en segundos la creación de CMMIApp (pantalla de inicio), la primera visita a cada pantalla
+    de navegación, las visitas siguientes (desde la caché) y un formulario de PREGUNTAS_FORMULARIO preguntas.
+    Devuelvo {caso: [tiempo de cada repetición]}.
+    """
+    tiempos = {}
+    with PantallaVirtual():
+        import tkinter as tk
+        from diagnostico_cmmi_tkinter import CMMIApp, medir_formulario, medir_transiciones
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            root = tk.Tk()
+            app = CMMIApp(root)
+            root.update_idletasks()
+            tiempos.setdefault("CMMIApp.__init__", []).append(time.perf_counter() - inicio)
+            transiciones = medir_transiciones(app, 3)
+            tiempos.setdefault("CMMIApp.pantallas[primera]", []).append(
+                sum(primera for primera, _ in transiciones.values()) / 1000)
+            tiempos.setdefault("CMMIApp.pantallas[cache]", []).append(
+                sum(siguientes for _, siguientes in transiciones.values()) / 1000)
+            tiempos.setdefault(f"ListaPreguntasVirtual[{PREGUNTAS_FORMULARIO}]", []).append(
+                medir_formulario(root, PREGUNTAS_FORMULARIO) / 1000)
+            app.trabajador.cerrar()
+            root.destroy()
+    return tiempos
+
+
+def medir_arranque_en_frio(repeticiones=3):
+    """
+    Mido en segundos, en intérpretes nuevos, la importación de evaluacion_cmmi y el arranque hasta
+    la primera evaluación puntuada (los mismos tiempos que python evaluacion_cmmi.py --medir-arranque).
+    Devuelvo {caso: [tiempo de cada repetición]}.
+    """
+    from evaluacion_cmmi import medir_arranque
+    tiempos = {}
+    for _ in range(repeticiones):
+        importacion, arranque, _ = medir_arranque(1)
+        tiempos.setdefault("evaluacion_cmmi.importacion", []).append(importacion / 1000)
+        tiempos.setdefault("evaluacion_cmmi.arranque", []).append(arranque / 1000)
+    return tiempos
+
+
+# --- ENTORNO Y COMPARACIÓN ---
+
+def entorno():
+    """
+    Devuelvo los datos del entorno que influyen en las medidas.
+    """
+    import subprocess
+    datos = {
+        "python": platform.python_version(),
+        "implementacion": platform.python_implementation(),
+        "plataforma": platform.platform(),
+        "maquina": platform.machine(),
+        "procesador": platform.processor(),
+        "nucleos": os.cpu_count(),
+    }
+    try:
+        import numpy
+        datos["numpy"] = numpy.__version__
+    except ImportError:
+        datos["numpy"] = None
+    try:
+        directorio = os.path.dirname(os.path.abspath(__file__))
+        datos["commit"] = subprocess.run(["git", "rev-parse", "HEAD"], cwd=directorio, capture_output=True,
+                                         text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        datos["commit"] = None
+    return datos
+
+
+def ejecutar(tamanos, casos, generador="plantillas", semilla=SEMILLA, repeticiones=None, sin_limite=False,
+             con_gui=True, aviso=None):
+    """
+    Ejecuto los casos pedidos para cada tamaño y devuelvo el diccionario de resultados.
+    Los casos se saltan por encima de su tamaño máximo (salvo con sin_limite) o si falta una dependencia.
+    """
+    import datetime
+    informe = {
+        "formato": FORMATO_RESULTADOS,
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "entorno": entorno(),
+        "generador": generador,
+        "semilla": semilla,
+        "resultados": [],
+        "omitidos": [],
+    }
+    for tamano in tamanos:
+        n = TAMANOS[tamano]
+        cartera = CarteraSintetica(n, generador, semilla)
+        vueltas = repeticiones or (3 if n <= 100_000 else 1)
+        for caso in casos:
+            if not sin_limite and n > TAMANOS[CASOS[caso][3]]:
+                informe["omitidos"].append({"caso": caso, "tamano": tamano, "motivo": "por encima del tamaño máximo"})
+                continue
+            try:
+                tiempos = medir_caso(caso, cartera, vueltas)
+            except ImportError as error:
+                informe["omitidos"].append({"caso": caso, "tamano": tamano, "motivo": str(error)})
+                continue
+            informe["resultados"].append(resultado(caso, tamano, n, tiempos))
+            if aviso:
+                aviso(informe["resultados"][-1])
+    for caso, tiempos in medir_arranque_en_frio(repeticiones or 3).items():
+        informe["resultados"].append(resultado(caso, "1", 1, tiempos))
+        if aviso:
+            aviso(informe["resultados"][-1])
+    if con_gui:
+        try:
+            for caso, tiempos in medir_pantallas(repeticiones or 3).items():
+                informe["resultados"].append(resultado(caso, "1", 1, tiempos))
+                if aviso:
+                    aviso(informe["resultados"][-1])
+        except (ImportError, RuntimeError) as error:
+            informe["omitidos"].append({"caso": "CMMIApp", "tamano": "1", "motivo": str(error)})
+        except Exception as error:  # tkinter.TclError sin importar tkinter aquí
+            informe["omitidos"].append({"caso": "CMMIApp", "tamano": "1", "motivo": f"{type(error).__name__}: {error}"})
+    return informe
+
+
+def comparar(base, nuevo, umbral=UMBRAL):
+    """
+    Comparo el tiempo por elemento de los casos comunes a dos ejecuciones.
+    Devuelvo una lista de (caso, tamaño, µs base, µs nuevo, cambio en %, es_regresion).
+    """
+    anteriores = {(r["caso"], r["tamano"]): r for r in base["resultados"]}
+    filas = []
+    for r in nuevo["resultados"]:
+        anterior = anteriores.get((r["caso"], r["tamano"]))
+        if anterior is None or not anterior["por_elemento_us"]:
+            continue
+        cambio = (r["por_elemento_us"] / anterior["por_elemento_us"] - 1) * 100
+        filas.append((r["caso"], r["tamano"], anterior["por_elemento_us"], r["por_elemento_us"],
+                      cambio, cambio > umbral))
+    return filas
+
+
+def mostrar_resultado(r):
+    print(f"{r['caso']:64} {r['tamano']:>5} {r['mejor_s'] * 1000:>12.3f} ms {r['por_elemento_us']:>12.3f} µs/elem")
+
+
+def mostrar_comparacion(filas, umbral):
+    for caso, tamano, antes, despues, cambio, regresion in filas:
+        marca = "REGRESIÓN" if regresion else ("mejora" if cambio < -umbral else "")
+        print(f"{caso:64} {tamano:>5} {antes:>12.3f} → {despues:>12.3f} µs {cambio:>+8.1f}%  {marca}")
+    regresiones = sum(1 for *_, regresion in filas if regresion)
+    print(f"Casos comparados: {len(filas)}; regresiones por encima del {umbral:g}%: {regresiones}")
+    return regresiones
+
+
+def cargar(ruta):
+    with open(ruta, encoding="utf-8") as f:
+        datos = json.load(f)
+    if datos.get("formato") != FORMATO_RESULTADOS:
+        raise ValueError(f"{ruta} no es un archivo de resultados de rendimiento (formato {FORMATO_RESULTADOS}).")
+    return datos
+
+
+def main(argv=None):
+    """
+    Ejecuto la batería de medidas (y la comparo con una base si se pide), o solo comparo dos resultados.
+    Devuelvo 1 si hay regresiones, para poder usarlo en integración continua.
+    """
+    parser = argparse.ArgumentParser(description="Medidas de rendimiento reproducibles de la herramienta CMMI.")
+    parser.add_argument("--tamanos", nargs="+", choices=list(TAMANOS), default=["1", "1k", "100k"],
+                        help="Tamaños de cartera (por defecto 1 1k 100k)")
+    parser.add_argument("--casos", nargs="+", choices=list(CASOS), help="Casos que mido (por defecto todos)")
+    parser.add_argument("--generador", choices=GENERADORES, default="plantillas",
+                        help="Respuestas independientes (uniforme) o copiadas de unas pocas plantillas")
+    parser.add_argument("--semilla", type=int, default=SEMILLA, help="Semilla de los datos sintéticos")
+    parser.add_argument("--repeticiones", type=int, help="Repeticiones de cada caso (por defecto 3, o 1 con 1M)")
+    parser.add_argument("--sin-limite", action="store_true", help="Medir también los casos lentos con 1M proyectos")
+    parser.add_argument("--sin-gui", action="store_true", help="No medir las pantallas de CMMIApp")
+    parser.add_argument("--salida", help="Archivo JSON donde guardo los resultados")
+    parser.add_argument("--base", help="Resultados anteriores (JSON) con los que comparo esta ejecución")
+    parser.add_argument("--comparar", nargs=2, metavar=("BASE", "NUEVO"),
+                        help="Solo comparo dos archivos de resultados, sin medir nada")
+    parser.add_argument("--umbral", type=float, default=UMBRAL, help="Empeoramiento (en %%) que cuenta como regresión")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.comparar:
+            base, nuevo = cargar(args.comparar[0]), cargar(args.comparar[1])
+        else:
+            base = cargar(args.base) if args.base else None
+            nuevo = ejecutar(args.tamanos, args.casos or list(CASOS), args.generador, args.semilla,
+                             args.repeticiones, args.sin_limite, not args.sin_gui, aviso=mostrar_resultado)
+            for omitido in nuevo["omitidos"]:
+                print(f"{omitido['caso']:64} {omitido['tamano']:>5} omitido: {omitido['motivo']}")
+            if args.salida:
+                with open(args.salida, "w", encoding="utf-8") as f:
+                    json.dump(nuevo, f, ensure_ascii=False, indent=2)
+    except (OSError, ValueError, KeyError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+
+    if base is None:
+        return 0
+    print()
+    return 1 if mostrar_comparacion(comparar(base, nuevo, args.umbral), args.umbral) else 0
+
+
+# Este bloque solo se ejecuta si ejecuto este archivo directamente (no si lo importo)
+if __name__ == "__main__":
+    sys.exit(main())
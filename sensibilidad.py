@@ -0,0 +1,309 @@
+# sensibilidad.py
+# Este archivo estima lo robusto que es el veredicto de Nivel 2 frente a la subjetividad del evaluador
+# Elegir "Parcial" o "Sí" muchas veces es cuestión de criterio: con un modelo de confusión
+# (probabilidad de cada respuesta alternativa según la respuesta dada) perturbo las respuestas
+# muchas veces (Monte Carlo) y cuento cómo se reparten los estados de cada KPA y el veredicto
+# Todo el muestreo y la puntuación se hacen con arrays de NumPy, sin bucles por muestra
+# El estado de una KPA solo depende de cuántas respuestas tiene de cada opción, así que simulo cada
+# combinación distinta (cuántos Sí, Parcial y No) una sola vez y la comparto entre todos los proyectos
+
+import json  # Para leer el modelo de confusión y escribir los resultados
+import sys  # Para devolver un código de salida y escribir errores
+import numpy as np  # Muestreo y puntuación vectorizados
+from VALOR_RESPUESTA import VALOR_RESPUESTA  # Opciones válidas y su valor numérico
+from porcentaje import estado_porcentaje  # Clasificación por porcentaje (única fuente de los umbrales)
+from motor_vectorial import ESTADOS, INICIO_KPA, NOMBRES_KPA, PREGUNTAS_POR_KPA, TOTAL_PREGUNTAS, puntuar_matriz
+from tabla_recomendaciones import TEXTO_OPCION  # Texto legible de cada opción
+
+
+# Opciones en el orden de los códigos de motor_vectorial ('1', '2', '3'); el dígito de cada una es su posición
+OPCIONES = tuple(VALOR_RESPUESTA.keys())
+
+# Modelo de confusión por defecto: respuesta dada -> {respuesta alternativa: probabilidad}
+# La duda más habitual es entre "Sí" y "Parcial"; entre "Parcial" y "No" es algo menor
+MODELO_POR_DEFECTO = {
+    "1": {"1": 0.85, "2": 0.15},
+    "2": {"1": 0.15, "2": 0.75, "3": 0.10},
+    "3": {"2": 0.10, "3": 0.90},
+}
+
+MUESTRAS = 100_000  # Muestras por proyecto (o por combinación de respuestas de cada KPA en la cartera)
+SEMILLA = 20240601  # Semilla por defecto para que los resultados sean reproducibles
+UMBRAL_FRAGIL = 0.2  # Probabilidad de que cambie el veredicto a partir de la cual lo marco como frágil
+
+
+def modelo_adyacente(error):
+    """
+    Modelo sencillo: cada respuesta pasa a cada opción vecina (Sí ↔ Parcial ↔ No) con probabilidad error.
+    """
+    if not 0 <= error <= 0.5:
+        raise ValueError("La probabilidad de error debe estar entre 0 y 0.5.")
+    orden = sorted(OPCIONES, key=VALOR_RESPUESTA.get)
+    modelo = {}
+    for i, opcion in enumerate(orden):
+        vecinas = [orden[j] for j in (i - 1, i + 1) if 0 <= j < len(orden)]
+        modelo[opcion] = {v: error for v in vecinas}
+        modelo[opcion][opcion] = 1 - error * len(vecinas)
+    return modelo
+
+
+def cargar_modelo(ruta):
+    """
+    Leo un modelo de confusión en JSON {opción dada: {opción alternativa: probabilidad}}.
+    Las opciones pueden ir por código ('1', '2', '3') o por texto ("Sí", "Parcial", "No").
+    """
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def matriz_confusion(modelo):
+    """
+    Convierto el modelo en una matriz (opción dada × opción alternativa) indexada por dígito,
+    comprobando que cada fila es una distribución de probabilidad.
+    """
+    codigo = {o: o for o in OPCIONES}
+    codigo.update({texto: o for o, texto in TEXTO_OPCION.items()})
+    if not isinstance(modelo, dict):
+        raise ValueError("El modelo de confusión debe ser un diccionario {opción: {opción: probabilidad}}.")
+    matriz = np.eye(len(OPCIONES))  # Las opciones que no aparecen no se perturban
+    for dada, fila in modelo.items():
+        if dada not in codigo or not isinstance(fila, dict) or any(o not in codigo for o in fila):
+            raise ValueError(f"Opción desconocida en el modelo de confusión: '{dada}'.")
+        probabilidades = np.zeros(len(OPCIONES))
+        for alternativa, p in fila.items():
+            if isinstance(p, bool) or not isinstance(p, (int, float)) or p < 0:
+                raise ValueError(f"Las probabilidades de '{dada}' deben ser números no negativos.")
+            probabilidades[OPCIONES.index(codigo[alternativa])] += p
+        if abs(probabilidades.sum() - 1) > 1e-9:
+            raise ValueError(f"Las probabilidades de '{dada}' deben sumar 1.")
+        matriz[OPCIONES.index(codigo[dada])] = probabilidades
+    return matriz
+
+
+def tabla_estados(num_preguntas):
+    """
+    Estado de una KPA según cuántas respuestas tiene de cada opción, con la misma cuenta que evaluar_kpa.
+    El índice es (número de la primera opción) × (n + 1) + (número de la segunda opción).
+    """
+    n = num_preguntas
+    tabla = np.zeros((n + 1) ** 2, dtype=np.uint8)
+    for primeras in range(n + 1):
+        for segundas in range(n + 1 - primeras):
+            cuentas = (primeras, segundas, n - primeras - segundas)
+            suma = sum(VALOR_RESPUESTA[o] * c for o, c in zip(OPCIONES, cuentas))
+            tabla[primeras * (n + 1) + segundas] = ESTADOS.index(estado_porcentaje((suma / n) * 100))
+    return tabla
+
+
+class SimuladorSensibilidad:
+    """
+    Simulación Monte Carlo de los estados de las KPAs con respuestas perturbadas.
+    Con la misma semilla, el mismo modelo y las mismas respuestas, los resultados se repiten exactamente.
+    """
+
+    def __init__(self, modelo=None, muestras=MUESTRAS, semilla=SEMILLA, umbral=UMBRAL_FRAGIL):
+        if muestras < 1:
+            raise ValueError("El número de muestras debe ser al menos 1.")
+        if not 0 <= umbral <= 1:
+            raise ValueError("El umbral de fragilidad debe estar entre 0 y 1.")
+        self.confusion = matriz_confusion(MODELO_POR_DEFECTO if modelo is None else modelo)
+        self.muestras = int(muestras)
+        self.semilla = semilla
+        self.umbral = umbral
+        self.tablas = [tabla_estados(int(n)) for n in PREGUNTAS_POR_KPA]
+
+    def estados_muestreados(self, k, clave):
+        """
+        Simulo muestras veces una KPA k con la combinación de respuestas clave (índice de tabla_estados)
+        y devuelvo el código de estado de cada muestra.
+        Cada grupo de respuestas iguales se perturba con una multinomial: solo importa cuántas pasan
+        a cada opción, no cuáles. El generador depende de la semilla, la KPA y la combinación, así que
+        un proyecto da lo mismo analizado solo o dentro de una cartera.
+        """
+        n = int(PREGUNTAS_POR_KPA[k])
+        primeras, segundas = divmod(int(clave), n + 1)
+        rng = np.random.default_rng([self.semilla, k, int(clave)])
+        cuentas = np.zeros((self.muestras, len(OPCIONES)), dtype=np.int64)
+        for digito, veces in enumerate((primeras, segundas, n - primeras - segundas)):
+            if veces:
+                cuentas += rng.multinomial(veces, self.confusion[digito], size=self.muestras)
+        return self.tablas[k][cuentas[:, 0] * (n + 1) + cuentas[:, 1]]
+
+    def claves_kpa(self, matriz, k):
+        """
+        Índice de tabla_estados de la KPA k para cada fila de la matriz (cuántas respuestas hay de cada opción).
+        """
+        matriz = np.asarray(matriz, dtype=np.uint8)
+        if matriz.ndim != 2 or matriz.shape[1] != TOTAL_PREGUNTAS:
+            raise ValueError(f"La matriz debe tener {TOTAL_PREGUNTAS} columnas (una por pregunta).")
+        if matriz.size and (matriz.min() < 1 or matriz.max() > len(OPCIONES)):
+            raise ValueError("La matriz contiene opciones vacías o no válidas.")
+        n = int(PREGUNTAS_POR_KPA[k])
+        bloque = matriz[:, INICIO_KPA[k]:INICIO_KPA[k] + n]
+        return np.count_nonzero(bloque == 1, axis=1) * (n + 1) + np.count_nonzero(bloque == 2, axis=1)
+
+    def analizar_proyecto(self, respuestas):
+        """
+        Simulo un proyecto {kpa: [opciones]} perturbando todas sus respuestas a la vez en cada muestra.
+        Devuelvo la distribución de estados de cada KPA y la frecuencia con que cumple el Nivel 2.
+        """
+        from motor_vectorial import matriz_respuestas
+        matriz = matriz_respuestas([respuestas])
+        cumple = np.ones(self.muestras, dtype=bool)
+        kpas = {}
+        for k, kpa in enumerate(NOMBRES_KPA):
+            estados = self.estados_muestreados(k, self.claves_kpa(matriz, k)[0])
+            cumple &= estados == 0
+            frecuencias = np.bincount(estados, minlength=len(ESTADOS)) / self.muestras
+            kpas[kpa] = {e: float(f) for e, f in zip(ESTADOS, frecuencias)}
+        return self.resultado(puntuar_matriz(matriz), 0, kpas, float(cumple.mean()))
+
+    def analizar_matriz(self, matriz):
+        """
+        Analizo una cartera completa (matriz uint8 proyectos × preguntas de motor_vectorial).
+        Cada combinación distinta de respuestas de cada KPA (21 con 5 preguntas) se simula una sola vez;
+        como las KPAs se perturban de forma independiente, la probabilidad de cumplir es el producto
+        de las probabilidades de que cada KPA quede implementada. Devuelvo un diccionario de arrays:
+          - "probabilidades": (proyectos × KPAs × estados)
+          - "prob_cumple": probabilidad de cumplir el Nivel 2 por proyecto
+          - "puntuacion": la puntuación sin perturbar de puntuar_matriz
+        """
+        matriz = np.asarray(matriz, dtype=np.uint8)
+        probabilidades = np.zeros((matriz.shape[0], len(NOMBRES_KPA), len(ESTADOS)))
+        for k in range(len(NOMBRES_KPA)):
+            unicas, inversa = np.unique(self.claves_kpa(matriz, k), return_inverse=True)
+            frecuencias = np.array([np.bincount(self.estados_muestreados(k, clave), minlength=len(ESTADOS))
+                                    for clave in unicas]).reshape(-1, len(ESTADOS))
+            probabilidades[:, k] = (frecuencias / self.muestras)[inversa.reshape(-1)]
+        return {
+            "probabilidades": probabilidades,
+            "prob_cumple": probabilidades[:, :, 0].prod(axis=1),
+            "puntuacion": puntuar_matriz(matriz),
+        }
+
+    def resultado(self, puntuacion, fila, kpas, prob_cumple):
+        """
+        Resultado de un proyecto: veredicto sin perturbar, probabilidades y si el veredicto es frágil.
+        """
+        cumple = bool(puntuacion["cumple_nivel2"][fila])
+        prob_cambio = 1 - prob_cumple if cumple else prob_cumple
+        return {
+            "cumple_nivel2": cumple,
+            "prob_cumple": round(prob_cumple, 6),
+            "prob_cambio": round(prob_cambio, 6),
+            "fragil": prob_cambio >= self.umbral,
+            "kpas": {
+                kpa: {
+                    "estado": ESTADOS[puntuacion["estados"][fila][k]],
+                    "probabilidades": {e: round(p, 6) for e, p in kpas[kpa].items()},
+                }
+                for k, kpa in enumerate(NOMBRES_KPA)
+            },
+        }
+
+    def resultados_matriz(self, analisis):
+        """
+        Convierto el análisis de analizar_matriz en un resultado por proyecto (como analizar_proyecto).
+        """
+        for fila, (probabilidades, prob_cumple) in enumerate(zip(analisis["probabilidades"], analisis["prob_cumple"])):
+            kpas = {kpa: dict(zip(ESTADOS, map(float, p))) for kpa, p in zip(NOMBRES_KPA, probabilidades)}
+            yield self.resultado(analisis["puntuacion"], fila, kpas, float(prob_cumple))
+
+
+def analizar_archivo(ruta_entrada, ruta_salida=None, simulador=None, formato=None):
+    """
+    Analizo todos los proyectos de un archivo de respuestas (CSV o JSONL) y, si hay salida,
+    escribo una línea JSON por proyecto. Devuelvo (nombres, análisis de analizar_matriz).
+    """
+    from evaluacion_lotes import formato_por_extension, leer_respuestas
+    from motor_vectorial import matriz_respuestas
+    simulador = simulador or SimuladorSensibilidad()
+    with open(ruta_entrada, encoding="utf-8", newline="") as entrada:
+        proyectos = list(leer_respuestas(entrada, formato or formato_por_extension(ruta_entrada)))
+    nombres = [nombre for nombre, _ in proyectos]
+    analisis = simulador.analizar_matriz(matriz_respuestas(r for _, r in proyectos))
+    if ruta_salida:
+        with open(ruta_salida, "w", encoding="utf-8", newline="\n") as salida:
+            for nombre, resultado in zip(nombres, simulador.resultados_matriz(analisis)):
+                salida.write(json.dumps({"proyecto": nombre, **resultado}, ensure_ascii=False) + "\n")
+    return nombres, analisis
+
+
+def mostrar_proyecto(nombre, resultado):
+    """
+    Muestro por consola la distribución de estados de cada KPA y la robustez del veredicto.
+    """
+    veredicto = "CUMPLE" if resultado["cumple_nivel2"] else "NO CUMPLE"
+    print(f"\nProyecto {nombre}: {veredicto} el Nivel 2 (probabilidad de cumplir: {resultado['prob_cumple']:.1%})")
+    for kpa, datos in resultado["kpas"].items():
+        reparto = ", ".join(f"{e} {p:.1%}" for e, p in datos["probabilidades"].items())
+        print(f"  - {kpa}: {datos['estado']} ({reparto})")
+    if resultado["fragil"]:
+        print(f"  Veredicto FRÁGIL: cambia en el {resultado['prob_cambio']:.1%} de las simulaciones")
+    else:
+        print(f"  Veredicto robusto: cambia en el {resultado['prob_cambio']:.1%} de las simulaciones")
+
+
+def main(argv=None):
+    """
+    Analizo la sensibilidad del veredicto de una cartera (o de un solo proyecto) y muestro los más frágiles.
+    """
+    import argparse
+    import time
+    parser = argparse.ArgumentParser(description="Sensibilidad del veredicto de Nivel 2 a la subjetividad de las respuestas.")
+    parser.add_argument("entrada", help="Archivo de respuestas (.csv o .jsonl)")
+    parser.add_argument("--salida", help="Archivo JSON Lines con el análisis de cada proyecto")
+    parser.add_argument("--formato", choices=("csv", "jsonl"), help="Formato de entrada (por defecto según la extensión)")
+    grupo = parser.add_mutually_exclusive_group()
+    grupo.add_argument("--modelo", help="JSON {opción dada: {opción alternativa: probabilidad}}")
+    grupo.add_argument("--error", type=float, help="Probabilidad de confundir cada respuesta con cada opción vecina")
+    parser.add_argument("--muestras", type=int, default=MUESTRAS, help=f"Muestras Monte Carlo (por defecto {MUESTRAS})")
+    parser.add_argument("--semilla", type=int, default=SEMILLA, help="Semilla del generador aleatorio")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_FRAGIL,
+                        help="Probabilidad de cambio del veredicto a partir de la cual es frágil")
+    parser.add_argument("--proyecto", help="Analizo solo este proyecto y muestro el detalle por KPA")
+    parser.add_argument("--mostrar", type=int, default=10, help="Proyectos frágiles que muestro")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.modelo:
+            modelo = cargar_modelo(args.modelo)
+        elif args.error is not None:
+            modelo = modelo_adyacente(args.error)
+        else:
+            modelo = None
+        simulador = SimuladorSensibilidad(modelo, args.muestras, args.semilla, args.umbral)
+        inicio = time.perf_counter()
+        if args.proyecto is not None:
+            from evaluacion_lotes import formato_por_extension, leer_respuestas
+            with open(args.entrada, encoding="utf-8", newline="") as entrada:
+                formato = args.formato or formato_por_extension(args.entrada)
+                respuestas = next((r for nombre, r in leer_respuestas(entrada, formato) if nombre == args.proyecto), None)
+            if respuestas is None:
+                raise ValueError(f"No encuentro el proyecto '{args.proyecto}'.")
+            mostrar_proyecto(args.proyecto, simulador.analizar_proyecto(respuestas))
+            return 0
+        nombres, analisis = analizar_archivo(args.entrada, args.salida, simulador, args.formato)
+        segundos = time.perf_counter() - inicio
+    except (OSError, ValueError, KeyError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+
+    cumple = analisis["puntuacion"]["cumple_nivel2"]
+    prob_cambio = np.where(cumple, 1 - analisis["prob_cumple"], analisis["prob_cumple"])
+    fragiles = np.flatnonzero(prob_cambio >= simulador.umbral)
+    print(f"Proyectos analizados: {len(nombres)} en {segundos:.2f} s ({simulador.muestras} muestras)")
+    print(f"  Cumplen el Nivel 2: {int(np.count_nonzero(cumple))}")
+    print(f"  Veredictos frágiles (cambian en ≥ {simulador.umbral:.0%} de las simulaciones): {len(fragiles)}")
+    orden = fragiles[np.argsort(-prob_cambio[fragiles], kind="stable")][:max(args.mostrar, 0)]
+    if len(orden):
+        print("Veredictos más frágiles:")
+        for fila in orden:
+            veredicto = "cumple" if cumple[fila] else "no cumple"
+            print(f"  {nombres[fila]}: {veredicto}, cambia en el {prob_cambio[fila]:.1%}")
+    return 0
+
+
+# Este bloque solo se ejecuta si ejecuto este archivo directamente (no si lo importo)
+if __name__ == "__main__":
+    sys.exit(main())
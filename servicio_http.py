@@ -0,0 +1,457 @@
+# servicio_http.py
+# Este archivo implementa un servicio HTTP local (solo biblioteca estándar + asyncio) para que otras
+# herramientas envíen evaluaciones sin pasar por la CLI
+# POST /evaluar recibe {"proyecto": "...", "respuestas": {kpa: [opciones]}} y devuelve el mismo registro
+# que el modo por lotes (resultado de cada KPA, diagnóstico general y recomendaciones para el Nivel 2)
+# Las peticiones que llegan a la vez se agrupan en lotes que se puntúan de una sola vez con
+# motor_vectorial en un hilo aparte, así el bucle de eventos solo se ocupa de la red
+# Las conexiones se mantienen abiertas (keep-alive) entre peticiones
+# Con --carga lanzo además un generador de carga que mide peticiones por segundo y latencias
+
+import argparse  # Para leer los argumentos de la línea de comandos
+import asyncio  # Servidor y cliente HTTP asíncronos
+import io  # Búfer de texto donde codifico cada lote de respuestas
+import json  # Para leer las peticiones y escribir las respuestas
+import sys  # Para devolver un código de salida y escribir errores
+import time  # Para medir el generador de carga
+from concurrent.futures import ThreadPoolExecutor  # Hilo donde puntúo los lotes
+from KPAS import KPAS  # Cargo las 5 KPAs con sus preguntas
+from cache_resultados import CacheLRU, clave_proyecto  # Respuestas de los vectores ya puntuados
+from diagnostico_cmmi_nivel2 import TABLA_RECOMENDACIONES  # Recomendaciones de la versión CLI
+from evaluacion_lotes import proyecto_desde_json  # Misma validación que el modo por lotes
+from exportadores import ExportadorJSONL  # Misma codificación JSON que el modo por lotes
+from motor_vectorial import ESTADOS, NOMBRES_KPA, matriz_respuestas, puntuar_matriz  # Puntuación vectorizada
+import perfilado  # Medición por etapa (sin coste si el perfilado está desactivado)
+
+
+# Dirección y puerto por defecto (solo local)
+HOST = "127.0.0.1"
+PUERTO = 8080
+
+# Peticiones que agrupo como máximo en un lote
+MAX_LOTE = 512
+
+# Tiempo que espero (en segundos) a que lleguen más peticiones antes de puntuar un lote
+# Con 0 solo cedo el turno una vez al bucle de eventos: agrupo lo que ya estaba listo sin añadir latencia
+ESPERA_LOTE = 0.0
+
+# Tamaño máximo del cuerpo de una petición (bytes)
+MAX_CUERPO = 1 << 20
+
+# Segundos que mantengo abierta una conexión sin peticiones
+TIEMPO_INACTIVO = 30
+
+TEXTO_ESTADO = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+
+
+class ErrorHTTP(Exception):
+    """
+    Error que se responde al cliente con su código de estado y un mensaje JSON.
+    """
+
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+# --- PUNTUACIÓN POR LOTES ---
+
+class PuntuadorLotes:
+    """
+    Puntúa un lote de proyectos con motor_vectorial y devuelve la línea JSON de cada uno,
+    idéntica a json.dumps(evaluacion_lotes.evaluar_proyecto(...), ensure_ascii=False).
+    Se ejecuta en el hilo del ejecutor; como solo hay un lote en marcha a la vez,
+    la caché de fragmentos del exportador no se comparte entre hilos.
+    """
+
+    def __init__(self):
+        self.exportador = ExportadorJSONL(None, kpas=KPAS)
+
+    @perfilado.etapa()
+    def __call__(self, proyectos):
+        puntuacion = puntuar_matriz(matriz_respuestas(respuestas for _, respuestas in proyectos))
+        # Paso los arrays a listas de Python una sola vez por lote
+        porcentajes = puntuacion["porcentajes"].tolist()
+        estados = puntuacion["estados"].tolist()
+        implementadas = puntuacion["implementadas"].tolist()
+        parciales = puntuacion["parciales"].tolist()
+        deficientes = puntuacion["deficientes"].tolist()
+        cumple = puntuacion["cumple_nivel2"].tolist()
+
+        salida = self.exportador.salida = io.StringIO()
+        for fila, (nombre, respuestas) in enumerate(proyectos):
+            resultados = [
+                {
+                    "kpa": kpa,
+                    "porcentaje": porcentajes[fila][k],
+                    "estado": ESTADOS[estados[fila][k]],
+                    "recomendaciones": TABLA_RECOMENDACIONES.buscar(kpa, KPAS[kpa], respuestas[kpa]),
+                }
+                for k, kpa in enumerate(NOMBRES_KPA)
+            ]
+            resumen = {
+                "implementadas": implementadas[fila],
+                "parciales": parciales[fila],
+                "deficientes": deficientes[fila],
+                "por_kpa": dict(zip(NOMBRES_KPA, porcentajes[fila])),
+            }
+            self.exportador.escribir_proyecto(nombre, resultados, resumen, cumple[fila])
+        return salida.getvalue().encode("utf-8").split(b"\n")[:-1]
+
+
+def prefijo_json(nombre):
+    """
+    Comienzo de la línea JSON de un proyecto, hasta su nombre incluido (en bytes).
+    """
+    return b'{"proyecto": ' + json.dumps(nombre, ensure_ascii=False).encode("utf-8")
+
+
+class AgrupadorPeticiones:
+    """
+    Agrupa las peticiones concurrentes en lotes. Mientras un lote se puntúa en el ejecutor,
+    las peticiones nuevas se acumulan en la cola y forman el siguiente lote.
+    """
+
+    def __init__(self, ejecutor, max_lote=MAX_LOTE, espera=ESPERA_LOTE, capacidad_cache=None):
+        self.ejecutor = ejecutor
+        self.max_lote = max_lote
+        self.espera = espera
+        self.puntuar = PuntuadorLotes()
+        self.cache = CacheLRU(capacidad_cache)
+        self.cola = asyncio.Queue()
+        self.tarea = None
+        # Contadores que muestro en GET /salud (peticiones puntuadas en lotes, sin contar los aciertos de la caché)
+        self.lotes = 0
+        self.peticiones = 0
+
+    def iniciar(self):
+        self.tarea = asyncio.get_running_loop().create_task(self.bucle())
+
+    async def detener(self):
+        if self.tarea is not None:
+            self.tarea.cancel()
+            try:
+                await self.tarea
+            except asyncio.CancelledError:
+                pass
+
+    async def evaluar(self, nombre, respuestas):
+        """
+        Encolo un proyecto ya validado y espero su línea JSON.
+        Si el mismo vector de respuestas ya se puntuó, respondo al momento desde la caché.
+        """
+        clave = clave_proyecto(respuestas)
+        prefijo = prefijo_json(nombre)
+        cola = self.cache.obtener(clave)
+        if cola is not None:
+            return prefijo + cola
+        futuro = asyncio.get_running_loop().create_future()
+        self.cola.put_nowait((nombre, respuestas, futuro))
+        linea = await futuro
+        # Guardo el registro sin el nombre, que es lo único que cambia entre envíos del mismo vector
+        self.cache.guardar(clave, linea[len(prefijo):])
+        return linea
+
+    async def bucle(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            lote = [await self.cola.get()]
+            # Dejo que las demás conexiones listas encolen sus peticiones y recojo todas las pendientes
+            await asyncio.sleep(self.espera)
+            while len(lote) < self.max_lote and not self.cola.empty():
+                lote.append(self.cola.get_nowait())
+            try:
+                lineas = await loop.run_in_executor(self.ejecutor, self.puntuar, [(n, r) for n, r, _ in lote])
+            except Exception as error:  # Un fallo inesperado se responde a todas las peticiones del lote
+                for *_, futuro in lote:
+                    if not futuro.done():
+                        futuro.set_exception(error)
+                continue
+            self.lotes += 1
+            self.peticiones += len(lote)
+            for (*_, futuro), linea in zip(lote, lineas):
+                if not futuro.done():
+                    futuro.set_result(linea)
+
+
+# --- HTTP ---
+
+def respuesta_http(estado, cuerpo, mantener=True):
+    """
+    Construyo una respuesta HTTP/1.1 con cuerpo JSON (ya en bytes).
+    """
+    cabecera = (f"HTTP/1.1 {estado} {TEXTO_ESTADO.get(estado, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\nContent-Length: {len(cuerpo)}\r\n"
+                f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n")
+    return cabecera.encode("ascii") + cuerpo
+
+
+def json_error(mensaje):
+    return json.dumps({"error": mensaje}, ensure_ascii=False).encode("utf-8")
+
+
+async def leer_peticion(lector):
+    """
+    Leo una petición HTTP/1.x y devuelvo (método, ruta, versión, cabeceras, cuerpo),
+    o None si el cliente cerró la conexión entre peticiones.
+    """
+    try:
+        bloque = await asyncio.wait_for(lector.readuntil(b"\r\n\r\n"), TIEMPO_INACTIVO)
+    except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError:
+        raise ErrorHTTP(431, "Cabeceras demasiado grandes.")
+    lineas = bloque.decode("latin-1").split("\r\n")
+    try:
+        metodo, ruta, version = lineas[0].split(" ", 2)
+    except ValueError:
+        raise ErrorHTTP(400, "Línea de petición no válida.")
+    cabeceras = {}
+    for linea in lineas[1:]:
+        if linea:
+            nombre, _, valor = linea.partition(":")
+            cabeceras[nombre.strip().lower()] = valor.strip()
+    try:
+        longitud = int(cabeceras.get("content-length", 0))
+    except ValueError:
+        raise ErrorHTTP(400, "Content-Length no válido.")
+    if longitud > MAX_CUERPO:
+        raise ErrorHTTP(413, f"El cuerpo supera {MAX_CUERPO} bytes.")
+    cuerpo = await lector.readexactly(longitud) if longitud else b""
+    return metodo, ruta, version, cabeceras, cuerpo
+
+
+def mantener_conexion(version, cabeceras):
+    """
+    HTTP/1.1 mantiene la conexión salvo "Connection: close"; HTTP/1.0 solo con "Connection: keep-alive".
+    """
+    conexion = cabeceras.get("connection", "").lower()
+    if version == "HTTP/1.0":
+        return conexion == "keep-alive"
+    return conexion != "close"
+
+
+class ServicioEvaluacion:
+    """
+    Servidor HTTP de evaluaciones: GET /salud y POST /evaluar.
+    """
+
+    def __init__(self, host=HOST, puerto=PUERTO, max_lote=MAX_LOTE, espera=ESPERA_LOTE, capacidad_cache=None):
+        self.host = host
+        self.puerto = puerto
+        self.ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cmmi-lotes")
+        self.agrupador = AgrupadorPeticiones(self.ejecutor, max_lote, espera, capacidad_cache)
+        self.servidor = None
+
+    async def atender(self, metodo, ruta, cuerpo):
+        """
+        Resuelvo una petición y devuelvo (estado, cuerpo en bytes).
+        """
+        if ruta == "/salud":
+            if metodo != "GET":
+                raise ErrorHTTP(405, "Usa GET en /salud.")
+            return 200, json.dumps({"estado": "ok", "lotes": self.agrupador.lotes,
+                                    "peticiones": self.agrupador.peticiones,
+                                    "cache": self.agrupador.cache.estadisticas()}).encode("utf-8")
+        if ruta != "/evaluar":
+            raise ErrorHTTP(404, f"Ruta desconocida: {ruta}")
+        if metodo != "POST":
+            raise ErrorHTTP(405, "Usa POST en /evaluar.")
+        try:
+            proyecto, respuestas = proyecto_desde_json(json.loads(cuerpo))
+        except (ValueError, TypeError, AttributeError) as error:
+            raise ErrorHTTP(400, str(error))
+        return 200, await self.agrupador.evaluar(proyecto, respuestas)
+
+    async def conexion(self, lector, escritor):
+        """
+        Atiendo todas las peticiones de una conexión, una detrás de otra, mientras siga abierta.
+        """
+        try:
+            while True:
+                mantener = False
+                try:
+                    peticion = await leer_peticion(lector)
+                    if peticion is None:
+                        break
+                    metodo, ruta, version, cabeceras, cuerpo = peticion
+                    mantener = mantener_conexion(version, cabeceras)
+                    estado, datos = await self.atender(metodo, ruta.split("?", 1)[0], cuerpo)
+                except ErrorHTTP as error:
+                    estado, datos = error.estado, json_error(str(error))
+                except asyncio.IncompleteReadError:
+                    break
+                except Exception as error:  # Un fallo inesperado no debe tumbar el servidor
+                    estado, datos, mantener = 500, json_error(str(error)), False
+                escritor.write(respuesta_http(estado, datos, mantener))
+                await escritor.drain()
+                if not mantener:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+    async def iniciar(self):
+        self.agrupador.iniciar()
+        self.servidor = await asyncio.start_server(self.conexion, self.host, self.puerto)
+        return self.servidor
+
+    async def detener(self):
+        if self.servidor is not None:
+            self.servidor.close()
+            await self.servidor.wait_closed()
+        await self.agrupador.detener()
+        self.ejecutor.shutdown(wait=False)
+
+    async def servir(self):
+        await self.iniciar()
+        print(f"Servicio de evaluación en http://{self.host}:{self.puerto} (POST /evaluar, GET /salud)")
+        async with self.servidor:
+            await self.servidor.serve_forever()
+
+
+# --- GENERADOR DE CARGA ---
+
+def cuerpos_aleatorios(cantidad, semilla=0):
+    """
+    Preparo cuerpos de petición con respuestas aleatorias (reproducibles con la semilla).
+    """
+    import random
+    azar = random.Random(semilla)
+    return [
+        json.dumps({"proyecto": f"Carga_{i}",
+                    "respuestas": {kpa: [azar.choice("123") for _ in preguntas] for kpa, preguntas in KPAS.items()}},
+                   ensure_ascii=False).encode("utf-8")
+        for i in range(cantidad)
+    ]
+
+
+async def cliente_carga(host, puerto, cuerpos, latencias):
+    """
+    Una conexión keep-alive que envía sus peticiones una detrás de otra y anota la latencia de cada una.
+    Devuelvo el número de respuestas con error.
+    """
+    lector, escritor = await asyncio.open_connection(host, puerto)
+    errores = 0
+    try:
+        for cuerpo in cuerpos:
+            inicio = time.perf_counter()
+            escritor.write(f"POST /evaluar HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                           f"Content-Length: {len(cuerpo)}\r\n\r\n".encode("ascii") + cuerpo)
+            await escritor.drain()
+            cabecera = await lector.readuntil(b"\r\n\r\n")
+            longitud = 0
+            for linea in cabecera.split(b"\r\n"):
+                if linea.lower().startswith(b"content-length:"):
+                    longitud = int(linea.split(b":", 1)[1])
+            await lector.readexactly(longitud)
+            latencias.append(time.perf_counter() - inicio)
+            if not cabecera.startswith(b"HTTP/1.1 200"):
+                errores += 1
+    finally:
+        escritor.close()
+    return errores
+
+
+async def generar_carga(host=HOST, puerto=PUERTO, conexiones=64, peticiones=20000, vectores=5000, semilla=0):
+    """
+    Reparto las peticiones entre varias conexiones concurrentes y devuelvo
+    {peticiones, errores, segundos, por_segundo, p50_ms, p99_ms}.
+    Solo hay `vectores` vectores de respuestas distintos, que se repiten en orden.
+    """
+    cuerpos = cuerpos_aleatorios(max(1, min(peticiones, vectores)), semilla)
+    reparto = [[cuerpos[i % len(cuerpos)] for i in range(c, peticiones, conexiones)] for c in range(conexiones)]
+    latencias = []
+    inicio = time.perf_counter()
+    errores = await asyncio.gather(*(cliente_carga(host, puerto, parte, latencias) for parte in reparto if parte))
+    segundos = time.perf_counter() - inicio
+    latencias.sort()
+    return {
+        "peticiones": len(latencias),
+        "errores": sum(errores),
+        "segundos": round(segundos, 3),
+        "por_segundo": round(len(latencias) / segundos, 1) if segundos else None,
+        "p50_ms": round(latencias[len(latencias) // 2] * 1000, 2) if latencias else None,
+        "p99_ms": round(latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))] * 1000, 2) if latencias else None,
+    }
+
+
+async def esperar_servidor(host, puerto, segundos=10):
+    """
+    Espero a que el servidor acepte conexiones (lo uso al lanzarlo en otro proceso).
+    """
+    limite = time.monotonic() + segundos
+    while True:
+        try:
+            _, escritor = await asyncio.open_connection(host, puerto)
+            escritor.close()
+            return
+        except OSError:
+            if time.monotonic() > limite:
+                raise
+            await asyncio.sleep(0.05)
+
+
+def ejecutar_carga(args):
+    """
+    Lanzo el servidor en otro proceso (salvo --sin-servidor), genero la carga y muestro el resultado.
+    """
+    import subprocess
+    proceso = None
+    if not args.sin_servidor:
+        proceso = subprocess.Popen([sys.executable, __file__, "--host", args.host, "--puerto", str(args.puerto),
+                                    "--max-lote", str(args.max_lote), "--espera-lote", str(args.espera_lote)]
+                                   + ([] if args.cache is None else ["--cache", str(args.cache)]),
+                                   stdout=subprocess.DEVNULL)
+    try:
+        asyncio.run(esperar_servidor(args.host, args.puerto))
+        resultado = asyncio.run(generar_carga(args.host, args.puerto, args.conexiones, args.peticiones, args.vectores))
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait()
+    print(f"Peticiones: {resultado['peticiones']} ({resultado['errores']} con error) en {resultado['segundos']} s")
+    print(f"  Rendimiento: {resultado['por_segundo']} peticiones/s con {args.conexiones} conexiones")
+    print(f"  Latencia: p50 {resultado['p50_ms']} ms, p99 {resultado['p99_ms']} ms")
+    return 0 if resultado["errores"] == 0 else 1
+
+
+def main(argv=None):
+    """
+    Arranco el servicio HTTP o, con --carga, mido su rendimiento con el generador de carga.
+    """
+    parser = argparse.ArgumentParser(description="Servicio HTTP local de evaluación CMMI Nivel 2.")
+    parser.add_argument("--host", default=HOST, help="Dirección donde escucho (por defecto solo local)")
+    parser.add_argument("--puerto", type=int, default=PUERTO, help="Puerto TCP")
+    parser.add_argument("--max-lote", type=int, default=MAX_LOTE, help="Peticiones que agrupo como máximo en un lote")
+    parser.add_argument("--espera-lote", type=float, default=ESPERA_LOTE * 1000,
+                        help="Milisegundos que espero a que lleguen más peticiones antes de puntuar un lote")
+    parser.add_argument("--cache", type=int, help="Vectores de respuestas que guardo en la caché (0 = sin caché)")
+    parser.add_argument("--carga", action="store_true", help="Generar carga contra el servicio y medir peticiones/s")
+    parser.add_argument("--sin-servidor", action="store_true", help="Con --carga, usar un servicio ya arrancado")
+    parser.add_argument("--conexiones", type=int, default=64, help="Conexiones concurrentes del generador de carga")
+    parser.add_argument("--peticiones", type=int, default=20000, help="Peticiones totales del generador de carga")
+    parser.add_argument("--vectores", type=int, default=5000,
+                        help="Vectores de respuestas distintos que envía el generador de carga")
+    perfilado.agregar_argumentos(parser)
+    args = parser.parse_args(argv)
+
+    try:
+        perfilado.activar_desde_argumentos(args)
+        if args.carga:
+            return ejecutar_carga(args)
+        servicio = ServicioEvaluacion(args.host, args.puerto, args.max_lote, args.espera_lote / 1000, args.cache)
+        asyncio.run(servicio.servir())
+    except KeyboardInterrupt:
+        pass
+    except (OSError, ValueError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+    return 0
+
+
+# Este bloque solo se ejecuta si ejecuto este archivo directamente (no si lo importo)
+if __name__ == "__main__":
+    sys.exit(main())
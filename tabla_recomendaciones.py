@@ -0,0 +1,109 @@
+# tabla_recomendaciones.py
+# Este archivo precompila las recomendaciones de cada KPA para todos los patrones de respuesta posibles
+# Con 5 preguntas y 3 opciones solo hay 3^5 = 243 patrones por KPA, así que calculo cada uno una vez
+# (la primera vez que aparece) y después obtener las recomendaciones de una KPA es una sola búsqueda por índice
+
+from VALOR_RESPUESTA import VALOR_RESPUESTA  # Opciones válidas y su valor numérico
+from perfilado import etapa  # Medición por etapa (sin coste si el perfilado está desactivado)
+
+
+# Texto legible de cada opción, igual que en las versiones CLI y GUI
+TEXTO_OPCION = {"1": "Sí", "2": "Parcial", "3": "No"}
+
+# A partir de este número de preguntas no precompilo la KPA (3^8 = 6561 patrones ya es mucho)
+MAX_PREGUNTAS_TABLA = 8
+
+
+def respuestas_raw_de(preguntas, opciones):
+    """
+    Construyo la lista respuestas_raw (la misma forma que usan evaluar_kpa en la CLI y la GUI)
+    a partir de las preguntas y las opciones elegidas. Las preguntas sin responder ("") no se incluyen.
+    """
+    return [
+        {"pregunta": p, "opcion": o, "valor": VALOR_RESPUESTA[o], "texto": TEXTO_OPCION[o]}
+        for p, o in zip(preguntas, opciones) if o
+    ]
+
+
+def recomendaciones_omitidas(preguntas, opciones):
+    """
+    Recomendaciones de las preguntas omitidas en el modo de veredicto rápido ("" en opciones):
+    no se sabe si son un problema, así que pido evaluarlas antes de dar el resultado por definitivo.
+    """
+    return tuple(
+        f"Pregunta sin responder (veredicto rápido): '{p}' -> Evaluarla para confirmar el estado de la KPA."
+        for p, o in zip(preguntas, opciones) if not o
+    )
+
+
+class TablaRecomendaciones:
+    """
+    Tabla compilada de recomendaciones para una función generadora concreta.
+    La CLI y la GUI formulan las recomendaciones de forma distinta, así que cada una
+    crea su propia tabla pasando su función generar_recomendaciones_por_respuestas.
+    Cada patrón se calcula la primera vez que aparece (o todos de una vez con compilar)
+    y las tuplas devueltas se comparten.
+    """
+
+    def __init__(self, generador):
+        # Guardo la función original: es la referencia exacta de lo que debe salir
+        self.generador = generador
+        # Opciones en orden fijo y el dígito (en base len(opciones)) que corresponde a cada una
+        self.opciones = tuple(VALOR_RESPUESTA.keys())
+        self.digito = {o: i for i, o in enumerate(self.opciones)}
+        # Tablas: (kpa, preguntas) -> lista con una entrada por patrón (None si aún no se ha calculado)
+        self.tablas = {}
+
+    def indice_patron(self, opciones):
+        """
+        Calculo el índice del patrón de respuestas (número en base len(opciones),
+        con la primera pregunta como dígito menos significativo).
+        """
+        base = len(self.opciones)
+        indice = 0
+        peso = 1
+        for o in opciones:
+            indice += self.digito[o] * peso
+            peso *= base
+        return indice
+
+    @etapa()
+    def compilar(self, kpa, preguntas):
+        """
+        Genero las recomendaciones de todos los patrones posibles de una KPA llamando
+        a la función original, y guardo cada resultado como tupla inmutable.
+        """
+        base = len(self.opciones)
+        tabla = []
+        for indice in range(base ** len(preguntas)):
+            # Reconstruyo las opciones del patrón a partir de su índice
+            opciones = []
+            for _ in preguntas:
+                indice, digito = divmod(indice, base)
+                opciones.append(self.opciones[digito])
+            tabla.append(tuple(self.generador(kpa, respuestas_raw_de(preguntas, opciones))))
+        self.tablas[(kpa, tuple(preguntas))] = tabla
+        return tabla
+
+    def buscar(self, kpa, preguntas, opciones, base=None):
+        """
+        Devuelvo la tupla de recomendaciones de una KPA para las opciones dadas.
+        base son las recomendaciones generales de la KPA cuando vienen de un cuestionario cargado
+        (None = las de RECOMENDACIONES_BASE); se pasan a la función original como tercer argumento.
+        Si la KPA tiene demasiadas preguntas o las opciones no cubren todas las preguntas
+        (por ejemplo, preguntas omitidas en el modo de veredicto rápido), calculo directamente
+        con la función original.
+        """
+        extra = () if base is None else (base,)
+        if len(opciones) != len(preguntas) or len(preguntas) > MAX_PREGUNTAS_TABLA or "" in opciones:
+            return tuple(self.generador(kpa, respuestas_raw_de(preguntas, opciones), *extra))
+        clave = (kpa, tuple(preguntas)) if base is None else (kpa, tuple(preguntas), tuple(base))
+        tabla = self.tablas.get(clave)
+        if tabla is None:  # Primera vez que uso esta KPA: reservo una entrada por patrón
+            tabla = self.tablas[clave] = [None] * len(self.opciones) ** len(preguntas)
+        indice = self.indice_patron(opciones)
+        recomendaciones = tabla[indice]
+        if recomendaciones is None:  # Primera vez que aparece este patrón: lo calculo con la función original
+            recomendaciones = tabla[indice] = tuple(
+                self.generador(kpa, respuestas_raw_de(preguntas, opciones), *extra))
+        return recomendaciones
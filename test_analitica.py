@@ -0,0 +1,57 @@
+# test_analitica.py
+# Compruebo los indicadores de cartera: percentiles como límite inferior del intervalo, fusión de
+# resultados parciales y resultados de un cuestionario cargado
+
+import json
+
+import pytest
+
+from analitica import AnaliticaCartera, HistogramaFijo, main
+
+
+def resultado(kpa, porcentaje, estado="Deficiente"):
+    return {"kpa": kpa, "porcentaje": porcentaje, "estado": estado}
+
+
+def test_percentil_es_limite_inferior_del_intervalo():
+    histograma = HistogramaFijo()
+    for valor in (10.0, 20.0, 30.7, 40.0):
+        histograma.agregar(valor)
+    assert histograma.cuantil(0.5) == 20.0
+    assert histograma.cuantil(0.75) == 30.0
+    assert histograma.cuantil(1) == 40.0
+
+
+def test_fusionar_igual_que_una_sola_pasada():
+    kpas = ["A", "B"]
+    proyectos = [([resultado("A", p), resultado("B", 100 - p, "Implementada")], p > 50, f"2026-0{1 + p % 3}-01")
+                 for p in range(0, 101, 7)]
+    completa = AnaliticaCartera(kpas)
+    partes = [AnaliticaCartera(kpas), AnaliticaCartera(kpas)]
+    for i, proyecto in enumerate(proyectos):
+        completa.agregar(*proyecto)
+        partes[i % 2].agregar(*proyecto)
+    fusionada = partes[0].fusionar(AnaliticaCartera.desde_dict(json.loads(json.dumps(partes[1].a_dict()))))
+    assert fusionada.informe() == completa.informe()
+
+
+def test_kpa_desconocida():
+    with pytest.raises(ValueError, match="KPA desconocida 'Área A'"):
+        AnaliticaCartera().agregar([resultado("Área A", 50.0)], False)
+
+
+def test_main_con_cuestionario(tmp_path, capsys):
+    (tmp_path / "c.json").write_text(json.dumps({
+        "version": "prueba",
+        "kpas": [{"id": "A", "nombre": "Área A", "preguntas": [{"id": "A1", "texto": "¿Uno?"}]}],
+    }), "utf-8")
+    (tmp_path / "r.jsonl").write_text(json.dumps({
+        "proyecto": "P", "kpas": [resultado("Área A", 100.0, "Implementada")], "cumple_nivel2": True}) + "\n", "utf-8")
+    assert main([str(tmp_path / "r.jsonl")]) == 1
+    assert "--cuestionario" in capsys.readouterr().err
+    assert main([str(tmp_path / "r.jsonl"), "--cuestionario", str(tmp_path / "c.json"),
+                 "--json", str(tmp_path / "i.json")]) == 0
+    assert "límite inferior" in capsys.readouterr().out
+    informe = json.loads((tmp_path / "i.json").read_text("utf-8"))
+    assert informe["ancho_intervalo"] == 1.0
+    assert informe["por_kpa"]["Área A"]["percentiles"] == {"p10": 100.0, "p50": 100.0, "p90": 100.0}
@@ -0,0 +1,74 @@
+# test_archivo_columnar.py
+# Compruebo que una evaluación archivada se lee igual que se escribió, también con un cuestionario
+# cargado y desde el historial (sin archivar resultados provisionales como si fueran 0%)
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from KPAS import KPAS
+from archivo_columnar import ArchivoColumnar, archivar_historial, archivar_respuestas, segundos_de
+from cuestionario import Cuestionario, compilar_definicion
+from diagnostico_cmmi_nivel2 import construir_resultado_kpa
+from historial import HistorialEvaluaciones
+
+
+def cuestionario_propio():
+    return Cuestionario(compilar_definicion({
+        "version": "prueba",
+        "valores": {"3": 0.0, "2": 0.8, "1": 1.0},  # Otro orden que VALOR_RESPUESTA
+        "kpas": [
+            {"id": "A", "nombre": "Área A", "preguntas": [{"id": "A1", "texto": "¿Uno?"}, {"id": "A2", "texto": "¿Dos?"}]},
+            {"id": "B", "nombre": "Área B", "preguntas": [{"id": "B1", "texto": "¿Tres?"}]},
+        ],
+    }, "prueba"))
+
+
+def test_respuestas_de_ida_y_vuelta(tmp_path):
+    columnas = [f"{kpa}|{i + 1}" for kpa, preguntas in KPAS.items() for i in range(len(preguntas))]
+    respuestas = {kpa: ["1", "2", "3", "1", "2"] for kpa in KPAS}
+    (tmp_path / "r.csv").write_text("proyecto," + ",".join(columnas) + "\n"
+                                    + "P," + ",".join(o for kpa in KPAS for o in respuestas[kpa]) + "\n", "utf-8")
+    assert archivar_respuestas(str(tmp_path / "r.csv"), str(tmp_path / "a.cmmicol"), "2026-08-15") == 1
+    with ArchivoColumnar(str(tmp_path / "a.cmmicol")) as archivo:
+        assert archivo.fila(0) == {
+            "proyecto": "P",
+            "fecha": "2026-08-15 00:00:00",
+            "respuestas": respuestas,
+            "porcentajes": {kpa: construir_resultado_kpa(kpa, KPAS[kpa], respuestas[kpa])["porcentaje"] for kpa in KPAS},
+        }
+        assert list(archivo.filtrar(next(iter(KPAS)), 60, segundos_de("2026-08-15"), segundos_de("2026-08-16"))) == []
+        assert list(archivo.filtrar(next(iter(KPAS)), 60.01, segundos_de("2026-08-15"))) == [0]
+
+
+def test_respuestas_con_cuestionario(tmp_path):
+    (tmp_path / "r.csv").write_text("proyecto,Área A|1,Área A|2,Área B|1\nP1,1,2,1\nP2,3,3,2\n", "utf-8")
+    cuestionario = cuestionario_propio()
+    archivar_respuestas(str(tmp_path / "r.csv"), str(tmp_path / "a.cmmicol"), "2026-08-15", cuestionario=cuestionario)
+    with ArchivoColumnar(str(tmp_path / "a.cmmicol")) as archivo:
+        assert archivo.kpas == ["Área A", "Área B"]
+        assert archivo.cabecera["version_cuestionario"] == "prueba"
+        assert archivo.fila(0)["respuestas"] == {"Área A": ["1", "2"], "Área B": ["1"]}
+        assert archivo.fila(0)["porcentajes"] == {"Área A": 90.0, "Área B": 100.0}
+        assert archivo.fila(1)["respuestas"] == {"Área A": ["3", "3"], "Área B": ["2"]}
+        assert archivo.fila(1)["porcentajes"] == {"Área A": 0.0, "Área B": 80.0}
+
+
+def test_historial_sin_provisionales(tmp_path):
+    completas = [construir_resultado_kpa(kpa, preguntas, ["1", "1", "1", "2", "3"]) for kpa, preguntas in KPAS.items()]
+    # Dos "Sí" y tres omitidas: todavía podría llegar a Implementada, así que es provisional
+    provisional = construir_resultado_kpa("Gestión de requisitos", KPAS["Gestión de requisitos"], ["1", "1", "", "", ""])
+    assert provisional["provisional"]
+    with HistorialEvaluaciones(str(tmp_path / "h.db")) as historial:
+        historial.guardar_lote([
+            ("Completo", completas, False, "2026-07-01 10:00:00"),
+            ("Rápido", [provisional] + completas[1:], False, "2026-07-02 10:00:00"),
+        ])
+        assert archivar_historial(historial, str(tmp_path / "h.cmmicol")) == (1, 1)
+    with ArchivoColumnar(str(tmp_path / "h.cmmicol")) as archivo:
+        assert archivo.filas == 1
+        fila = archivo.fila(0)
+        assert fila["proyecto"] == "Completo"
+        assert fila["fecha"] == "2026-07-01 10:00:00"
+        assert fila["respuestas"] == {kpa: ["1", "1", "1", "2", "3"] for kpa in KPAS}
+        assert fila["porcentajes"] == {r["kpa"]: r["porcentaje"] for r in completas}
@@ -0,0 +1,100 @@
+# test_cache_resultados.py
+# Compruebo la caché LRU de resultados (orden de desalojo, contadores, capacidad) y que puntuar
+# con las cachés desactivadas escribe exactamente lo mismo que con ellas
+
+import pytest
+
+import diagnostico_cmmi_nivel2
+import evaluacion_cmmi
+import evaluacion_lotes
+from cache_resultados import CacheLRU, capacidad_configurada, clave_kpa
+from test_evaluacion_lotes import cartera, escribir_cartera
+
+
+def test_desaloja_el_usado_hace_mas_tiempo():
+    cache = CacheLRU(2)
+    cache.guardar("a", 1)
+    cache.guardar("b", 2)
+    assert cache.obtener("a") == 1  # "a" pasa a ser la más reciente
+    cache.guardar("c", 3)
+    assert "b" not in cache.datos and list(cache.datos) == ["a", "c"]
+    assert cache.obtener("b", "no") == "no"
+    assert cache.estadisticas() == {"capacidad": 2, "tamano": 2, "aciertos": 1, "fallos": 1,
+                                    "desalojos": 1, "tasa_aciertos": 0.5}
+
+
+def test_obtener_o_calcular_y_capacidad_cero():
+    llamadas = []
+
+    def calcular(x):
+        llamadas.append(x)
+        return None  # None también es un valor que se guarda
+
+    cache = CacheLRU(4)
+    assert cache.obtener_o_calcular("k", calcular, 1) is None
+    assert cache.obtener_o_calcular("k", calcular, 1) is None
+    assert llamadas == [1]
+
+    sin_cache = CacheLRU(0)
+    for _ in range(3):
+        sin_cache.obtener_o_calcular("k", calcular, 2)
+    assert llamadas == [1, 2, 2, 2] and len(sin_cache) == 0
+
+
+def test_redimensionar_y_vaciar():
+    cache = CacheLRU(10)
+    for i in range(10):
+        cache.guardar(i, i)
+    cache.redimensionar(3)
+    assert list(cache.datos) == [7, 8, 9] and cache.desalojos == 7
+    cache.redimensionar(0)
+    assert len(cache) == 0
+    cache.vaciar()
+    assert cache.estadisticas()["desalojos"] == 0 and cache.estadisticas()["tasa_aciertos"] is None
+
+
+@pytest.mark.parametrize("valor, esperado", [(None, 4096), ("", 4096), ("12", 12), ("0", 0)])
+def test_capacidad_de_la_variable_de_entorno(monkeypatch, valor, esperado):
+    if valor is None:
+        monkeypatch.delenv("CMMI_CACHE_RESULTADOS", raising=False)
+    else:
+        monkeypatch.setenv("CMMI_CACHE_RESULTADOS", valor)
+    assert capacidad_configurada() == esperado
+
+
+@pytest.mark.parametrize("valor", ["mucho", "-1"])
+def test_capacidad_no_valida(monkeypatch, valor):
+    monkeypatch.setenv("CMMI_CACHE_RESULTADOS", valor)
+    with pytest.raises(ValueError, match="CMMI_CACHE_RESULTADOS"):
+        capacidad_configurada()
+
+
+def test_clave_distingue_las_omitidas_al_final():
+    assert clave_kpa("A", ["1", "2"]) != clave_kpa("A", ["1", "2", ""])
+    assert clave_kpa("A", ["1", "2"]) != clave_kpa("B", ["1", "2"])
+    assert clave_kpa("A", ["1", "2"], "v1") != clave_kpa("A", ["1", "2"], "v2")
+
+
+CACHES = [evaluacion_cmmi.CACHE_RESULTADOS, diagnostico_cmmi_nivel2.CACHE_RESULTADOS,
+          evaluacion_lotes.CACHE_REGISTROS, evaluacion_lotes.CACHE_JSON, evaluacion_lotes.CACHE_FRAGMENTOS]
+
+
+@pytest.fixture
+def sin_caches():
+    capacidades = [cache.capacidad for cache in CACHES]
+    for cache in CACHES:
+        cache.redimensionar(0)
+    yield
+    for cache, capacidad in zip(CACHES, capacidades):
+        cache.redimensionar(capacidad)
+
+
+def test_sin_caches_la_salida_no_cambia(tmp_path, sin_caches):
+    escribir_cartera(tmp_path / "respuestas.csv", cartera(60), "csv")
+    evaluacion_lotes.evaluar_archivo(str(tmp_path / "respuestas.csv"), str(tmp_path / "sin_cache.jsonl"))
+    assert all(len(cache) == 0 for cache in CACHES)
+    for cache in CACHES:
+        cache.redimensionar(4096)
+    evaluacion_lotes.evaluar_archivo(str(tmp_path / "respuestas.csv"), str(tmp_path / "con_cache.jsonl"))
+    assert evaluacion_lotes.CACHE_FRAGMENTOS.aciertos > 0
+    assert (tmp_path / "con_cache.jsonl").read_bytes() == (tmp_path / "sin_cache.jsonl").read_bytes()
@@ -0,0 +1,60 @@
+# test_codificacion.py
+# Compruebo el empaquetado de respuestas a 2 bits y la vista tipo diccionario de ResultadoKPA
+
+import itertools
+
+import pytest
+
+from KPAS import KPAS
+from codificacion import (
+    ResultadoKPA,
+    desempaquetar,
+    desempaquetar_proyecto,
+    empaquetar,
+    empaquetar_proyecto,
+)
+from evaluacion_cmmi import calcular_resultado_kpa
+
+
+def test_empaquetar_y_desempaquetar():
+    for opciones in itertools.product(["1", "2", "3", ""], repeat=5):
+        assert desempaquetar(empaquetar(opciones), 5) == list(opciones)
+
+
+def test_proyecto_completo_cabe_en_50_bits():
+    respuestas = {kpa: ["3"] * len(preguntas) for kpa, preguntas in KPAS.items()}
+    codigo = empaquetar_proyecto(respuestas)
+    assert codigo.bit_length() == 50
+    assert desempaquetar_proyecto(codigo) == respuestas
+
+
+def test_proyecto_con_otras_kpas():
+    kpas = {"Área A": ["¿Uno?", "¿Dos?"], "Área B": ["¿Tres?"]}
+    respuestas = {"Área A": ["2", ""], "Área B": ["3"]}
+    assert desempaquetar_proyecto(empaquetar_proyecto(respuestas, kpas), kpas) == respuestas
+
+
+def test_resultado_se_lee_como_el_diccionario_de_siempre():
+    preguntas = KPAS["Gestión de configuración"]
+    resultado = calcular_resultado_kpa("Gestión de configuración", ["1", "2", "3", "1", "1"])
+    assert isinstance(resultado, ResultadoKPA)
+    assert resultado.opciones == ["1", "2", "3", "1", "1"]
+    assert resultado["porcentaje"] == 70.0
+    assert resultado["estado"] == "Parcialmente implementada"
+    assert resultado["respuestas"] == resultado["respuestas_raw"]
+    assert resultado["respuestas_raw"][1] == {"pregunta": preguntas[1], "opcion": "2", "valor": 0.5, "texto": "Parcial"}
+    assert resultado["detalles"][2] == {"pregunta": preguntas[2],
+                                        "respuesta": {"opcion": "3", "texto": "No", "valor": 0.0}}
+    assert set(resultado.a_dict()) == set(ResultadoKPA.CLAVES)
+    assert "estado" in resultado and "otra" not in resultado
+    assert resultado.get("otra", 5) == 5
+    with pytest.raises(KeyError):
+        resultado["otra"]
+
+
+def test_preguntas_omitidas_no_aparecen_en_las_vistas():
+    resultado = calcular_resultado_kpa("Gestión de configuración", ["1", "", "3", "", "1"])
+    assert resultado.opciones == ["1", "", "3", "", "1"]
+    assert resultado.omitidas == (1, 3)
+    assert [r["opcion"] for r in resultado["respuestas_raw"]] == ["1", "3", "1"]
+    assert len(resultado["detalles"]) == 3
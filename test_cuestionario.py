@@ -0,0 +1,148 @@
+# test_cuestionario.py
+# Compruebo la carga de cuestionarios: la caché compilada se usa, se invalida cuando cambia el archivo
+# y se descarta si está dañada; y las definiciones no válidas se rechazan con un mensaje claro
+
+import json
+import os
+import sys
+
+import pytest
+
+import cuestionario
+from KPAS import KPAS
+from cuestionario import (
+    cargar_cuestionario,
+    compilar_definicion,
+    cuestionario_por_defecto,
+    definicion_por_defecto,
+    ruta_cache,
+    texto_definicion,
+)
+from evaluacion_cmmi import evaluar_kpa
+
+
+def escribir(ruta, definicion):
+    ruta.write_text(texto_definicion(definicion), encoding="utf-8")
+    return str(ruta)
+
+
+def sin_compilar(monkeypatch):
+    # A partir de aquí cualquier compilación hace fallar la prueba
+    def compilar(*args):
+        raise AssertionError("se volvió a compilar el cuestionario")
+    monkeypatch.setattr(cuestionario, "compilar_definicion", compilar)
+
+
+def test_cuestionario_incluido_de_ida_y_vuelta(tmp_path, monkeypatch):
+    ruta = escribir(tmp_path / "cmmi.json", definicion_por_defecto())
+    cargado = cargar_cuestionario(ruta)
+    incluido = cuestionario_por_defecto()
+    assert cargado.kpas == KPAS
+    assert cargado.huella == incluido.huella
+    assert os.path.exists(ruta_cache(ruta))
+
+    sin_compilar(monkeypatch)
+    desde_cache = cargar_cuestionario(ruta)
+    assert desde_cache.kpas == KPAS and desde_cache.pesos_kpa == incluido.pesos_kpa
+    opciones = ["1", "2", "3", "1", "2"]
+    assert (evaluar_kpa("Gestión de requisitos", opciones, desde_cache).a_dict()
+            == evaluar_kpa("Gestión de requisitos", opciones).a_dict())
+    assert desde_cache.respuestas_por_kpa({"REQM-02": "3"})["Gestión de requisitos"] == ["", "3", "", "", ""]
+
+
+def test_cambio_de_fecha_sin_cambio_de_contenido(tmp_path, monkeypatch):
+    ruta = escribir(tmp_path / "cmmi.json", definicion_por_defecto())
+    cargar_cuestionario(ruta)
+    os.utime(ruta, ns=(0, 10**18))
+    sin_compilar(monkeypatch)
+    assert cargar_cuestionario(ruta).kpas == KPAS
+    with open(ruta_cache(ruta), encoding="utf-8") as f:
+        assert json.load(f)["mtime_ns"] == 10**18
+
+
+def test_cambio_de_contenido_invalida_la_cache(tmp_path):
+    definicion = definicion_por_defecto()
+    ruta = escribir(tmp_path / "cmmi.json", definicion)
+    estado = os.stat(ruta)
+    cargar_cuestionario(ruta)
+    # Mismo tamaño y otra fecha: se lee el archivo y su huella ya no coincide con la de la caché
+    definicion["kpas"][0]["preguntas"][0]["texto"] = definicion["kpas"][0]["preguntas"][0]["texto"].upper()
+    escribir(tmp_path / "cmmi.json", definicion)
+    os.utime(ruta, ns=(estado.st_atime_ns, estado.st_mtime_ns + 1))
+    cargado = cargar_cuestionario(ruta)
+    assert cargado.kpas["Gestión de requisitos"][0] == KPAS["Gestión de requisitos"][0].upper()
+
+
+@pytest.mark.parametrize("dano", ["{no es json", '{"formato": 0, "datos": {}}', "incoherente"])
+def test_cache_danada_se_descarta(tmp_path, dano):
+    ruta = escribir(tmp_path / "cmmi.json", definicion_por_defecto())
+    cargar_cuestionario(ruta)
+    with open(ruta_cache(ruta), encoding="utf-8") as f:
+        cache = json.load(f)
+    if dano == "incoherente":
+        cache["datos"]["inicio_kpa"][-1] += 1
+        dano = json.dumps(cache)
+    with open(ruta_cache(ruta), "w", encoding="utf-8") as f:
+        f.write(dano)
+    assert cargar_cuestionario(ruta).kpas == KPAS
+    with open(ruta_cache(ruta), encoding="utf-8") as f:
+        assert json.load(f)["formato"] == cuestionario.FORMATO_CACHE
+
+
+@pytest.mark.skipif(sys.version_info < (3, 11), reason="tomllib necesita Python 3.11")
+def test_toml_con_valores_y_pesos(tmp_path):
+    ruta = tmp_path / "mini.toml"
+    ruta.write_text("""
+version = "mini-1"
+
+[valores]
+"1" = 1.0
+"2" = 0.75
+"3" = 0.0
+
+[[kpas]]
+id = "A"
+nombre = "Área A"
+
+[[kpas.preguntas]]
+id = "A-01"
+texto = "¿Uno?"
+peso = 3
+
+[[kpas.preguntas]]
+id = "A-02"
+texto = "¿Dos?"
+""", encoding="utf-8")
+    cargado = cargar_cuestionario(str(ruta))
+    assert cargado.kpas == {"Área A": ["¿Uno?", "¿Dos?"]}
+    assert cargado.pesos_kpa == {"Área A": [3.0, 1.0]}
+    assert evaluar_kpa("Área A", ["2", "3"], cargado)["porcentaje"] == 56.25
+
+
+def definicion_con(cambio):
+    definicion = definicion_por_defecto()
+    cambio(definicion)
+    return definicion
+
+
+@pytest.mark.parametrize("cambio, mensaje", [
+    (lambda d: d.update(valores={"1": 1, "2": 0.5, "4": 0}), "Las opciones de respuesta"),
+    (lambda d: d.update(kpas=[]), "ninguna KPA"),
+    (lambda d: d["kpas"][0].pop("id"), "no tiene identificador"),
+    (lambda d: d["kpas"].append(dict(d["kpas"][0])), "KPA repetida"),
+    (lambda d: d["kpas"][1]["preguntas"][0].update(id="REQM-01"), "repetido: 'REQM-01'"),
+    (lambda d: d["kpas"][0]["preguntas"][0].pop("texto"), "sin texto"),
+    (lambda d: d["kpas"][0]["preguntas"][0].update(peso=0), "número positivo"),
+    (lambda d: d["kpas"][0]["preguntas"][0].update(peso="mucho"), "número positivo"),
+])
+def test_definiciones_no_validas(cambio, mensaje):
+    with pytest.raises(ValueError, match=mensaje):
+        compilar_definicion(definicion_con(cambio))
+
+
+def test_respuestas_no_validas():
+    incluido = cuestionario_por_defecto()
+    with pytest.raises(ValueError, match="Pregunta desconocida 'XX-01'"):
+        incluido.respuestas_por_kpa({"XX-01": "1"})
+    with pytest.raises(ValueError, match="Opción no válida '4'"):
+        incluido.respuestas_por_kpa({"REQM-01": "4"})
@@ -0,0 +1,131 @@
+# test_diagnostico_cmmi_tkinter.py
+# Compruebo la interfaz gráfica con una ventana real de Tk (oculta); sin pantalla las pruebas se omiten
+
+import pytest
+
+tk = pytest.importorskip("tkinter")
+from tkinter import ttk  # noqa: E402
+
+import diagnostico_cmmi_tkinter  # noqa: E402
+from KPAS import KPAS  # noqa: E402
+
+KPA = "Gestión de requisitos"
+
+
+@pytest.fixture
+def root():
+    try:
+        ventana = tk.Tk()
+    except tk.TclError as error:
+        pytest.skip(f"Tk no disponible: {error}")
+    ventana.withdraw()
+    yield ventana
+    ventana.destroy()
+
+
+@pytest.fixture
+def app(root):
+    return diagnostico_cmmi_tkinter.CMMIApp(root)
+
+
+def elegir(lista, fila, opcion):
+    # Lo mismo que hace un clic en el radio button de la fila
+    lista.filas[fila][2].set(opcion)
+
+
+def test_pantallas_se_construyen_una_vez(app):
+    app.menu_kpa()
+    app.formulario_kpa(KPA)
+    construidas = dict(app.pantallas)
+    for _ in range(3):
+        app.frame_inicio()
+        app.menu_kpa()
+        app.formulario_kpa(KPA)
+    assert app.pantallas == construidas
+    assert all(app.pantallas[clave] is frame for clave, frame in construidas.items())
+    assert app.pantalla_actual is app.pantallas[("kpa", KPA)]
+    # Solo la pantalla actual está empaquetada en la ventana
+    assert [clave for clave, frame in app.pantallas.items() if frame.winfo_manager()] == [("kpa", KPA)]
+
+
+def test_formulario_conserva_las_respuestas(app):
+    app.formulario_kpa(KPA)
+    elegir(app.lista, 0, "1")
+    elegir(app.lista, 2, "3")
+    app.menu_kpa()
+    app.formulario_kpa("Planificación de proyectos")
+    app.formulario_kpa(KPA)
+    assert app.lista.respuestas == ["1", "", "3", "", ""]
+    assert len(app.lista.respuestas) == len(KPAS[KPA])
+
+
+def test_marcador_en_vivo(app):
+    app.formulario_kpa(KPA)
+    etiqueta = app.etiquetas_marcador[("kpa", KPA)]
+    assert etiqueta.cget("text") == "Ahora: 0.0% (Deficiente)"
+    for fila in range(len(KPAS[KPA])):
+        elegir(app.lista, fila, "1")
+    assert etiqueta.cget("text") == "Ahora: 100.0% (Implementada)"
+    elegir(app.lista, 0, "3")
+    assert etiqueta.cget("text") == "Ahora: 80.0% (Implementada)"
+
+def medir(texto):
+    # Fuente de ancho fijo: 10 píxeles por carácter
+    return 10 * len(texto)
+
+
+def test_recortar_lineas():
+    assert diagnostico_cmmi_tkinter.recortar_lineas("uno dos tres", medir, ancho=80) == ("uno dos\ntres", False)
+    assert diagnostico_cmmi_tkinter.recortar_lineas("uno dos tres cuatro cinco", medir, ancho=80) == (
+        "uno dos\ntres …", True)
+    # Una palabra que no cabe sola ocupa su línea entera en lugar de perderse
+    assert diagnostico_cmmi_tkinter.recortar_lineas("anticonstitucional", medir, ancho=80, lineas=1) == (
+        "anticonstitucional", False)
+
+
+def test_lista_virtual_reutiliza_las_filas(root):
+    marco = ttk.Frame(root)
+    preguntas = [f"Pregunta {i + 1}" for i in range(1000)]
+    cambios = []
+    lista = diagnostico_cmmi_tkinter.ListaPreguntasVirtual(
+        marco, preguntas, lambda i, anterior, nueva: cambios.append((i, anterior, nueva)))
+    filas = len(lista.filas)
+    assert filas <= 420 // diagnostico_cmmi_tkinter.ALTO_FILA + 2
+
+    elegir(lista, 1, "2")
+    lista.desplazar("scroll", 10, "units")
+    assert lista.indice_fila[0] == 10
+    elegir(lista, 0, "3")
+    lista.desplazar("scroll", -10, "units")
+    assert len(lista.filas) == filas
+    assert lista.filas[1][2].get() == "2" and lista.filas[0][2].get() == ""
+    assert cambios == [(1, "", "2"), (10, "", "3")]
+    assert lista.respuestas[1] == "2" and lista.respuestas[10] == "3" and lista.respuestas.count("") == 998
+
+    lista.vaciar()
+    assert lista.respuestas == [""] * 1000 and lista.filas[1][2].get() == ""
+
+
+def contenido(area):
+    return area["texto"].get("1.0", "end-1c")
+
+
+def test_informe_se_inserta_por_lotes(app, root):
+    area = app.construir_area_texto(ttk.Frame(root))
+    por_lote = diagnostico_cmmi_tkinter.LINEAS_POR_LOTE
+    viejas = [f"Vieja {i}\n" for i in range(3 * por_lote)]
+    lineas = [f"Línea {i}\n" for i in range(2 * por_lote + 1)]
+
+    app.insertar_por_lotes(area, viejas)
+    # El primer lote aparece al instante y el resto queda programado
+    assert contenido(area) == "".join(viejas[:por_lote])
+    assert area["tarea"] is not None
+
+    # Un informe nuevo cancela la carga del anterior
+    app.insertar_por_lotes(area, lineas)
+    while area["tarea"] is not None:
+        root.update()
+    assert contenido(area) == "".join(lineas)
+    assert area["lineas"] is lineas
+    assert area["etiqueta"].cget("text") == "Informe completo"
+    assert area["texto"].cget("state") == "disabled"
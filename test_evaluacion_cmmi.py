@@ -0,0 +1,30 @@
+# test_evaluacion_cmmi.py
+# Compruebo que la puntuación sin interfaz gráfica no carga módulos pesados: ni al importarla
+# ni al puntuar una evaluación completa (los tiempos de arranque se miden en rendimiento.py)
+
+import os
+import subprocess
+import sys
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Módulos que evaluacion_cmmi solo debe cargar cuando se usa la parte que los necesita
+PESADOS = ("tkinter", "numpy", "sqlite3")
+
+PROGRAMA = """
+import sys
+import evaluacion_cmmi
+cargados = [m for m in {pesados!r} if m in sys.modules]
+resultados = [evaluacion_cmmi.evaluar_kpa(kpa, ["1", "2", "3", "1", "2"][:len(preguntas)])
+              for kpa, preguntas in evaluacion_cmmi.KPAS.items()]
+evaluacion_cmmi.generar_resumen_general(resultados)
+print(",".join(cargados))
+print(",".join(m for m in {pesados!r} if m in sys.modules))
+"""
+
+
+def test_importar_y_puntuar_no_carga_modulos_pesados():
+    salida = subprocess.run([sys.executable, "-c", PROGRAMA.format(pesados=PESADOS)], cwd=DIRECTORIO,
+                            capture_output=True, text=True, check=True).stdout.split("\n")
+    assert salida[0] == "", f"al importar: {salida[0]}"
+    assert salida[1] == "", f"al puntuar: {salida[1]}"
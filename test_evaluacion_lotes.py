@@ -0,0 +1,111 @@
+# test_evaluacion_lotes.py
+# Compruebo la lectura y validación de las respuestas del modo por lotes
+
+import io
+import json
+
+import pytest
+
+from KPAS import KPAS
+from evaluacion_lotes import (
+    columnas_csv,
+    evaluar_archivo,
+    evaluar_archivo_paralelo,
+    evaluar_proyecto,
+    evaluar_proyecto_json,
+    leer_csv,
+    leer_jsonl,
+    main,
+    proyecto_desde_json,
+)
+
+
+def respuestas_completas(opcion="1"):
+    return {kpa: [opcion] * len(preguntas) for kpa, preguntas in KPAS.items()}
+
+
+def test_proyecto_json_valido():
+    nombre, respuestas = proyecto_desde_json({"proyecto": " Demo ", "respuestas": respuestas_completas()})
+    assert nombre == "Demo"
+    assert respuestas == respuestas_completas()
+
+
+@pytest.mark.parametrize("valor", ["11111", 5, None, ["1", 2, "1", "1", "1"]])
+def test_respuestas_que_no_son_lista_de_textos(valor):
+    respuestas = respuestas_completas()
+    respuestas["Gestión de requisitos"] = valor
+    with pytest.raises(ValueError, match="Proyecto 'P' \\(línea 7\\)"):
+        proyecto_desde_json({"proyecto": "P", "respuestas": respuestas}, linea=7)
+
+
+def test_jsonl_indica_la_linea():
+    malo = {"proyecto": "Malo", "respuestas": {**respuestas_completas(), "Gestión de requisitos": "11111"}}
+    archivo = io.StringIO(json.dumps({"proyecto": "Bueno", "respuestas": respuestas_completas()}) + "\n\n"
+                          + json.dumps(malo) + "\n")
+    lector = leer_jsonl(archivo)
+    assert next(lector)[0] == "Bueno"
+    with pytest.raises(ValueError, match="Proyecto 'Malo' \\(línea 3\\)"):
+        next(lector)
+
+
+def test_jsonl_no_valido():
+    with pytest.raises(ValueError, match="Línea 1: JSON no válido"):
+        list(leer_jsonl(io.StringIO('{"proyecto":\n')))
+
+
+def test_csv_indica_la_linea():
+    with pytest.raises(ValueError, match="Proyecto 'A' \\(línea 2\\)"):
+        list(leer_csv(io.StringIO("proyecto,x\nA,1\n")))
+
+
+def test_main_informa_sin_traza(tmp_path, capsys):
+    entrada = tmp_path / "respuestas.jsonl"
+    entrada.write_text(json.dumps({"proyecto": "P", "respuestas": {"Gestión de requisitos": 5}}) + "\n", "utf-8")
+    assert main([str(entrada), str(tmp_path / "salida.jsonl")]) == 1
+    assert "Error: Proyecto 'P' (línea 1)" in capsys.readouterr().err
+
+
+def test_linea_json_igual_que_el_registro():
+    respuestas = respuestas_completas("2")
+    assert evaluar_proyecto_json("P", respuestas) == json.dumps(evaluar_proyecto("P", respuestas), ensure_ascii=False)
+
+
+def cartera(cantidad=25):
+    # Proyectos deterministas con respuestas distintas
+    return [(f"P{i}", {kpa: [str(1 + (i * 7 + k * 3 + j) % 3) for j in range(len(preguntas))]
+                       for k, (kpa, preguntas) in enumerate(KPAS.items())})
+            for i in range(cantidad)]
+
+
+def escribir_cartera(ruta, proyectos, formato):
+    with open(ruta, "w", encoding="utf-8") as f:
+        if formato == "csv":
+            f.write(",".join(columnas_csv()) + "\n")
+            for nombre, respuestas in proyectos:
+                f.write(",".join([nombre] + [o for kpa in KPAS for o in respuestas[kpa]]) + "\n")
+        else:
+            for nombre, respuestas in proyectos:
+                f.write(json.dumps({"proyecto": nombre, "respuestas": respuestas}, ensure_ascii=False) + "\n")
+
+
+@pytest.mark.parametrize("formato", ["csv", "jsonl"])
+def test_paralelo_igual_que_en_serie(tmp_path, formato):
+    entrada = tmp_path / f"respuestas.{formato}"
+    escribir_cartera(entrada, cartera(), formato)
+    assert evaluar_archivo(str(entrada), str(tmp_path / "serie.jsonl")) == 25
+    assert evaluar_archivo_paralelo(str(entrada), str(tmp_path / "paralelo.jsonl"), procesos=2, tam_bloque=4) == 25
+    assert (tmp_path / "paralelo.jsonl").read_bytes() == (tmp_path / "serie.jsonl").read_bytes()
+
+
+def test_paralelo_indica_la_linea_del_error(tmp_path):
+    proyectos = cartera(10)
+    proyectos[7][1]["Gestión de requisitos"] = "11111"
+    entrada = tmp_path / "respuestas.jsonl"
+    escribir_cartera(entrada, proyectos, "jsonl")
+    with pytest.raises(ValueError, match="Proyecto 'P7' \\(línea 8\\)"):
+        evaluar_archivo_paralelo(str(entrada), str(tmp_path / "salida.jsonl"), procesos=2, tam_bloque=3)
+
+
+def test_paralelo_rechaza_bloques_vacios(tmp_path):
+    with pytest.raises(ValueError, match="bloque"):
+        evaluar_archivo_paralelo(str(tmp_path / "no_existe.csv"), str(tmp_path / "salida.jsonl"), tam_bloque=0)
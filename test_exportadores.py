@@ -0,0 +1,127 @@
+# test_exportadores.py
+# Compruebo los exportadores CSV, JSON Lines y HTML contra los registros de evaluar_proyecto
+
+import csv
+import json
+from html.parser import HTMLParser
+
+import pytest
+
+import exportadores
+from KPAS import KPAS
+from evaluacion_lotes import evaluar_archivo, evaluar_proyecto
+from exportadores import SEPARADOR_COLUMNA, abrir_salida, crear_exportador, exportar_registros, main
+from test_evaluacion_lotes import cartera, escribir_cartera
+
+
+def registros(cantidad=25):
+    return [evaluar_proyecto(nombre, respuestas) for nombre, respuestas in cartera(cantidad)]
+
+
+@pytest.mark.parametrize("max_fragmentos", [exportadores.MAX_FRAGMENTOS, 3])
+def test_jsonl_igual_que_el_modo_por_lotes(tmp_path, monkeypatch, max_fragmentos):
+    monkeypatch.setattr(exportadores, "MAX_FRAGMENTOS", max_fragmentos)  # También vaciando la caché a menudo
+    escribir_cartera(tmp_path / "respuestas.csv", cartera(), "csv")
+    evaluar_archivo(str(tmp_path / "respuestas.csv"), str(tmp_path / "lotes.jsonl"))
+    assert exportar_registros(registros(), str(tmp_path / "exportado.jsonl")) == 25
+    assert (tmp_path / "exportado.jsonl").read_bytes() == (tmp_path / "lotes.jsonl").read_bytes()
+    with open(tmp_path / "exportado.jsonl", encoding="utf-8") as f:
+        assert [json.loads(linea) for linea in f] == json.loads(json.dumps(registros()))
+
+
+def test_csv(tmp_path):
+    exportar_registros(registros(), str(tmp_path / "exportado.csv"))
+    with open(tmp_path / "exportado.csv", encoding="utf-8", newline="") as f:
+        filas = list(csv.DictReader(f))
+    assert len(filas) == 25
+    for fila, registro in zip(filas, registros()):
+        assert fila["proyecto"] == registro["proyecto"]
+        assert fila["cumple_nivel2"] == ("true" if registro["cumple_nivel2"] else "false")
+        assert int(fila["deficientes"]) == registro["resumen"]["deficientes"]
+        for r in registro["kpas"]:
+            assert float(fila[f"{r['kpa']}{SEPARADOR_COLUMNA}porcentaje"]) == r["porcentaje"]
+            assert fila[f"{r['kpa']}{SEPARADOR_COLUMNA}estado"] == r["estado"]
+
+
+def test_csv_kpas_en_otro_orden_o_ausentes(tmp_path):
+    registro = registros(1)[0]
+    ruta = str(tmp_path / "parcial.csv")
+    with abrir_salida(ruta) as salida, crear_exportador(salida, "csv", kpas=KPAS) as exportador:
+        exportador.escribir_proyecto("P", registro["kpas"][:0:-1], registro["resumen"], False)
+    with open(ruta, encoding="utf-8", newline="") as f:
+        fila = next(csv.DictReader(f))
+    primera = registro["kpas"][0]["kpa"]
+    assert fila[f"{primera}{SEPARADOR_COLUMNA}estado"] == ""
+    assert fila[f"{registro['kpas'][1]['kpa']}{SEPARADOR_COLUMNA}estado"] == registro["kpas"][1]["estado"]
+
+
+class Tabla(HTMLParser):
+    # Leo las celdas de cada fila y compruebo que las etiquetas abren y cierran en orden
+    def __init__(self):
+        super().__init__()
+        self.abiertas, self.filas, self.fila, self.texto = [], [], None, None
+
+    def handle_starttag(self, etiqueta, atributos):
+        if etiqueta not in ("meta", "br"):
+            self.abiertas.append(etiqueta)
+        if etiqueta == "tr":
+            self.fila = []
+        elif etiqueta in ("td", "th"):
+            self.texto = ""
+
+    def handle_endtag(self, etiqueta):
+        assert self.abiertas.pop() == etiqueta
+        if etiqueta in ("td", "th") and self.fila is not None and self.texto is not None:
+            self.fila.append(self.texto)
+            self.texto = None
+        elif etiqueta == "tr":
+            self.filas.append(self.fila)
+
+    def handle_data(self, datos):
+        if self.texto is not None:
+            self.texto += datos
+
+
+def test_html(tmp_path):
+    evaluados = registros()
+    evaluados[0]["proyecto"] = "<Beta & Cía>"
+    exportar_registros(evaluados, str(tmp_path / "informe.html"), con_recomendaciones=True)
+    contenido = (tmp_path / "informe.html").read_text("utf-8")
+    assert "&lt;Beta &amp; Cía&gt;" in contenido and "<Beta" not in contenido
+    tabla = Tabla()
+    tabla.feed(contenido)
+    assert tabla.abiertas == []
+
+    proyectos = [fila for fila in tabla.filas if len(fila) == len(KPAS) + 2 and fila[0] != "Proyecto"]
+    assert [fila[0] for fila in proyectos] == [r["proyecto"] for r in evaluados]
+    for fila, registro in zip(proyectos, evaluados):
+        assert fila[1] == ("Cumple" if registro["cumple_nivel2"] else "No cumple")
+        assert fila[2:] == [f"{r['porcentaje']}%" for r in registro["kpas"]]
+    assert f"Proyectos evaluados: 25. Cumplen el Nivel 2: {sum(r['cumple_nivel2'] for r in evaluados)}." in contenido
+    totales = {fila[0]: [int(n) for n in fila[1:]] for fila in tabla.filas if len(fila) == 4 and fila[0] in KPAS}
+    assert list(totales) == list(KPAS)
+    for kpa, contados in totales.items():
+        estados = [r["estado"] for registro in evaluados for r in registro["kpas"] if r["kpa"] == kpa]
+        assert contados == [estados.count(e) for e in exportadores.CLASE_ESTADO]
+    assert contenido.count("<details>") == sum(not r["cumple_nivel2"] for r in evaluados)
+
+
+def test_sin_proyectos_el_documento_queda_completo(tmp_path):
+    assert exportar_registros([], str(tmp_path / "vacio.html")) == 0
+    tabla = Tabla()
+    tabla.feed((tmp_path / "vacio.html").read_text("utf-8"))
+    assert tabla.abiertas == []
+    exportar_registros([], str(tmp_path / "vacio.csv"))
+    assert (tmp_path / "vacio.csv").read_text("utf-8").count("\n") == 1  # Solo la cabecera
+
+
+def test_main(tmp_path, capsys):
+    with open(tmp_path / "resultados.jsonl", "w", encoding="utf-8") as f:
+        for registro in registros(5):
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    assert main([str(tmp_path / "resultados.jsonl"), str(tmp_path / "salida.csv")]) == 0
+    assert "Proyectos exportados: 5" in capsys.readouterr().out
+    assert main([str(tmp_path / "no_existe.jsonl"), str(tmp_path / "salida.csv")]) == 1
+    assert capsys.readouterr().err.startswith("Error:")
+    with pytest.raises(ValueError, match="Formato de exportación desconocido"):
+        crear_exportador(None, "xml")
@@ -0,0 +1,49 @@
+# test_flujo_evaluacion.py
+# Compruebo que la tubería en streaming escribe lo mismo que el modo por lotes, que sus agregados
+# cuadran con los registros y que procesa los proyectos de uno en uno
+
+import itertools
+import json
+
+from KPAS import KPAS
+from evaluacion_lotes import evaluar_archivo, evaluar_proyecto
+from flujo_evaluacion import agregados_vacios, clasificar, ejecutar_flujo, parsear, puntuar
+from historial import HistorialEvaluaciones
+from test_evaluacion_lotes import cartera, escribir_cartera
+
+
+def test_misma_salida_que_el_modo_por_lotes(tmp_path):
+    escribir_cartera(tmp_path / "respuestas.csv", cartera(), "csv")
+    evaluar_archivo(str(tmp_path / "respuestas.csv"), str(tmp_path / "lotes.jsonl"))
+    total, _ = ejecutar_flujo(str(tmp_path / "respuestas.csv"), str(tmp_path / "flujo.jsonl"))
+    assert total == 25
+    assert (tmp_path / "flujo.jsonl").read_bytes() == (tmp_path / "lotes.jsonl").read_bytes()
+
+
+def test_agregados_y_historial(tmp_path):
+    proyectos = cartera()
+    escribir_cartera(tmp_path / "respuestas.jsonl", proyectos, "jsonl")
+    with HistorialEvaluaciones(str(tmp_path / "h.db")) as historial:
+        _, agregados = ejecutar_flujo(str(tmp_path / "respuestas.jsonl"), str(tmp_path / "flujo.csv"), historial=historial)
+        assert historial.conexion.execute("SELECT COUNT(*) FROM evaluaciones").fetchone() == (25,)
+
+    esperado = agregados_vacios()
+    for nombre, respuestas in proyectos:
+        registro = evaluar_proyecto(nombre, respuestas)
+        esperado["proyectos"] += 1
+        esperado["cumplen_nivel2"] += registro["cumple_nivel2"]
+        for clave in ("implementadas", "parciales", "deficientes"):
+            esperado[clave] += registro["resumen"][clave]
+        for r in registro["kpas"]:
+            esperado["por_kpa"][r["kpa"]][r["estado"]] += 1
+    assert agregados == esperado
+    assert (tmp_path / "flujo.csv").read_text("utf-8").count("\n") == 26  # Cabecera y un proyecto por línea
+
+
+def test_procesa_los_proyectos_de_uno_en_uno():
+    # Una entrada sin fin: si alguna etapa acumulara la entrada, la prueba no terminaría
+    linea = json.dumps({"proyecto": "P", "respuestas": {kpa: ["1"] * len(p) for kpa, p in KPAS.items()}}) + "\n"
+    agregados = agregados_vacios()
+    registros = clasificar(puntuar(parsear(itertools.repeat(linea), "jsonl")), agregados)
+    assert [r["cumple_nivel2"] for r in itertools.islice(registros, 3)] == [True] * 3
+    assert agregados["proyectos"] == 3
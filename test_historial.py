@@ -0,0 +1,43 @@
+# test_historial.py
+# Compruebo que el historial devuelve lo que se guardó y que un lote fallido no deja ids en las cachés
+
+import pytest
+
+from KPAS import KPAS
+from diagnostico_cmmi_nivel2 import construir_resultado_kpa, diagnostico_general
+from historial import HistorialEvaluaciones
+
+
+def evaluacion(opciones):
+    resultados = [construir_resultado_kpa(kpa, preguntas, opciones) for kpa, preguntas in KPAS.items()]
+    return resultados, diagnostico_general(resultados)[1]
+
+
+def test_ida_y_vuelta(tmp_path):
+    buena, cumple = evaluacion(["1", "1", "1", "1", "2"])
+    mala, no_cumple = evaluacion(["3", "3", "2", "1", "3"])
+    with HistorialEvaluaciones(str(tmp_path / "h.db")) as historial:
+        ids = historial.guardar_lote([
+            ("Alfa", mala, no_cumple, "2026-01-10 09:00:00"),
+            ("Beta", buena, cumple, "2026-01-11 09:00:00"),
+            ("Alfa", buena, cumple, "2026-02-10 09:00:00"),
+        ])
+        assert ids == [1, 2, 3]
+        assert historial.respuestas_de(1) == {kpa: ["3", "3", "2", "1", "3"] for kpa in KPAS}
+        assert historial.ultima_evaluacion_por_proyecto() == [
+            ("Alfa", 3, "2026-02-10 09:00:00", 1), ("Beta", 2, "2026-01-11 09:00:00", 1)]
+        assert historial.proyectos_por_estado("Gestión de requisitos", "Deficiente", solo_ultima=False) == [
+            ("Alfa", 1, "2026-01-10 09:00:00", 30.0)]
+        assert historial.proyectos_por_estado("Gestión de requisitos", "Deficiente") == []
+
+
+def test_lote_deshecho_no_deja_ids_en_cache(tmp_path):
+    resultados, cumple = evaluacion(["1", "1", "1", "1", "1"])
+    roto = [{"kpa": "KPA nueva", "respuestas": []}]  # Sin porcentaje: falla a mitad de la transacción
+    with HistorialEvaluaciones(str(tmp_path / "h.db")) as historial:
+        with pytest.raises(KeyError):
+            historial.guardar_lote([("Nuevo", resultados + roto, cumple)])
+        assert historial.conexion.execute("SELECT COUNT(*) FROM proyectos").fetchone() == (0,)
+        assert historial.ids_proyecto == {} and historial.ids_kpa == {}
+        historial.guardar_lote([("Otro", resultados, cumple), ("Nuevo", resultados, cumple)])
+        assert [fila[0] for fila in historial.ultima_evaluacion_por_proyecto()] == ["Nuevo", "Otro"]
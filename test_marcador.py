@@ -0,0 +1,56 @@
+# test_marcador.py
+# Compruebo que el marcador en vivo, aplicando solo la diferencia de cada cambio de respuesta,
+# da en todo momento lo mismo que evaluar de nuevo todas las KPAs
+
+import random
+
+import pytest
+
+from KPAS import KPAS
+from cuestionario import Cuestionario, compilar_definicion, definicion_por_defecto
+from evaluacion_cmmi import evaluar_kpa, generar_resumen_general
+from marcador import MarcadorEnVivo
+
+
+def cuestionario_con_pesos():
+    definicion = definicion_por_defecto()
+    definicion["valores"] = {"1": 1.0, "2": 0.75, "3": 0.0}
+    for k, kpa in enumerate(definicion["kpas"][:-1]):  # La última KPA sigue con todos los pesos a 1
+        for i, pregunta in enumerate(kpa["preguntas"]):
+            pregunta["peso"] = 1 + (i + k) % 3
+    return Cuestionario(compilar_definicion(definicion, "pesos"))
+
+
+@pytest.mark.parametrize("ponderado", [False, True])
+def test_igual_que_evaluar_de_nuevo(ponderado):
+    cuestionario = cuestionario_con_pesos() if ponderado else None
+    if cuestionario is None:
+        kpas, marcador = KPAS, MarcadorEnVivo()
+    else:
+        kpas = cuestionario.kpas
+        marcador = MarcadorEnVivo(kpas, cuestionario.valores, cuestionario.pesos_kpa)
+    respuestas = {kpa: [""] * len(preguntas) for kpa, preguntas in kpas.items()}
+    azar = random.Random(2024)
+    for _ in range(500):
+        kpa = azar.choice(list(kpas))
+        indice = azar.randrange(len(kpas[kpa]))
+        nueva = azar.choice(["1", "2", "3", ""])
+        estado = marcador.cambiar(kpa, respuestas[kpa][indice], nueva, indice)
+        respuestas[kpa][indice] = nueva
+
+        resultado = evaluar_kpa(kpa, respuestas[kpa], cuestionario)
+        assert estado == resultado["estado"]
+        assert round(marcador.porcentaje(kpa), 2) == resultado["porcentaje"]
+    resultados = [evaluar_kpa(kpa, respuestas[kpa], cuestionario) for kpa in kpas]
+    assert marcador.resumen() == generar_resumen_general(resultados, kpas)
+
+
+def test_vaciar_y_cumplir_nivel2():
+    marcador = MarcadorEnVivo()
+    assert marcador.contadores == {"implementadas": 0, "parciales": 0, "deficientes": 5}
+    for kpa, total in marcador.num_preguntas.items():
+        for i in range(total):
+            marcador.cambiar(kpa, "", "1", i)
+    assert marcador.cumple_nivel2
+    marcador.vaciar()
+    assert not marcador.cumple_nivel2 and marcador.resumen()[0]["deficientes"] == 5
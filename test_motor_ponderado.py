@@ -0,0 +1,60 @@
+# test_motor_ponderado.py
+# Compruebo que el motor ponderado puntúa igual que porcentaje.porcentaje_ponderado (la ruta por KPA)
+# y que, con todos los pesos a 1, da exactamente lo mismo que motor_vectorial
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from cuestionario import Cuestionario, compilar_definicion, definicion_por_defecto
+from motor_ponderado import ModeloPonderado
+from motor_vectorial import ESTADOS, puntuar_matriz
+from porcentaje import estado_porcentaje, porcentaje_ponderado
+
+
+def cartera(total_preguntas, proyectos=500):
+    # Opciones '1', '2' y '3' al azar, con semilla fija
+    return np.random.default_rng(2024).integers(1, 4, size=(proyectos, total_preguntas), dtype=np.uint8)
+
+
+def cuestionario_con_pesos():
+    definicion = definicion_por_defecto()
+    definicion["valores"] = {"1": 1.0, "2": 0.8, "3": 0.0}
+    for k, kpa in enumerate(definicion["kpas"]):
+        for i, pregunta in enumerate(kpa["preguntas"]):
+            pregunta["peso"] = 1 + (i + k) % 3
+    for pregunta in definicion["kpas"][-1]["preguntas"]:
+        pregunta["peso"] = 1  # Una KPA sigue con todos los pesos a 1
+    return Cuestionario(compilar_definicion(definicion, "pesos"))
+
+
+def test_pesos_a_uno_identico_a_motor_vectorial():
+    matriz = cartera(25)
+    ponderado = ModeloPonderado().puntuar(matriz)
+    original = puntuar_matriz(matriz)
+    for clave in original:
+        assert np.array_equal(ponderado[clave], original[clave]), clave
+
+
+def test_pesos_como_porcentaje_ponderado():
+    cuestionario = cuestionario_con_pesos()
+    assert cuestionario.pesos_kpa[cuestionario.nombres_kpa[-1]] is None
+    matriz = cartera(cuestionario.total_preguntas)
+    puntuacion = ModeloPonderado(cuestionario).puntuar(matriz)
+    valores = [None] + list(cuestionario.valores.values())
+    for fila, codigos in enumerate(matriz):
+        for k, nombre in enumerate(cuestionario.nombres_kpa):
+            inicio, fin = cuestionario.inicio_kpa[k], cuestionario.inicio_kpa[k + 1]
+            esperado = porcentaje_ponderado([valores[c] for c in codigos[inicio:fin]], cuestionario.pesos_kpa[nombre])
+            assert puntuacion["porcentajes"][fila, k] == round(esperado, 2)
+            assert ESTADOS[puntuacion["estados"][fila, k]] == estado_porcentaje(esperado)
+
+
+def test_banco_grande_disperso_igual_que_denso(monkeypatch):
+    cuestionario = cuestionario_con_pesos()
+    matriz = cartera(cuestionario.total_preguntas)
+    denso = ModeloPonderado(cuestionario).puntuar(matriz)
+    monkeypatch.setattr("motor_ponderado.UMBRAL_DISPERSO", 0)
+    disperso = ModeloPonderado(cuestionario)
+    assert disperso.disperso
+    assert np.array_equal(disperso.puntuar(matriz)["porcentajes"], denso["porcentajes"])
@@ -0,0 +1,54 @@
+# test_motor_vectorial.py
+# Compruebo que el motor vectorizado da exactamente lo mismo que construir_resultado_kpa
+# para los 3^5 = 243 patrones de respuesta de cada KPA
+
+import itertools
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from KPAS import KPAS
+from VALOR_RESPUESTA import VALOR_RESPUESTA
+from diagnostico_cmmi_nivel2 import construir_resultado_kpa, diagnostico_general
+from motor_vectorial import ESTADOS, NOMBRES_KPA, matriz_respuestas, puntuar_matriz, resumen_proyecto
+
+
+def matriz_todos_los_patrones():
+    """
+    Una fila por patrón; cada KPA recorre los 243 patrones desplazada respecto a las demás
+    para que los veredictos de Nivel 2 combinen estados distintos.
+    """
+    patrones = [list(p) for p in itertools.product(VALOR_RESPUESTA, repeat=len(KPAS[NOMBRES_KPA[0]]))]
+    filas = []
+    for i in range(len(patrones)):
+        filas.append([int(o) for k in range(len(NOMBRES_KPA)) for o in patrones[(i + 37 * k) % len(patrones)]])
+    return np.array(filas, dtype=np.uint8), patrones
+
+
+def test_todos_los_patrones_coinciden_con_construir_resultado_kpa():
+    matriz, patrones = matriz_todos_los_patrones()
+    puntuacion = puntuar_matriz(matriz)
+    for k, kpa in enumerate(NOMBRES_KPA):
+        for i in range(len(patrones)):
+            esperado = construir_resultado_kpa(kpa, KPAS[kpa], patrones[(i + 37 * k) % len(patrones)])
+            assert puntuacion["porcentajes"][i, k] == esperado["porcentaje"]
+            assert ESTADOS[puntuacion["estados"][i, k]] == esperado["estado"]
+
+
+def test_resumen_y_veredicto_identicos():
+    matriz, patrones = matriz_todos_los_patrones()
+    puntuacion = puntuar_matriz(matriz)
+    for i in range(len(patrones)):
+        resultados = [construir_resultado_kpa(kpa, KPAS[kpa], patrones[(i + 37 * k) % len(patrones)])
+                      for k, kpa in enumerate(NOMBRES_KPA)]
+        assert resumen_proyecto(puntuacion, i) == diagnostico_general(resultados)
+
+
+def test_matriz_desde_diccionarios():
+    respuestas = {kpa: ["1", "2", "3", "1", "2"] for kpa in NOMBRES_KPA}
+    todas_si = {kpa: ["1"] * len(KPAS[kpa]) for kpa in NOMBRES_KPA}
+    matriz = matriz_respuestas([respuestas, todas_si])
+    assert matriz.dtype == np.uint8
+    assert matriz[0].tolist() == [int(o) for kpa in NOMBRES_KPA for o in respuestas[kpa]]
+    assert puntuar_matriz(matriz)["cumple_nivel2"].tolist() == [False, True]
@@ -0,0 +1,125 @@
+# test_optimizador_nivel2.py
+# Compruebo los planes de mejora contra la fuerza bruta: para cada patrón de respuestas de una KPA
+# el plan es el más barato de los que la dejan implementada y de verdad la deja implementada
+
+import itertools
+import json
+import random
+
+import pytest
+
+from KPAS import KPAS
+from optimizador_nivel2 import ESCALON, OPCIONES, OptimizadorNivel2, implementada, main, patrones, planificar_archivo
+from test_evaluacion_lotes import cartera, escribir_cartera
+
+KPA = "Gestión de requisitos"
+
+
+def fuerza_bruta(opciones, esfuerzos):
+    # Pruebo todas las formas de subir cada pregunta (o dejarla) y me quedo con el coste mínimo
+    posibles = [[o for o in OPCIONES if ESCALON[o] >= ESCALON[actual]] for actual in opciones]
+    return min(sum(e * (ESCALON[n] - ESCALON[a]) for a, n, e in zip(opciones, nuevas, esfuerzos))
+               for nuevas in itertools.product(*posibles) if implementada(nuevas))
+
+
+def aplicar(opciones, cambios):
+    opciones = list(opciones)
+    for i, desde, hasta, _ in cambios:
+        assert opciones[i] == desde and ESCALON[hasta] > ESCALON[desde]
+        opciones[i] = hasta
+    return opciones
+
+
+@pytest.mark.parametrize("semilla", [None, 1, 2])
+def test_plan_minimo_como_la_fuerza_bruta(semilla):
+    n = len(KPAS[KPA])
+    if semilla is None:
+        esfuerzos = [1.0] * n
+    else:
+        azar = random.Random(semilla)
+        esfuerzos = [azar.choice([0, 0.5, 1, 2, 3.5]) for _ in range(n)]
+    optimizador = OptimizadorNivel2({KPA: esfuerzos})
+    for opciones in patrones(n):
+        coste, cambios = optimizador.plan_kpa(KPA, list(opciones))
+        assert coste == pytest.approx(fuerza_bruta(opciones, esfuerzos))
+        assert coste == pytest.approx(sum(c[3] for c in cambios))
+        assert implementada(aplicar(opciones, cambios))
+        if implementada(opciones):
+            assert (coste, cambios) == (0, ())
+
+
+def test_prefiere_el_plan_con_menos_cambios():
+    # Subir una pregunta de No a Sí cuesta lo mismo que subir dos de No a Parcial
+    optimizador = OptimizadorNivel2()
+    coste, cambios = optimizador.plan_kpa(KPA, ["1", "1", "1", "3", "2"])
+    assert coste == 1 and len(cambios) == 1
+    coste, cambios = optimizador.plan_kpa(KPA, ["1", "1", "1", "3", "3"])
+    assert coste == 2 and [(desde, hasta) for _, desde, hasta, _ in cambios] == [("3", "1")]
+
+
+def test_sin_responder_cuenta_como_no():
+    optimizador = OptimizadorNivel2()
+    assert (optimizador.plan_kpa(KPA, ["1", "", "2", "", "1"])
+            == optimizador.plan_kpa(KPA, ["1", "3", "2", "3", "1"]))
+
+
+def test_plan_del_proyecto():
+    optimizador = OptimizadorNivel2()
+    for _, respuestas in cartera(12):
+        plan = optimizador.plan(respuestas)
+        assert plan["coste_por_kpa"] == {kpa: optimizador.plan_kpa(kpa, respuestas[kpa])[0] for kpa in KPAS}
+        assert plan["coste"] == sum(plan["coste_por_kpa"].values())
+        assert plan["cumple_nivel2"] == (not plan["cambios"])
+        assert [c["coste"] for c in plan["cambios"]] == sorted(c["coste"] for c in plan["cambios"])
+    cumple = {kpa: ["1"] * len(preguntas) for kpa, preguntas in KPAS.items()}
+    assert optimizador.plan(cumple) == {"cumple_nivel2": True, "coste": 0, "coste_por_kpa": dict.fromkeys(KPAS, 0.0),
+                                        "cambios": []}
+
+
+def test_costes_matriz_como_el_plan():
+    pytest.importorskip("numpy")
+    from motor_vectorial import matriz_respuestas
+
+    proyectos = [respuestas for _, respuestas in cartera(30)]
+    optimizador = OptimizadorNivel2({KPA: [2, 1, 1, 3, 0.5]})
+    costes, num_cambios = optimizador.costes_matriz(matriz_respuestas(proyectos))
+    for fila, respuestas in enumerate(proyectos):
+        plan = optimizador.plan(respuestas)
+        assert list(costes[fila]) == list(plan["coste_por_kpa"].values())
+        assert num_cambios[fila] == len(plan["cambios"])
+
+
+@pytest.mark.parametrize("esfuerzos, mensaje", [
+    ([1] * 5, "diccionario"),
+    ({"Otra KPA": [1] * 5}, "KPAs desconocidas: Otra KPA"),
+    ({KPA: [1] * 4}, "sus 5 preguntas"),
+    ({KPA: [1, 1, -1, 1, 1]}, "no negativos"),
+    ({KPA: [1, 1, True, 1, 1]}, "no negativos"),
+])
+def test_esfuerzos_no_validos(esfuerzos, mensaje):
+    with pytest.raises(ValueError, match=mensaje):
+        OptimizadorNivel2(esfuerzos)
+
+
+def test_respuestas_de_otra_longitud():
+    with pytest.raises(ValueError, match="necesita 5 respuestas"):
+        OptimizadorNivel2().plan_kpa(KPA, ["1"] * 4)
+
+
+def test_planificar_archivo_y_main(tmp_path, capsys):
+    proyectos = cartera(20)
+    escribir_cartera(tmp_path / "respuestas.jsonl", proyectos, "jsonl")
+    totales = planificar_archivo(str(tmp_path / "respuestas.jsonl"), str(tmp_path / "planes.jsonl"))
+    with open(tmp_path / "planes.jsonl", encoding="utf-8") as f:
+        planes = [json.loads(linea) for linea in f]
+    assert [p["proyecto"] for p in planes] == [nombre for nombre, _ in proyectos]
+    assert totales["proyectos"] == 20
+    assert totales["cumplen_nivel2"] == sum(p["cumple_nivel2"] for p in planes)
+    assert totales["coste"] == pytest.approx(sum(p["coste"] for p in planes))
+    assert sum(totales["mejoras"].values()) == sum(len(p["cambios"]) for p in planes)
+
+    assert main([str(tmp_path / "respuestas.jsonl")]) == 0
+    assert "Proyectos planificados: 20" in capsys.readouterr().out
+    (tmp_path / "esfuerzos.json").write_text(json.dumps({"Otra KPA": [1]}), encoding="utf-8")
+    assert main([str(tmp_path / "respuestas.jsonl"), "--esfuerzos", str(tmp_path / "esfuerzos.json")]) == 1
+    assert capsys.readouterr().err.startswith("Error:")
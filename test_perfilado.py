@@ -0,0 +1,54 @@
+# test_perfilado.py
+# Compruebo que activar el perfilado al importar (CMMI_PERFILADO) y después (--perfilar)
+# mide exactamente las mismas etapas con el mismo número de llamadas
+
+import json
+import os
+import subprocess
+import sys
+
+from evaluacion_lotes import columnas_csv
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+def escribir_respuestas(ruta):
+    columnas = columnas_csv()
+    filas = [["P1"] + ["1"] * (len(columnas) - 1),
+             ["P2"] + ["2", "3"] * len(columnas),
+             ["P3"] + ["3"] * (len(columnas) - 1)]
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(",".join(columnas) + "\n")
+        for fila in filas:
+            f.write(",".join(fila[:len(columnas)]) + "\n")
+
+
+def etapas_medidas(tmp_path, nombre, argumentos, entorno):
+    salida = tmp_path / f"{nombre}.json"
+    entorno = {**os.environ, **entorno}
+    subprocess.run([sys.executable, "evaluacion_lotes.py", str(tmp_path / "respuestas.csv"),
+                    str(tmp_path / f"{nombre}.jsonl")] + argumentos,
+                   cwd=DIRECTORIO, env=entorno, check=True, capture_output=True)
+    return {etapa: datos["llamadas"] for etapa, datos in json.loads(salida.read_text("utf-8"))["etapas"].items()}
+
+
+def test_activar_al_importar_o_despues_mide_las_mismas_etapas(tmp_path):
+    escribir_respuestas(tmp_path / "respuestas.csv")
+    al_importar = etapas_medidas(tmp_path, "entorno", [], {
+        "CMMI_PERFILADO": "json", "CMMI_PERFILADO_SALIDA": str(tmp_path / "entorno.json")})
+    despues = etapas_medidas(tmp_path, "opcion", [
+        "--perfilar", "json", "--perfilar-salida", str(tmp_path / "opcion.json")], {"CMMI_PERFILADO": ""})
+    assert al_importar == despues
+    assert al_importar["diagnostico_cmmi_nivel2.generar_recomendaciones_por_respuestas"] > 0
+
+
+def test_valor_no_valido_no_rompe_la_importacion(tmp_path):
+    escribir_respuestas(tmp_path / "respuestas.csv")
+    proceso = subprocess.run([sys.executable, "evaluacion_lotes.py", str(tmp_path / "respuestas.csv"),
+                              str(tmp_path / "salida.jsonl")],
+                             cwd=DIRECTORIO, env={**os.environ, "CMMI_PERFILADO": "mucho"},
+                             capture_output=True, text=True)
+    assert proceso.returncode == 0
+    assert "CMMI_PERFILADO='mucho' no es válido" in proceso.stderr
+    assert "Perfilado por etapa" not in proceso.stderr
+    assert (tmp_path / "salida.jsonl").read_text("utf-8").count("\n") == 3
@@ -0,0 +1,65 @@
+# test_rendimiento.py
+# Compruebo la batería de rendimiento sin fiarme de los tiempos: carteras sintéticas reproducibles,
+# la comparación que marca las regresiones y el código de salida de --comparar
+
+import json
+
+import pytest
+
+from KPAS import KPAS
+from rendimiento import FORMATO_RESULTADOS, CarteraSintetica, comparar, ejecutar, main
+
+
+def resultados(**por_elemento):
+    return {"formato": FORMATO_RESULTADOS, "resultados": [
+        {"caso": caso, "tamano": "1k", "por_elemento_us": us} for caso, us in por_elemento.items()]}
+
+
+def test_comparar_marca_solo_lo_que_empeora_por_encima_del_umbral():
+    base = resultados(igual=10.0, peor=10.0, algo_peor=10.0, mejor=10.0, cero=0.0, solo_base=1.0)
+    nuevo = resultados(igual=10.0, peor=12.0, algo_peor=10.5, mejor=5.0, cero=1.0, nuevo=3.0)
+    filas = {fila[0]: fila for fila in comparar(base, nuevo, umbral=10.0)}
+    assert set(filas) == {"igual", "peor", "algo_peor", "mejor"}
+    assert filas["peor"] == ("peor", "1k", 10.0, 12.0, pytest.approx(20.0), True)
+    assert [filas[c][5] for c in ("igual", "algo_peor", "mejor")] == [False, False, False]
+    assert filas["mejor"][4] == pytest.approx(-50.0)
+
+
+def test_main_comparar_devuelve_1_si_hay_regresiones(tmp_path, capsys):
+    for nombre, datos in [("base", resultados(caso=10.0)), ("peor", resultados(caso=20.0)),
+                          ("mejor", resultados(caso=9.0)), ("otro", {"formato": 99, "resultados": []})]:
+        (tmp_path / f"{nombre}.json").write_text(json.dumps(datos), encoding="utf-8")
+
+    def ruta(nombre):
+        return str(tmp_path / f"{nombre}.json")
+
+    assert main(["--comparar", ruta("base"), ruta("peor")]) == 1
+    assert "REGRESIÓN" in capsys.readouterr().out
+    assert main(["--comparar", ruta("base"), ruta("mejor")]) == 0
+    assert main(["--comparar", ruta("base"), ruta("peor"), "--umbral", "150"]) == 0
+    assert main(["--comparar", ruta("base"), ruta("otro")]) == 1
+    assert capsys.readouterr().err.startswith("Error:")
+
+
+@pytest.mark.parametrize("generador", ["uniforme", "plantillas"])
+def test_cartera_sintetica_reproducible(generador):
+    cartera = CarteraSintetica(50, generador, semilla=7)
+    assert cartera.texto == CarteraSintetica(50, generador, semilla=7).texto
+    assert cartera.texto != CarteraSintetica(50, generador, semilla=8).texto
+    proyectos = cartera.proyectos()
+    assert [nombre for nombre, _ in proyectos[:2]] == ["P0", "P1"]
+    assert all({kpa: len(o) for kpa, o in respuestas.items()} == {kpa: len(p) for kpa, p in KPAS.items()}
+               for _, respuestas in proyectos)
+    assert sum(len(bloque) for bloque in cartera.bloques(tam_bloque=16)) == 50
+    with pytest.raises(ValueError, match="Generador desconocido"):
+        CarteraSintetica(1, "otro")
+
+
+def test_ejecutar_un_caso_pequeno():
+    informe = ejecutar(["1k"], ["evaluacion_cmmi.evaluar_kpa", "diagnostico_cmmi_nivel2.cli"], repeticiones=1,
+                       con_gui=False)
+    medidos = {(r["caso"], r["tamano"]) for r in informe["resultados"]}
+    assert {("evaluacion_cmmi.evaluar_kpa", "1k"), ("diagnostico_cmmi_nivel2.cli", "1k")} <= medidos
+    assert all(r["por_elemento_us"] > 0 for r in informe["resultados"])
+    # Una ejecución comparada consigo misma no tiene regresiones
+    assert not any(fila[5] for fila in comparar(informe, informe))
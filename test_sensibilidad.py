@@ -0,0 +1,139 @@
+# test_sensibilidad.py
+# Compruebo el análisis de sensibilidad con semilla fija: los resultados se repiten exactamente,
+# sin error de evaluador los veredictos son seguros y las frecuencias simuladas se acercan a las exactas
+
+import itertools
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from KPAS import KPAS  # noqa: E402
+from evaluacion_cmmi import evaluar_kpa  # noqa: E402
+from motor_vectorial import ESTADOS, NOMBRES_KPA, matriz_respuestas  # noqa: E402
+from sensibilidad import (  # noqa: E402
+    OPCIONES,
+    SimuladorSensibilidad,
+    analizar_archivo,
+    main,
+    matriz_confusion,
+    modelo_adyacente,
+    tabla_estados,
+)
+from test_evaluacion_lotes import cartera, escribir_cartera  # noqa: E402
+
+KPA = "Gestión de requisitos"
+
+
+def test_tabla_de_estados_como_evaluar_kpa():
+    n = len(KPAS[KPA])
+    tabla = tabla_estados(n)
+    for opciones in itertools.product(OPCIONES, repeat=n):
+        clave = opciones.count(OPCIONES[0]) * (n + 1) + opciones.count(OPCIONES[1])
+        assert ESTADOS[tabla[clave]] == evaluar_kpa(KPA, list(opciones))["estado"]
+
+
+def test_misma_semilla_mismos_resultados():
+    matriz = matriz_respuestas(r for _, r in cartera(30))
+    primero = SimuladorSensibilidad(muestras=2000, semilla=5).analizar_matriz(matriz)
+    segundo = SimuladorSensibilidad(muestras=2000, semilla=5).analizar_matriz(matriz)
+    otro = SimuladorSensibilidad(muestras=2000, semilla=6).analizar_matriz(matriz)
+    assert np.array_equal(primero["probabilidades"], segundo["probabilidades"])
+    assert np.array_equal(primero["prob_cumple"], segundo["prob_cumple"])
+    assert not np.array_equal(primero["probabilidades"], otro["probabilidades"])
+
+
+def test_proyecto_solo_igual_que_dentro_de_la_cartera():
+    proyectos = cartera(12)
+    simulador = SimuladorSensibilidad(muestras=2000, semilla=3)
+    en_cartera = list(simulador.resultados_matriz(simulador.analizar_matriz(
+        matriz_respuestas(r for _, r in proyectos))))
+    for (_, respuestas), resultado in zip(proyectos, en_cartera):
+        solo = simulador.analizar_proyecto(respuestas)
+        assert solo["cumple_nivel2"] == resultado["cumple_nivel2"]
+        assert solo["kpas"] == resultado["kpas"]
+
+
+def test_sin_error_los_veredictos_son_seguros():
+    proyectos = cartera(30)
+    simulador = SimuladorSensibilidad(modelo_adyacente(0), muestras=50)
+    for (_, respuestas), resultado in zip(proyectos, simulador.resultados_matriz(
+            simulador.analizar_matriz(matriz_respuestas(r for _, r in proyectos)))):
+        assert resultado["prob_cambio"] == 0 and not resultado["fragil"]
+        assert resultado["prob_cumple"] == float(resultado["cumple_nivel2"])
+        for kpa, datos in resultado["kpas"].items():
+            assert datos["estado"] == evaluar_kpa(kpa, respuestas[kpa])["estado"]
+            assert datos["probabilidades"][datos["estado"]] == 1
+
+
+def probabilidades_exactas(opciones, confusion):
+    # Recorro todas las respuestas perturbadas posibles con su probabilidad
+    exactas = dict.fromkeys(ESTADOS, 0.0)
+    for perturbadas in itertools.product(range(len(OPCIONES)), repeat=len(opciones)):
+        p = np.prod([confusion[OPCIONES.index(o), d] for o, d in zip(opciones, perturbadas)])
+        exactas[evaluar_kpa(KPA, [OPCIONES[d] for d in perturbadas])["estado"]] += p
+    return exactas
+
+
+@pytest.mark.parametrize("opciones", [["1", "1", "1", "1", "2"], ["1", "2", "2", "3", "1"], ["3", "3", "2", "3", "3"]])
+def test_frecuencias_cerca_de_las_exactas(opciones):
+    modelo = modelo_adyacente(0.1)
+    respuestas = {kpa: ["1"] * len(preguntas) for kpa, preguntas in KPAS.items()}
+    respuestas[KPA] = opciones
+    resultado = SimuladorSensibilidad(modelo, muestras=40_000, semilla=11).analizar_proyecto(respuestas)
+    exactas = probabilidades_exactas(opciones, matriz_confusion(modelo))
+    for estado, p in resultado["kpas"][KPA]["probabilidades"].items():
+        assert p == pytest.approx(exactas[estado], abs=0.01)
+
+
+def test_modelo_por_texto_y_opciones_sin_modelo():
+    matriz = matriz_confusion({"Sí": {"Sí": 0.5, "2": 0.5}})
+    assert matriz[0].tolist() == [0.5, 0.5, 0.0]
+    assert matriz[1:].tolist() == [[0.0, 1.0, 0.0], [0.0, 0.0, 1.0]]
+
+
+@pytest.mark.parametrize("modelo, mensaje", [
+    ([], "diccionario"),
+    ({"4": {"1": 1}}, "Opción desconocida"),
+    ({"1": {"Quizá": 1}}, "Opción desconocida"),
+    ({"1": {"1": 1.5, "2": -0.5}}, "no negativos"),
+    ({"1": {"1": 0.5}}, "sumar 1"),
+])
+def test_modelos_no_validos(modelo, mensaje):
+    with pytest.raises(ValueError, match=mensaje):
+        matriz_confusion(modelo)
+
+
+def test_parametros_no_validos():
+    with pytest.raises(ValueError, match="entre 0 y 0.5"):
+        modelo_adyacente(0.6)
+    with pytest.raises(ValueError, match="muestras"):
+        SimuladorSensibilidad(muestras=0)
+    with pytest.raises(ValueError, match="umbral"):
+        SimuladorSensibilidad(umbral=2)
+    with pytest.raises(ValueError, match="columnas"):
+        SimuladorSensibilidad(muestras=1).analizar_matriz(np.ones((2, 3), dtype=np.uint8))
+
+
+def test_analizar_archivo_y_main(tmp_path, capsys):
+    proyectos = cartera(15)
+    escribir_cartera(tmp_path / "respuestas.csv", proyectos, "csv")
+    simulador = SimuladorSensibilidad(muestras=500)
+    nombres, analisis = analizar_archivo(str(tmp_path / "respuestas.csv"), str(tmp_path / "salida.jsonl"), simulador)
+    assert nombres == [nombre for nombre, _ in proyectos]
+    with open(tmp_path / "salida.jsonl", encoding="utf-8") as f:
+        lineas = [json.loads(linea) for linea in f]
+    assert [linea.pop("proyecto") for linea in lineas] == nombres
+    assert lineas == json.loads(json.dumps(list(simulador.resultados_matriz(analisis))))
+    assert all(list(linea["kpas"]) == list(NOMBRES_KPA) for linea in lineas)
+
+    ruta = str(tmp_path / "respuestas.csv")
+    assert main([ruta, "--muestras", "500"]) == 0
+    assert "Proyectos analizados: 15" in capsys.readouterr().out
+    assert main([ruta, "--muestras", "500", "--proyecto", "P3"]) == 0
+    assert "Proyecto P3" in capsys.readouterr().out
+    assert main([ruta, "--proyecto", "Otro"]) == 1
+    assert "No encuentro el proyecto 'Otro'" in capsys.readouterr().err
+    assert main([ruta, "--error", "0.7"]) == 1
+    assert capsys.readouterr().err.startswith("Error:")
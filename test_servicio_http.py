@@ -0,0 +1,123 @@
+# test_servicio_http.py
+# Compruebo el servicio HTTP con un servidor real en un puerto libre: las evaluaciones válidas
+# devuelven el registro del modo por lotes y las peticiones no válidas un error 4xx con su mensaje,
+# sin cerrar la conexión
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from KPAS import KPAS  # noqa: E402
+from evaluacion_lotes import evaluar_proyecto  # noqa: E402
+from servicio_http import MAX_CUERPO, ServicioEvaluacion  # noqa: E402
+from test_evaluacion_lotes import cartera  # noqa: E402
+
+
+async def enviar(lector, escritor, metodo, ruta, cuerpo=b""):
+    escritor.write(f"{metodo} {ruta} HTTP/1.1\r\nHost: prueba\r\nContent-Length: {len(cuerpo)}\r\n\r\n"
+                   .encode("ascii") + cuerpo)
+    await escritor.drain()
+    cabecera = (await lector.readuntil(b"\r\n\r\n")).decode("latin-1")
+    estado = int(cabecera.split(" ", 2)[1])
+    longitud = int(cabecera.lower().split("content-length:", 1)[1].split("\r\n", 1)[0])
+    return estado, await lector.readexactly(longitud)
+
+
+def con_servicio(prueba):
+    # Arranco el servicio en un puerto libre, ejecuto la prueba con una conexión y lo detengo
+    async def principal():
+        servicio = ServicioEvaluacion(puerto=0)
+        servidor = await servicio.iniciar()
+        puerto = servidor.sockets[0].getsockname()[1]
+        lector, escritor = await asyncio.open_connection("127.0.0.1", puerto)
+        try:
+            return await prueba(servicio, puerto, lector, escritor)
+        finally:
+            escritor.close()
+            await servicio.detener()
+    return asyncio.run(principal())
+
+
+def cuerpo(nombre, respuestas):
+    return json.dumps({"proyecto": nombre, "respuestas": respuestas}, ensure_ascii=False).encode("utf-8")
+
+
+def test_evaluaciones_validas_como_el_modo_por_lotes():
+    proyectos = cartera(10)
+
+    async def prueba(servicio, puerto, lector, escritor):
+        for nombre, respuestas in proyectos + [("Repetido", proyectos[0][1])]:  # El último sale de la caché
+            estado, datos = await enviar(lector, escritor, "POST", "/evaluar", cuerpo(nombre, respuestas))
+            assert estado == 200
+            assert datos.decode("utf-8") == json.dumps(evaluar_proyecto(nombre, respuestas), ensure_ascii=False)
+        estado, datos = await enviar(lector, escritor, "GET", "/salud")
+        return estado, json.loads(datos)
+
+    estado, salud = con_servicio(prueba)
+    assert estado == 200
+    # Los vectores repetidos (como el del último envío) no vuelven a puntuarse
+    assert salud["peticiones"] + salud["cache"]["aciertos"] == 11 and salud["cache"]["aciertos"] >= 1
+
+
+def test_peticiones_concurrentes():
+    proyectos = cartera(40)
+
+    async def prueba(servicio, puerto, lector, escritor):
+        async def cliente(nombre, respuestas):
+            lector, escritor = await asyncio.open_connection("127.0.0.1", puerto)
+            try:
+                return await enviar(lector, escritor, "POST", "/evaluar", cuerpo(nombre, respuestas))
+            finally:
+                escritor.close()
+        return await asyncio.gather(*(cliente(n, r) for n, r in proyectos))
+
+    for (nombre, respuestas), (estado, datos) in zip(proyectos, con_servicio(prueba)):
+        assert estado == 200
+        assert json.loads(datos) == json.loads(json.dumps(evaluar_proyecto(nombre, respuestas)))
+
+
+def respuestas_con(kpa, valor):
+    respuestas = {k: ["1"] * len(p) for k, p in KPAS.items()}
+    respuestas[kpa] = valor
+    return respuestas
+
+
+@pytest.mark.parametrize("metodo, ruta, datos, esperado, mensaje", [
+    ("POST", "/evaluar", b'{"proyecto": "P", "respuestas": ', 400, "Expecting value"),
+    ("POST", "/evaluar", b"\xff\xfe", 400, ""),
+    ("POST", "/evaluar", b"[1, 2]", 400, "objeto JSON"),
+    ("POST", "/evaluar", b'{"proyecto": "P", "respuestas": "11111"}', 400, "objeto JSON"),
+    ("POST", "/evaluar", cuerpo("P", respuestas_con("Gestión de requisitos", ["1", "4", "1", "1", "1"])), 400,
+     "Gestión de requisitos"),
+    ("POST", "/evaluar", cuerpo("P", respuestas_con("Gestión de requisitos", ["1"])), 400, "Gestión de requisitos"),
+    ("GET", "/evaluar", b"", 405, "POST"),
+    ("POST", "/salud", b"", 405, "GET"),
+    ("GET", "/otra", b"", 404, "/otra"),
+])
+def test_errores_del_cliente(metodo, ruta, datos, esperado, mensaje):
+    valido = cuerpo("P", respuestas_con("Gestión de requisitos", ["1"] * 5))
+
+    async def prueba(servicio, puerto, lector, escritor):
+        error = await enviar(lector, escritor, metodo, ruta, datos)
+        # La misma conexión sigue atendiendo peticiones después del error
+        return error, await enviar(lector, escritor, "POST", "/evaluar", valido)
+
+    (estado, error), (estado_siguiente, _) = con_servicio(prueba)
+    assert estado == esperado
+    assert mensaje in json.loads(error)["error"]
+    assert estado_siguiente == 200
+
+
+def test_cuerpo_demasiado_grande():
+    async def prueba(servicio, puerto, lector, escritor):
+        escritor.write(f"POST /evaluar HTTP/1.1\r\nContent-Length: {MAX_CUERPO + 1}\r\n\r\n".encode("ascii"))
+        await escritor.drain()
+        cabecera = await lector.readuntil(b"\r\n\r\n")
+        return cabecera.split(b" ", 2)[1], await lector.read()
+
+    estado, datos = con_servicio(prueba)
+    assert estado == b"413"
+    assert "supera" in json.loads(datos)["error"]
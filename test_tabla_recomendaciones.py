@@ -0,0 +1,53 @@
+# test_tabla_recomendaciones.py
+# Compruebo que la tabla precompilada devuelve exactamente lo mismo que la función original
+# (la de la CLI y la de la GUI) para los 3^5 = 243 patrones de respuesta de cada KPA
+
+import itertools
+
+import pytest
+
+import diagnostico_cmmi_nivel2
+import evaluacion_cmmi
+from KPAS import KPAS
+from VALOR_RESPUESTA import VALOR_RESPUESTA
+from tabla_recomendaciones import TablaRecomendaciones, recomendaciones_omitidas, respuestas_raw_de
+
+GENERADORES = [diagnostico_cmmi_nivel2.generar_recomendaciones_por_respuestas,
+               evaluacion_cmmi.generar_recomendaciones_por_respuestas]
+
+
+@pytest.mark.parametrize("generador", GENERADORES)
+def test_todos_los_patrones(generador):
+    tabla = TablaRecomendaciones(generador)
+    compilada = tabla.compilar("Gestión de requisitos", KPAS["Gestión de requisitos"])
+    for kpa, preguntas in KPAS.items():
+        for opciones in itertools.product(VALOR_RESPUESTA, repeat=len(preguntas)):
+            esperado = tuple(generador(kpa, respuestas_raw_de(preguntas, opciones)))
+            assert tabla.buscar(kpa, preguntas, list(opciones)) == esperado
+            if kpa == "Gestión de requisitos":
+                assert compilada[tabla.indice_patron(opciones)] == esperado
+
+
+def test_recomendaciones_base_de_un_cuestionario():
+    generador = GENERADORES[0]
+    tabla = TablaRecomendaciones(generador)
+    preguntas = ["¿Uno?", "¿Dos?"]
+    for base in (["Base 1"], ["Base 2"]):
+        for opciones in itertools.product(VALOR_RESPUESTA, repeat=2):
+            esperado = tuple(generador("Área", respuestas_raw_de(preguntas, opciones), base))
+            assert tabla.buscar("Área", preguntas, list(opciones), base) == esperado
+    # Con las recomendaciones base el patrón entra en una tabla propia, no en la de RECOMENDACIONES_BASE
+    assert tabla.buscar("Área", preguntas, ["3", "1"], ["Base 1"])[0] == "Base 1"
+
+
+def test_preguntas_omitidas_usan_la_funcion_original():
+    generador = GENERADORES[1]
+    tabla = TablaRecomendaciones(generador)
+    preguntas = KPAS["Aseguramiento de calidad"]
+    opciones = ["3", "", "1", "", "2"]
+    assert tabla.buscar("Aseguramiento de calidad", preguntas, opciones) == tuple(
+        generador("Aseguramiento de calidad", respuestas_raw_de(preguntas, opciones)))
+    assert tabla.tablas == {}
+    assert recomendaciones_omitidas(preguntas, opciones) == tuple(
+        f"Pregunta sin responder (veredicto rápido): '{preguntas[i]}' -> Evaluarla para confirmar el estado de la KPA."
+        for i in (1, 3))
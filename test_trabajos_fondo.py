@@ -0,0 +1,131 @@
+# test_trabajos_fondo.py
+# Compruebo el trabajador en segundo plano de la GUI sin ventana: una raíz falsa guarda lo que
+# se programa con after y la prueba hace de bucle de eventos llamando a sondear
+
+import threading
+import time
+
+from evaluacion_cmmi import evaluar_kpa, importar_y_evaluar
+from test_evaluacion_lotes import cartera, escribir_cartera
+from trabajos_fondo import MAX_BLOQUES_EN_COLA, TrabajadorFondo
+
+
+class RaizFalsa:
+    def __init__(self):
+        self.programado = None
+
+    def after(self, ms, funcion):
+        self.programado = funcion
+        return "sondeo"
+
+    def after_cancel(self, identificador):
+        self.programado = None
+
+
+def atender(raiz, trabajo, limite=5.0):
+    # Hago de bucle de eventos de Tk hasta que el trabajo avise de su final
+    fin = time.monotonic() + limite
+    while not trabajo.terminado:
+        assert time.monotonic() < fin, "el trabajo no terminó"
+        funcion, raiz.programado = raiz.programado, None
+        if funcion is not None:
+            funcion()
+        time.sleep(0.001)
+
+
+def lanzar(funcion, *args):
+    raiz = RaizFalsa()
+    trabajador = TrabajadorFondo(raiz)
+    avisos = []
+    trabajo = trabajador.lanzar(
+        funcion, *args,
+        al_progresar=lambda hechos, total, mensaje: avisos.append(("progreso", hechos, total)),
+        al_recibir=lambda bloque: avisos.append(("bloque", bloque)),
+        al_terminar=lambda resultado: avisos.append(("fin", resultado)),
+        al_fallar=lambda error: avisos.append(("error", error)),
+        al_cancelar=lambda: avisos.append(("cancelado",)),
+    )
+    return raiz, trabajador, trabajo, avisos
+
+
+def test_bloques_en_orden_y_resultado():
+    def contar(trabajo, n):
+        for i in range(n):
+            trabajo.entregar(i)
+            trabajo.avanzar(i + 1, n, "Contando")
+        return "hecho"
+
+    raiz, trabajador, trabajo, avisos = lanzar(contar, 20)
+    atender(raiz, trabajo)
+    assert [a[1] for a in avisos if a[0] == "bloque"] == list(range(20))
+    assert [a for a in avisos if a[0] == "progreso"][-1] == ("progreso", 20, 20)
+    assert avisos[-1] == ("fin", "hecho")
+    assert trabajador.pendientes == set()
+    trabajador.cerrar()
+
+
+def test_error_y_cancelacion():
+    def fallar(trabajo):
+        raise ValueError("archivo roto")
+
+    raiz, trabajador, trabajo, avisos = lanzar(fallar)
+    atender(raiz, trabajo)
+    assert [a[0] for a in avisos] == ["error"] and str(avisos[0][1]) == "archivo roto"
+    trabajador.cerrar()
+
+    empezado = threading.Event()
+
+    def sin_fin(trabajo):
+        while True:
+            empezado.set()
+            trabajo.avanzar(1)
+
+    raiz, trabajador, trabajo, avisos = lanzar(sin_fin)
+    assert empezado.wait(5)
+    trabajo.cancelar()
+    atender(raiz, trabajo)
+    assert avisos[-1] == ("cancelado",)
+    trabajador.cerrar()
+
+
+def test_bloques_sin_recoger_frenan_el_trabajo():
+    entregados = []
+
+    def rapido(trabajo):
+        for i in range(10):
+            trabajo.entregar(i)
+            entregados.append(i)
+
+    raiz, trabajador, trabajo, avisos = lanzar(rapido)
+    fin = time.monotonic() + 5
+    while len(entregados) < MAX_BLOQUES_EN_COLA and time.monotonic() < fin:
+        time.sleep(0.001)
+    time.sleep(0.05)  # Sin sondear, la cola no se vacía y el trabajo espera
+    assert len(entregados) == MAX_BLOQUES_EN_COLA
+    atender(raiz, trabajo)
+    assert [a[1] for a in avisos if a[0] == "bloque"] == list(range(10))
+    trabajador.cerrar()
+
+
+class TrabajoAnotado:
+    def __init__(self):
+        self.bloques = []
+
+    def entregar(self, bloque):
+        self.bloques.append(bloque)
+
+    def avanzar(self, hechos, total=None, mensaje=""):
+        pass
+
+
+def test_importar_y_evaluar_por_bloques(tmp_path):
+    proyectos = cartera()
+    escribir_cartera(tmp_path / "respuestas.jsonl", proyectos, "jsonl")
+    trabajo = TrabajoAnotado()
+    assert importar_y_evaluar(trabajo, str(tmp_path / "respuestas.jsonl"), por_bloque=10) == 25
+    assert [len(proyectos_bloque) for proyectos_bloque, _ in trabajo.bloques] == [10, 10, 5]
+    importados = [p for proyectos_bloque, _ in trabajo.bloques for p in proyectos_bloque]
+    for (nombre, respuestas), (importado, resultados, _, _) in zip(proyectos, importados):
+        assert importado == nombre
+        assert [r["porcentaje"] for r in resultados] == [
+            evaluar_kpa(kpa, opciones)["porcentaje"] for kpa, opciones in respuestas.items()]
@@ -0,0 +1,67 @@
+# test_veredicto_rapido.py
+# Compruebo el modo de veredicto rápido: solo se deja de preguntar cuando ninguna respuesta posible
+# a las preguntas que faltan puede cambiar el resultado, y los resultados omitidos se marcan bien
+
+import itertools
+
+import pytest
+
+import diagnostico_cmmi_nivel2
+from KPAS import KPAS
+from VALOR_RESPUESTA import VALOR_RESPUESTA
+from porcentaje import cotas_porcentaje, estado_decidido, estado_porcentaje, porcentaje_ponderado
+
+KPA = "Planificación de proyectos"
+
+
+def implementada(valores, pesos=None):
+    return estado_porcentaje(porcentaje_ponderado(valores, pesos)) == "Implementada"
+
+
+@pytest.mark.parametrize("pesos", [None, (3.0, 1.0, 1.0, 2.0, 1.0)])
+def test_decidido_solo_si_ninguna_respuesta_lo_cambia(pesos):
+    valores = list(VALOR_RESPUESTA.values())
+    for respondidas in range(1, 5):
+        for prefijo in itertools.product(valores, repeat=respondidas):
+            faltan = 5 - respondidas
+            completas = [list(prefijo) + list(resto) for resto in itertools.product(valores, repeat=faltan)]
+            estados = {estado_porcentaje(porcentaje_ponderado(c, pesos)) for c in completas}
+            veredictos = {implementada(c, pesos) for c in completas}
+            parcial = list(prefijo) + [None] * faltan
+            assert estado_decidido(parcial, "estado", pesos=pesos) == (len(estados) == 1)
+            assert estado_decidido(parcial, "nivel2", pesos=pesos) == (len(veredictos) == 1)
+            minimo, maximo = cotas_porcentaje(parcial, pesos=pesos)
+            assert minimo == min(porcentaje_ponderado(c, pesos) for c in completas)
+            assert maximo == max(porcentaje_ponderado(c, pesos) for c in completas)
+
+
+def evaluar_con_respuestas(monkeypatch, respuestas, criterio):
+    entradas = iter(respuestas)
+    monkeypatch.setattr("builtins.input", lambda mensaje="": next(entradas))
+    return diagnostico_cmmi_nivel2.evaluar_kpa(KPA, KPAS[KPA], modo_rapido=True, criterio=criterio)
+
+
+def test_estado_decidido_omite_el_resto(monkeypatch, capsys):
+    resultado = evaluar_con_respuestas(monkeypatch, ["3", "3", "3"], "estado")
+    assert "omito 2 pregunta(s)" in capsys.readouterr().out
+    assert resultado["omitidas"] == (3, 4)
+    assert resultado["estado"] == "Deficiente"
+    assert not resultado["provisional"]
+
+
+def test_criterio_nivel2_deja_el_estado_provisional(monkeypatch, capsys):
+    # Con dos "No" ya no llega al 80%, pero todavía puede quedar Deficiente o Parcialmente implementada
+    resultado = evaluar_con_respuestas(monkeypatch, ["3", "3"], "nivel2")
+    assert "omito 3 pregunta(s)" in capsys.readouterr().out
+    assert resultado["omitidas"] == (2, 3, 4)
+    assert resultado["porcentaje"] == 0
+    assert resultado["provisional"]
+    assert any("sin responder" in r for r in resultado["recomendaciones"])
+
+
+def test_sin_modo_rapido_pregunta_todo(monkeypatch):
+    entradas = iter(["3"] * 5)
+    monkeypatch.setattr("builtins.input", lambda mensaje="": next(entradas))
+    resultado = diagnostico_cmmi_nivel2.evaluar_kpa(KPA, KPAS[KPA])
+    assert resultado["omitidas"] == ()
+    assert resultado["porcentaje"] == 0
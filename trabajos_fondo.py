@@ -0,0 +1,181 @@
+# trabajos_fondo.py
+# Este archivo implementa un trabajador en segundo plano para la interfaz gráfica
+# Las tareas pesadas (importar un archivo de respuestas, puntuar una cartera, exportar un informe)
+# se ejecutan en un hilo aparte y solo se comunican con Tkinter a través de una cola
+# que leo con root.after, así la ventana sigue respondiendo mientras trabajan
+
+import queue  # Cola segura entre hilos para los mensajes de los trabajos
+import threading  # Para la señal de cancelación de cada trabajo
+import time  # Para no enviar más avisos de progreso de los que se pueden dibujar
+from concurrent.futures import ThreadPoolExecutor  # Hilos que ejecutan los trabajos
+
+
+# Cada cuántos milisegundos miro la cola desde el hilo de Tkinter (unos 60 fotogramas por segundo)
+INTERVALO_SONDEO = 16
+
+# Mensajes que proceso como máximo en cada sondeo, para no bloquear la ventana si se acumulan
+MAX_MENSAJES_POR_SONDEO = 200
+
+# Bloques de resultados parciales que un trabajo puede dejar en la cola sin que la GUI los haya recogido
+MAX_BLOQUES_EN_COLA = 4
+
+
+class TrabajoCancelado(Exception):
+    """
+    La lanza Trabajo.avanzar dentro del hilo cuando el usuario ha cancelado el trabajo.
+    """
+
+
+class Trabajo:
+    """
+    Un trabajo lanzado en segundo plano.
+    La función del trabajo recibe este objeto como primer argumento y llama a avanzar()
+    para informar del progreso y a entregar() para enviar resultados parciales;
+    en los dos se detiene si el usuario lo ha cancelado.
+    """
+
+    def __init__(self, cola, al_progresar=None, al_terminar=None, al_fallar=None, al_cancelar=None,
+                 al_recibir=None):
+        self.cola = cola
+        self.evento_cancelar = threading.Event()
+        self.terminado = False
+        # Funciones que llamo desde el hilo de Tkinter
+        self.al_progresar = al_progresar  # al_progresar(hechos, total, mensaje); total puede ser None
+        self.al_terminar = al_terminar  # al_terminar(resultado)
+        self.al_fallar = al_fallar  # al_fallar(error)
+        self.al_cancelar = al_cancelar  # al_cancelar()
+        self.al_recibir = al_recibir  # al_recibir(bloque) con cada bloque de resultados parciales
+        self.ultimo_aviso = 0.0
+        self.huecos = threading.Semaphore(MAX_BLOQUES_EN_COLA)  # Bloques que aún puedo enviar sin esperar
+
+    def cancelar(self):
+        """
+        Pido al trabajo que se detenga en su próximo avance (lo llamo desde la GUI).
+        """
+        self.evento_cancelar.set()
+
+    @property
+    def cancelado(self):
+        return self.evento_cancelar.is_set()
+
+    def avanzar(self, hechos, total=None, mensaje=""):
+        """
+        Informo del progreso desde el hilo del trabajo. Solo envío un aviso por intervalo
+        de sondeo (y siempre el último), así la cola no crece aunque se llame por cada elemento.
+        """
+        if self.evento_cancelar.is_set():
+            raise TrabajoCancelado()
+        ahora = time.monotonic()
+        if hechos == total or ahora - self.ultimo_aviso >= INTERVALO_SONDEO / 1000:
+            self.ultimo_aviso = ahora
+            self.cola.put(("progreso", self, (hechos, total, mensaje)))
+
+    def entregar(self, bloque):
+        """
+        Envío un bloque de resultados parciales desde el hilo del trabajo. A diferencia de los avisos
+        de progreso, los bloques no se descartan: la GUI los recibe todos y en orden, antes del final.
+        Si ya hay MAX_BLOQUES_EN_COLA sin recoger espero, así la memoria no crece aunque el trabajo
+        vaya más rápido que la ventana.
+        """
+        while True:
+            if self.evento_cancelar.is_set():
+                raise TrabajoCancelado()
+            if self.huecos.acquire(timeout=INTERVALO_SONDEO / 1000):
+                break
+        self.cola.put(("bloque", self, bloque))
+
+
+class TrabajadorFondo:
+    """
+    Ejecuta trabajos en un grupo de hilos y entrega sus avisos en el hilo de Tkinter.
+    Todas las funciones al_* de los trabajos se llaman desde sondear(), nunca desde otro hilo,
+    así que pueden tocar widgets sin problemas.
+    """
+
+    def __init__(self, root, hilos=1):
+        self.root = root
+        self.cola = queue.Queue()
+        self.ejecutor = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="cmmi-trabajo")
+        self.pendientes = set()  # Trabajos lanzados que todavía no han avisado de su final
+        self.sondeo = None  # Identificador del root.after programado
+
+    def lanzar(self, funcion, *args, al_progresar=None, al_terminar=None, al_fallar=None, al_cancelar=None,
+               al_recibir=None):
+        """
+        Ejecuto funcion(trabajo, *args) en segundo plano y devuelvo el Trabajo para poder cancelarlo.
+        """
+        trabajo = Trabajo(self.cola, al_progresar, al_terminar, al_fallar, al_cancelar, al_recibir)
+        self.pendientes.add(trabajo)
+        self.ejecutor.submit(self.ejecutar, trabajo, funcion, args)
+        self.programar_sondeo()
+        return trabajo
+
+    def ejecutar(self, trabajo, funcion, args):
+        """
+        Cuerpo del hilo: ejecuto el trabajo y dejo en la cola cómo terminó.
+        """
+        try:
+            resultado = funcion(trabajo, *args)
+        except TrabajoCancelado:
+            self.cola.put(("cancelado", trabajo, None))
+        except Exception as error:  # Cualquier fallo se muestra en la GUI, no en este hilo
+            self.cola.put(("error", trabajo, error))
+        else:
+            self.cola.put(("fin", trabajo, resultado))
+
+    def programar_sondeo(self):
+        if self.sondeo is None:
+            self.sondeo = self.root.after(INTERVALO_SONDEO, self.sondear)
+
+    def sondear(self):
+        """
+        Leo los mensajes acumulados en la cola (en el hilo de Tkinter) y llamo a las funciones de cada trabajo.
+        De los avisos de progreso solo uso el último de cada trabajo; los bloques y los finales los
+        entrego todos, en el orden en que llegaron.
+        """
+        self.sondeo = None
+        progreso = {}
+        ordenados = []
+        for _ in range(MAX_MENSAJES_POR_SONDEO):
+            try:
+                tipo, trabajo, dato = self.cola.get_nowait()
+            except queue.Empty:
+                break
+            if tipo == "progreso":
+                progreso[trabajo] = dato
+            else:
+                ordenados.append((tipo, trabajo, dato))
+
+        for trabajo, (hechos, total, mensaje) in progreso.items():
+            if trabajo.al_progresar is not None and not trabajo.cancelado:
+                trabajo.al_progresar(hechos, total, mensaje)
+
+        for tipo, trabajo, dato in ordenados:
+            if tipo == "bloque":
+                if trabajo.al_recibir is not None and not trabajo.cancelado:
+                    trabajo.al_recibir(dato)
+                trabajo.huecos.release()
+                continue
+            trabajo.terminado = True
+            self.pendientes.discard(trabajo)
+            if tipo == "fin" and trabajo.al_terminar is not None:
+                trabajo.al_terminar(dato)
+            elif tipo == "error" and trabajo.al_fallar is not None:
+                trabajo.al_fallar(dato)
+            elif tipo == "cancelado" and trabajo.al_cancelar is not None:
+                trabajo.al_cancelar()
+
+        # Sigo sondeando mientras quede algún trabajo en marcha o mensajes sin leer
+        if self.pendientes or not self.cola.empty():
+            self.programar_sondeo()
+
+    def cerrar(self):
+        """
+        Cancelo todos los trabajos en marcha y libero los hilos (al cerrar la aplicación).
+        """
+        for trabajo in self.pendientes:
+            trabajo.cancelar()
+        if self.sondeo is not None:
+            self.root.after_cancel(self.sondeo)
+            self.sondeo = None
+        self.ejecutor.shutdown(wait=False, cancel_futures=True)